@@ -0,0 +1,251 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import re
+import stat
+import bisect
+import shutil
+import tempfile
+import contextlib
+
+COPY_BLOCK_SIZE = 1024 * 1024
+
+
+class ConfigStore:
+    '''In-memory, indexed view of a Kconfig style file (config,
+    rootfs_config, sdt-auto.conf, ...).
+
+    The file is parsed once into a symbol dict and a sorted key list
+    which serves prefix lookups, and is only re-read when its
+    inode, size or mtime changes on disk.
+
+    Updates are staged in memory and written back in a single pass by
+    commit(), reads always see the staged values.
+    '''
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.stamp = None
+        self.disk_lines = []
+        self.staged = {}
+        self.lines = []
+        self.symbols = {}
+        self.keys = []
+        self.query_cache = {}
+
+    def _stat(self):
+        try:
+            st = os.stat(self.filename)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def invalidate(self):
+        self.stamp = False
+
+    def refresh(self):
+        stamp = self._stat()
+        if stamp == self.stamp:
+            return
+        lines = []
+        if stamp:
+            with open(self.filename, 'r') as file_data:
+                lines = file_data.readlines()
+        self.stamp = stamp
+        self.disk_lines = lines
+        self.load(self._apply_staged(lines))
+
+    @staticmethod
+    def _macro_pattern(macro):
+        # Same matching rules update_config_value always used
+        return re.compile('(?:# %s is not set)|(?:%s=)' % (macro, macro))
+
+    def _apply_staged(self, lines):
+        if not self.staged:
+            return lines
+        pattern = re.compile('|'.join(
+            '(?:# %s is not set)|(?:%s=)' % (macro, macro)
+            for macro in self.staged))
+        lines = [line for line in lines if not pattern.search(line)]
+        return lines + [line for line in self.staged.values() if line]
+
+    def set(self, macro, value):
+        self.refresh()
+        if value == 'disable':
+            new_line = '# %s is not set\n' % macro
+        else:
+            new_line = '%s=%s\n' % (macro, value)
+        pattern = self._macro_pattern(macro)
+        if [line for line in self.lines if pattern.search(line)] == \
+                [new_line] and self.lines[-1] == new_line:
+            # Symbol already holds this value on the last line, where the
+            # update would move it, nothing to rewrite
+            return
+        # Setting a symbol drops every earlier line it matches, this
+        # includes lines staged for other symbols, whose patterns keep
+        # filtering the on-disk lines.
+        for staged_macro, line in self.staged.items():
+            if line and pattern.search(line):
+                self.staged[staged_macro] = None
+        self.staged.pop(macro, None)
+        self.staged[macro] = new_line
+        self.load(self._apply_staged(self.disk_lines))
+
+    def discard(self):
+        if self.staged:
+            self.staged = {}
+            self.load(self.disk_lines)
+
+    def commit(self):
+        if not self.staged:
+            return
+        lines = self._apply_staged(self.disk_lines)
+        write_file_atomic(self.filename, ''.join(lines))
+        self.staged = {}
+        self.disk_lines = lines
+        self.stamp = self._stat()
+        self.load(lines)
+
+    def load(self, lines):
+        self.lines = lines
+        self.symbols = {}
+        self.query_cache = {}
+        for index, line in enumerate(lines):
+            line = line.strip()
+            if not line:
+                continue
+            # Lines are keyed by the text before the first '=' so that
+            # "startswith(macro + '=')" becomes a single dict lookup.
+            key = line.split('=', 1)[0]
+            self.symbols.setdefault(key, []).append(index)
+        self.keys = sorted(self.symbols.keys())
+
+    def _prefix_matches(self, macro):
+        # Indexes of all lines starting with macro, in file order
+        matches = []
+        start = bisect.bisect_left(self.keys, macro)
+        for key in self.keys[start:]:
+            if not key.startswith(macro):
+                break
+            matches += self.symbols[key]
+        return [self.lines[index].strip() for index in sorted(matches)]
+
+    def _scan(self, macro):
+        return [line.strip() for line in self.lines
+                if line.strip().startswith(macro)]
+
+    def get(self, macro, Type='bool', end_macro='=y'):
+        self.refresh()
+        query = (macro, Type, end_macro)
+        if query not in self.query_cache:
+            self.query_cache[query] = self._lookup(macro, Type, end_macro)
+        value = self.query_cache[query]
+        read_log.append((self.filename, query, value))
+        return value
+
+    def _lookup(self, macro, Type, end_macro):
+        if '=' in macro:
+            # Keys never contain '=', fall back to a linear scan
+            candidates = self._scan(macro)
+        elif Type == 'bool':
+            candidates = [self.lines[index].strip()
+                          for index in self.symbols.get(macro, [])]
+        else:
+            candidates = self._prefix_matches(macro)
+        value = ''
+        if Type == 'bool':
+            for line in candidates:
+                if line.startswith(macro + '='):
+                    value = line.replace(macro + '=', '').replace('"', '')
+                    break
+        elif Type == 'choice':
+            for line in candidates:
+                if line.endswith(end_macro):
+                    value = line.replace(macro, '').replace(end_macro, '')
+                    break
+        elif Type == 'choicelist':
+            for line in candidates:
+                if line.endswith(end_macro):
+                    value += ' ' + \
+                        line.replace(macro, '').replace(end_macro, '')
+        elif Type == 'asterisk':
+            for line in candidates:
+                if re.search(end_macro, line):
+                    value = line.split('=')[1].replace('"', '')
+                    break
+        return value
+
+
+config_stores = {}
+batch_depth = 0
+# Every lookup made through a ConfigStore, in order, see stage_manifest
+read_log = []
+
+
+def write_file_atomic(filename, data):
+    '''Write data to a sibling temp file and rename it over filename so
+    an interrupted run never leaves a half-written file behind. data is
+    a str, bytes or a binary file object, copied in blocks.'''
+    try:
+        mode = stat.S_IMODE(os.stat(filename).st_mode)
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    fd, tmpfile = tempfile.mkstemp(dir=os.path.dirname(filename),
+                                   prefix='.%s.' % os.path.basename(filename))
+    try:
+        with os.fdopen(fd, 'w' if isinstance(data, str) else 'wb') \
+                as file_data:
+            if hasattr(data, 'read'):
+                shutil.copyfileobj(data, file_data, COPY_BLOCK_SIZE)
+            else:
+                file_data.write(data)
+            file_data.flush()
+            os.fsync(file_data.fileno())
+        os.chmod(tmpfile, mode)
+        os.replace(tmpfile, filename)
+    except BaseException:
+        if os.path.exists(tmpfile):
+            os.remove(tmpfile)
+        raise
+
+
+def get_config_store(filename):
+    filename = os.path.abspath(filename)
+    if filename not in config_stores:
+        config_stores[filename] = ConfigStore(filename)
+    return config_stores[filename]
+
+
+@contextlib.contextmanager
+def config_batch():
+    '''Stage every update_config_value() made inside the block and
+    write each touched file once, atomically, when the outermost block
+    exits. Staged updates are dropped if the block raises.
+    '''
+    global batch_depth
+    batch_depth += 1
+    try:
+        yield
+    except BaseException:
+        if batch_depth == 1:
+            for store in config_stores.values():
+                store.discard()
+        raise
+    else:
+        if batch_depth == 1:
+            for store in config_stores.values():
+                store.commit()
+    finally:
+        batch_depth -= 1
+
+
+def set_config_value(macro, value, filename):
+    store = get_config_store(filename)
+    store.set(macro, value)
+    if not batch_depth:
+        store.commit()
+
@@ -0,0 +1,145 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import json
+import atexit
+import time
+import hashlib
+import threading
+import concurrent.futures
+
+from config_store import write_file_atomic
+
+BLOCK_SIZE = 4 * 1024 * 1024
+# Files modified this recently may still change within the same mtime
+# tick, their digests are not cached.
+RACY_WINDOW = 2
+
+
+def sha256_file(filename):
+    '''sha256 of filename, read in large blocks into a reused buffer.'''
+    method = hashlib.sha256()
+    buf = bytearray(BLOCK_SIZE)
+    view = memoryview(buf)
+    with open(filename, 'rb', buffering=0) as file_f:
+        while True:
+            size = file_f.readinto(buf)
+            if not size:
+                break
+            method.update(view[:size])
+    return method.hexdigest()
+
+
+class DigestCache:
+    '''File digests keyed on (path, inode, size, mtime_ns, kind).
+
+    Entries live in memory for the run and in an optional JSON cache
+    file across runs, so an unchanged file is hashed at most once. The
+    file is written by flush(), at the end of a batch of digests and
+    at exit, not on every new digest.
+    prefetch() computes a digest on a background thread, a digest()
+    call for the same file waits for it instead of hashing again.
+    '''
+
+    def __init__(self):
+        self.entries = {}
+        self.pending = {}
+        self.cache_file = None
+        self.dirty = False
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def set_cache_file(self, cache_file):
+        with self.lock:
+            self.cache_file = cache_file
+            try:
+                with open(cache_file, 'r') as cache_f:
+                    saved = json.load(cache_f)
+            except (OSError, ValueError):
+                return
+            for path, kind, ino, size, mtime_ns, digest in saved:
+                self.entries.setdefault(
+                    (path, kind), ((ino, size, mtime_ns), digest))
+
+    def flush(self):
+        with self.lock:
+            if self.dirty:
+                self._save()
+                self.dirty = False
+
+    def _save(self):
+        if not self.cache_file:
+            return
+        data = [[path, kind] + list(stamp) + [digest]
+                for (path, kind), (stamp, digest) in self.entries.items()]
+        try:
+            write_file_atomic(self.cache_file, json.dumps(data, indent=1))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _stamp(filename):
+        st = os.stat(filename)
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def digest(self, filename, kind='sha256', hash_func=sha256_file):
+        path = os.path.abspath(filename)
+        key = (path, kind)
+        with self.lock:
+            event = self.pending.get(key)
+        if event:
+            event.wait()
+        return self._compute(path, kind, hash_func)
+
+    def _compute(self, path, kind, hash_func):
+        key = (path, kind)
+        stamp = self._stamp(path)
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry and entry[0] == stamp:
+            return entry[1]
+        digest = hash_func(path)
+        # Only keep the digest if the file did not change while hashing,
+        # and not while it is racy: a file rewritten within the same
+        # mtime tick may come back with the same inode and size.
+        if self._stamp(path) == stamp and \
+                time.time_ns() - stamp[2] > RACY_WINDOW * 10**9:
+            with self.lock:
+                self.entries[key] = (stamp, digest)
+                self.dirty = True
+        return digest
+
+    def prefetch(self, filenames, kind='sha256', hash_func=sha256_file):
+        '''Start hashing filenames (a path or a list of paths) on a
+        thread pool.'''
+        if isinstance(filenames, str):
+            filenames = [filenames]
+        with self.lock:
+            if not self.executor:
+                self.executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=min(8, os.cpu_count() or 1))
+        for filename in filenames:
+            path = os.path.abspath(filename)
+            key = (path, kind)
+            with self.lock:
+                if key in self.pending:
+                    continue
+                event = self.pending[key] = threading.Event()
+            self.executor.submit(self._prefetch_worker, path, kind,
+                                 hash_func, event)
+
+    def _prefetch_worker(self, path, kind, hash_func, event):
+        try:
+            self._compute(path, kind, hash_func)
+        except OSError:
+            pass
+        finally:
+            with self.lock:
+                self.pending.pop((path, kind), None)
+            event.set()
+
+
+digest_cache = DigestCache()
+atexit.register(digest_cache.flush)
@@ -0,0 +1,173 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# flash_parts.txt of the XSCT flow written without launching xsct: the
+# get_flash_width_parts procs of petalinux_hsm.tcl over the lines of the
+# config, with the flash cell looked up in the syshw data instead of the
+# XSA. Anything the port can not answer the way the Tcl would (hardware
+# properties the syshw data does not hold, values Tcl would read
+# differently) raises FlashPartsUnsupported, for the caller to run xsct.
+
+import re
+
+KCONF_NAME = re.compile(r'[A-Za-z0-9_]+\Z')
+PART_NAME = re.compile(r'[A-Za-z0-9_.-]*\Z')
+# Integers Tcl expr reads the way Python does, no octal ambiguity
+TCL_INTEGER = re.compile(r'(0[xX][0-9a-fA-F]+|0|[1-9][0-9]*)\Z')
+LIST_INDEX = re.compile(r'(0|[1-9][0-9]*)\Z')
+# Characters which could make a line more than one list element
+LIST_SPECIAL = set(' \t\v\f{}\\')
+PART_IMAGES = ('fpga', 'boot', 'kernel', 'jffs2', 'dtb')
+
+
+class FlashPartsUnsupported(Exception):
+    '''petalinux_hsm.tcl has to write flash_parts.txt.'''
+
+
+def string_map(mapping, text):
+    '''Tcl string map: a single pass, trying the keys in order at each
+    position.'''
+    return re.sub('|'.join(re.escape(k) for k in mapping),
+                  lambda m: mapping[m.group(0)], text)
+
+
+def tcl_integer(value):
+    if not TCL_INTEGER.match(value):
+        raise FlashPartsUnsupported('not an integer: %s' % value)
+    return int(value, 0)
+
+
+def search(lines, pattern):
+    '''lsearch -inline -regexp, '' when nothing matches.'''
+    regex = re.compile(pattern)
+    for line in lines:
+        if regex.search(line):
+            return line
+    return ''
+
+
+def list_word(line):
+    '''A config line llength sees as a single word.'''
+    if LIST_SPECIAL.intersection(line):
+        raise FlashPartsUnsupported('line is not a single word: %s' % line)
+    return line
+
+
+def read_config_lines(sysconfig):
+    try:
+        with open(sysconfig, 'r', encoding='ascii') as config_f:
+            return config_f.read().split('\n')
+    except UnicodeDecodeError:
+        raise FlashPartsUnsupported('non ASCII config')
+
+
+def get_primary_flash(lines):
+    '''The selected flash Kconfig name, '' for none or MANUAL.'''
+    prefix = 'CONFIG_SUBSYSTEM_FLASH_'
+    selected = search(lines, '^%s(.*)_SELECT=y' % prefix)
+    if not selected:
+        return ''
+    selected = string_map({prefix: '', '_SELECT=y': ''}, selected)
+    if selected == 'MANUAL':
+        return ''
+    if not KCONF_NAME.match(selected):
+        raise FlashPartsUnsupported('flash name %s' % selected)
+    return selected
+
+
+def get_partitions(lines, flash_kname):
+    '''name=offset size of the partitions holding the images.'''
+    if not flash_kname:
+        return []
+    part_prefix = 'CONFIG_SUBSYSTEM_FLASH_%s_PART' % flash_kname
+    part_sizes = [line for line in lines
+                  if re.search('^%s(.*)_SIZE=' % part_prefix, line)]
+    if not part_sizes:
+        return []
+    offsets = ['0']
+    sizes = []
+    for i in range(len(part_sizes)):
+        size = search(lines, '^%s%d_SIZE=' % (part_prefix, i))
+        if not size:
+            raise FlashPartsUnsupported('no size for partition %d' % i)
+        size = re.sub('.*=', '', list_word(size))
+        offsets.append('0x%x' % (tcl_integer(offsets[i]) + tcl_integer(size)))
+        sizes.append(size)
+
+    name_prefix = 'CONFIG_SUBSYSTEM_IMAGES_ADVANCED_AUTOCONFIG_%s_PART_NAME=' \
+        % flash_kname
+    parts = []
+    for image in PART_IMAGES:
+        partname = image
+        # The same symbol for every image, as in petalinux_hsm.tcl
+        line = search(lines, '^' + name_prefix)
+        if line:
+            partname = string_map({'"': '', name_prefix: ''}, line)
+        if not PART_NAME.match(partname):
+            raise FlashPartsUnsupported('partition name %s' % partname)
+        part_id_str = search(lines, '^%s(.*)_NAME="(.*)%s"' % (
+            part_prefix, partname))
+        if not part_id_str:
+            continue
+        act_part_name = list_word(part_id_str).split('"')[1]
+        part_id = string_map({part_prefix: '',
+                              '_NAME="%s"' % act_part_name: ''}, part_id_str)
+        if not LIST_INDEX.match(part_id):
+            raise FlashPartsUnsupported('partition index %s' % part_id)
+        part_id = int(part_id)
+        parts.append('%s=%s %s' % (
+            partname, offsets[part_id] if part_id < len(offsets) else '',
+            sizes[part_id] if part_id < len(sizes) else ''))
+    return parts
+
+
+def get_flash_width(flash_kname, hw_model, processor):
+    '''flash_type, and width and size of a flash bank, from the syshw
+    data of processor.'''
+    if not flash_kname:
+        return []
+    flash_name = re.sub('_BANK.*', '', flash_kname).lower()
+    flash_bank = re.sub('.*_BANK', '', flash_kname)
+    ipname = hw_model.slave_property(processor, flash_name)
+    if not ipname:
+        raise FlashPartsUnsupported('%s is not a slave of %s' % (
+            flash_name, processor))
+    flash = hw_model.device_type(ipname, 'flash')
+    flash_type = flash.get('flash_type')
+    if not isinstance(flash_type, str):
+        raise FlashPartsUnsupported('no flash_type for %s' % ipname)
+    widths = []
+    if flash_type:
+        widths.append('flash_type=%s' % flash_type)
+
+    def bank_property(prop):
+        properties = flash.get('bank_property') or {}
+        name = properties.get(prop) if isinstance(properties, dict) else ''
+        if not name:
+            return ''
+        name = name.replace('<PLNXNUM>', flash_bank).lower()
+        value = hw_model.slave_property(processor, flash_name, name)
+        if not isinstance(value, str) or not value:
+            raise FlashPartsUnsupported('%s of %s is not in the syshw data'
+                                        % (name, flash_name))
+        return value
+
+    flash_width = bank_property('bank_width')
+    if flash_width:
+        widths.append('flash_width=%s' % flash_width)
+    flash_base = bank_property('bank_baseaddr')
+    if flash_base:
+        flash_high = bank_property('bank_highaddr')
+        widths.append('flash_size=0x%x' % (
+            tcl_integer(flash_high) - tcl_integer(flash_base) + 1))
+    return widths
+
+
+def gen_flash_parts(sysconfig, hw_model, processor):
+    '''flash_parts.txt as get_flash_width_parts writes it.'''
+    lines = read_config_lines(sysconfig)
+    flash_kname = get_primary_flash(lines)
+    parts = get_partitions(lines, flash_kname)
+    widths = get_flash_width(flash_kname, hw_model, processor)
+    return ''.join('%s\n' % line for line in widths + parts)
@@ -22,10 +22,80 @@ proc plnx_convert_list_to_yaml {datanode prefix} {
 	return "${str}"
 }
 
+proc plnx_json_string {str} {
+	set str [string map {"\\" "\\\\" "\"" "\\\"" "\n" "\\n" "\r" "\\r" "\t" "\\t"} ${str}]
+	return "\"${str}\""
+}
+
+# Whether yaml reads text back as the plain scalar it is, rather than as
+# a quoted string, a comment, a collection, an alias, ...
+proc plnx_yaml_plain {text} {
+	if { [regexp {^[][{},#&*!|>'"%@`]|^[-?:](\s|$)|:(\s|$)|\s#|^\s|\s$|[\x00-\x1f\x7f]} "${text}"] } {
+		return 0
+	}
+	return 1
+}
+
+# Same tree as plnx_convert_list_to_yaml, scalars are left as the plain
+# YAML text so the reader resolves them exactly as yaml would
+proc plnx_convert_list_to_json {datanode} {
+	global plnx_json_plain
+	set var [lindex ${datanode} 0]
+	set scalar ""
+	set children {}
+	foreach n [lreplace ${datanode} 0 0] {
+		if {[llength ${n}] <= 1} {
+			set scalar [format "%s %s" "${scalar}" "${n}"]
+		} else {
+			lappend children [plnx_convert_list_to_json ${n}]
+		}
+	}
+	set scalar [string trim ${scalar}]
+	if { ![plnx_yaml_plain "${var}"] || ![plnx_yaml_plain "${scalar}"] || \
+		([llength ${children}] > 0 && "${scalar}" ne "") } {
+		set plnx_json_plain 0
+	}
+	if {[llength ${children}] > 0} {
+		set value "\{[join ${children} ", "]\}"
+	} else {
+		set value [plnx_json_string ${scalar}]
+	}
+	return "[plnx_json_string ${var}]: ${value}"
+}
+
 proc plnx_output_data {datanodes} {
 	set msg [plnx_convert_list_to_yaml ${datanodes} ""]
 	global plnx_data
 	puts ${plnx_data} "${msg}"
+	global plnx_json_nodes
+	if {[lindex ${datanodes} 0] eq "processor"} {
+		# One record per processor, so a reader can load just one
+		foreach cpu [lreplace ${datanodes} 0 0] {
+			lappend plnx_json_nodes [plnx_convert_list_to_json [list processor ${cpu}]]
+		}
+	} else {
+		lappend plnx_json_nodes [plnx_convert_list_to_json ${datanodes}]
+	}
+}
+
+# JSON sidecar of plnx_syshw_data, much faster to load than the YAML:
+# a header line, then one single key object per line
+proc plnx_output_json {filename} {
+	global plnx_json_nodes plnx_json_plain
+	if { [catch {open "${filename}" w} jsonf] } {
+		error "Failed to open output data file ${filename}"
+	}
+	if { ${plnx_json_plain} } {
+		puts ${jsonf} "\{\"schema_version\": 3, \"scalars\": \"plain\"\}"
+		foreach node ${plnx_json_nodes} {
+			puts ${jsonf} "\{${node}\}"
+		}
+	} else {
+		# Some text reads back from the YAML as another value, the
+		# reader is left to parse the YAML
+		puts ${jsonf} "\{\"schema_version\": 3, \"scalars\": \"yaml\"\}"
+	}
+	close ${jsonf}
 }
 
 proc plnx_fix_kconf_name {name} {
@@ -1618,6 +1688,9 @@ proc plnx_gen_conf_images_location {kconfigprefix sds flashes} {
 proc get_ipinfo {args} {
 	global scripts_path
 	set ipinfofile "${scripts_path}/data/ipinfo.yaml"
+	if { [ipinfo_cache::get "${ipinfofile}" ip_list] } {
+		return "${ip_list}"
+	}
 	if { [catch {open "${ipinfofile}" r} ipinfof] } {
 		error "Failed to open IP information file ${ipinfofile}."
 	}
@@ -1668,6 +1741,7 @@ proc get_ipinfo {args} {
 	eval set ip_list "\{${ipinfodata}\}"
 	#set iplistlen [llength ${ip_list}]
 	#puts "ip_list=${ip_list} length=${iplistlen}"
+	ipinfo_cache::put "${ipinfofile}" ${ip_list}
 	return "${ip_list}"
 }
 
@@ -1693,6 +1767,8 @@ proc get_ip_property_info {property ipinfo} {
 }
 
 proc generate_mapping_list {args} {
+	global scripts_path
+	set ipinfofile "${scripts_path}/data/ipinfo.yaml"
 	set ipinfolist [get_ipinfo]
 	set devicetypes {processor memory serial ethernet flash sd rtc sata i2c usb dp timer reset_gpio}
 	set mappinglist {}
@@ -1707,10 +1783,8 @@ proc generate_mapping_list {args} {
 			lappend devtype_mapping "processor_ip microblaze"
 		}
 		set ips {devices}
-		foreach ipinfo ${ipinfolist} {
-			if {[is_ip_valid_for_device_type "${devtype}" ${ipinfo}] >= 0} {
-				lappend ips ${ipinfo}
-			}
+		foreach ipinfo [ipinfo_cache::devtype_ips "${ipinfofile}" ${ipinfolist} "${devtype}"] {
+			lappend ips ${ipinfo}
 		}
 		lappend devtype_mapping ${ips}
 		lappend mappinglist ${devtype_mapping}
@@ -1813,6 +1887,7 @@ proc plnx_gen_hwsysconf {args} {
 	plnx_output_data ${cpus_nodes}
 	close ${kconffile}
 	close ${plnx_data}
+	plnx_output_json "plnx_syshw_data.json"
 }
 
 proc plnx_shift {ls} {
@@ -1836,6 +1911,8 @@ set cmdline $argv
 set tclproc [plnx_shift cmdline]
 set plnx_kconfig 0
 set plnx_data 0
+set plnx_json_nodes {}
+set plnx_json_plain 1
 set current_arch ""
 set plnx_ips_record {}
 if { "[info procs ${tclproc}]" eq "${tclproc}"} {
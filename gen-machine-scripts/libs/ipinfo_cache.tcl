@@ -0,0 +1,99 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+#
+# Lists get_ipinfo builds from the YAML files, kept for the run (for the
+# whole xsct-server.tcl session) with the ips of each device type, so a
+# file is parsed and scanned once. tool_data.py preparses the tool data
+# files into data/.ipinfo.tcl, which is loaded in place of parsing them.
+# An entry is only used while the file holds the text it was built from.
+
+namespace eval ipinfo_cache {
+	variable data_file [file join [file dirname [file dirname \
+		[file normalize [info script]]]] data .ipinfo.tcl]
+	# file -> {text <file contents> list <get_ipinfo list>
+	#          devtypes {<device type> <ipinfo of its ips> ...}}
+	if { ![info exists ::ipinfo_cache::entries] } {
+		variable entries [dict create]
+		variable loaded 0
+	}
+}
+
+proc ipinfo_cache::read_text {ipinfofile} {
+	if { [catch {open "${ipinfofile}" r} fd] } {
+		return ""
+	}
+	fconfigure ${fd} -translation binary
+	set text [read ${fd}]
+	close ${fd}
+	return ${text}
+}
+
+# Called by data/.ipinfo.tcl for each file it holds
+proc ipinfo_cache::preparsed {name text ip_list devtypes} {
+	variable data_file
+	variable entries
+	set key [file join [file dirname ${data_file}] ${name}]
+	dict set entries ${key} [dict create text ${text} list ${ip_list} \
+		devtypes ${devtypes}]
+}
+
+proc ipinfo_cache::load {} {
+	variable data_file
+	variable loaded
+	if { ${loaded} } {
+		return
+	}
+	set loaded 1
+	if { [file exists ${data_file}] && \
+		[catch {uplevel #0 [list source ${data_file}]} msg] } {
+		puts stderr "WARNING: ${data_file}: ${msg}"
+	}
+}
+
+# Sets listvar to the list cached for ipinfofile, returns 0 if there is
+# none for its contents.
+proc ipinfo_cache::get {ipinfofile listvar} {
+	variable entries
+	upvar 1 ${listvar} ip_list
+	load
+	set key [file normalize ${ipinfofile}]
+	if { ![dict exists ${entries} ${key}] } {
+		return 0
+	}
+	if { [dict get ${entries} ${key} text] ne [read_text ${ipinfofile}] } {
+		dict unset entries ${key}
+		return 0
+	}
+	set ip_list [dict get ${entries} ${key} list]
+	return 1
+}
+
+proc ipinfo_cache::put {ipinfofile ip_list} {
+	variable entries
+	dict set entries [file normalize ${ipinfofile}] [dict create \
+		text [read_text ${ipinfofile}] list ${ip_list} devtypes {}]
+}
+
+# The elements of ipinfolist, get_ipinfo of ipinfofile, which have
+# devtype under their device_type
+proc ipinfo_cache::devtype_ips {ipinfofile ipinfolist devtype} {
+	variable entries
+	set key [file normalize ${ipinfofile}]
+	set cached [expr {[dict exists ${entries} ${key}] && \
+		[dict get ${entries} ${key} list] eq ${ipinfolist}}]
+	if { ${cached} && [dict exists ${entries} ${key} devtypes ${devtype}] } {
+		return [dict get ${entries} ${key} devtypes ${devtype}]
+	}
+	set ips {}
+	foreach ipinfo ${ipinfolist} {
+		set e [lsearch -index 0 -inline ${ipinfo} "device_type"]
+		if {[lsearch -index 0 ${e} "${devtype}"] >= 0} {
+			lappend ips ${ipinfo}
+		}
+	}
+	if { ${cached} } {
+		dict set entries ${key} devtypes ${devtype} ${ips}
+	}
+	return ${ips}
+}
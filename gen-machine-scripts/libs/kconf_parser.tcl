@@ -57,7 +57,7 @@ proc read_config {} {
 			set lookup_string [string toupper $lookup_string]
 			set lookup_regexp "^CONFIG_SUBSYSTEM_${lookup_string}.*_SELECT=y"
 			if {[regexp $lookup_regexp $line matched] == 1 } {
-				set ch_regexp "^CONFIG_SUBSYSTEM_${lookup_string}.*CHANNEL[0-9]_SELECT=y"
+				set ch_regexp "^CONFIG_SUBSYSTEM_${lookup_string}.*CHANNEL\[0-9\]_SELECT=y"
 				if {[regexp $ch_regexp $line matched] == 1 } {continue}
 				set value [string tolower [regsub -- "CONFIG_SUBSYSTEM_${lookup_string}_" $line ""]]
 				regsub -- "_select=y" $value "" value
@@ -79,7 +79,7 @@ proc read_config {} {
 					}
 				}
 				regsub -- "_bankless" $value "" value
-				regsub -- "_bank[0-9]" $value "" value
+				regsub -- {_bank[0-9]} $value "" value
 				# get the real ip name in the system
 				foreach real_ip_name [hsi get_cells -hier] {
 					if {[regexp -nocase -- $value $real_ip_name match]} {
@@ -143,7 +143,7 @@ proc read_config {} {
 				regsub -all {"} $prop_value "" prop_value
 				# FIXME: flash spi - CS, emc bank
 				# handle partition tables
-				if {[regexp "part[0-1]?[0-9]_.*" $prop_key]} {
+				if {[regexp {part[0-1]?[0-9]_.*} $prop_key]} {
 					if {[string equal $prop_value ""]} {continue}
 					set part_key_data [split $prop_key "_"]
 					set prop_pri_key [lindex $part_key_data 0]
@@ -172,12 +172,12 @@ proc db_gen_prop {fid db_dict ip main_key db_type config_cat config_var} {
 		#TODO: Clean up
 		switch -regexp $striped_config_cat {
 			"config([0-9]|)_value_plus_" {
-				debug "db_gen_prop" "config([0-9]|)_value_plus_"
+				debug "db_gen_prop" {config([0-9]|)_value_plus_}
 				set inc_value [regsub -all {config([0-9]|)_value_plus_} $striped_config_cat {} ]
 				set param_value [format "0x%08x" [expr $param_value + $inc_value]]
 			}
 			"config([0-9]|)_chk_.*_str" {
-				debug "db_gen_prop" "([0-9]|)_chk_.*_str"
+				debug "db_gen_prop" {([0-9]|)_chk_.*_str}
 				set desired_value [regsub -all {config([0-9]|)_chk_} $striped_config_cat {} ]
 				regsub -all {_str} $desired_value {} desired_value
 				if {![string equal -nocase $param_value $desired_value]} {
@@ -187,7 +187,7 @@ proc db_gen_prop {fid db_dict ip main_key db_type config_cat config_var} {
 				continue
 			}
 			"config([0-9]|)_chk_.*_custom_define" {
-				debug "db_gen_prop" "config([0-9]|)_chk_.*_custom_define"
+				debug "db_gen_prop" {config([0-9]|)_chk_.*_custom_define}
 				set desired_value [regsub -all {config([0-9]|)_chk_} $striped_config_cat {} ]
 				regsub -all {_custom_define} $desired_value {} desired_value
 				if {![string equal -nocase $key_value $desired_value]} {
@@ -197,15 +197,15 @@ proc db_gen_prop {fid db_dict ip main_key db_type config_cat config_var} {
 				set key_value "remove_me"
 			}
 			"config([0-9]|)_chk_.*" {
-				debug "db_gen_prop" "config([0-9]|)_chk_.*"
+				debug "db_gen_prop" {config([0-9]|)_chk_.*}
 				set desired_value [regsub -all {config([0-9]|)_chk_} $striped_config_cat {} ]
 				if {![string equal -nocase $desired_value $param_value]} {
 					continue
 				}
 			}
 			"custom_define([0-9]|)_chk_.*" {
-				debug "db_gen_prop" "custom_define([0-9]|)_chk_.*"
-				set desired_value [regsub -all "custom_define([0-9]|)_chk_" $striped_config_cat {} ]
+				debug "db_gen_prop" {custom_define([0-9]|)_chk_.*}
+				set desired_value [regsub -all {custom_define([0-9]|)_chk_} $striped_config_cat {} ]
 				if {![string equal -nocase $desired_value $param_value]} {
 					continue
 				}
@@ -213,7 +213,7 @@ proc db_gen_prop {fid db_dict ip main_key db_type config_cat config_var} {
 				set key_value "remove_me"
 			}
 			"custom_define([0-9]|)" {
-				debug "db_gen_prop" "custom_define([0-9]|)"
+				debug "db_gen_prop" {custom_define([0-9]|)}
 				# check if key define founded
 				set param_value $key_value
 				set key_value "remove_me"
@@ -236,7 +236,7 @@ proc db_gen_prop {fid db_dict ip main_key db_type config_cat config_var} {
 				}
 			}
 			"define_chk([0-9]|)_.*" {
-				set desired_value [regsub -all "define_chk([0-9]|)_" $striped_config_cat {} ]
+				set desired_value [regsub -all {define_chk([0-9]|)_} $striped_config_cat {} ]
 				if {![string equal -nocase $desired_value $param_value]} {
 					continue
 				}
@@ -246,7 +246,7 @@ proc db_gen_prop {fid db_dict ip main_key db_type config_cat config_var} {
 				set param_value 0
 			}
 			"define([0-9]|)_.*" {
-				set desired_value [regsub -all "define([0-9]|)_" $striped_config_cat {} ]
+				set desired_value [regsub -all {define([0-9]|)_} $striped_config_cat {} ]
 				set param_value $desired_value
 			}
 			"define([0-9]|)" {
@@ -30,6 +30,7 @@ proc get_current_ip_intc {target_ip} {
 	return ""
 }
 
+# Ported to uboot_bsp.py for MicroBlaze, see tests/test_uboot_bsp.py
 proc uboot_config_gen {} {
 	global target_app target_cpu
 	global out_dir
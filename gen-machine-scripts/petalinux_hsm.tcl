@@ -177,6 +177,7 @@ proc get_flash_width {sysconfig ipinfof hdf} {
 	return ${retlist}
 }
 
+# Ported to flash_parts.py, see tests/test_flash_parts.py
 proc get_flash_width_parts {args} {
 	set args [split [lindex ${args} 0]]
 	set sysconfig [lindex ${args} 0]
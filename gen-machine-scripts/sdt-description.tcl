@@ -3,6 +3,8 @@
 #
 # SPDX-License-Identifier: MIT
 
+# plnx_gen_hwsysconf is ported to sdt_syshw.py, see tests/test_sdt_syshw.py
+
 proc plnx_output_kconfig {msg} {
 	global plnx_kconfig
 	puts ${plnx_kconfig} "${msg}"
@@ -1412,6 +1414,9 @@ proc plnx_gen_conf_images_location {kconfigprefix sds flashes} {
 }
 
 proc get_ipinfo {ipinfofile} {
+	if { [ipinfo_cache::get "${ipinfofile}" ip_list] } {
+		return "${ip_list}"
+	}
 	if { [catch {open "${ipinfofile}" r} ipinfof] } {
 		error "Failed to open IP information file ${ipinfofile}."
 	}
@@ -1457,6 +1462,7 @@ proc get_ipinfo {ipinfofile} {
 	}
 	set ip_list {}
 	eval set ip_list "\{${ipinfodata}\}"
+	ipinfo_cache::put "${ipinfofile}" ${ip_list}
 	return "${ip_list}"
 }
 
@@ -1499,10 +1505,8 @@ proc generate_mapping_list {args} {
 			lappend devtype_mapping "processor_ip microblaze"
 		}
 		set ips {devices}
-		foreach ipinfo ${ipinfolist} {
-			if {[is_ip_valid_for_device_type "${devtype}" ${ipinfo}] >= 0} {
-				lappend ips ${ipinfo}
-			}
+		foreach ipinfo [ipinfo_cache::devtype_ips "${ipinfofile}" ${ipinfolist} "${devtype}"] {
+			lappend ips ${ipinfo}
 		}
 		lappend devtype_mapping ${ips}
 		lappend mappinglist ${devtype_mapping}
@@ -0,0 +1,188 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+#
+# Long-lived xsct running the hardware scripts as requests, so that xsct
+# starts and opens an XSA once per run rather than once per script.
+#
+#   xsct -sdx -nodisp xsct-server.tcl <idle timeout> ?<tcl file>?
+#
+# Each request is a line on stdin, its fields separated by tabs:
+#   <working directory> <XSA digest> <script> <script arguments>...
+# The script is sourced as xsct would run it, with its puts to stdout and
+# stderr and its exit status captured. The reply is a line
+#   @@xsct-server@@ <status> <stdout bytes> <stderr bytes>
+# followed by the two outputs. Anything else on stdout is xsct talking.
+#
+# The first design opened for a digest stays open: later openhw of that
+# digest only make it current again and hsi close_hw_design leaves it
+# open. The server exits on EOF or after <idle timeout> seconds without
+# a request. The optional tcl file is sourced at start, to define openhw
+# and hsi when the server runs under tclsh (tests/data/fake-hsi.tcl).
+
+namespace eval xsct_server {
+	variable marker "@@xsct-server@@"
+	variable idle_ms [expr {[lindex $argv 0] * 1000}]
+	variable idle_timer ""
+	variable designs [dict create]
+	variable digest ""
+	variable out ""
+	variable err ""
+	variable done 0
+}
+
+if { [llength $argv] > 1 } {
+	source [lindex $argv 1]
+}
+
+rename puts ::xsct_server::real_puts
+rename exit ::xsct_server::real_exit
+rename openhw ::xsct_server::real_openhw
+rename hsi ::xsct_server::real_hsi
+
+proc puts {args} {
+	set nonewline 0
+	if { [lindex $args 0] == "-nonewline" } {
+		set nonewline 1
+		set args [lrange $args 1 end]
+	}
+	if { [llength $args] == 1 } {
+		set chan stdout
+	} else {
+		set chan [lindex $args 0]
+	}
+	if { [llength $args] > 2 || [lsearch -exact {stdout stderr} $chan] < 0 } {
+		if { $nonewline } {
+			set args [linsert $args 0 -nonewline]
+		}
+		return [uplevel 1 [list ::xsct_server::real_puts {*}$args]]
+	}
+	set str [lindex $args end]
+	if { ! $nonewline } {
+		append str "\n"
+	}
+	if { $chan == "stdout" } {
+		append ::xsct_server::out $str
+	} else {
+		append ::xsct_server::err $str
+	}
+}
+
+proc exit {{status 0}} {
+	return -code error -errorcode [list XSCT_SERVER_EXIT $status] \
+		"exit $status"
+}
+
+proc openhw {hdf} {
+	set designs $::xsct_server::designs
+	set digest $::xsct_server::digest
+	if { [dict exists $designs $digest] } {
+		set design [dict get $designs $digest]
+		::xsct_server::real_hsi current_hw_design $design
+		return $design
+	}
+	set design [::xsct_server::real_openhw $hdf]
+	dict set ::xsct_server::designs $digest $design
+	return $design
+}
+
+proc hsi {args} {
+	if { [lindex $args 0] == "close_hw_design" } {
+		return
+	}
+	return [uplevel 1 [list ::xsct_server::real_hsi {*}$args]]
+}
+
+namespace eval xsct_server {
+	variable base_globals [info globals]
+	variable base_procs [info procs ::*]
+	variable base_channels [file channels]
+}
+
+# What a request leaves behind: its globals, procs and open files
+proc xsct_server::cleanup {} {
+	variable base_globals
+	variable base_procs
+	variable base_channels
+	foreach var [info globals] {
+		if { [lsearch -exact $base_globals $var] < 0 } {
+			unset -nocomplain ::$var
+		}
+	}
+	foreach p [info procs ::*] {
+		if { [lsearch -exact $base_procs $p] < 0 } {
+			rename $p {}
+		}
+	}
+	foreach chan [file channels] {
+		if { [lsearch -exact $base_channels $chan] < 0 } {
+			catch {close $chan}
+		}
+	}
+}
+
+proc xsct_server::run {cwd script script_args} {
+	variable out ""
+	variable err ""
+	set ::argv0 $script
+	set ::argv $script_args
+	set ::argc [llength $script_args]
+	set pwd [pwd]
+	set status 0
+	if { [catch {cd $cwd} msg] } {
+		append err "$msg\n"
+		return 1
+	}
+	if { [catch {uplevel #0 [list source $script]} msg opts] } {
+		set errorcode [dict get $opts -errorcode]
+		if { [lindex $errorcode 0] == "XSCT_SERVER_EXIT" } {
+			set status [lindex $errorcode 1]
+		} else {
+			append err "[dict get $opts -errorinfo]\n"
+			set status 1
+		}
+	}
+	cd $pwd
+	cleanup
+	return $status
+}
+
+proc xsct_server::reply {status} {
+	variable marker
+	variable out
+	variable err
+	set out [encoding convertto utf-8 $out]
+	set err [encoding convertto utf-8 $err]
+	real_puts stdout "$marker $status [string length $out] [string length $err]"
+	real_puts -nonewline stdout $out
+	real_puts -nonewline stdout $err
+	flush stdout
+}
+
+proc xsct_server::idle {} {
+	variable idle_timer
+	variable idle_ms
+	after cancel $idle_timer
+	set idle_timer [after $idle_ms {set ::xsct_server::done 1}]
+}
+
+proc xsct_server::request {} {
+	variable digest
+	if { [gets stdin line] < 0 } {
+		if { [eof stdin] } {
+			set ::xsct_server::done 1
+		}
+		return
+	}
+	set fields [split $line "\t"]
+	set digest [lindex $fields 1]
+	reply [run [lindex $fields 0] [lindex $fields 2] [lrange $fields 3 end]]
+	idle
+}
+
+fconfigure stdin -translation lf -encoding utf-8
+fconfigure stdout -translation binary
+fileevent stdin readable xsct_server::request
+xsct_server::idle
+vwait ::xsct_server::done
+::xsct_server::real_exit 0
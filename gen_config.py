@@ -12,7 +12,29 @@ import pathlib
 import subprocess
 import re
 import shutil
+import glob
+import random
 import logger_setup
+import kconfig
+from config_store import get_config_store, set_config_value, config_batch
+from stage_manifest import Stage, file_digest
+from output_writer import write_if_changed, copy_if_changed, \
+    report_changed_outputs
+from digest_cache import digest_cache
+from xsa_fingerprint import xsa_hw_digest, xsa_bitstream_digest, \
+    extract_xsa_bitfiles
+import sdt_manifest
+from hw_model import get_hw_model, convert_dictto_lowercase, sidecar_file
+from tool_data import get_tool_data
+from sdt_syshw import gen_sdt_syshw, SdtUnsupported
+from xsa_syshw import gen_xsa_syshw
+from xsa_extractor import XsaUnsupported
+from flash_parts import gen_flash_parts, FlashPartsUnsupported
+from uboot_bsp import gen_uboot_bsp, UbootBspUnsupported
+import xsct_server
+from xsct_server import XsctServerError
+from hw_cache import set_hw_cache, cache_key, fetch_outputs, save_outputs
+from output_bundle import export_bundle, import_bundle
 
 logger, console_h = logger_setup.setup_logger()
 
@@ -65,128 +87,109 @@ scripts_dir = os.path.join(base_dir, 'gen-machine-scripts')
 
 
 def get_filehashvalue(filename):
-    import mmap
-    import hashlib
-    method = hashlib.sha256()
-    with open(filename, "rb") as f:
-        try:
-            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
-                for chunk in iter(lambda: mm.read(8192), b''):
-                    method.update(chunk)
-        except ValueError:
-            # You can't mmap() an empty file so silence this exception
-            pass
-    return method.hexdigest()
-
-
-def validate_hashfile(args, macro, infile, update=True):
-    statistics_file = os.path.join(args.output, '.statistics')
-    old_hashvalue = get_config_value(macro, statistics_file)
-    new_hashvalue = get_filehashvalue(infile)
-    if old_hashvalue != new_hashvalue:
-        if update:
-            update_config_value(macro, new_hashvalue, statistics_file)
-        return False
-    return True
+    return digest_cache.digest(filename)
+
+
+def get_hwhashvalue(filename):
+    # Only the hardware description of an XSA matters to the
+    # generated Kconfig, bitstream changes are tracked separately
+    if filename.endswith('.xsa'):
+        return digest_cache.digest(filename, 'xsa-hw', xsa_hw_digest)
+    # SDT: every file in the directory, .dtsi includes as well
+    return sdt_manifest.manifest_root(
+        sdt_manifest.build_manifest(os.path.dirname(filename)))
+
+
+def get_bithashvalue(filename):
+    return digest_cache.digest(filename, 'xsa-bit', xsa_bitstream_digest)
+
+
+def prefetch_hwhashvalue(filename):
+    if filename.endswith('.xsa'):
+        digest_cache.prefetch(filename, 'xsa-hw', xsa_hw_digest)
+    else:
+        sdt_dir = os.path.dirname(filename)
+        digest_cache.prefetch([os.path.join(sdt_dir, f)
+                               for f in sdt_manifest.sdt_files(sdt_dir)])
+
+
+def hw_params(args):
+    '''Stage parameters of everything generated from the hw file.'''
+    return {'hw_file': args.hw_file,
+            'hw_hash': get_hwhashvalue(args.hw_file)}
+
+
+def hw_cache_key(args, stage):
+    '''hw cache key of what stage generates: the hardware, soc_family
+    and the contents of the stage inputs, tool data and scripts.'''
+    return cache_key(stage=stage.name, hw_hash=stage.params['hw_hash'],
+                     soc_family=args.soc_family,
+                     inputs=sorted(file_digest(f)
+                                   for f in stage.inputs + stage.configs))
+
+
+def report_sdt_changes(args):
+    '''Log which SDT files changed since the recorded manifest.'''
+    manifest_file = os.path.join(args.output, '.sdt-manifest')
+    manifest = sdt_manifest.build_manifest(os.path.dirname(args.hw_file))
+    old_manifest = sdt_manifest.load_manifest(manifest_file)
+    if old_manifest:
+        for path, change in sdt_manifest.diff_manifests(old_manifest,
+                                                        manifest):
+            logger.info('SDT file %s: %s' % (change, path))
+    sdt_manifest.save_manifest(manifest_file, manifest)
+
+
+def silentconfig_stage(Kconfig, cfgfile, out_dir, component):
+    '''silentconfig gives the same config as long as the resolved
+    Kconfig tree and the config contents do not change.'''
+    try:
+        inputs = kconfig.tree_files(Kconfig)
+    except (OSError, kconfig.KconfigError):
+        inputs = [Kconfig]
+    return Stage(out_dir, 'silentconfig-%s' % component, inputs + [cfgfile])
 
 
 def update_config_value(macro, value, filename):
-    lines = []
-    if os.path.exists(filename):
-        with open(filename, 'r') as file_data:
-            lines = file_data.readlines()
-        file_data.close()
-
-    with open(filename, 'w') as file_data:
-        for line in lines:
-            if re.search('# %s is not set' % macro, line) or re.search('%s=' % macro, line):
-                continue
-            file_data.write(line)
-        if value == 'disable':
-            file_data.write('# %s is not set\n' % macro)
-        else:
-            file_data.write('%s=%s\n' % (macro, value))
-    file_data.close()
+    set_config_value(macro, value, filename)
 
 
 def get_config_value(macro, filename, Type='bool', end_macro='=y'):
-    lines = []
-    if os.path.exists(filename):
-        with open(filename, 'r') as file_data:
-            lines = file_data.readlines()
-        file_data.close()
-    value = ''
-    if Type == 'bool':
-        for line in lines:
-            line = line.strip()
-            if line.startswith(macro + '='):
-                value = line.replace(macro + '=', '').replace('"', '')
-                break
-    elif Type == 'choice':
-        for line in lines:
-            line = line.strip()
-            if line.startswith(macro) and line.endswith(end_macro):
-                value = line.replace(macro, '').replace(end_macro, '')
-                break
-    elif Type == 'choicelist':
-        for line in lines:
-            line = line.strip()
-            if line.startswith(macro) and line.endswith(end_macro):
-                value += ' ' + line.replace(macro, '').replace(end_macro, '')
-    elif Type == 'asterisk':
-        for line in lines:
-            line = line.strip()
-            if line.startswith(macro) and re.search(end_macro, line):
-                value = line.split('=')[1].replace('"', '')
-                break
-    return value
-
-
-def convert_dictto_lowercase(data_dict):
-    if isinstance(data_dict, dict):
-        return {k.lower(): convert_dictto_lowercase(v) for k, v in data_dict.items()}
-    elif isinstance(data_dict, (list, set, tuple)):
-        t = type(data_dict)
-        return t(convert_dictto_lowercase(o) for o in data_dict)
-    elif isinstance(data_dict, str):
-        return data_dict.lower()
-    else:
-        return data_dict
+    return get_config_store(filename).get(macro, Type, end_macro)
 
 
-def get_ipproperty(device_name, default_cfgfile, prop='ip_name'):
-    processor = get_config_value(
+def get_syshw_file(output, hw_flow):
+    if hw_flow == 'xsct':
+        return os.path.join(output, 'plnx_syshw_data')
+    return os.path.join(output, 'petalinux_config.yaml')
+
+
+hw_model = None
+
+
+def load_hw_model(output, hw_flow):
+    '''HardwareModel of the syshw data and ipinfo.yaml, the generators
+    share one instance per run.'''
+    global hw_model
+    hw_model = get_hw_model(get_syshw_file(output, hw_flow))
+    return hw_model
+
+
+def get_processor(default_cfgfile):
+    return get_config_value(
         'CONFIG_SUBSYSTEM_PROCESSOR_', default_cfgfile, 'choice', '_SELECT=y')
+
+
+def get_ipproperty(device_name, default_cfgfile, prop='ip_name'):
+    processor = get_processor(default_cfgfile)
     if device_name == 'MANUAL':
         return ''
-    ipname = ''
-    global slaves_dict
-    slaves_dict = convert_dictto_lowercase(
-        plnx_syshw_data['processor'][processor]['slaves'])
-    if device_name.lower() in slaves_dict.keys():
-        if prop == 'ip_name':
-            ipname = slaves_dict[device_name.lower()]['ip_name']
-            return ipname
-        else:
-            prop_value = ''
-            if prop in slaves_dict[device_name.lower()].keys():
-                prop_value = slaves_dict[device_name.lower()][prop]
-                return prop_value
-            else:
-                return ''
-    return ''
+    return hw_model.slave_property(processor, device_name, prop)
 
 
 def get_processor_property(default_cfgfile, prop):
-    processor = get_config_value(
-        'CONFIG_SUBSYSTEM_PROCESSOR_', default_cfgfile, 'choice', '_SELECT=y')
-    global slaves_dict
-    linux_kernel_properties = ''
-    if 'linux_kernel_properties' in plnx_syshw_data['processor'][processor].keys():
-        linux_kernel_properties = plnx_syshw_data['processor'][processor]['linux_kernel_properties']
-    if linux_kernel_properties and prop in linux_kernel_properties.keys():
-        return linux_kernel_properties[prop].split(' ')[0]
-    return ''
+    processor = get_processor(default_cfgfile)
+    return hw_model.processor_property(processor, prop)
 
 
 Tunefeatures = {
@@ -203,8 +206,7 @@ Tunefeatures = {
 
 
 def get_tunefeatures(soc_family, default_cfgfile):
-    processor = get_config_value(
-        'CONFIG_SUBSYSTEM_PROCESSOR_', default_cfgfile, 'choice', '_SELECT=y')
+    processor = get_processor(default_cfgfile)
     tune_features = [soc_family]
     hwversion = get_processor_property(
         default_cfgfile, 'XILINX_MICROBLAZE0_HW_VER')
@@ -226,33 +228,23 @@ def get_tunefeatures(soc_family, default_cfgfile):
 
 
 def check_ip(prop, default_cfgfile):
-    processor = get_config_value(
-        'CONFIG_SUBSYSTEM_PROCESSOR_', default_cfgfile, 'choice', '_SELECT=y')
+    processor = get_processor(default_cfgfile)
     if prop == 'MANUAL':
         return ''
-    for key in plnx_syshw_data['processor'][processor]['slaves'].keys():
-        if 'ip_name' in plnx_syshw_data['processor'][processor]['slaves'][key].keys():
-            if prop == plnx_syshw_data['processor'][processor]['slaves'][key]['ip_name']:
-                return True
+    if hw_model.has_ip(processor, prop):
+        return True
     return ''
 
 
 def get_sysconsole_bootargs(default_cfgfile, soc_family, soc_variant):
-    global ipinfo_data
     serialname = get_config_value(
         'CONFIG_SUBSYSTEM_SERIAL_', default_cfgfile, 'choice', '_SELECT=y')
     serialipname = get_ipproperty(serialname, default_cfgfile)
-    serial_devfile = ''
-    serial_earlycon = ''
-    if serialipname in ipinfo_data.keys():
-        if isinstance(ipinfo_data[serialipname]['device_type'], dict) and \
-                'serial' in ipinfo_data[serialipname]['device_type'].keys():
-            if 'linux_console_file_name' in ipinfo_data[serialipname]['device_type']['serial'].keys():
-                serial_devfile = ipinfo_data[serialipname]['device_type']['serial']['linux_console_file_name']
-            if 'linux_earlycon_str' in ipinfo_data[serialipname]['device_type']['serial'].keys():
-                serial_earlycon = ipinfo_data[serialipname]['device_type']['serial']['linux_earlycon_str']
-    else:
+    if serialipname not in hw_model.ipinfo:
         return ''
+    serial_info = hw_model.device_type(serialipname, 'serial')
+    serial_devfile = serial_info.get('linux_console_file_name', '')
+    serial_earlycon = serial_info.get('linux_earlycon_str', '')
     if not serial_devfile:
         logger.error('Unknown serial ipname %s for %s.' %
                      (serialipname, serialname))
@@ -304,10 +296,7 @@ def get_sysconsole_bootargs(default_cfgfile, soc_family, soc_variant):
 
 
 def get_soc_variant(soc_family, output):
-    global plnx_syshw_data
-    device_id = ''
-    if 'device_id' in plnx_syshw_data.keys():
-        device_id = plnx_syshw_data['device_id']
+    device_id = hw_model.get('device_id')
     soc_variant = ''
     if soc_family == 'zynqmp':
         if device_id.endswith('ev') or device_id.endswith('k26'):
@@ -406,6 +395,23 @@ def pre_sys_conf(args, default_cfgfile):
                             '"%s"' % args.machine, default_cfgfile)
 
 
+def gen_mac_address(args, ethdevname, macaddrpattern):
+    '''macaddrpattern with a random digit for each ?. With
+    --deterministic the same design, machine and ethernet ip always get
+    the same digits.'''
+    rand = random
+    if args.deterministic:
+        rand = random.Random('%s:%s:%s' % (
+            get_hwhashvalue(args.hw_file), args.machine, ethdevname))
+    new_mac = ''
+    for x in range(17):
+        if macaddrpattern[x] == '?':
+            new_mac += str(rand.randint(0, 9))
+        else:
+            new_mac += macaddrpattern[x]
+    return new_mac
+
+
 def post_sys_conf(args, default_cfgfile, hw_flow, soc_variant):
     builddir = os.environ.get('BUILDDIR', '')
     output = args.output
@@ -492,13 +498,7 @@ def post_sys_conf(args, default_cfgfile, hw_flow, soc_variant):
             'CONFIG_SUBSYSTEM_ETHERNET_%s_MAC_PATTERN' % ethdevname, default_cfgfile)
         if not macaddrpattern:
             macaddrpattern = '00:0a:35:00:??:??'
-        new_mac = ''
-        import random
-        for x in range(17):
-            if macaddrpattern[x] == '?':
-                new_mac += str(random.randint(0, 9))
-            else:
-                new_mac += macaddrpattern[x]
+        new_mac = gen_mac_address(args, ethdevname, macaddrpattern)
         update_config_value('CONFIG_SUBSYSTEM_ETHERNET_%s_MAC' %
                             ethdevname, '"%s"' % new_mac, default_cfgfile)
         update_config_value('CONFIG_SUBSYSTEM_ETHERNET_%s_MAC_AUTO' %
@@ -516,7 +516,7 @@ def post_sys_conf(args, default_cfgfile, hw_flow, soc_variant):
         vcu_bootargs = ''
         vcu_maxsize = ''
         if check_ip('vcu', default_cfgfile):
-            vcu_maxsize = ipinfo_data['vcu']['linux_kernel_properties']['CMA_SIZE_MBYTES']
+            vcu_maxsize = hw_model.ip('vcu')['linux_kernel_properties']['CMA_SIZE_MBYTES']
             if vcu_maxsize:
                 vcu_bootargs = 'cma=%sM' % vcu_maxsize
         bootargs = '%s %s' % (bootargs, vcu_bootargs)
@@ -524,7 +524,7 @@ def post_sys_conf(args, default_cfgfile, hw_flow, soc_variant):
         vdu_bootargs = ''
         vdu_maxsize = ''
         if check_ip('vdu', default_cfgfile):
-            vdu_maxsize = ipinfo_data['vdu']['linux_kernel_properties']['CMA_SIZE_MBYTES']
+            vdu_maxsize = hw_model.ip('vdu')['linux_kernel_properties']['CMA_SIZE_MBYTES']
             if vdu_maxsize:
                 vdu_bootargs = 'cma=%sM' % vdu_maxsize
         bootargs = '%s %s' % (bootargs, vdu_bootargs)
@@ -534,22 +534,6 @@ def post_sys_conf(args, default_cfgfile, hw_flow, soc_variant):
             bootargs = '%s %s' % (bootargs, extra_bootargs)
         update_config_value('CONFIG_SUBSYSTEM_BOOTARGS_GENERATED',
                             '"%s"' % re.sub(' +', ' ', bootargs.strip()), default_cfgfile)
-    # generate flash parts info for given xsa
-    if hw_flow == 'xsct':
-        ipinfo_file = os.path.join(scripts_dir, 'data/ipinfo.yaml')
-        flashinfo_file = os.path.join(output, 'flash_parts.txt')
-        # No need to run if system conf file(config) is doesnot change
-        if validate_hashfile(args, 'SYSTEM_CONF', default_cfgfile, update=False) and \
-                os.path.exists(flashinfo_file):
-            return 0
-
-        with open(flashinfo_file, 'w') as fp:
-            pass
-        cmd = 'xsct -sdx -nodisp %s/petalinux_hsm.tcl get_flash_width_parts %s %s %s %s' % \
-            (scripts_dir, default_cfgfile, ipinfo_file, args.hw_file,
-             flashinfo_file)
-        run_cmd(cmd, output, args.logfile)
-
     # Enabling the multiconfigs based on BBMULTICONFIG value
     if hw_flow == 'sdt':
         if builddir:
@@ -559,15 +543,70 @@ def post_sys_conf(args, default_cfgfile, hw_flow, soc_variant):
                 update_config_value('CONFIG_YOCTO_BBMC_%s' % config.upper().replace(
                     "-", "_"), 'y', default_cfgfile)
 
+
+def generate_flash_parts(args, default_cfgfile, hw_flow):
+    output = args.output
+    # generate flash parts info for given xsa
+    if hw_flow == 'xsct':
+        ipinfo_file = os.path.join(scripts_dir, 'data/ipinfo.yaml')
+        hsm_tcl = os.path.join(scripts_dir, 'petalinux_hsm.tcl')
+        flashinfo_file = os.path.join(output, 'flash_parts.txt')
+        plnx_syshw_file = get_syshw_file(output, hw_flow)
+        stage = Stage(output, 'flash-parts',
+                      [hsm_tcl, ipinfo_file, plnx_syshw_file,
+                       os.path.join(base_dir, 'flash_parts.py')],
+                      hw_params(args), [flashinfo_file], [default_cfgfile])
+        # get_flash_width_parts only reads the selected flash and its
+        # partition/image name symbols from config.
+        get_config_value('CONFIG_SUBSYSTEM_FLASH_',
+                         default_cfgfile, 'choicelist', '')
+        get_config_value('CONFIG_SUBSYSTEM_IMAGES_ADVANCED_AUTOCONFIG_',
+                         default_cfgfile, 'choicelist', '')
+        # No need to run if none of those symbols changed
+        if stage.unchanged():
+            return
+        logger.debug('Flash parts: %s' % stage.reason)
+
+        try:
+            write_if_changed(flashinfo_file, gen_flash_parts(
+                default_cfgfile, get_hw_model(plnx_syshw_file),
+                get_processor(default_cfgfile)))
+            stage.done()
+            return
+        except FlashPartsUnsupported as e:
+            logger.debug('flash_parts.txt needs xsct: %s' % e)
+        key = hw_cache_key(args, stage)
+        if not fetch_outputs(key, stage.outputs):
+            with open(flashinfo_file, 'w') as fp:
+                pass
+            run_xsct(hsm_tcl, ['get_flash_width_parts', default_cfgfile,
+                               ipinfo_file, args.hw_file, flashinfo_file],
+                     args, output)
+            save_outputs(key, stage.outputs)
+        stage.done()
+
 # Run menuconfig/silentconfig
 
 
 def run_menuconfig(Kconfig, cfgfile, ui, out_dir, component):
     if not ui:
+        # Kconfig tree and config are as the last run left them
+        if silentconfig_stage(Kconfig, cfgfile, out_dir,
+                              component).unchanged():
+            logger.debug('Skipping silentconfig %s, Kconfig and config '
+                         'are unchanged' % component)
+            return
         logger.info('Silentconfig %s' % (component))
+        try:
+            kconfig.silentconfig(Kconfig, cfgfile)
+            get_config_store(cfgfile).invalidate()
+            return
+        except kconfig.KconfigError as e:
+            logger.debug('%s, falling back to conf' % e)
         cmd = 'yes "" | env KCONFIG_CONFIG=%s conf %s' % (cfgfile, Kconfig)
         logger.debug('Running CMD: %s' % cmd)
         status, stdout = subprocess.getstatusoutput(cmd)
+        get_config_store(cfgfile).invalidate()
         logger.debug(stdout)
         if status != 0:
             logger.error('Failed to silentconfig %s' % component)
@@ -578,6 +617,7 @@ def run_menuconfig(Kconfig, cfgfile, ui, out_dir, component):
         logger.debug('Running CMD: %s' % cmd)
         try:
             subprocess.check_call(cmd.split(), cwd=out_dir)
+            get_config_store(cfgfile).invalidate()
         except subprocess.CalledProcessError as e:
             if e.returncode != 0:
                 logger.error('Failed to Menuconfig %s' % component)
@@ -607,6 +647,35 @@ def run_cmd(command, out_dir, logfile, shell=False):
     return stdout, stderr
 
 
+def run_xsct(script, script_args, args, out_dir):
+    '''xsct script script_args... run in out_dir, by the xsct server
+    which keeps the XSA open, or by an xsct of its own.'''
+    try:
+        return xsct_server.server.run(script, script_args, out_dir,
+                                      get_hwhashvalue(args.hw_file))
+    except XsctServerError as e:
+        logger.debug('Running xsct on its own: %s' % e)
+    cmd = 'xsct -sdx -nodisp %s %s' % (script, ' '.join(script_args))
+    return run_cmd(cmd, out_dir, args.logfile)
+
+
+def generate_xsa_syshw(args, syshw_tcl, ipinfo_file, outputs, out_dir):
+    '''Kconfig.syshw, plnx_syshw_data and its sidecar, outputs in that
+    order, of the XSA: xsa_syshw.py writes them and xsct runs
+    hw-description.tcl for whatever it leaves out.'''
+    try:
+        syshw = gen_xsa_syshw(args.hw_file, ipinfo_file)
+    except XsaUnsupported as e:
+        logger.debug('Kconfig.syshw needs xsct: %s' % e)
+        run_xsct(syshw_tcl, ['plnx_gen_hwsysconf', args.hw_file, outputs[0]],
+                 args, out_dir)
+        return
+    for out_file, text in zip(outputs, syshw):
+        write_if_changed(out_file, text)
+    # What xsct does when it opens the XSA
+    extract_xsa_bitfiles(args.hw_file, os.path.dirname(args.hw_file))
+
+
 # Rootfs configs starts
 def add_rootfs_configs(args, default_cfgfile):
     arch = get_config_value('CONFIG_SUBSYSTEM_ARCH_',
@@ -643,26 +712,28 @@ def add_rootfs_configs(args, default_cfgfile):
         shutil.copy2(template_rfsfile, default_rfsfile)
     if not os.path.isfile(rfsKconfig_part):
         shutil.copy2(template_Kconfig, rfsKconfig_part)
-    shutil.copy2(user_cfg, rootfs_cfgdir)
+    copy_if_changed(user_cfg, rootfs_cfgdir)
     # No need to run if user_rootfsconfig doesnot changes
-    if not validate_hashfile(args, 'USER_RFS_CFG', user_cfg) or \
-            not os.path.exists(rfsKconfig_user):
+    stage = Stage(args.output, 'rootfs-kconfig', [user_cfg, rfsconfig_py],
+                  outputs=[rfsKconfig_user])
+    if not stage.unchanged():
         logger.info('Generating kconfig for rootfs')
         cmd = 'python3 %s --generate_kconfig %s %s' \
             % (rfsconfig_py, user_cfg, rootfs_cfgdir)
         run_cmd(cmd, args.output, args.logfile)
+        stage.done()
     rfsKconfig_str = Kconfig_arch.format(args.soc_family)
     with open(rfsKconfig_part, 'r', encoding='utf-8') as rfskconfig_part_f:
         rfskconfig_part_data = rfskconfig_part_f.read()
     rfskconfig_part_f.close()
     rfsKconfig_str += rfskconfig_part_data.replace(
         'source ./Kconfig.user', 'source %s' % rfsKconfig_user)
-    with open(rootfs_Kconfig, 'w') as rfskconfig_f:
-        rfskconfig_f.write(rfsKconfig_str)
-    rfskconfig_f.close()
+    write_if_changed(rootfs_Kconfig, rfsKconfig_str)
     run_menuconfig(rootfs_Kconfig, default_rfsfile,
                    True if args.menuconfig == 'rootfs' else False,
                    args.output, 'rootfs')
+    silentconfig_stage(rootfs_Kconfig, default_rfsfile,
+                       args.output, 'rootfs').done()
 
 
 def get_hw_description(args, hw_flow):
@@ -683,24 +754,71 @@ def get_hw_description(args, hw_flow):
 
     # XSCT command to read the hw file and generate syshw file
     Kconfig_syshw = os.path.join(project_cfgdir, 'Kconfig.syshw')
+    libs = sorted(glob.glob(os.path.join(scripts_dir, 'libs', '*')))
     if hw_flow == 'xsct':
-        cmd = 'xsct -sdx -nodisp %s/hw-description.tcl plnx_gen_hwsysconf %s %s' % \
-            (scripts_dir, args.hw_file, Kconfig_syshw)
+        syshw_tcl = os.path.join(scripts_dir, 'hw-description.tcl')
         ipinfo_file = os.path.join(scripts_dir, 'data/ipinfo.yaml')
-        plnx_syshw_file = os.path.join(output, 'plnx_syshw_data')
+        plnx_syshw_file = get_syshw_file(output, hw_flow)
+        stage = Stage(output, 'kconfig-syshw',
+                      [syshw_tcl, os.path.join(base_dir, 'xsa_syshw.py'),
+                       os.path.join(base_dir, 'xsa_extractor.py'),
+                       os.path.join(base_dir, 'sdt_syshw.py'),
+                       ipinfo_file] + libs,
+                      hw_params(args), [Kconfig_syshw, plnx_syshw_file,
+                                        sidecar_file(plnx_syshw_file)])
     elif hw_flow == 'sdt':
-        cmd = 'chmod 777 %s/sdt-description.tcl;' % (scripts_dir)
-        cmd += 'tclsh %s/sdt-description.tcl plnx_gen_hwsysconf "" %s' % \
-            (scripts_dir, Kconfig_syshw)
-        ipinfo_file = os.path.join(scripts_dir, 'data/sdt_ipinfo.yaml')
-        plnx_syshw_file = os.path.join(output, 'petalinux_config.yaml')
+        syshw_tcl = os.path.join(scripts_dir, 'sdt-description.tcl')
+        cmd = 'chmod 777 %s;' % (syshw_tcl)
+        cmd += 'tclsh %s plnx_gen_hwsysconf "" %s' % \
+            (syshw_tcl, Kconfig_syshw)
+        sdt_ipinfo_file = os.path.join(scripts_dir, 'data/sdt_ipinfo.yaml')
+        plnx_syshw_file = get_syshw_file(output, hw_flow)
+        # dt-processor.sh generated petalinux_config.yaml is read here
+        stage = Stage(output, 'kconfig-syshw',
+                      [syshw_tcl, os.path.join(base_dir, 'sdt_syshw.py'),
+                       sdt_ipinfo_file, plnx_syshw_file] + libs,
+                      hw_params(args), [Kconfig_syshw])
     ipinfo_file = os.path.join(scripts_dir, 'data/ipinfo.yaml')
 
-    # Generate Kconfig.syshw only when hw_file changes
-    if not validate_hashfile(args, 'HW_FILE', args.hw_file) or \
-            not os.path.exists(Kconfig_syshw):
+    # Generate Kconfig.syshw only when one of its inputs changes
+    if not stage.unchanged():
+        logger.debug('Kconfig.syshw: %s' % stage.reason)
+        if hw_flow == 'sdt':
+            report_sdt_changes(args)
         logger.info('Generating Kconfig for project')
-        run_cmd(cmd, output, args.logfile, shell=True)
+        if hw_flow == 'sdt':
+            try:
+                write_if_changed(Kconfig_syshw, gen_sdt_syshw(
+                    plnx_syshw_file, sdt_ipinfo_file))
+                cmd = ''
+            except SdtUnsupported as e:
+                logger.debug('Kconfig.syshw needs sdt-description.tcl: %s' % e)
+        key = hw_cache_key(args, stage)
+        if hw_flow == 'xsct':
+            if fetch_outputs(key, stage.outputs):
+                # What xsct does when it opens the XSA
+                extract_xsa_bitfiles(args.hw_file,
+                                     os.path.dirname(args.hw_file))
+            else:
+                generate_xsa_syshw(args, syshw_tcl, ipinfo_file,
+                                   stage.outputs, output)
+                save_outputs(key, stage.outputs)
+        elif cmd and not fetch_outputs(key, stage.outputs):
+            run_cmd(cmd, output, args.logfile, shell=True)
+            save_outputs(key, stage.outputs)
+        stage.done()
+        if hw_flow == 'xsct':
+            Stage(output, 'bitfile',
+                  params={'bit_hash': get_bithashvalue(args.hw_file)}).done()
+    elif hw_flow == 'xsct':
+        # Same design, new bitstream: only refresh the extracted bitfile,
+        # plnxtool.conf picks it up through the bitfile digest.
+        bit_stage = Stage(output, 'bitfile',
+                          params={'bit_hash': get_bithashvalue(args.hw_file)})
+        if not bit_stage.unchanged():
+            logger.info('Bitstream changed, updating bitfile')
+            extract_xsa_bitfiles(args.hw_file, os.path.dirname(args.hw_file))
+            bit_stage.done()
     Kconfig_part = os.path.join(scripts_dir, 'configs/Kconfig.part')
 
     for file_path in [Kconfig_part, ipinfo_file, plnx_syshw_file, Kconfig_syshw]:
@@ -708,16 +826,7 @@ def get_hw_description(args, hw_flow):
             logger.error('%s is not found in tool' % file_path)
             sys.exit(255)
 
-    import yaml
-    global plnx_syshw_data
-    global ipinfo_data
-    with open(plnx_syshw_file, 'r') as plnx_syshw_file_f:
-        plnx_syshw_data = yaml.safe_load(plnx_syshw_file_f)
-    plnx_syshw_file_f.close()
-
-    with open(ipinfo_file, 'r') as ipinfo_file_f:
-        ipinfo_data = yaml.safe_load(ipinfo_file_f)
-    ipinfo_file_f.close()
+    load_hw_model(output, hw_flow)
 
     Kconfig = os.path.join(project_cfgdir, 'Kconfig')
     default_cfgfile = os.path.join(output, 'config')
@@ -735,7 +844,7 @@ def get_hw_description(args, hw_flow):
         # the available machine conf files and generating
         # kconfig based on that values
         if builddir:
-            for mconf in os.listdir(os.path.join(builddir, 'conf', 'multiconfig')):
+            for mconf in sorted(os.listdir(os.path.join(builddir, 'conf', 'multiconfig'))):
                 bbmulticonfig += mconf.rstrip('.conf') + ' '
             multiconfig_str = "menu \"Multiconfig Targets\""
             for config in bbmulticonfig.split():
@@ -759,15 +868,18 @@ def get_hw_description(args, hw_flow):
         kconfig_part_data = kconfig_part_data.replace(
             '@@multiconfigmenustr@@', '')
     Kconfig_str += kconfig_part_data
-    with open(Kconfig, 'w') as kconfig_f:
-        kconfig_f.write(Kconfig_str)
-    kconfig_f.close()
+    write_if_changed(Kconfig, Kconfig_str)
     # Update the sysconfig with command line arguments
     # to reflect in menuconfig/config
     pre_sys_conf(args, default_cfgfile)
     run_menuconfig(Kconfig, default_cfgfile,
                    True if menuconfig == 'project' else False,
                    output, 'project')
-    post_sys_conf(args, default_cfgfile, hw_flow, soc_variant)
+    # Stage all post silentconfig updates and write config once
+    with config_batch():
+        post_sys_conf(args, default_cfgfile, hw_flow, soc_variant)
+    generate_flash_parts(args, default_cfgfile, hw_flow)
+    # Record the config as post_sys_conf left it
+    silentconfig_stage(Kconfig, default_cfgfile, output, 'project').done()
     # update rootfs configs to plnxtool.conf
     add_rootfs_configs(args, default_cfgfile)
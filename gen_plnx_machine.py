@@ -80,11 +80,9 @@ def add_external_sources(component, Kcomponent):
 
 def generate_kernel_cfg(args):
     logger.info('Generating kernel configuration files')
-    sysconf_koptions = os.path.join(scripts_dir, 'data/sysconf_koptions.yaml')
-    import yaml
-    with open(sysconf_koptions, 'r') as sysconf_koptions_f:
-        sysconf_koptions_data = yaml.safe_load(sysconf_koptions_f)
-    sysconf_koptions_f.close()
+    # Copied, the devices which are not valid are removed below
+    sysconf_koptions_data = {'selected_device': dict(
+        get_tool_data().sysconf_koptions['selected_device'])}
     invalide_props = []
     # Filter sysconf_koptions.yaml, remove the ip list which are not enabled in design
     for device in sysconf_koptions_data['selected_device'].keys():
@@ -118,48 +116,23 @@ def generate_kernel_cfg(args):
                 elif value == 'n':
                     kernel_opts += '# CONFIG_%s is not set\n' % prop
 
-    ipinfo_file = os.path.join(scripts_dir, 'data/ipinfo.yaml')
-    plnx_syshw_file = os.path.join(args.output, 'plnx_syshw_data')
-    with open(ipinfo_file, 'r') as ipinfo_file_f:
-        ipinfo_data = yaml.safe_load(ipinfo_file_f)
-    ipinfo_file_f.close()
-    with open(plnx_syshw_file, 'r') as plnx_syshw_file_f:
-        plnx_syshw_data = yaml.safe_load(plnx_syshw_file_f)
-    plnx_syshw_file_f.close()
-    processor = get_config_value('CONFIG_SUBSYSTEM_PROCESSOR_', default_cfgfile,
-                                 'choice', '_SELECT=y')
-    slaves_dict = convert_dictto_lowercase(
-        plnx_syshw_data['processor'][processor]['slaves'])
-    slaves = []
+    # microblaze designs only come as an XSA
+    hw_model = load_hw_model(args.output, 'xsct')
+    processor = get_processor(default_cfgfile)
     # Get the slave ip_name from plnx_syshw_data which are enabled in design
-    for slave in slaves_dict.keys():
-        ipname = slaves_dict[slave]['ip_name']
-        if ipname not in slaves:
-            slaves.append(ipname)
+    slaves = hw_model.slave_ips(processor)
     # Add linux_kernel_properties from ipinfo.yaml
     for slave in slaves:
-        if slave in ipinfo_data.keys():
-            if 'linux_kernel_properties' in ipinfo_data[slave].keys():
-                for prop in ipinfo_data[slave]['linux_kernel_properties'].keys():
-                    value = ipinfo_data[slave]['linux_kernel_properties'][prop]
-                    value = value.replace('bool', '').strip()
-                    if value == 'y':
-                        kernel_opts += 'CONFIG_%s=y\n' % prop
-                    elif value == 'n':
-                        kernel_opts += '# CONFIG_%s is not set\n' % prop
-    devtypes = []
+        for prop, value in hw_model.ip_kernel_options(slave).items():
+            value = value.replace('bool', '').strip()
+            if value == 'y':
+                kernel_opts += 'CONFIG_%s=y\n' % prop
+            elif value == 'n':
+                kernel_opts += '# CONFIG_%s is not set\n' % prop
     generic_devtype_kdrvs = ''
     ipdevtype_kdrvs = ''
     # Add device_type/linux_kernel_properties from ipinfo.yaml
-    for ip in ipinfo_data.keys():
-        if 'device_type' in ipinfo_data[ip].keys():
-            for ip_type in ipinfo_data[ip]['device_type'].keys():
-                if ipinfo_data[ip]['device_type'][ip_type]:
-                    if 'linux_kernel_properties' in ipinfo_data[ip]['device_type'][ip_type].keys():
-                        if ip_type not in devtypes:
-                            devtypes.append(ip_type)
-
-    for devtype in devtypes:
+    for devtype in hw_model.kernel_device_types():
         devname = get_config_value('CONFIG_SUBSYSTEM_%s_' % devtype.upper(),
                                    default_cfgfile, 'choice', '_SELECT=y')
         devipname = get_ipproperty(devname, default_cfgfile)
@@ -176,29 +149,26 @@ def generate_kernel_cfg(args):
                     elif value == 'n':
                         generic_devtype_kdrvs += '# CONFIG_%s is not set\n' % prop
         # Add devtype linux_kernel_properties from ipinfo.yaml
-        if devipname in ipinfo_data.keys():
-            if devtype in ipinfo_data[devipname]['device_type'].keys():
-                if 'linux_kernel_properties' in ipinfo_data[devipname]['device_type'][devtype].keys():
-                    for prop in ipinfo_data[devipname]['device_type'][devtype]['linux_kernel_properties'].keys():
-                        value = ipinfo_data[devipname]['device_type'][devtype]['linux_kernel_properties'][prop]
-                        value = value.replace('bool', '').strip()
-                        if value == 'y':
-                            ipdevtype_kdrvs += 'CONFIG_%s=y\n' % prop
-                        elif value == 'n':
-                            ipdevtype_kdrvs += '# CONFIG_%s is not set\n' % prop
+        devtype_info = hw_model.device_type(devipname, devtype)
+        if 'linux_kernel_properties' in devtype_info:
+            for prop in devtype_info['linux_kernel_properties'].keys():
+                value = devtype_info['linux_kernel_properties'][prop]
+                value = value.replace('bool', '').strip()
+                if value == 'y':
+                    ipdevtype_kdrvs += 'CONFIG_%s=y\n' % prop
+                elif value == 'n':
+                    ipdevtype_kdrvs += '# CONFIG_%s is not set\n' % prop
     if args.soc_family == 'microblaze':
         ipdevtype_kdrvs += 'CONFIG_EARLY_PRINTK=y\n'
 
     # Add processor related linux_kernel_properties from plnx_syshw_data
-    if 'linux_kernel_properties' in plnx_syshw_data['processor'][processor].keys():
-        for prop in plnx_syshw_data['processor'][processor]['linux_kernel_properties'].keys():
-            valstr = plnx_syshw_data['processor'][processor]['linux_kernel_properties'][prop]
-            val = valstr.split()[0]
-            valtype = valstr.split()[1]
-            if valtype == 'string':
-                kernel_opts += 'CONFIG_%s="%s"\n' % (prop, val)
-            else:
-                kernel_opts += 'CONFIG_%s=%s\n' % (prop, val)
+    for prop, valstr in hw_model.processor_kernel_properties(processor).items():
+        val = valstr.split()[0]
+        valtype = valstr.split()[1]
+        if valtype == 'string':
+            kernel_opts += 'CONFIG_%s="%s"\n' % (prop, val)
+        else:
+            kernel_opts += 'CONFIG_%s=%s\n' % (prop, val)
     memory = get_config_value('CONFIG_SUBSYSTEM_MEMORY_', default_cfgfile,
                               'choice', '_SELECT=y')
     memory_baseaddr = get_config_value('CONFIG_SUBSYSTEM_MEMORY_%s_BASEADDR'
@@ -216,9 +186,56 @@ def generate_kernel_cfg(args):
     auto_linux_file = os.path.join(args.output, 'linux-xlnx/plnx_kernel.cfg')
     if not os.path.isdir(os.path.dirname(auto_linux_file)):
         os.makedirs(os.path.dirname(auto_linux_file))
-    with open(auto_linux_file, 'w') as auto_linux_file_f:
-        auto_linux_file_f.write(kernel_opts)
-    auto_linux_file_f.close()
+    write_if_changed(auto_linux_file, kernel_opts)
+
+
+def generate_autoconfig_cfgs(args):
+    # linux-xlnx and u-boot-xlnx fragment configs for microblaze
+    if args.soc_family != 'microblaze':
+        return
+    if get_config_value('CONFIG_SUBSYSTEM_AUTOCONFIG_KERNEL', default_cfgfile):
+        auto_linux_file = os.path.join(args.output,
+                                       'linux-xlnx/plnx_kernel.cfg')
+        stage = Stage(args.output, 'kernel-cfg',
+                      [os.path.join(scripts_dir, 'data/sysconf_koptions.yaml'),
+                       os.path.join(scripts_dir, 'data/ipinfo.yaml'),
+                       os.path.join(args.output, 'plnx_syshw_data')],
+                      outputs=[auto_linux_file], configs=[default_cfgfile])
+        if not stage.unchanged():
+            logger.debug('Kernel cfg: %s' % stage.reason)
+            generate_kernel_cfg(args)
+            stage.done()
+    if get_config_value('CONFIG_SUBSYSTEM_AUTOCONFIG_U__BOOT',
+                        default_cfgfile):
+        auto_uboot_dir = os.path.join(args.output, 'u-boot-xlnx')
+        bridge_tcl = os.path.join(scripts_dir, 'petalinux_hsm_bridge.tcl')
+        data_dir = os.path.join(scripts_dir, 'data')
+        # u-boot_bsp reads the whole config and the tool data
+        stage = Stage(args.output, 'uboot-cfg',
+                      [default_cfgfile, bridge_tcl,
+                       os.path.join(base_dir, 'uboot_bsp.py'),
+                       os.path.join(base_dir, 'xsa_extractor.py')] +
+                      sorted(glob.glob(os.path.join(scripts_dir, 'libs', '*'))) +
+                      sorted(glob.glob(os.path.join(data_dir, '*.yaml'))),
+                      hw_params(args), [auto_uboot_dir])
+        if not stage.unchanged():
+            logger.debug('U-boot cfg: %s' % stage.reason)
+            if not os.path.isdir(auto_uboot_dir):
+                os.makedirs(auto_uboot_dir)
+            logger.info('Generating u-boot configuration files')
+            try:
+                write_if_changed(os.path.join(auto_uboot_dir, 'config.cfg'),
+                                 gen_uboot_bsp(default_cfgfile, args.hw_file,
+                                               data_dir))
+                stage.done()
+                return
+            except UbootBspUnsupported as e:
+                logger.debug('U-boot cfg needs xsct: %s' % e)
+            run_xsct(bridge_tcl, ['-c', default_cfgfile, '-a', 'u-boot_bsp',
+                                  '-hdf', os.path.abspath(args.hw_file),
+                                  '-o', auto_uboot_dir, '-data', data_dir],
+                     args, args.output)
+            stage.done()
 
 
 def generate_plnx_config(args, machine_conf_file, hw_flow):
@@ -229,6 +246,20 @@ def generate_plnx_config(args, machine_conf_file, hw_flow):
         logger.error('Failed to generate .conf file, Unable to find config'
                      ' file at: %s' % args.output)
         sys.exit(255)
+    plnx_syshw_file = get_syshw_file(args.output, hw_flow)
+    rfsconfig_py = os.path.join(scripts_dir,
+                                'rootfsconfigs/rootfs_config.py')
+    # The kernel and u-boot fragments are stages of their own
+    generate_autoconfig_cfgs(args)
+    params = dict(hw_params(args), hw_flow=hw_flow,
+                  machine=machine_conf_file, xsct_tool=args.xsct_tool,
+                  config_site=os.environ.get('CONFIG_SITE', ''))
+    if hw_flow == 'xsct':
+        params['bit_hash'] = get_bithashvalue(args.hw_file)
+    # rootfs_config is consumed as a whole by rootfs_config.py --update_cfg
+    stage = Stage(args.output, 'plnxtool',
+                  [default_rfsfile, rfsconfig_py, plnx_syshw_file],
+                  params, configs=[default_cfgfile])
     arch = get_config_value('CONFIG_SUBSYSTEM_ARCH_',
                             default_cfgfile, 'choice', '=y').lower()
 
@@ -236,25 +267,19 @@ def generate_plnx_config(args, machine_conf_file, hw_flow):
     global plnx_conf_path
     plnx_conf_file = 'plnxtool.conf'
     plnx_conf_path = os.path.join(args.output, plnx_conf_file)
-    # Generate the plnxtool.conf if config/rootfs_config changed
-    if validate_hashfile(args, 'SYSTEM_CONF', default_cfgfile, update=False) and \
-            validate_hashfile(args, 'RFS_CONF', default_rfsfile, update=False) and \
-            os.path.exists(plnx_conf_path):
+    # Generate the plnxtool.conf only if a config value it reads or
+    # rootfs_config changed
+    stage.outputs = [plnx_conf_path]
+    if stage.unchanged():
         return plnx_conf_file
+    logger.debug('plnxtool.conf: %s' % stage.reason)
     logger.info('Generating plnxtool conf file')
 
     # Create a PetaLinux tool configuration file(plnxtool.conf) which set's
     # above generated ${MACHINE}-${DEVICE_ID} as Yocto MACHINE.
     soc_family = args.soc_family
 
-    import yaml
-    if hw_flow == 'xsct':
-        plnx_syshw_file = os.path.join(args.output, 'plnx_syshw_data')
-    else:
-        plnx_syshw_file = os.path.join(args.output, 'petalinux_config.yaml')
-    with open(plnx_syshw_file, 'r') as plnx_syshw_file_f:
-        plnx_syshw_data = yaml.safe_load(plnx_syshw_file_f)
-    plnx_syshw_file_f.close()
+    hw_model = load_hw_model(args.output, hw_flow)
 
     # Variable for constructing plnxtool.conf file.
     override_string = ''
@@ -285,8 +310,8 @@ def generate_plnx_config(args, machine_conf_file, hw_flow):
         if os.path.exists(sdk_path):
             uninative_path = os.path.join(sdk_path, 'downloads', 'uninative')
             # Check for exact x86_64-nativesdk file
-            uninative_file = glob.glob(
-                uninative_path + '/*/x86_64-nativesdk-libc*')
+            uninative_file = sorted(glob.glob(
+                uninative_path + '/*/x86_64-nativesdk-libc*'))
             if uninative_file:
                 uninative_dir = os.path.dirname(uninative_file[0])
                 # Add trainling slash if not present
@@ -363,7 +388,6 @@ def generate_plnx_config(args, machine_conf_file, hw_flow):
     if soc_family == 'microblaze':
         if kernel_autoconfig:
             override_string += 'KERNEL_AUTO_CONFIG:pn-linux-xlnx = "1"\n'
-            generate_kernel_cfg(args)
 
     override_string += '\n# PetaLinux tool device-tree variables\n'
     autoconfig_dt = get_config_value('CONFIG_SUBSYSTEM_AUTOCONFIG_DEVICE__TREE',
@@ -440,14 +464,6 @@ def generate_plnx_config(args, machine_conf_file, hw_flow):
     if soc_family == 'microblaze':
         if uboot_autoconfig:
             override_string += 'U_BOOT_AUTO_CONFIG:pn-u-boot-xlnx = "1"\n'
-            auto_uboot_dir = os.path.join(args.output, 'u-boot-xlnx')
-            if not os.path.isdir(auto_uboot_dir):
-                os.makedirs(auto_uboot_dir)
-            logger.info('Generating u-boot configuration files')
-            cmd = 'xsct -sdx -nodisp %s/petalinux_hsm_bridge.tcl -c %s -a u-boot_bsp -hdf %s -o %s -data %s' % \
-                (scripts_dir, default_cfgfile, os.path.abspath(args.hw_file),
-                    auto_uboot_dir, os.path.join(scripts_dir, 'data'))
-            run_cmd(cmd, args.output, args.logfile)
 
     if arch == 'aarch64':
         override_string += '\n# PetaLinux tool Arm-trusted-firmware variables\n'
@@ -734,16 +750,14 @@ def generate_plnx_config(args, machine_conf_file, hw_flow):
     override_string += 'PACKAGE_FITIMG_NAME = "%s"\n' % fit_deployname
 
     # Get design name from xsa
-    design_name = ''
-    if 'hw_design_name' in plnx_syshw_data.keys():
-        design_name = plnx_syshw_data['hw_design_name']
+    design_name = hw_model.get('hw_design_name')
     is_overlay = get_config_value(
         'CONFIG_SUBSYSTEM_DTB_OVERLAY', default_cfgfile)
     bitfile_name = 'system.bit'
     if is_overlay == 'y' and design_name:
         bitfile_name = design_name + '.bit'
 
-    bitfile = glob.glob(os.path.dirname(args.hw_file) + '/*.bit')
+    bitfile = sorted(glob.glob(os.path.dirname(args.hw_file) + '/*.bit'))
     extra_files = '%s:config' % os.path.join(args.output, 'config')
     if bitfile:
         extra_files += ' %s:%s' % (bitfile[0], bitfile_name)
@@ -754,20 +768,22 @@ def generate_plnx_config(args, machine_conf_file, hw_flow):
     override_string += 'WITHIN_PLNX_FLOW = "1"\n'
     override_string += 'SYSCONFIG_DIR = "%s"\n' % args.output
 
-    with open(plnx_conf_path, 'w') as override_conf_f:
+    # Rootfs configs, rootfs_config.py appends them to the file it is
+    # given: build the whole file aside and write plnxtool.conf once.
+    plnx_conf_tmp = plnx_conf_path + '.tmp'
+    with open(plnx_conf_tmp, 'w') as override_conf_f:
         override_conf_f.write(override_string)
     override_conf_f.close()
-
-    # Rootfs configs
-    rfsconfig_py = os.path.join(scripts_dir,
-                                'rootfsconfigs/rootfs_config.py')
-    default_rfsfile = os.path.join(args.output, 'rootfs_config')
     cmd = 'python3 %s --update_cfg %s %s %s' \
         % (rfsconfig_py, default_rfsfile,
-           plnx_conf_path, soc_family)
-    run_cmd(cmd, args.output, args.logfile)
-
-    # Update config and rootfs_config file hash if changed
-    validate_hashfile(args, 'SYSTEM_CONF', default_cfgfile)
-    validate_hashfile(args, 'RFS_CONF', default_rfsfile)
+           plnx_conf_tmp, soc_family)
+    try:
+        run_cmd(cmd, args.output, args.logfile)
+        with open(plnx_conf_tmp, 'r') as override_conf_f:
+            override_string = override_conf_f.read()
+    finally:
+        os.remove(plnx_conf_tmp)
+    write_if_changed(plnx_conf_path, override_string)
+
+    stage.done()
     return plnx_conf_file
@@ -18,23 +18,18 @@ def generate_yocto_machine(args, hw_flow):
         logger.error('Failed to generate .conf file, Unable to find config'
                      ' file at: %s' % args.output)
         sys.exit(255)
+    plnx_syshw_file = get_syshw_file(args.output, hw_flow)
+    machinejson_file = os.path.join(scripts_dir, 'data/machineconf.json')
+    stage = Stage(args.output, 'machine-conf',
+                  [machinejson_file, plnx_syshw_file],
+                  dict(hw_params(args), hw_flow=hw_flow),
+                  configs=[default_cfgfile])
     arch = get_config_value('CONFIG_SUBSYSTEM_ARCH_',
                             default_cfgfile, 'choice', '=y').lower()
 
     soc_family = args.soc_family
-    import yaml
-    if hw_flow == 'xsct':
-        plnx_syshw_file = os.path.join(args.output, 'plnx_syshw_data')
-    else:
-        plnx_syshw_file = os.path.join(args.output, 'petalinux_config.yaml')
-    with open(plnx_syshw_file, 'r') as plnx_syshw_file_f:
-        plnx_syshw_data = yaml.safe_load(plnx_syshw_file_f)
-    plnx_syshw_file_f.close()
-
     # Get the device_id from plnx_syshw_data
-    device_id = ''
-    if 'device_id' in plnx_syshw_data.keys():
-        device_id = plnx_syshw_data['device_id']
+    device_id = load_hw_model(args.output, hw_flow).get('device_id')
 
     soc_variant = get_config_value('CONFIG_SUBSYSTEM_VARIANT_%s'
                                    % soc_family.upper(),
@@ -53,8 +48,6 @@ def generate_yocto_machine(args, hw_flow):
             req_conf_file = '%s-generic' % (soc_family)
 
     # Machine conf json file
-    import json
-    machinejson_file = os.path.join(scripts_dir, 'data/machineconf.json')
     if not os.path.isfile(machinejson_file):
         logger.error('Machine json file doesnot exist at: %s' %
                      machinejson_file)
@@ -70,16 +63,13 @@ def generate_yocto_machine(args, hw_flow):
     dt_board_file = ''
     json_yocto_vars = ''
     board_overrides = ''
-    # Parse json to string
-    with open(machinejson_file, 'r') as data_file:
-        machinejson_data = json.load(data_file)
-    data_file.close()
+    tool_data = get_tool_data()
+    machinejson_data = tool_data.machineconf
 
     # Get optional machine name from sysconfig and check with json
     if yocto_machine_name and yocto_machine_name in machinejson_data.keys():
         # These configs includes board dtsi files associated to machine file
-        if 'dt-boardfile' in machinejson_data[machine_conf_file].keys():
-            dt_board_file = machinejson_data[machine_conf_file]['dt-boardfile']
+        dt_board_file = tool_data.machine_boardfiles.get(machine_conf_file, '')
         if 'machine-overrides' in machinejson_data[machine_conf_file].keys():
             board_overrides = machinejson_data[machine_conf_file]['machine-overrides']
         if 'extra-yocto-vars' in machinejson_data[machine_conf_file].keys():
@@ -98,16 +88,17 @@ def generate_yocto_machine(args, hw_flow):
     machine_conf_path = os.path.join(args.output, machine_conf_file + '.conf')
     machine_override = machine_conf_file
 
-    # Generate the yocto machine if config file changed.
-    if validate_hashfile(args, 'SYSTEM_CONF', default_cfgfile, update=False) and \
-            os.path.exists(machine_conf_path):
-        return machine_conf_file
-
     # Dont generate machineconf file from gen-machineconf if hw_flow SDT
     # dt-processor.sh generates it
     if hw_flow == 'sdt':
         return machine_conf_file
 
+    # Generate the yocto machine only if one of its inputs changed
+    stage.outputs = [machine_conf_path]
+    if stage.unchanged():
+        return machine_conf_file
+    logger.debug('Machine conf: %s' % stage.reason)
+
     logger.info('Generating machine conf file')
     # Variable for constructing ${MACHINE}.conf files.
     machine_override_string = ''
@@ -411,7 +402,6 @@ def generate_yocto_machine(args, hw_flow):
                                % (machine_conf_file.replace('-', '_'),
                                   machine_conf_file)
 
-    with open(machine_conf_path, 'w') as machine_override_conf_f:
-        machine_override_conf_f.write(machine_override_string)
-    machine_override_conf_f.close()
+    write_if_changed(machine_conf_path, machine_override_string)
+    stage.done()
     return machine_conf_file
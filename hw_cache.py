@@ -0,0 +1,314 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Cache of the files the hardware stages generate (Kconfig.syshw,
+# plnx_syshw_data, flash_parts.txt), shared by every output directory the
+# same hardware is generated into. An entry is found by a key digest of
+# what the files are generated from; it lists the digest of each file,
+# whose contents are stored once under that digest:
+#
+#   entries/<key>       {"key": <key>, "files": {<name>: <sha256>}}
+#   objects/<sha256>    file contents
+#
+# Both are checked against their digest when read back. The store is a
+# local directory, trimmed once it outgrows its size by evicting the least
+# recently used entries, or an HTTP server answering GET and PUT on those
+# paths, such as the one this script runs:
+#
+#   hw_cache.py serve <directory> [<port>]
+
+import os
+import sys
+import json
+import time
+import hashlib
+import urllib.error
+import urllib.request
+import http.server
+
+import logger_setup
+from config_store import write_file_atomic
+from output_writer import write_if_changed
+
+logger, console_h = logger_setup.setup_logger()
+
+KINDS = ('entries', 'objects')
+# Default size of a local cache, in MiB
+DEFAULT_SIZE = 512
+HTTP_TIMEOUT = 30
+# A full local cache is trimmed to this share of its size, for the next
+# saves not to evict again
+EVICT_TARGET = 0.75
+# Seconds an object no entry holds is kept: the run which stored it may
+# not have written its entry yet
+OBJECT_GRACE = 3600
+
+
+def sha256_data(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def cache_key(**parts):
+    '''Key digest of the values an entry is generated from.'''
+    return sha256_data(json.dumps(parts, sort_keys=True).encode())
+
+
+def remove_file(filename):
+    try:
+        os.remove(filename)
+    except OSError:
+        pass
+
+
+def valid_name(name):
+    return isinstance(name, str) and len(name) == 64 and \
+        all(c in '0123456789abcdef' for c in name)
+
+
+class LocalCache:
+    '''Cache store in a directory, at most max_size bytes.'''
+
+    def __init__(self, path, max_size):
+        self.path = path
+        self.max_size = max_size
+
+    def _file(self, kind, name):
+        return os.path.join(self.path, kind, name[:2], name)
+
+    def get(self, kind, name):
+        filename = self._file(kind, name)
+        try:
+            with open(filename, 'rb') as cache_f:
+                data = cache_f.read()
+            if kind == 'entries':
+                # Last use of an entry, for the eviction
+                os.utime(filename)
+        except OSError:
+            return None
+        return data
+
+    def put(self, kind, name, data):
+        filename = self._file(kind, name)
+        if kind == 'objects':
+            stored = self.get(kind, name)
+            if stored is not None and sha256_data(stored) == name:
+                # Stored again for a new entry, restart its grace period
+                try:
+                    os.utime(filename)
+                    return
+                except OSError:
+                    pass
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        write_file_atomic(filename, data)
+        if kind == 'entries' and self.size() > self.max_size:
+            self.evict()
+
+    def _files(self, kind):
+        top = os.path.join(self.path, kind)
+        for root, dirs, files in os.walk(top):
+            for f in files:
+                if valid_name(f):
+                    yield f, os.path.join(root, f)
+
+    def size(self):
+        size = 0
+        for kind in KINDS:
+            for name, filename in self._files(kind):
+                try:
+                    size += os.path.getsize(filename)
+                except OSError:
+                    pass
+        return size
+
+    def evict(self):
+        '''Drop the least recently used entries until the entries and
+        the objects they hold fit in EVICT_TARGET of max_size, then the
+        objects no entry holds which are older than OBJECT_GRACE. Another
+        run may be evicting too, files can vanish.'''
+        entries = []
+        for name, filename in self._files('entries'):
+            try:
+                with open(filename, 'r') as entry_f:
+                    files = json.load(entry_f)['files'].values()
+                st = os.stat(filename)
+                entries.append((st.st_mtime, filename, st.st_size, set(files)))
+            except (ValueError, KeyError, AttributeError):
+                remove_file(filename)
+            except OSError:
+                pass
+        objects = {}
+        for name, filename in self._files('objects'):
+            try:
+                st = os.stat(filename)
+                objects[name] = (filename, st.st_size, st.st_mtime)
+            except OSError:
+                pass
+        entries.sort(reverse=True)
+        kept = set()
+        size = 0
+        for mtime, filename, entry_size, files in entries:
+            added = files - kept
+            entry_size += sum(objects[f][1] for f in added if f in objects)
+            if size + entry_size > self.max_size * EVICT_TARGET:
+                logger.debug('Evicting hw cache entry %s' % filename)
+                remove_file(filename)
+                continue
+            size += entry_size
+            kept |= added
+        expired = time.time() - OBJECT_GRACE
+        for name, (filename, _, mtime) in objects.items():
+            if name not in kept and mtime < expired:
+                remove_file(filename)
+
+
+class HttpCache:
+    '''Cache store behind GET and PUT of <url>/<kind>/<name>.'''
+
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+
+    def get(self, kind, name):
+        try:
+            with urllib.request.urlopen('%s/%s/%s' % (self.url, kind, name),
+                                        timeout=HTTP_TIMEOUT) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            if e.code != 404:
+                logger.debug('hw cache GET %s: %s' % (name, e))
+        except (OSError, ValueError) as e:
+            logger.debug('hw cache GET %s: %s' % (name, e))
+        return None
+
+    def put(self, kind, name, data):
+        request = urllib.request.Request('%s/%s/%s' % (self.url, kind, name),
+                                         data=data, method='PUT')
+        try:
+            urllib.request.urlopen(request, timeout=HTTP_TIMEOUT).close()
+        except (OSError, ValueError) as e:
+            logger.debug('hw cache PUT %s: %s' % (name, e))
+
+
+class HwCache:
+    '''Entries of generated files in a LocalCache or HttpCache.'''
+
+    def __init__(self, store):
+        self.store = store
+
+    def fetch(self, key, outputs):
+        '''Write the outputs cached for key, False if they are not all
+        there and intact.'''
+        data = self.store.get('entries', key)
+        try:
+            entry = json.loads(data.decode())
+            files = entry['files']
+            if entry['key'] != key or \
+                    sorted(files) != sorted(os.path.basename(f) for f in outputs):
+                return False
+        except (AttributeError, ValueError, KeyError, TypeError):
+            return False
+        contents = {}
+        for filename in outputs:
+            digest = files[os.path.basename(filename)]
+            if not valid_name(digest):
+                return False
+            data = self.store.get('objects', digest)
+            if data is None or sha256_data(data) != digest:
+                logger.debug('hw cache object %s missing or corrupted' % digest)
+                return False
+            contents[filename] = data
+        for filename, data in contents.items():
+            write_if_changed(filename, data)
+        return True
+
+    def save(self, key, outputs):
+        files = {}
+        for filename in outputs:
+            with open(filename, 'rb') as output_f:
+                data = output_f.read()
+            files[os.path.basename(filename)] = digest = sha256_data(data)
+            self.store.put('objects', digest, data)
+        self.store.put('entries', key, json.dumps(
+            {'key': key, 'files': files}, indent=1, sort_keys=True).encode())
+
+
+hw_cache = None
+
+
+def set_hw_cache(location, size=DEFAULT_SIZE):
+    '''Use the cache at location, a directory or an http(s) URL, of at
+    most size MiB for a directory.'''
+    global hw_cache
+    if location.startswith(('http://', 'https://')):
+        hw_cache = HwCache(HttpCache(location))
+    else:
+        hw_cache = HwCache(LocalCache(os.path.abspath(location),
+                                      size * 1024 * 1024))
+
+
+def fetch_outputs(key, outputs):
+    '''True if outputs were written from the cache.'''
+    if not hw_cache:
+        return False
+    if hw_cache.fetch(key, outputs):
+        logger.debug('hw cache hit %s' % key)
+        return True
+    logger.debug('hw cache miss %s' % key)
+    return False
+
+
+def save_outputs(key, outputs):
+    if not hw_cache:
+        return
+    try:
+        hw_cache.save(key, outputs)
+    except OSError as e:
+        logger.debug('Unable to save hw cache entry: %s' % e)
+
+
+class CacheRequestHandler(http.server.BaseHTTPRequestHandler):
+    store = None
+
+    def _name(self):
+        parts = self.path.strip('/').split('/')
+        if len(parts) != 2 or parts[0] not in KINDS or \
+                not valid_name(parts[1]):
+            self.send_error(404)
+            return None, None
+        return parts
+
+    def do_GET(self):
+        kind, name = self._name()
+        if not kind:
+            return
+        data = self.store.get(kind, name)
+        if data is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_PUT(self):
+        kind, name = self._name()
+        if not kind:
+            return
+        data = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if kind == 'objects' and sha256_data(data) != name:
+            self.send_error(400)
+            return
+        self.store.put(kind, name, data)
+        self.send_response(201)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3 or sys.argv[1] != 'serve':
+        sys.exit('usage: %s serve <directory> [<port>]' % sys.argv[0])
+    CacheRequestHandler.store = LocalCache(os.path.abspath(sys.argv[2]),
+                                           DEFAULT_SIZE * 1024 * 1024)
+    port = int(sys.argv[3]) if len(sys.argv) > 3 else 8000
+    http.server.ThreadingHTTPServer(('127.0.0.1', port),
+                                    CacheRequestHandler).serve_forever()
@@ -0,0 +1,293 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import sys
+import json
+
+from config_store import write_file_atomic
+from digest_cache import digest_cache
+from tool_data import get_tool_data
+
+# Version of the JSON sidecar written next to plnx_syshw_data by
+# hw-description.tcl and next to any other syshw file by load_syshw().
+# Its first line is a header, every other line a single key object, the
+# processor tree being split in one {"processor": {name: ...}} per line.
+SIDECAR_SCHEMA = 3
+PROCESSOR_PREFIX = b'{"processor": {"'
+
+
+def convert_dictto_lowercase(data_dict):
+    if isinstance(data_dict, dict):
+        return {k.lower(): convert_dictto_lowercase(v) for k, v in data_dict.items()}
+    elif isinstance(data_dict, (list, set, tuple)):
+        t = type(data_dict)
+        return t(convert_dictto_lowercase(o) for o in data_dict)
+    elif isinstance(data_dict, str):
+        return data_dict.lower()
+    else:
+        return data_dict
+
+
+class PlainScalars:
+    '''Turns the plain YAML scalars hw-description.tcl puts in its JSON
+    sidecar into the values yaml.safe_load() gives for the same text.
+    The Tcl only writes them when every key and scalar is plain YAML
+    (plnx_yaml_plain), text such as 'x' or "a #b" which the YAML reads
+    as something else leaves a "scalars": "yaml" header instead.'''
+
+    def __init__(self):
+        import yaml
+        self.yaml = yaml
+        self.resolver = yaml.resolver.Resolver()
+        self.constructor = yaml.constructor.SafeConstructor()
+        self.values = {}
+
+    def scalar(self, text):
+        if text not in self.values:
+            tag = self.resolver.resolve(self.yaml.nodes.ScalarNode, text,
+                                        (True, False))
+            self.values[text] = self.constructor.construct_object(
+                self.yaml.nodes.ScalarNode(tag, text))
+        return self.values[text]
+
+    def __call__(self, node):
+        if isinstance(node, dict):
+            return {self.scalar(k): self(v) for k, v in node.items()}
+        return self.scalar(node)
+
+
+def typed_scalars(node):
+    return node
+
+
+def sidecar_file(syshw_file):
+    return syshw_file + '.json'
+
+
+class SyshwSidecar:
+    '''Top level values of a syshw sidecar, with each processor only
+    located in the file until it is asked for: whatever the size of the
+    design, just the selected processor's subtree is ever in memory.'''
+
+    def __init__(self, syshw_file):
+        self.filename = sidecar_file(syshw_file)
+        self.top = {}
+        self.offsets = {}
+        with open(self.filename, 'rb') as sidecar_f:
+            header = json.loads(sidecar_f.readline())
+            if header.get('schema_version') != SIDECAR_SCHEMA:
+                raise ValueError('%s: unknown schema' % self.filename)
+            if header.get('scalars') == 'plain':
+                # Written by the Tcl together with syshw_file, only an
+                # older script could since have rewritten the YAML alone
+                if os.stat(self.filename).st_mtime_ns < \
+                        os.stat(syshw_file).st_mtime_ns:
+                    raise ValueError('%s is stale' % self.filename)
+                self.resolve = PlainScalars()
+            elif header.get('scalars') == 'typed' and \
+                    header.get('source_digest') == digest_cache.digest(syshw_file):
+                self.resolve = typed_scalars
+            else:
+                # Stale, or "yaml": only the YAML holds the values
+                raise ValueError('%s is stale' % self.filename)
+            offset = sidecar_f.tell()
+            for line in sidecar_f:
+                if line.startswith(PROCESSOR_PREFIX):
+                    name = json.decoder.scanstring(
+                        line.decode('utf-8'), len(PROCESSOR_PREFIX))[0]
+                    self.offsets[self.resolve(name)] = (offset, len(line))
+                else:
+                    self.top.update(self.resolve(json.loads(line)))
+                offset += len(line)
+
+    def processor_names(self):
+        return list(self.offsets)
+
+    def processor(self, processor):
+        offset, length = self.offsets[processor]
+        with open(self.filename, 'rb') as sidecar_f:
+            sidecar_f.seek(offset)
+            line = sidecar_f.read(length)
+        return self.resolve(json.loads(line))['processor'][processor]
+
+
+class SyshwData:
+    '''SyshwSidecar interface over an already loaded tree.'''
+
+    def __init__(self, data):
+        self.top = {k: v for k, v in data.items() if k != 'processor'}
+        self.processors = data.get('processor') or {}
+
+    def processor_names(self):
+        return list(self.processors)
+
+    def processor(self, processor):
+        return self.processors[processor]
+
+
+def write_sidecar(syshw_file, data):
+    lines = [{'schema_version': SIDECAR_SCHEMA, 'scalars': 'typed',
+              'source_digest': digest_cache.digest(syshw_file)}]
+    for key, value in data.items():
+        if key == 'processor' and isinstance(value, dict):
+            lines += [{key: {name: cpu}} for name, cpu in value.items()]
+        else:
+            lines.append({key: value})
+    write_file_atomic(sidecar_file(syshw_file),
+                      ''.join(json.dumps(line) + '\n' for line in lines))
+
+
+def load_syshw(syshw_file):
+    '''SyshwSidecar of plnx_syshw_data or petalinux_config.yaml. YAML
+    is only parsed for a file without a current sidecar, which is then
+    written for this and later loads.'''
+    try:
+        return SyshwSidecar(syshw_file)
+    except (OSError, ValueError, AttributeError):
+        pass
+    import yaml
+    with open(syshw_file, 'r') as syshw_f:
+        data = yaml.safe_load(syshw_f) or {}
+    try:
+        write_sidecar(syshw_file, data)
+        return SyshwSidecar(syshw_file)
+    except (OSError, TypeError, ValueError):
+        # Values json can not hold (dates, binary) stay YAML only
+        return SyshwData(data)
+
+
+class Slave:
+    '''A processor slave as get_ipproperty() sees it, properties in
+    lowercase. Kept in slots, with the ip_name interned since thousands
+    of slaves share a handful of ips.'''
+    __slots__ = ('ip_name', 'properties')
+
+    def __init__(self, slave):
+        slave = convert_dictto_lowercase(slave) if isinstance(slave, dict) else {}
+        ip_name = slave.pop('ip_name', None)
+        self.ip_name = sys.intern(ip_name) if isinstance(ip_name, str) else ip_name
+        self.properties = tuple(slave.items())
+
+    def get(self, prop, default=''):
+        if prop == 'ip_name':
+            return default if self.ip_name is None else self.ip_name
+        for name, value in self.properties:
+            if name == prop:
+                return value
+        return default
+
+
+class ProcessorSlaves:
+    '''Slaves of one processor, indexed by lowercase name, by ip_name
+    and by the ipinfo.yaml device types of their ip.'''
+
+    def __init__(self, slaves, tool_data):
+        slaves = slaves or {}
+        self.by_name = {}
+        self.by_ip = {}
+        self.by_device_type = {}
+        for name, slave in slaves.items():
+            self.by_name[name.lower()] = Slave(slave)
+            ip_name = slave.get('ip_name') if isinstance(slave, dict) else None
+            if ip_name is None:
+                continue
+            self.by_ip.setdefault(ip_name, []).append(name)
+            for device_type in tool_data.ip_device_types.get(ip_name, []):
+                self.by_device_type.setdefault(device_type, []).append(name)
+
+
+class HardwareModel:
+    '''plnx_syshw_data (or petalinux_config.yaml) with the compiled
+    ipinfo.yaml, loaded once and indexed for the lookups the generators
+    make. A processor's subtree is only read on the first lookup made
+    for it.'''
+
+    def __init__(self, syshw_file):
+        self.syshw = load_syshw(syshw_file)
+        self.tool_data = get_tool_data()
+        self.ipinfo = self.tool_data.ipinfo
+        self.processors = {}
+        self.processor_slaves = {}
+
+    def get(self, key, default=''):
+        return self.syshw.top.get(key, default)
+
+    def processor(self, processor):
+        '''Properties of the processor, its slaves are in slaves().'''
+        if processor not in self.processors:
+            data = self.syshw.processor(processor)
+            self.processors[processor] = {
+                k: v for k, v in data.items() if k != 'slaves'}
+            self.processor_slaves[processor] = ProcessorSlaves(
+                data.get('slaves'), self.tool_data)
+        return self.processors[processor]
+
+    def slaves(self, processor):
+        self.processor(processor)
+        return self.processor_slaves[processor]
+
+    def slave_property(self, processor, device_name, prop='ip_name'):
+        '''prop of a slave looked up by case insensitive name, lowercase,
+        '' if either is unknown.'''
+        slave = self.slaves(processor).by_name.get(device_name.lower())
+        if not slave:
+            return ''
+        return slave.get(prop, '')
+
+    def has_ip(self, processor, ip_name):
+        return ip_name in self.slaves(processor).by_ip
+
+    def slave_ips(self, processor):
+        '''Distinct lowercase ip_names of the slaves, in design order.'''
+        ip_names = []
+        for slave in self.slaves(processor).by_name.values():
+            if slave.ip_name not in ip_names:
+                ip_names.append(slave.ip_name)
+        return ip_names
+
+    def slaves_of_type(self, processor, device_type):
+        return self.slaves(processor).by_device_type.get(device_type, [])
+
+    def processor_property(self, processor, prop):
+        properties = self.processor(processor).get('linux_kernel_properties')
+        if properties and prop in properties:
+            return properties[prop].split(' ')[0]
+        return ''
+
+    def processor_kernel_properties(self, processor):
+        return self.processor(processor).get('linux_kernel_properties') or {}
+
+    def ip(self, ip_name):
+        return self.ipinfo.get(ip_name) or {}
+
+    def device_type(self, ip_name, device_type):
+        '''ipinfo.yaml device_type entry of an ip, {} if it has none.'''
+        device_types = self.ip(ip_name).get('device_type')
+        if not isinstance(device_types, dict):
+            return {}
+        return device_types.get(device_type) or {}
+
+    def ip_kernel_options(self, ip_name):
+        return self.tool_data.ip_kernel_options.get(ip_name) or {}
+
+    def kernel_device_types(self):
+        '''Device types that carry linux_kernel_properties for any ip,
+        in ipinfo.yaml order.'''
+        return self.tool_data.kernel_device_types
+
+
+hw_models = {}
+
+
+def get_hw_model(syshw_file):
+    '''HardwareModel for syshw_file, reloaded only when the file changes
+    on disk.'''
+    key = os.path.abspath(syshw_file)
+    st = os.stat(key)
+    stamp = (st.st_ino, st.st_size, st.st_mtime_ns)
+    cached = hw_models.get(key)
+    if not cached or cached[0] != stamp:
+        hw_models[key] = (stamp, HardwareModel(syshw_file))
+    return hw_models[key][1]
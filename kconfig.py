@@ -0,0 +1,797 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import re
+import shutil
+
+from config_store import write_file_atomic
+
+CONFIG_ = 'CONFIG_'
+
+
+class KconfigError(Exception):
+    '''Raised for Kconfig input this module does not handle, callers
+    fall back to the kconfig-frontends conf tool.'''
+    pass
+
+
+class Symbol:
+    def __init__(self, name, const=False):
+        self.name = name
+        self.const = const
+        self.type = None
+        self.choice = None
+        self.is_choice = False
+        self.nodes = []
+        self.prompts = []
+        self.defaults = []
+        self.ranges = []
+        self.rev_dep = []
+        self.implied = []
+        self.dir_dep = []
+        self.user_value = None
+
+
+class Choice(Symbol):
+    def __init__(self, name):
+        super().__init__(name)
+        self.is_choice = True
+        self.type = 'bool'
+        self.members = []
+        self.optional = False
+        self.user_selection = None
+
+
+class MenuNode:
+    def __init__(self, kind, item=None, parent=None):
+        self.kind = kind
+        self.item = item
+        self.parent = parent
+        self.children = []
+        self.prompt = None
+        self.depends = []
+        self.visibility = []
+        self.defaults = []
+        self.selects = []
+        self.implies = []
+        self.ranges = []
+        self.dep = None
+
+
+# Expression trees are Symbols or tuples:
+#   ('and', a, b) ('or', a, b) ('not', a) ('cmp', op, sym_a, sym_b)
+def expr_and(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return ('and', a, b)
+
+
+def expr_or(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return ('or', a, b)
+
+
+def expr_syms(expr):
+    if expr is None:
+        return
+    if isinstance(expr, Symbol):
+        yield expr
+    else:
+        for operand in expr[1:]:
+            if isinstance(operand, (Symbol, tuple)):
+                yield from expr_syms(operand)
+
+
+token_re = re.compile(r'''\s*(?:
+    (?P<str>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')|
+    (?P<op>&&|\|\||!=|<=|>=|[!=()<>])|
+    (?P<word>[A-Za-z0-9_\-/.$+]+)
+    )''', re.X)
+
+
+def tokenize(text, location):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        if text[pos] in ' \t':
+            pos += 1
+            continue
+        if text[pos] == '#':
+            break
+        match = token_re.match(text, pos)
+        if not match or match.end() == pos:
+            raise KconfigError('%s: invalid token: %s' % (location, text[pos:]))
+        if match.group('str') is not None:
+            value = re.sub(r'\\(.)', r'\1', match.group('str')[1:-1])
+            tokens.append(('str', value))
+        elif match.group('op') is not None:
+            tokens.append(('op', match.group('op')))
+        else:
+            tokens.append(('word', match.group('word')))
+        pos = match.end()
+    return tokens
+
+
+def source_path(name, current, srcdir):
+    name = os.path.expandvars(name)
+    if os.path.isabs(name):
+        return name
+    for base in (os.getcwd(), os.path.dirname(current), srcdir):
+        path = os.path.join(base, name)
+        if os.path.isfile(path):
+            return path
+    raise KconfigError('%s: can\'t open file "%s"' % (current, name))
+
+
+def tab_width(text):
+    width = 0
+    for char in text:
+        if char == '\t':
+            width = (width & ~7) + 8
+        elif char == ' ':
+            width += 1
+        else:
+            break
+    return width
+
+
+class Kconfig:
+    '''Parse a Kconfig tree and evaluate it the way kconfig-frontends
+    "conf" does in oldaskconfig mode when every question is answered
+    with its default, i.e. `yes "" | conf Kconfig`.'''
+
+    entry_options = ('bool', 'boolean', 'tristate', 'string', 'hex', 'int',
+                     'def_bool', 'def_tristate', 'prompt', 'default',
+                     'depends', 'select', 'imply', 'range', 'help',
+                     '---help---', 'optional', 'visible', 'option')
+
+    def __init__(self, filename):
+        self.syms = {}
+        self.consts = {}
+        self.choices = []
+        self.mainmenu = 'Linux Kernel Configuration'
+        self.root = MenuNode('root')
+        self.srcdir = os.path.dirname(os.path.abspath(filename))
+        self._values = {}
+        self._visible = {}
+        self._write = set()
+        self._selection = {}
+        self._parse(filename)
+        self._finalize(self.root, None, [])
+
+    # Parser
+    def symbol(self, name):
+        if name in ('y', 'm', 'n'):
+            return self.const_symbol(name)
+        if name not in self.syms:
+            self.syms[name] = Symbol(name)
+        return self.syms[name]
+
+    def const_symbol(self, name):
+        if name not in self.consts:
+            self.consts[name] = Symbol(name, const=True)
+        return self.consts[name]
+
+    def _read_lines(self, filename):
+        try:
+            with open(filename, 'r', encoding='utf-8') as kconfig_f:
+                data = kconfig_f.read()
+        except OSError as e:
+            raise KconfigError('Unable to read %s: %s' % (filename, e))
+        return data.split('\n')
+
+    def _parse(self, filename):
+        stack = [self.root]
+        entry = None
+        files = [(filename, self._read_lines(filename), 0)]
+        while files:
+            filename, lines, index = files.pop()
+            while index < len(lines):
+                location = '%s:%d' % (filename, index + 1)
+                line = lines[index]
+                index += 1
+                while line.endswith('\\') and index < len(lines):
+                    line = line[:-1] + lines[index]
+                    index += 1
+                tokens = tokenize(line, location)
+                if not tokens:
+                    continue
+                keyword = tokens[0][1] if tokens[0][0] == 'word' else None
+                if entry and keyword in self.entry_options:
+                    if keyword in ('help', '---help---'):
+                        index = self._skip_help(lines, index)
+                    else:
+                        self._entry_option(entry, keyword, tokens[1:],
+                                           location)
+                    continue
+                entry = None
+                parent = stack[-1]
+                if keyword in ('config', 'menuconfig'):
+                    if len(tokens) != 2:
+                        raise KconfigError('%s: invalid config entry' % location)
+                    sym = self.symbol(tokens[1][1])
+                    entry = MenuNode('config', sym, parent)
+                    sym.nodes.append(entry)
+                    choice = self._enclosing_choice(stack)
+                    if choice and sym.choice is None:
+                        sym.choice = choice
+                        choice.members.append(sym)
+                    parent.children.append(entry)
+                elif keyword == 'choice':
+                    name = tokens[1][1] if len(tokens) > 1 else \
+                        '<choice %d>' % len(self.choices)
+                    choice = Choice(name)
+                    self.choices.append(choice)
+                    entry = MenuNode('choice', choice, parent)
+                    choice.nodes.append(entry)
+                    parent.children.append(entry)
+                    stack.append(entry)
+                elif keyword in ('menu', 'comment'):
+                    entry = MenuNode(keyword, None, parent)
+                    entry.prompt = (self._prompt_text(tokens, location), None)
+                    parent.children.append(entry)
+                    if keyword == 'menu':
+                        stack.append(entry)
+                elif keyword == 'if':
+                    node = MenuNode('if', None, parent)
+                    node.depends.append(self._parse_expr(tokens[1:], location))
+                    parent.children.append(node)
+                    stack.append(node)
+                elif keyword in ('endmenu', 'endchoice', 'endif'):
+                    kind = keyword[3:]
+                    if len(stack) < 2 or stack[-1].kind != kind:
+                        raise KconfigError('%s: unexpected %s' % (location, keyword))
+                    stack.pop()
+                elif keyword == 'source':
+                    path = source_path(self._prompt_text(tokens, location),
+                                       filename, self.srcdir)
+                    files.append((filename, lines, index))
+                    files.append((path, self._read_lines(path), 0))
+                    break
+                elif keyword == 'mainmenu':
+                    self.mainmenu = self._prompt_text(tokens, location)
+                else:
+                    raise KconfigError('%s: unsupported statement: %s'
+                                       % (location, line.strip()))
+        if len(stack) != 1:
+            raise KconfigError('%s: missing end%s' % (filename, stack[-1].kind))
+
+    @staticmethod
+    def _enclosing_choice(stack):
+        for node in reversed(stack):
+            if node.kind == 'choice':
+                return node.item
+            if node.kind != 'if':
+                return None
+        return None
+
+    @staticmethod
+    def _prompt_text(tokens, location):
+        if len(tokens) != 2 or tokens[1][0] == 'op':
+            raise KconfigError('%s: invalid prompt' % location)
+        return tokens[1][1]
+
+    @staticmethod
+    def _skip_help(lines, index):
+        # Same rules as the zconf lexer HELP state: help text ends at the
+        # first line indented less than the first help line, or when a
+        # line is followed by one starting in column 0.
+        first_ts = 0
+        while index < len(lines):
+            line = lines[index]
+            ts = tab_width(line)
+            if line[:1] in (' ', '\t') and first_ts and ts < first_ts:
+                return index
+            index += 1
+            if line.strip() and not first_ts:
+                first_ts = ts
+            if index < len(lines) and lines[index][:1] not in ('', ' ', '\t'):
+                return index
+        return index
+
+    def _split_if(self, tokens):
+        for pos, token in enumerate(tokens):
+            if token == ('word', 'if'):
+                return tokens[:pos], tokens[pos + 1:]
+        return tokens, None
+
+    def _entry_option(self, node, keyword, tokens, location):
+        sym = node.item
+        value, cond = self._split_if(tokens)
+        cond = self._parse_expr(cond, location) if cond is not None else None
+        if keyword in ('bool', 'boolean', 'tristate', 'string', 'hex', 'int',
+                       'def_bool', 'def_tristate'):
+            if sym is None:
+                raise KconfigError('%s: type outside config entry' % location)
+            kind = {'boolean': 'bool', 'def_bool': 'bool',
+                    'def_tristate': 'tristate'}.get(keyword, keyword)
+            if sym.type is None or sym.is_choice:
+                sym.type = kind
+            if keyword.startswith('def_'):
+                node.defaults.append((self._parse_expr(value, location), cond))
+            elif value:
+                node.prompt = (self._prompt_text([None] + value, location), cond)
+        elif keyword == 'prompt':
+            node.prompt = (self._prompt_text([None] + value, location), cond)
+        elif keyword == 'default':
+            node.defaults.append((self._parse_expr(value, location), cond))
+        elif keyword == 'depends':
+            if not tokens or tokens[0] != ('word', 'on'):
+                raise KconfigError('%s: invalid depends' % location)
+            node.depends.append(self._parse_expr(tokens[1:], location))
+        elif keyword in ('select', 'imply'):
+            if len(value) != 1 or value[0][0] != 'word':
+                raise KconfigError('%s: invalid %s' % (location, keyword))
+            target = self.symbol(value[0][1])
+            targets = node.selects if keyword == 'select' else node.implies
+            targets.append((target, cond))
+        elif keyword == 'range':
+            if len(value) != 2 or value[0][0] == 'op' or value[1][0] == 'op':
+                raise KconfigError('%s: invalid range' % location)
+            node.ranges.append((self._operand(value[0]),
+                                self._operand(value[1]), cond))
+        elif keyword == 'optional' and node.kind == 'choice':
+            sym.optional = True
+        elif keyword == 'visible' and node.kind == 'menu' and \
+                tokens[:1] == [('word', 'if')]:
+            node.visibility.append(cond)
+        else:
+            raise KconfigError('%s: unsupported option: %s'
+                               % (location, keyword))
+
+    def _operand(self, token):
+        if token[0] == 'str':
+            return self.const_symbol(token[1]) \
+                if token[1] not in ('y', 'm', 'n') else self.symbol(token[1])
+        return self.symbol(token[1])
+
+    def _parse_expr(self, tokens, location):
+        if not tokens:
+            raise KconfigError('%s: missing expression' % location)
+        self._tokens = tokens
+        self._pos = 0
+        self._location = location
+        expr = self._parse_or()
+        if self._pos != len(tokens):
+            raise KconfigError('%s: invalid expression' % location)
+        return expr
+
+    def _peek(self):
+        if self._pos < len(self._tokens):
+            return self._tokens[self._pos]
+        return (None, None)
+
+    def _parse_or(self):
+        expr = self._parse_and()
+        while self._peek() == ('op', '||'):
+            self._pos += 1
+            expr = ('or', expr, self._parse_and())
+        return expr
+
+    def _parse_and(self):
+        expr = self._parse_factor()
+        while self._peek() == ('op', '&&'):
+            self._pos += 1
+            expr = ('and', expr, self._parse_factor())
+        return expr
+
+    def _parse_factor(self):
+        token = self._peek()
+        self._pos += 1
+        if token == ('op', '!'):
+            return ('not', self._parse_factor())
+        if token == ('op', '('):
+            expr = self._parse_or()
+            if self._peek() != ('op', ')'):
+                raise KconfigError('%s: missing )' % self._location)
+            self._pos += 1
+            return expr
+        if token[0] not in ('word', 'str'):
+            raise KconfigError('%s: invalid expression' % self._location)
+        sym = self._operand(token)
+        op = self._peek()
+        if op[0] == 'op' and op[1] in ('=', '!=', '<', '<=', '>', '>='):
+            self._pos += 1
+            other = self._peek()
+            self._pos += 1
+            if other[0] not in ('word', 'str'):
+                raise KconfigError('%s: invalid expression' % self._location)
+            return ('cmp', op[1], sym, self._operand(other))
+        return sym
+
+    def _finalize(self, node, parentdep, visibility):
+        '''Propagate menu/if/choice dependencies to every property, as
+        menu_finalize() does.'''
+        dep = parentdep
+        for depends in node.depends:
+            dep = expr_and(dep, depends)
+        node.dep = dep
+        sym = node.item
+        if node.prompt:
+            visible = expr_and(dep, node.prompt[1])
+            if sym:
+                # Enclosing "visible if" only hides symbol prompts
+                for expr in visibility:
+                    visible = expr_and(visible, expr)
+            node.prompt = (node.prompt[0], visible)
+            if sym:
+                sym.prompts.append(visible)
+                if sym.is_choice and not sym.optional:
+                    sym.rev_dep.append(('and', visible,
+                                        self.const_symbol('m')))
+        if sym:
+            sym.dir_dep.append(dep)
+            for value, cond in node.defaults:
+                sym.defaults.append((value, expr_and(dep, cond)))
+            for low, high, cond in node.ranges:
+                sym.ranges.append((low, high, expr_and(dep, cond)))
+            for target, cond in node.selects:
+                target.rev_dep.append(('and', sym, expr_and(dep, cond)))
+            for target, cond in node.implies:
+                target.implied.append(('and', sym, expr_and(dep, cond)))
+        if node.kind == 'choice':
+            childdep = sym
+        elif node.kind in ('menu', 'if', 'root'):
+            childdep = dep
+        else:
+            childdep = parentdep
+        visibility = visibility + node.visibility
+        for child in node.children:
+            self._finalize(child, childdep, visibility)
+        if sym and sym.is_choice:
+            for pos, member in enumerate(sym.members):
+                if member.type is None:
+                    member.type = sym.type
+                # menu_finalize() moves such a member out of the choice,
+                # under the one it depends on
+                earlier = set(sym.members[:pos])
+                for member_node in member.nodes:
+                    for depends in member_node.depends:
+                        if earlier.intersection(expr_syms(depends)):
+                            raise KconfigError(
+                                'choice member %s depends on another member'
+                                % member.name)
+
+    # Evaluation, following sym_calc_value()/expr_calc_value()
+    def tri(self, expr):
+        if expr is None:
+            return 2
+        if isinstance(expr, Symbol):
+            return self.sym_tri(expr)
+        if expr[0] == 'and':
+            return min(self.tri(expr[1]), self.tri(expr[2]))
+        if expr[0] == 'or':
+            return max(self.tri(expr[1]), self.tri(expr[2]))
+        if expr[0] == 'not':
+            return 2 - self.tri(expr[1])
+        return 2 if self._compare(*expr[1:]) else 0
+
+    def sym_tri(self, sym):
+        if sym.const or sym.type is None:
+            return {'y': 2, 'm': 1}.get(sym.name, 0) if sym.const else 0
+        if sym.type not in ('bool', 'tristate'):
+            return 0
+        return self.value(sym)
+
+    def str_value(self, sym):
+        if sym.const or sym.type is None:
+            return sym.name
+        value = self.value(sym)
+        if sym.type in ('bool', 'tristate'):
+            return 'nmy'[value]
+        return value
+
+    @staticmethod
+    def _parse_number(text, sym_type):
+        patterns = {'int': r'[-+]?\d+',
+                    'hex': r'(?:0[xX])?[0-9a-fA-F]+',
+                    None: r'[-+]?(?:0[xX][0-9a-fA-F]+|\d+)',
+                    'string': r'[-+]?(?:0[xX][0-9a-fA-F]+|\d+)'}
+        if sym_type in ('bool', 'tristate'):
+            return {'n': 0, 'm': 1, 'y': 2}.get(text, -1)
+        if not re.fullmatch(patterns[sym_type], text):
+            return None
+        if sym_type == 'hex':
+            return int(text, 16)
+        if sym_type == 'int':
+            return int(text, 10)
+        return int(text, 0) if not re.fullmatch(r'[-+]?0\d+', text) \
+            else int(text, 8)
+
+    def _compare(self, op, left, right):
+        str1 = self.str_value(left)
+        str2 = self.str_value(right)
+        type1 = None if left.const else left.type
+        type2 = None if right.const else right.type
+        if type1 == 'string' and type2 == 'string':
+            val1 = val2 = None
+        else:
+            val1 = self._parse_number(str1, type1)
+            val2 = self._parse_number(str2, type2)
+        if val1 is None or val2 is None:
+            res = (str1 > str2) - (str1 < str2)
+        else:
+            res = (val1 > val2) - (val1 < val2)
+        return {'=': res == 0, '!=': res != 0, '<': res < 0,
+                '<=': res <= 0, '>': res > 0, '>=': res >= 0}[op]
+
+    def visible(self, sym):
+        if sym in self._visible:
+            return self._visible[sym]
+        self._visible[sym] = 0
+        tri = 0
+        for prompt in sym.prompts:
+            tri = max(tri, self.tri(prompt))
+        if tri == 1:
+            tri = 2
+        self._visible[sym] = tri
+        return tri
+
+    def value(self, sym):
+        if sym in self._values:
+            return self._values[sym]
+        if sym.type in ('bool', 'tristate'):
+            self._values[sym] = 0
+            value = self._calc_tri(sym)
+        else:
+            self._values[sym] = ''
+            value = self._calc_string(sym)
+        self._values[sym] = value
+        return value
+
+    def _rev_dep(self, exprs):
+        tri = 0
+        for expr in exprs:
+            tri = max(tri, self.tri(expr))
+        return tri
+
+    def _calc_tri(self, sym):
+        vis = self.visible(sym)
+        if vis:
+            self._write.add(sym)
+        if sym.choice and vis == 2:
+            return 2 if self.selection(sym.choice) is sym else 0
+        if vis and sym.user_value is not None:
+            value = min(sym.user_value, vis)
+        else:
+            value = 0
+            if self._rev_dep(sym.rev_dep):
+                self._write.add(sym)
+            if not sym.is_choice:
+                for expr, cond in sym.defaults:
+                    cond = self.tri(cond)
+                    if cond:
+                        value = min(self.tri(expr), cond)
+                        if value:
+                            self._write.add(sym)
+                        break
+                implied = self._rev_dep(sym.implied)
+                if implied and self._rev_dep(sym.dir_dep):
+                    value = max(value, implied)
+                    self._write.add(sym)
+        value = max(value, self._rev_dep(sym.rev_dep))
+        # No modules support, m is promoted to y
+        return 2 if value == 1 else value
+
+    def _calc_string(self, sym):
+        vis = self.visible(sym)
+        value = ''
+        if vis:
+            self._write.add(sym)
+        # conf_read() drops user values outside the active range
+        if vis and sym.user_value is not None and \
+                self._within_range(sym, sym.user_value):
+            value = sym.user_value
+        else:
+            for expr, cond in sym.defaults:
+                if self.tri(cond):
+                    if isinstance(expr, Symbol):
+                        self._write.add(sym)
+                        value = self.str_value(expr)
+                    break
+        return self._validate_range(sym, value)
+
+    def _active_range(self, sym):
+        for low, high, cond in sym.ranges:
+            if self.tri(cond):
+                return low, high
+        return None
+
+    def _within_range(self, sym, value):
+        if sym.type not in ('int', 'hex'):
+            return True
+        active = self._active_range(sym)
+        if active is None:
+            return True
+        base = 16 if sym.type == 'hex' else 10
+        val = self._strtoll(value, base)
+        return self._strtoll(self.str_value(active[0]), base) <= val <= \
+            self._strtoll(self.str_value(active[1]), base)
+
+    def _validate_range(self, sym, value):
+        if sym.type not in ('int', 'hex'):
+            return value
+        active = self._active_range(sym)
+        if active is None:
+            return value
+        base = 16 if sym.type == 'hex' else 10
+        val = self._strtoll(value, base)
+        low_val = self._strtoll(self.str_value(active[0]), base)
+        high_val = self._strtoll(self.str_value(active[1]), base)
+        if low_val <= val <= high_val:
+            return value
+        bound = low_val if val < low_val else high_val
+        return str(bound) if base == 10 else '0x%x' % bound
+
+    @staticmethod
+    def _strtoll(text, base):
+        pattern = r'\s*[-+]?(?:0[xX])?[0-9a-fA-F]*' if base == 16 \
+            else r'\s*[-+]?\d*'
+        match = re.match(pattern, text).group().strip()
+        try:
+            return int(match, base)
+        except ValueError:
+            return 0
+
+    def selection(self, choice):
+        if choice in self._selection:
+            return self._selection[choice]
+        self._selection[choice] = None
+        selected = None
+        if self.value(choice) == 2:
+            user = choice.user_selection
+            if user and self.visible(user):
+                selected = user
+            else:
+                for expr, cond in choice.defaults:
+                    if self.tri(cond) and isinstance(expr, Symbol) and \
+                            expr.choice is choice and self.visible(expr):
+                        selected = expr
+                        break
+                else:
+                    for member in choice.members:
+                        if self.visible(member):
+                            selected = member
+                            break
+        self._selection[choice] = selected
+        return selected
+
+    # Config files
+    def load_config(self, filename):
+        '''Read user values the way conf_read() does, later
+        assignments override earlier ones.'''
+        if not os.path.isfile(filename):
+            return
+        with open(filename, 'r', encoding='utf-8') as config_f:
+            lines = config_f.read().splitlines()
+        for line in lines:
+            if line.startswith('# ' + CONFIG_):
+                name, _, rest = line[2 + len(CONFIG_):].partition(' ')
+                if not rest.startswith('is not set') or name not in self.syms:
+                    continue
+                sym = self.syms[name]
+                if sym.type in ('bool', 'tristate'):
+                    sym.user_value = 0
+            elif line.startswith(CONFIG_):
+                name, sep, value = line[len(CONFIG_):].partition('=')
+                if not sep or name not in self.syms:
+                    continue
+                sym = self.syms[name]
+                if not self._set_user_value(sym, value.rstrip('\r')):
+                    continue
+            else:
+                continue
+            if sym.choice:
+                choice = sym.choice
+                if sym.user_value:
+                    choice.user_selection = sym
+                choice.user_value = max(choice.user_value or 0,
+                                        sym.user_value or 0)
+
+    def _set_user_value(self, sym, value):
+        if sym.type in ('bool', 'tristate'):
+            tri = {'n': 0, 'm': 1, 'y': 2}.get(value[:1])
+            if tri is None or (tri == 1 and sym.type != 'tristate'):
+                return False
+            sym.user_value = tri
+            return True
+        if sym.type == 'string':
+            if not value.startswith('"'):
+                return False
+            match = re.match(r'"((?:[^"\\]|\\.)*)"', value)
+            if not match:
+                return False
+            value = re.sub(r'\\(.)', r'\1', match.group(1))
+        elif sym.type == 'int':
+            if not re.fullmatch(r'-?(?:0|[1-9]\d*)', value):
+                return False
+        elif sym.type == 'hex':
+            if not re.fullmatch(r'(?:0[xX])?[0-9a-fA-F]+', value):
+                return False
+        else:
+            return False
+        sym.user_value = value
+        return True
+
+    def config_string(self):
+        '''Render the configuration as conf_write() does.'''
+        out = ['#', '# Automatically generated file; DO NOT EDIT.',
+               '# %s' % self.mainmenu, '#']
+        written = set()
+        for node in self._walk(self.root):
+            sym = node.item
+            if sym is None:
+                if node.prompt and self.tri(node.prompt[1]) and \
+                        all(self.tri(expr) for expr in node.visibility):
+                    out += ['', '#', '# %s' % node.prompt[0], '#']
+                continue
+            if sym.is_choice or sym in written or sym.type is None:
+                continue
+            self.value(sym)
+            written.add(sym)
+            if sym not in self._write:
+                continue
+            if sym.type in ('bool', 'tristate'):
+                if self.value(sym):
+                    out.append('%s%s=y' % (CONFIG_, sym.name))
+                else:
+                    out.append('# %s%s is not set' % (CONFIG_, sym.name))
+            elif sym.type == 'string':
+                value = self.value(sym).replace(
+                    '\\', '\\\\').replace('"', '\\"')
+                out.append('%s%s="%s"' % (CONFIG_, sym.name, value))
+            else:
+                out.append('%s%s=%s' % (CONFIG_, sym.name, self.value(sym)))
+        return '\n'.join(out) + '\n'
+
+    def _walk(self, node):
+        for child in node.children:
+            yield child
+            yield from self._walk(child)
+
+    def write_config(self, filename):
+        '''Write the configuration, the file is left untouched when its
+        content does not change. Returns True if it was rewritten.'''
+        data = self.config_string()
+        if os.path.isfile(filename):
+            with open(filename, 'r', encoding='utf-8') as config_f:
+                if config_f.read() == data:
+                    return False
+            shutil.copyfile(filename, filename + '.old')
+        write_file_atomic(filename, data)
+        return True
+
+
+source_re = re.compile(r'^[ \t]*source[ \t]+(?:"([^"]*)"|(\S+))', re.M)
+
+
+def tree_files(Kconfig_file):
+    '''Kconfig_file and every file it sources, in parse order.'''
+    srcdir = os.path.dirname(os.path.abspath(Kconfig_file))
+    files = []
+    pending = [Kconfig_file]
+    while pending:
+        filename = pending.pop()
+        files.append(filename)
+        with open(filename, 'r', encoding='utf-8') as kconfig_f:
+            data = kconfig_f.read()
+        sources = [source_path(quoted or word, filename, srcdir)
+                   for quoted, word in source_re.findall(data)]
+        pending += reversed(sources)
+    return files
+
+
+def silentconfig(Kconfig_file, cfgfile):
+    '''In-process equivalent of `yes "" | KCONFIG_CONFIG=cfgfile conf
+    Kconfig_file`, raises KconfigError if the tree can not be handled.'''
+    kconf = Kconfig(Kconfig_file)
+    kconf.load_config(cfgfile)
+    return kconf.write_config(cfgfile)
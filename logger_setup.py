@@ -12,13 +12,14 @@ import logging
 import sys
 
 logger = None
+console_h = None
 format = logging.Formatter("[%(levelname)s] %(message)s")
 
 
 def setup_logger():
-    global logger
+    global logger, console_h
     if logger:
-        return logger
+        return logger, console_h
     logger = logging.getLogger('')
     logger.setLevel(logging.DEBUG)
 
@@ -0,0 +1,257 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Relocatable bundle of an output directory, to take a generated
+# configuration to another build host without regenerating it:
+#
+#   gen-machineconf ... --output <dir> --export-bundle <bundle.tar.gz>
+#   gen-machineconf ... --output <dir> --import-bundle <bundle.tar.gz>
+#
+# The generated files and the stage manifest hold absolute paths (the
+# output directory, the hw file, the tool, PROOT and BUILDDIR). Export
+# replaces them with placeholders, import with the paths of the host it
+# runs on, given by its --output and --hw-description and environment.
+# Import then records the digests of the relocated files in the stage
+# manifest, so the next run finds every bundled stage up to date.
+#
+# Stages writing outside the output directory (local.conf, dt-processor.sh
+# in BUILDDIR) and stages out of date at export are left out of the
+# bundle, they run on the importing host.
+
+import io
+import os
+import re
+import sys
+import json
+import tarfile
+
+import logger_setup
+import run_stamp
+from config_store import write_file_atomic
+from output_writer import write_if_changed
+from stage_manifest import MANIFEST_FILE, file_digest
+from xsa_fingerprint import extract_xsa_bitfiles
+
+logger, console_h = logger_setup.setup_logger()
+
+BUNDLE_FILE = 'bundle.json'
+BUNDLE_VERSION = 1
+OUTPUT_DIR = 'output'
+# Logs of this host, like the hidden files (stamps, digest caches, the
+# manifest which is bundled relocated, temporary files) they are skipped
+EXCLUDE_FILES = ('gen-machineconf.log', 'gen-machineconf.log.old')
+# Characters which can continue a path component
+PATH_CHARS = r'\w.+-'
+
+
+def bundle_paths(args):
+    '''Placeholder of each absolute path the outputs may hold on this
+    host.'''
+    paths = {'@@OUTPUT@@': args.output,
+             '@@HW_FILE@@': args.hw_file,
+             '@@HW_DIR@@': os.path.dirname(args.hw_file),
+             '@@TOOL_DIR@@': os.path.abspath(os.path.dirname(__file__))}
+    for name in ('PROOT', 'BUILDDIR'):
+        if os.environ.get(name):
+            paths['@@%s@@' % name] = os.path.abspath(os.environ[name])
+    return paths
+
+
+def relocate(text, paths):
+    '''Replace each path in text by its placeholder, longest paths first
+    so a path below another one keeps its own placeholder. A path starts
+    where no path component goes on before it, or after the // of a URL
+    (file:///path).'''
+    for placeholder, path in sorted(paths.items(), key=lambda p: -len(p[1])):
+        text = re.sub(r'(?:(?<![/%s])|(?<=//)(?<![/%s]//))%s(?![%s])' % (
+            PATH_CHARS, PATH_CHARS, re.escape(path), PATH_CHARS),
+            placeholder.replace('\\', r'\\'), text)
+    return text
+
+
+def restore(text, paths):
+    for placeholder, path in paths.items():
+        text = text.replace(placeholder, path)
+    return text
+
+
+def in_output(filename, output):
+    return filename == output or filename.startswith(output + os.sep)
+
+
+def bundle_stages(output):
+    '''Stages of the manifest the bundle can carry: those only writing
+    into output, whose files in output are as they recorded.'''
+    try:
+        with open(os.path.join(output, MANIFEST_FILE), 'r') as manifest_f:
+            stages = json.load(manifest_f)['stages']
+    except (OSError, ValueError, KeyError):
+        return {}
+    bundled = {}
+    for name, stage in sorted(stages.items()):
+        files = dict(stage.get('inputs', {}))
+        files.update(stage.get('outputs', {}))
+        if not all(in_output(f, output) for f in stage.get('outputs', {})):
+            logger.debug('Stage %s writes outside %s, not bundled'
+                         % (name, output))
+        elif any(in_output(f, output) and file_digest(f) != digest
+                 for f, digest in files.items()):
+            logger.debug('Stage %s is out of date, not bundled' % name)
+        else:
+            bundled[name] = stage
+    return bundled
+
+
+def output_files(output, skip):
+    for root, dirs, files in os.walk(output):
+        dirs.sort()
+        for filename in sorted(files):
+            path = os.path.join(root, filename)
+            if filename in EXCLUDE_FILES or filename.startswith('.') or \
+                    path == skip:
+                continue
+            yield path
+
+
+def add_member(bundle_tar, name, data):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mode = 0o644
+    bundle_tar.addfile(info, io.BytesIO(data))
+
+
+def export_bundle(args, hw_flow, hw_hash):
+    '''Write the output directory to the bundle args.export_bundle.'''
+    output = args.output
+    if not os.path.isdir(output):
+        logger.error('Output directory %s not found to export' % output)
+        sys.exit(255)
+    paths = bundle_paths(args)
+    used = set()
+
+    def relocate_used(text):
+        text = relocate(text, paths)
+        used.update(p for p in paths if p in text)
+        return text
+
+    stages = bundle_stages(output)
+    bundle_tmp = os.path.join(os.path.dirname(args.export_bundle), '.%s.tmp'
+                              % os.path.basename(args.export_bundle))
+    with tarfile.open(bundle_tmp, 'w:gz') as bundle_tar:
+        for path in output_files(output, args.export_bundle):
+            with open(path, 'rb') as output_f:
+                data = output_f.read()
+            try:
+                data = relocate_used(data.decode('utf-8')).encode('utf-8')
+            except UnicodeDecodeError:
+                pass
+            add_member(bundle_tar, os.path.join(
+                OUTPUT_DIR, os.path.relpath(path, output)), data)
+        add_member(bundle_tar, os.path.join(OUTPUT_DIR, MANIFEST_FILE),
+                   relocate_used(json.dumps({'stages': stages}, indent=1,
+                                            sort_keys=True)).encode())
+        add_member(bundle_tar, BUNDLE_FILE, json.dumps({
+            'version': BUNDLE_VERSION, 'soc_family': args.soc_family,
+            'hw_flow': hw_flow, 'hw_hash': hw_hash,
+            'placeholders': sorted(used)}, indent=1, sort_keys=True).encode())
+    os.replace(bundle_tmp, args.export_bundle)
+    logger.info('Exported %s with %d up to date stages to %s'
+                % (output, len(stages), args.export_bundle))
+
+
+def read_member(bundle_tar, member):
+    member_f = bundle_tar.extractfile(member)
+    if not member_f:
+        logger.error('Bad member %s in bundle' % member.name)
+        sys.exit(255)
+    with member_f:
+        return member_f.read()
+
+
+def member_path(member, output):
+    '''Path in output of a bundle member, None if it is not one.'''
+    name = os.path.normpath(member.name)
+    if not name.startswith(OUTPUT_DIR + os.sep) or not member.isfile():
+        return None
+    name = os.path.relpath(name, OUTPUT_DIR)
+    if os.path.isabs(name) or name.split(os.sep)[0] == '..':
+        logger.error('Bad member %s in bundle' % member.name)
+        sys.exit(255)
+    return os.path.join(output, name)
+
+
+def import_bundle(args, hw_flow, hw_hash):
+    '''Write the bundle args.import_bundle to the output directory,
+    relocated to this host.'''
+    output = args.output
+    try:
+        bundle_tar = tarfile.open(args.import_bundle, 'r:*')
+    except (OSError, tarfile.TarError) as e:
+        logger.error('Unable to read bundle %s: %s' % (args.import_bundle, e))
+        sys.exit(255)
+    with bundle_tar:
+        try:
+            info = json.loads(read_member(
+                bundle_tar, bundle_tar.getmember(BUNDLE_FILE)).decode())
+        except (KeyError, ValueError) as e:
+            logger.error('%s is not a gen-machineconf bundle: %s'
+                         % (args.import_bundle, e))
+            sys.exit(255)
+        if info.get('version') != BUNDLE_VERSION:
+            logger.error('Unsupported bundle version %s' % info.get('version'))
+            sys.exit(255)
+        if (info.get('soc_family'), info.get('hw_flow')) != \
+                (args.soc_family, hw_flow):
+            logger.error('Bundle is for soc_family %s with %s flow, not %s'
+                         % (info.get('soc_family'), info.get('hw_flow'),
+                            args.soc_family))
+            sys.exit(255)
+        if info.get('hw_hash') != hw_hash:
+            logger.error('Bundle was generated from another hardware '
+                         'description than %s' % args.hw_description)
+            sys.exit(255)
+        paths = bundle_paths(args)
+        missing = [p for p in info.get('placeholders', []) if p not in paths]
+        if missing:
+            logger.error('Bundle needs %s set to be imported'
+                         % ', '.join(p.strip('@') for p in missing))
+            sys.exit(255)
+
+        manifest = None
+        for member in bundle_tar.getmembers():
+            path = member_path(member, output)
+            if not path:
+                continue
+            data = read_member(bundle_tar, member)
+            try:
+                data = restore(data.decode('utf-8'), paths).encode('utf-8')
+            except UnicodeDecodeError:
+                pass
+            if os.path.relpath(path, output) == MANIFEST_FILE:
+                manifest = data
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_if_changed(path, data)
+
+    try:
+        stages = json.loads(manifest.decode())['stages']
+    except (AttributeError, ValueError, KeyError):
+        logger.error('No stage manifest in bundle %s' % args.import_bundle)
+        sys.exit(255)
+    # Files in output were exported as their stages recorded them, they
+    # are the same files with this host's paths
+    for stage in stages.values():
+        for kind in ('inputs', 'outputs'):
+            for filename in stage.get(kind, {}):
+                if in_output(filename, output):
+                    stage[kind][filename] = file_digest(filename)
+    write_file_atomic(os.path.join(output, MANIFEST_FILE),
+                      json.dumps({'stages': stages}, indent=1,
+                                 sort_keys=True))
+    run_stamp.invalidate(args)
+    if hw_flow == 'xsct':
+        # plnxtool.conf lists the bitfile xsct extracted next to the XSA
+        extract_xsa_bitfiles(args.hw_file, os.path.dirname(args.hw_file))
+    logger.info('Imported %d up to date stages from %s into %s'
+                % (len(stages), args.import_bundle, output))
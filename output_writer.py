@@ -0,0 +1,60 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import shutil
+import filecmp
+import tempfile
+
+from config_store import write_file_atomic
+
+# Outputs whose contents changed during this run, in write order
+changed_outputs = []
+
+
+def write_if_changed(filename, data):
+    '''Write data to filename atomically, unless the file already holds
+    exactly that data: an untouched file keeps its mtime, so bitbake
+    does not reparse a configuration that did not change.
+    Returns True if the file was written.'''
+    mode = 'rb' if isinstance(data, bytes) else 'r'
+    try:
+        with open(filename, mode) as file_f:
+            if file_f.read() == data:
+                return False
+    except (OSError, UnicodeDecodeError):
+        pass
+    write_file_atomic(filename, data)
+    if filename not in changed_outputs:
+        changed_outputs.append(filename)
+    return True
+
+
+def copy_if_changed(src, dst):
+    '''shutil.copy2() which leaves an identical destination alone, dst
+    may be a directory as with copy2. Returns True if dst was written.'''
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    if os.path.isfile(dst) and filecmp.cmp(src, dst, shallow=False):
+        return False
+    fd, tmpfile = tempfile.mkstemp(dir=os.path.dirname(dst),
+                                   prefix='.%s.' % os.path.basename(dst))
+    os.close(fd)
+    try:
+        shutil.copy2(src, tmpfile)
+        os.replace(tmpfile, dst)
+    except BaseException:
+        if os.path.exists(tmpfile):
+            os.remove(tmpfile)
+        raise
+    if dst not in changed_outputs:
+        changed_outputs.append(dst)
+    return True
+
+
+def report_changed_outputs(logger):
+    if not changed_outputs:
+        logger.info('No generated file changed')
+    for filename in changed_outputs:
+        logger.info('Updated %s' % filename)
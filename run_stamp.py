@@ -0,0 +1,163 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Kept to the standard library on purpose: the up to date check runs
+# before gen-machineconf imports the generator modules.
+import os
+import sys
+import json
+import time
+import logger_setup
+from config_store import write_file_atomic
+
+logger, console_h = logger_setup.setup_logger()
+
+STAMP_FILE = '.run-stamp'
+# Command line options and environment the generated files depend on
+ARG_NAMES = ('soc_family', 'hw_description', 'machine', 'output',
+             'xsct_tool', 'native_sysroot', 'sdt_sysroot', 'petalinux',
+             'add_rootfsconfig', 'deterministic')
+# Every variable the generators read, PATH for the tools they look up
+ENV_NAMES = ('BUILDDIR', 'PROOT', 'CONFIG_SITE', 'UPDATE_USER_LAYERS',
+             'PETALINUX', 'PETALINUX_MAJOR_VER', 'XILINX_INT_SITE',
+             'XILINX_INT_SSTATES', 'XILINX_INT_DOWNLOADS', 'PATH')
+# Files modified this recently may still change within the same mtime
+# tick, their contents are recorded as well.
+RACY_WINDOW = 2
+
+base_dir = os.path.dirname(__file__)
+scripts_dir = os.path.join(base_dir, 'gen-machine-scripts')
+
+
+# Environment as the run started, before it extends PATH
+start_env = None
+
+
+def run_env():
+    '''ENV_NAMES as first looked at, None for an unset variable: the
+    generators tell unset and empty apart.'''
+    global start_env
+    if start_env is None:
+        start_env = {name: os.environ.get(name) for name in ENV_NAMES}
+    return start_env
+
+
+def run_key(args):
+    return {'args': {name: getattr(args, name) for name in ARG_NAMES},
+            'env': run_env()}
+
+
+def walk_files(top, skip=()):
+    files = []
+    for root, dirs, filenames in os.walk(top):
+        dirs[:] = [d for d in dirs if os.path.join(root, d) not in skip]
+        files.append(root)
+        files += [os.path.join(root, f) for f in filenames]
+    return files
+
+
+def watched_files(args):
+    '''Every file a run reads or writes: the tool itself, the hw
+    description, the BUILDDIR configuration and all inputs and outputs
+    recorded in the stage manifest.'''
+    files = [os.path.join(base_dir, f) for f in os.listdir(base_dir)
+             if f.endswith('.py') or f == 'gen-machineconf']
+    files += walk_files(scripts_dir)
+    if os.path.isdir(args.hw_description):
+        files += walk_files(args.hw_description)
+    else:
+        files.append(args.hw_description)
+    builddir = os.environ.get('BUILDDIR', '')
+    if builddir:
+        conf_dir = os.path.join(builddir, 'conf')
+        # conf/dts is a dt-processor.sh output, the stage manifest has it
+        files += walk_files(conf_dir, [os.path.join(conf_dir, 'dts')])
+    manifest_file = os.path.join(args.output, '.stages.json')
+    files.append(manifest_file)
+    try:
+        with open(manifest_file, 'r') as manifest_f:
+            stages = json.load(manifest_f)['stages']
+    except (OSError, ValueError, KeyError):
+        stages = {}
+    for stage in stages.values():
+        files += stage['inputs']
+        files += stage['outputs']
+        files += [read[0] for read in stage['reads']]
+    return sorted(set(files))
+
+
+def file_stamp(filename):
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+
+def file_digest(filename):
+    import hashlib
+    with open(filename, 'rb') as file_f:
+        return hashlib.sha256(file_f.read()).hexdigest()
+
+
+def record(args):
+    '''Stamp every watched file after a successful run.'''
+    now = time.time_ns()
+    files = {}
+    for filename in watched_files(args):
+        stamp = file_stamp(filename)
+        # A racy stamp alone can not tell a later rewrite apart
+        if stamp and os.path.isfile(filename) and \
+                now - stamp[2] <= RACY_WINDOW * 10**9:
+            stamp.append(file_digest(filename))
+        files[filename] = stamp
+    write_file_atomic(os.path.join(args.output, STAMP_FILE),
+                      json.dumps({'key': run_key(args), 'files': files}))
+
+
+def invalidate(args):
+    try:
+        os.remove(os.path.join(args.output, STAMP_FILE))
+    except OSError:
+        pass
+
+
+def stale_reason(args):
+    '''Why a run is needed, '' when every watched file is as the
+    last successful run left it.'''
+    try:
+        with open(os.path.join(args.output, STAMP_FILE), 'r') as stamp_f:
+            saved = json.load(stamp_f)
+    except (OSError, ValueError):
+        return 'no previous run recorded'
+    if saved.get('key') != run_key(args):
+        return 'command line or environment changed'
+    files = saved.get('files', {})
+    if sorted(files) != watched_files(args):
+        return 'files were added or removed'
+    for filename, saved_stamp in files.items():
+        stamp = file_stamp(filename)
+        if not stamp or not saved_stamp:
+            if stamp != saved_stamp:
+                return '%s changed' % filename
+        elif stamp != saved_stamp[:3] or (
+                len(saved_stamp) > 3 and
+                file_digest(filename) != saved_stamp[3]):
+            return '%s changed' % filename
+    return ''
+
+
+def exit_if_uptodate(args):
+    '''Exit before anything is generated when nothing changed since the
+    last run, with --check exit non-zero when something did.'''
+    if args.menuconfig or args.export_bundle or args.import_bundle:
+        return
+    reason = stale_reason(args)
+    if not reason:
+        logger.info('Configuration in %s is up to date' % args.output)
+        sys.exit(0)
+    if args.check:
+        logger.info('Regeneration needed: %s' % reason)
+        sys.exit(1)
+    logger.debug('Regenerating: %s' % reason)
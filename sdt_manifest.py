@@ -0,0 +1,81 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import json
+import hashlib
+
+from config_store import write_file_atomic
+from digest_cache import digest_cache
+
+
+def sdt_files(sdt_dir):
+    '''Every file below sdt_dir, relative and sorted.'''
+    files = []
+    for root, dirs, filenames in os.walk(sdt_dir):
+        dirs.sort()
+        for filename in filenames:
+            files.append(os.path.relpath(os.path.join(root, filename), sdt_dir))
+    return sorted(files)
+
+
+def build_manifest(sdt_dir):
+    '''Map of relative path to sha256 for the whole SDT directory,
+    files are hashed on the digest cache thread pool and unchanged
+    files come from its stat cache.'''
+    files = sdt_files(sdt_dir)
+    paths = [os.path.join(sdt_dir, f) for f in files]
+    digest_cache.prefetch(paths)
+    manifest = {f: digest_cache.digest(path) for f, path in zip(files, paths)}
+    digest_cache.flush()
+    return manifest
+
+
+def manifest_root(manifest):
+    '''Merkle root: each directory hashes its entries' names and
+    digests, the root is the digest of the top directory.'''
+    tree = {}
+    for path, digest in manifest.items():
+        node = tree
+        parts = path.split(os.sep)
+        for part in parts[:-1]:
+            node = node.setdefault(part + os.sep, {})
+        node[parts[-1]] = digest
+
+    def node_digest(node):
+        method = hashlib.sha256()
+        for name in sorted(node):
+            value = node[name]
+            if isinstance(value, dict):
+                value = node_digest(value)
+            method.update(b'%s\0%s\n' % (name.encode(), value.encode()))
+        return method.hexdigest()
+
+    return node_digest(tree)
+
+
+def diff_manifests(old, new):
+    '''Sorted (path, change) pairs between two manifests.'''
+    changes = []
+    for path in sorted(set(old) | set(new)):
+        if path not in old:
+            changes.append((path, 'added'))
+        elif path not in new:
+            changes.append((path, 'removed'))
+        elif old[path] != new[path]:
+            changes.append((path, 'modified'))
+    return changes
+
+
+def load_manifest(manifest_file):
+    try:
+        with open(manifest_file, 'r') as manifest_f:
+            return json.load(manifest_f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest_file, manifest):
+    write_file_atomic(manifest_file, json.dumps(manifest, indent=1,
+                                                sort_keys=True))
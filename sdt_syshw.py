@@ -0,0 +1,976 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Kconfig.syshw of the SDT flow written without a Tcl interpreter. This
+# is sdt-description.tcl proc by proc, down to the variables the Tcl
+# leaks from one loop into the next, over the same Tcl lists it builds
+# from petalinux_config.yaml and sdt_ipinfo.yaml. Whatever the port does
+# not model (any hsi call, any path on which the Tcl errors out) raises
+# SdtUnsupported, for the caller to run sdt-description.tcl instead.
+
+import os
+import re
+import functools
+
+LIST_SPACE = ' \t\n\v\f\r'
+# Characters which make Tcl brace a list element, or escape it
+LIST_BRACED = set(LIST_SPACE + '[$;')
+LIST_ESCAPED = set(']{}"\\')
+TCL_NUMBER = re.compile(
+    r'\s*[-+]?(0[xX][0-9a-fA-F]+|0[oObBdD][0-9a-fA-F]+|[0-9]*\.?[0-9]*'
+    r'([eE][-+]?[0-9]+)?|inf(inity)?|nan(\([0-9a-fA-F]*\))?)\s*\Z', re.I)
+IPINFO_LINE = re.compile(r'(    )*[A-Za-z0-9_]+:')
+KCONF_NAME = re.compile(r'[A-Z0-9_]*\Z')
+DEVICE_TYPES = ('processor', 'memory', 'serial', 'ethernet', 'flash', 'sd',
+                'rtc', 'sata', 'i2c', 'usb', 'dp', 'timer', 'reset_gpio')
+
+
+class SdtUnsupported(Exception):
+    '''sdt-description.tcl has to generate Kconfig.syshw.'''
+
+
+@functools.lru_cache(maxsize=None)
+def split_list(text):
+    '''Elements of the Tcl list text, as lindex gives them.'''
+    if '\\' in text:
+        raise SdtUnsupported('backslash in list')
+    elements = []
+    i, n = 0, len(text)
+    while True:
+        while i < n and text[i] in LIST_SPACE:
+            i += 1
+        if i >= n:
+            break
+        if text[i] == '{':
+            depth, j = 1, i + 1
+            while j < n and depth:
+                if text[j] == '{':
+                    depth += 1
+                elif text[j] == '}':
+                    depth -= 1
+                j += 1
+            if depth:
+                raise SdtUnsupported('unmatched open brace in list')
+            elements.append(text[i + 1:j - 1])
+        elif text[i] == '"':
+            j = text.find('"', i + 1) + 1
+            if not j:
+                raise SdtUnsupported('unmatched open quote in list')
+            elements.append(text[i + 1:j - 1])
+        else:
+            j = i
+            while j < n and text[j] not in LIST_SPACE:
+                j += 1
+            elements.append(text[i:j])
+        if j < n and text[j] not in LIST_SPACE:
+            raise SdtUnsupported('list element followed by %s' % text[j])
+        i = j
+    return tuple(elements)
+
+
+def as_list(value):
+    return value if isinstance(value, tuple) else split_list(value)
+
+
+def as_string(value):
+    '''String form Tcl gives the list value.'''
+    if not isinstance(value, tuple):
+        return value
+    words = []
+    for element in value:
+        element = as_string(element)
+        if not element:
+            words.append('{}')
+        elif LIST_ESCAPED.intersection(element):
+            raise SdtUnsupported('list element %s needs escaping' % element)
+        elif LIST_BRACED.intersection(element) or \
+                (not words and element.startswith('#')):
+            words.append('{%s}' % element)
+        else:
+            words.append(element)
+    return ' '.join(words)
+
+
+def lindex(value, index):
+    elements = as_list(value)
+    return elements[index] if 0 <= index < len(elements) else ''
+
+
+def lreplace_first(value):
+    '''lreplace value 0 0'''
+    return as_list(value)[1:]
+
+
+@functools.lru_cache(maxsize=None)
+def glob_pattern(pattern, nocase):
+    if '[' in pattern or '\\' in pattern:
+        raise SdtUnsupported('glob pattern %s' % pattern)
+    if nocase and not pattern.isascii():
+        raise SdtUnsupported('case folding of %s' % pattern)
+    regex = ''.join('.*' if c == '*' else '.' if c == '?' else re.escape(c)
+                    for c in pattern)
+    return re.compile(regex + r'\Z', re.S | (re.I if nocase else 0))
+
+
+def string_match(pattern, value, nocase=False):
+    value = as_string(value)
+    if nocase and not value.isascii():
+        raise SdtUnsupported('case folding of %s' % value)
+    return glob_pattern(pattern, nocase).match(value) is not None
+
+
+def lsearch(value, pattern, all=False, inline=False, index=None,
+            subindices=False):
+    matches = []
+    for position, element in enumerate(as_list(value)):
+        subject = element
+        if index is not None:
+            subject = lindex(element, index)
+            if index >= len(as_list(element)):
+                raise SdtUnsupported('element %d missing from sublist' % index)
+        if string_match(pattern, subject):
+            found = subject if subindices else element if inline else position
+            if not all:
+                return found
+            matches.append(found)
+    if all:
+        return tuple(matches)
+    return '' if inline else -1
+
+
+def tcl_equal(a, b):
+    '''"$a" == "$b" in a Tcl expression: numbers compare by value.'''
+    if a == b:
+        return True
+    if TCL_NUMBER.match(a) and TCL_NUMBER.match(b):
+        raise SdtUnsupported('numeric comparison of %s and %s' % (a, b))
+    return False
+
+
+def defined(value, name):
+    if value is None:
+        raise SdtUnsupported('can\'t read "%s"' % name)
+    return value
+
+
+def fix_kconf_name(name):
+    if not name.isascii():
+        raise SdtUnsupported('upper case of %s' % name)
+    return name.upper().replace('+', 'PLUS').replace('-', '__') \
+        .replace('.', '___').replace(' ', '_')
+
+
+def get_ipinfo(ipinfofile):
+    '''get_ipinfo: the nesting of the name: value lines of a YAML file
+    as a Tcl list, any line that is not one being skipped.'''
+    try:
+        st = os.stat(ipinfofile)
+    except OSError:
+        raise SdtUnsupported('Failed to open IP information file %s.' %
+                             ipinfofile)
+    return read_ipinfo(ipinfofile, (st.st_ino, st.st_size, st.st_mtime_ns))
+
+
+@functools.lru_cache(maxsize=None)
+def read_ipinfo(ipinfofile, stamp):
+    ipinfodata = ''
+    previous_indent_level = -1
+    with open(ipinfofile, 'r', encoding='latin-1') as ipinfo_f:
+        for linenum, line in enumerate(ipinfo_f, 1):
+            line = line.rstrip('\n')
+            if not IPINFO_LINE.match(line):
+                continue
+            # Only plain text between braces survives the Tcl eval as is
+            if not line.isascii() or \
+                    not line.replace('\t', ' ').isprintable() or \
+                    set('{}\\').intersection(line):
+                raise SdtUnsupported('line %d of %s' % (linenum, ipinfofile))
+            tmpline = line.strip(' \t').replace(':', ' ')
+            indent_level = len(re.findall('    ', line))
+            if indent_level < previous_indent_level:
+                ipinfodata += '}' * (previous_indent_level - indent_level + 1)
+                ipinfodata += ' {' + tmpline
+            elif indent_level > previous_indent_level:
+                if indent_level - previous_indent_level > 1:
+                    raise SdtUnsupported('Wrong indentation in line %d of %s'
+                                         % (linenum, ipinfofile))
+                ipinfodata += ' {' + tmpline
+            else:
+                ipinfodata += '} {' + tmpline
+            previous_indent_level = indent_level
+    return ipinfodata + '}' * (previous_indent_level + 1)
+
+
+def get_ip_device_info(devtype, ipinfo):
+    e = lsearch(ipinfo, 'device_type', inline=True, index=0)
+    return lreplace_first(lsearch(e, devtype, inline=True, index=0))
+
+
+def get_ip_property_info(prop, ipinfo):
+    return lreplace_first(lsearch(ipinfo, prop, inline=True, index=0))
+
+
+def get_devices_nodes(devinfo):
+    return lreplace_first(lsearch(devinfo, 'devices', inline=True, index=0))
+
+
+def is_ip_valid_for_device_type(devtype, ipinfo):
+    e = lsearch(ipinfo, 'device_type', inline=True, index=0)
+    return lsearch(e, devtype, index=0)
+
+
+def interrupt_validation(ipinfo, devtype):
+    '''Passes for ips without interrupt_required, the others need hsi.'''
+    ipdev_info = get_ip_device_info(devtype, ipinfo)
+    if lindex(get_ip_property_info('interrupt_required', ipdev_info), 0) \
+            == 'y':
+        raise SdtUnsupported('interrupt of %s' % lindex(ipinfo, 0))
+
+
+def first_slaves(slaves, pattern):
+    '''(info, ip_name, hds) of the slaves matching pattern, hds being the
+    names of those named like the first of them.'''
+    info = lsearch(slaves, pattern, all=True, inline=True)
+    ip_name = lindex(lindex(lindex(info, 0), 2), 1)
+    ip_instance = lindex(lindex(info, 0), 0)
+    new_ip_instance = as_string(ip_instance).strip('0123456789')
+    hds = lsearch(info, '*%s*' % new_ip_instance, all=True, inline=True,
+                  index=0, subindices=True)
+    return info, ip_name, hds
+
+
+class SdtSyshw:
+    '''plnx_gen_hwsysconf of sdt-description.tcl.'''
+
+    def __init__(self, petalinux_config, ipinfo_file):
+        self.plnxinfolist = as_list(get_ipinfo(petalinux_config))
+        self.ipinfo_file = ipinfo_file
+        self.current_arch = ''
+        self.kconfig = []
+
+    def output(self, msg):
+        self.kconfig.append(msg + '\n')
+
+    def generate_mapping_list(self):
+        ipinfolist = as_list(get_ipinfo(self.ipinfo_file))
+        mappinglist = []
+        for devtype in DEVICE_TYPES:
+            devtype_mapping = [devtype]
+            if devtype == 'sd':
+                devtype_mapping.append(
+                    'processor_ip ps7_cortexa9 psu_cortexa53 psv_cortexa72')
+            elif devtype in ('timer', 'reset_gpio'):
+                devtype_mapping.append('processor_ip microblaze')
+            ips = ['devices']
+            for ipinfo in ipinfolist:
+                if is_ip_valid_for_device_type(devtype, ipinfo) >= 0:
+                    ips.append(ipinfo)
+            devtype_mapping.append(tuple(ips))
+            mappinglist.append(tuple(devtype_mapping))
+        return tuple(mappinglist)
+
+    def generate(self):
+        hwmenustr = 'menuconfig SUBSYSTEM_HARDWARE_AUTO\n' \
+            '\tbool "Subsystem AUTO Hardware Settings"\n' \
+            '\tdefault y\n' \
+            '\thelp\n' \
+            '\t  This menu is to configure system hardware.\n'
+        self.output('%s\n%s\n' % (hwmenustr, 'if SUBSYSTEM_HARDWARE_AUTO'))
+        hwkconfprefix = 'SUBSYSTEM_'
+        mapping = self.generate_mapping_list()
+        cpumapping = get_devices_nodes(lindex(mapping, 0))
+        retcpus = self.conf_processor(cpumapping, hwkconfprefix)
+        for c in lreplace_first(retcpus):
+            cpuname = lindex(c, 0)
+            self.current_arch = lindex(get_ip_property_info('arch', c), 0)
+            cpuipname = lindex(get_ip_property_info('ip_name', c), 0)
+            cpuslaves = get_ip_property_info('slaves_strings', c)
+            self.output('if %sPROCESSOR_%s_SELECT' % (hwkconfprefix, cpuname))
+            rets = {'sd': (), 'flash': ()}
+            for m in lreplace_first(mapping):
+                devclass = lindex(m, 0)
+                classcpuipnames = get_ip_property_info('processor_ip', m)
+                if classcpuipnames and \
+                        lsearch(classcpuipnames, cpuipname) < 0:
+                    continue
+                elements = get_devices_nodes(m)
+                pproc = getattr(self, 'conf_%s' % devclass)
+                rets[devclass] = pproc(elements, hwkconfprefix, cpuname,
+                                       cpuslaves)
+            self.conf_images_location(rets['sd'], rets['flash'])
+            self.output('endif')
+        self.output('endif')
+        return ''.join(self.kconfig)
+
+    def conf_processor(self, mapping, kconfprefix):
+        retcpus = ['processor']
+        cpukconfprefix = '%sPROCESSOR_' % kconfprefix
+        cpuchoicesstr = ''
+        armknamelist = []
+        mbknamelist = []
+        aarch64namelist = []
+        armlist = []
+        mblist = []
+        aarch64list = []
+        kconfstr = ''
+        ipname = arch_mapping = slaves_list = None
+        for m in as_list(mapping):
+            index = 0
+            ipname = lindex(m, 0)
+            devinfo = get_ip_device_info('processor', m)
+            lindex(get_ip_property_info('arch', devinfo), 0)
+            for p in self.plnxinfolist:
+                processor = lindex(lindex(p, 1), 0)
+                ip_name = lindex(lindex(lindex(p, 1), 2), 1)
+                arch_mapping = lindex(lindex(lindex(p, 1), 1), 1)
+                slaves = lindex(lindex(p, 1), 4)
+                lindex(lindex(slaves, lsearch(slaves, '*%s*' % ipname)), 0)
+                if ip_name != '' and not tcl_equal(ipname, ip_name):
+                    continue
+                if arch_mapping == 'aarch64':
+                    aarch64list.append('%s:aarch64' % processor)
+                elif arch_mapping == 'arm':
+                    armlist.append('%s:arm' % processor)
+                elif arch_mapping == 'microblaze':
+                    mblist.append('%s:microblaze' % processor)
+                kconfstr = '%s\n%s\n%s\n%s\n' % (
+                    kconfstr, 'config SUBSYSTEM_PROCESSOR%d_IP_NAME' % index,
+                    'string', 'default %s' % ipname)
+                index += 1
+        if aarch64list:
+            armlist = []
+            mblist = []
+        elif armlist:
+            mblist = []
+
+        for cpu in aarch64list + armlist + mblist:
+            cpuname = cpu.split(':')[0]
+            for p in self.plnxinfolist:
+                ipname = lindex(lindex(lindex(p, 1), 2), 1)
+                slaves_list = lindex(lindex(p, 1), 3)
+            kname = cpuname
+            if arch_mapping == 'arm':
+                armknamelist.append('%s%s_SELECT' % (cpukconfprefix, kname))
+            elif arch_mapping == 'microblaze':
+                mbknamelist.append('%s%s_SELECT' % (cpukconfprefix, kname))
+            elif arch_mapping == 'aarch64':
+                aarch64namelist.append('%s%s_SELECT' % (cpukconfprefix, kname))
+            cpuchoicesstr = '%s%s\n\t%s\n' % (
+                cpuchoicesstr, 'config %s%s_SELECT' % (cpukconfprefix, kname),
+                'bool "%s"' % cpuname)
+            retcpus.append((cpuname, ('arch', arch_mapping),
+                            ('ip_name', defined(ipname, 'ipname')),
+                            defined(slaves_list, 'slaves_list')))
+        if cpuchoicesstr == '':
+            raise SdtUnsupported('No CPU can be found in the system.')
+        kconfstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n%s\n%s\n' % (
+            kconfstr, 'choice', 'prompt "System Processor"', 'help',
+            ' Select a processor as the system processor', cpuchoicesstr,
+            'endchoice')
+        for namelist, arch_kconf, arch_select in (
+                (armknamelist, 'ARCHARM', 'ARCH_ARM'),
+                (mbknamelist, 'ARCHMB', 'ARCH_MICROBLAZE'),
+                (aarch64namelist, 'ARCH64', 'ARCH_AARCH64')):
+            if namelist:
+                kconfstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s%s\n' % (
+                    kconfstr, 'config SUBSYSTEM_ENABLE_%s' % arch_kconf,
+                    'bool', 'default y', 'select SUBSYSTEM_%s' % arch_select,
+                    'depends on ', ' ||'.join(namelist))
+        self.output(kconfstr)
+        return tuple(retcpus)
+
+    def conf_memory(self, mapping, kconfprefix, cpuname, cpuslaves):
+        memorykconfprefix = '%sMEMORY_' % kconfprefix
+        for m in as_list(mapping):
+            ipname = lindex(m, 0)
+            devinfo = get_ip_device_info('memory', m)
+            has_bank = lindex(get_ip_property_info('has_bank', devinfo), 0)
+            if has_bank == 'y':
+                lindex(get_ip_property_info('number_of_banks', devinfo), 0)
+                bankinfo = get_ip_property_info('bank_property', devinfo)
+                for prop in ('bankid_replacement_str', 'bank_enabled',
+                             'bank_baseaddr', 'bank_highaddr', 'bank_type'):
+                    lindex(get_ip_property_info(prop, bankinfo), 0)
+            else:
+                lindex(get_ip_property_info('baseaddr', devinfo), 0)
+                lindex(get_ip_property_info('highaddr', devinfo), 0)
+            for p in self.plnxinfolist:
+                slaves = lindex(lindex(p, 1), 4)
+                lindex(lindex(lindex(p, 1), 2), 1)
+                lindex(lindex(lindex(p, 1), 1), 1)
+                meminfo, ip_name, hds = first_slaves(slaves, '*ddr*')
+                for hd in as_list(hds):
+                    if ip_name != '' and not tcl_equal(ipname, ip_name):
+                        continue
+                    # Each way on reads a bank address the Tcl never sets
+                    # or gets it through hsi
+                    raise SdtUnsupported('memory bank of %s' % hd)
+        choicestr = '%s\n%s\n\t%s\n' % (
+            '', 'config %sMANUAL_SELECT' % memorykconfprefix,
+            'bool "manual"')
+        baseaddrstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n' % (
+            '', 'config %sMANUAL_LOWER_BASEADDR' % memorykconfprefix,
+            'hex "Lower memory base address"',
+            'default 0x0',
+            'depends on %sMANUAL_SELECT' % memorykconfprefix,
+            'help',
+            '  base address of the lower memory',
+            '  Make sure the DT memory entry should start with provided address.')
+        sizestr = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n' % (
+            '', 'config %sMANUAL_LOWER_MEMORYSIZE' % memorykconfprefix,
+            'hex "Lower memory size"',
+            'default 0x80000000',
+            'depends on %sMANUAL_SELECT' % memorykconfprefix,
+            'help',
+            '  Size of the lower memory. Minimum is 32MB, maximum is the size of',
+            '  the selected primary memory physical address range.',
+            '  If you specify 0x0 offset then it will skip generating lower memory node.')
+        baseaddrstr1 = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n' % (
+            '', 'config %sMANUAL_UPPER_BASEADDR' % memorykconfprefix,
+            'hex "Upper memory base address"',
+            'default 0x800000000',
+            'depends on %sMANUAL_SELECT' % memorykconfprefix,
+            'depends on SUBSYSTEM_ARCH_AARCH64',
+            'help',
+            '  base address of the upper memory',
+            '  Make sure the DT memory entry should start with provided address.')
+        sizestr1 = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n' % (
+            '', 'config %sMANUAL_UPPER_MEMORYSIZE' % memorykconfprefix,
+            'hex "Upper memory size"',
+            'default 0x80000000',
+            'depends on %sMANUAL_SELECT' % memorykconfprefix,
+            'depends on SUBSYSTEM_ARCH_AARCH64',
+            'help',
+            '  Size of the upper memory. Minimum is 32MB, maximum is the size of',
+            '  the selected primary memory physical address range.',
+            '  If you specify 0x0 offset then it will skip generating upper memory node.')
+        choicestr = '%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n' % (
+            'choice',
+            'prompt "Primary Memory"',
+            'help',
+            '  The configuration in this menu impacts the memory settings in the device tree',
+            '  autoconfig files.',
+            '  If you select \'manual\', PetaLinux will auto generate memory node based on user inputs,',
+            '  you will need to specify base address and memory size.',
+            '  To skip generating lower or upper memory node specify 0x0 offset to the memory size.',
+            choicestr,
+            'endchoice')
+        self.output('%s\n%s\n%s\n%s\n%s\n%s\n%s\n%s\n%s\n%s\n' % (
+            'menu "Memory Settings"', choicestr, baseaddrstr, sizestr,
+            baseaddrstr1, sizestr1, '', '', '', 'endmenu'))
+        return ()
+
+    def conf_serial(self, mapping, kconfprefix, cpuname, cpuslaves):
+        retserials = []
+        serialkconfprefix = '%sSERIAL_' % kconfprefix
+        choicestr = []
+        baudratechoicestr = ''
+        serialipname = ''
+        baudrates = {}
+        arch_mapping = None
+        for m in as_list(mapping):
+            ipname = lindex(m, 0)
+            devinfo = get_ip_device_info('serial', m)
+            baudrateproperty = lindex(
+                get_ip_property_info('default_baudrate', devinfo), 0)
+            hcbaudrate = lindex(
+                get_ip_property_info('default_baudrate_value', devinfo), 0)
+            is_baudrate_editable = lindex(
+                get_ip_property_info('baudrate_editable', devinfo), 0)
+            baseaddr_property = lindex(
+                get_ip_property_info('baseaddr', devinfo), 0)
+            is_config_uart_property = lindex(
+                get_ip_property_info('is_serial_property', devinfo), 0)
+            for p in self.plnxinfolist:
+                slaves = lindex(lindex(p, 1), 4)
+                cpuname = lindex(lindex(lindex(p, 1), 2), 1)
+                arch_mapping = lindex(lindex(lindex(p, 1), 1), 1)
+                serialinfo, ip_name, hds = first_slaves(slaves, '*uart*')
+                for hd in as_list(hds):
+                    if ip_name != '' and not tcl_equal(ipname, ip_name):
+                        continue
+                    if is_config_uart_property != '':
+                        is_config_uart = lindex(get_ip_property_info(
+                            'is_serial_property', serialinfo), 0)
+                        if is_config_uart == '' or \
+                                tcl_equal(is_config_uart, '0'):
+                            continue
+                    if baseaddr_property != '':
+                        lindex(get_ip_property_info('baseaddr', serialinfo), 0)
+                    interrupt_validation(m, 'serial')
+                    kname = fix_kconf_name(hd)
+                    if baudrateproperty != '' and is_baudrate_editable == 'n':
+                        baudrates[kname] = (lindex(get_ip_property_info(
+                            'default_baudrate', devinfo), 0),)
+                    elif hcbaudrate != '':
+                        baudrates[kname] = (hcbaudrate,)
+                    else:
+                        baudrates[kname] = ('600', '9600', '28800', '115200',
+                                            '230400', '460800', '921600')
+                    choicestr.append(hd)
+                    retserials.append(hd)
+        arch_mapping = defined(arch_mapping, 'arch_mapping')
+        components_list = ''
+        if string_match('*aarch64*', arch_mapping, nocase=True):
+            if re.search('psv_cortexa72*', cpuname):
+                components_list = 'PLM TF-A DTG'
+            elif re.search('psu_cortexa53*', cpuname):
+                components_list = 'PMUFW FSBL TF-A DTG'
+        elif re.search('arm*', arch_mapping):
+            components_list = 'FSBL DTG'
+        elif re.search('microblaze*', arch_mapping):
+            components_list = 'FSBOOT DTG'
+        tmpstr = tuple(choicestr)
+        choicestr = ''
+        for component in as_list(components_list):
+            conf_comp = '' if component == 'DTG' else '%s_' % component
+            choicestr = '%s\n%s\n\t%s\n' % (
+                choicestr, 'choice',
+                'prompt "%s Serial stdin/stdout"' % component)
+            choicestr = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n' % (
+                choicestr, 'help',
+                '  Select a serial as the %s\'s stdin,stdout.' % component,
+                '  If you select \'manual\', you will need to add this variable ',
+                '  YAML_SERIAL_CONSOLE_STDIN_forcevariable_pn-%s = "<serial_ipname>" '
+                % component,
+                '  YAML_SERIAL_CONSOLE_STDOUT_forcevariable_pn-%s = "<serial_ipname>" '
+                % component)
+            if component == 'TF-A':
+                choicestr = '%s\n%s\n\t%s\n\t%s\n\t%s\n' % (
+                    choicestr, 'help',
+                    '  Select a serial as the %s\'s stdin,stdout.' % component,
+                    '  If you select \'manual\', you will need to add this variable ',
+                    '  ATF_CONSOLE_forcevariable = "<serial_ipname>" in petalinuxbps.conf ')
+            for serial in tmpstr:
+                kstr = fix_kconf_name(serial)
+                choicestr = '%s%s\n\t%s\n' % (
+                    choicestr, 'config %s%sSERIAL_%s_SELECT' %
+                    (kconfprefix, conf_comp, kstr), 'bool "%s"' % serial)
+            choicestr = '%s%s\n%s\n\t%s\n' % (
+                choicestr, 'config %s%sSERIAL_MANUAL_SELECT' %
+                (kconfprefix, conf_comp), 'bool "manual"', 'endchoice')
+
+        if tmpstr:
+            baudratechoicestr = ''
+            for serial in tmpstr:
+                kstr = fix_kconf_name(lindex(serial, 0))
+                baudratechoicestr = '%s%s\n\t%s\n\t%s\n' % (
+                    baudratechoicestr, 'choice',
+                    'prompt "System stdin/stdout baudrate for %s"' % serial,
+                    'default %s%s_BAUDRATE_115200' % (serialkconfprefix, kstr))
+                if kstr not in baudrates:
+                    raise SdtUnsupported('no baudrates for %s' % kstr)
+                for b in baudrates[kstr]:
+                    baudratechoicestr = '%s%s\n\t%s\t\n' % (
+                        baudratechoicestr, 'config %s%s_BAUDRATE_%s' %
+                        (serialkconfprefix, kstr, b), 'bool "%s"' % b)
+                baudratechoicestr = '%s%s\n' % (baudratechoicestr, 'endchoice')
+
+        for component in as_list(components_list):
+            conf_comp = '' if component == 'DTG' else '%s_' % component
+            serialipname = '%s\n%s\n%s\n' % (
+                serialipname, 'config %s%sIP_NAME' %
+                (serialkconfprefix, conf_comp), 'string')
+            for serial in tmpstr:
+                kstr = fix_kconf_name(serial)
+                if component == 'TF-A':
+                    atf_console = ''
+                    if string_match('*psu_uart_0*', serial, nocase=True):
+                        atf_console = 'cadence'
+                    elif string_match('*psu_uart_1*', serial, nocase=True):
+                        atf_console = 'cadence1'
+                    elif string_match('*psv_sbsauart_0*', serial, nocase=True):
+                        atf_console = 'pl011'
+                    elif string_match('*psv_sbsauart_1*', serial, nocase=True):
+                        atf_console = 'pl011_1'
+                    if atf_console == '':
+                        atf_console = 'dcc'
+                    serial = atf_console
+                serialipname = '%s%s\n' % (
+                    serialipname, 'default %s if %s%sSERIAL_%s_SELECT' %
+                    (serial, kconfprefix, conf_comp, kstr))
+
+        kconfigstr = '%s\n%s\n' % ('menu "Serial Settings"', choicestr)
+        self.output('%s\n%s\n%s\n%s\n' % (
+            kconfigstr, baudratechoicestr, serialipname, 'endmenu'))
+        return tuple(retserials)
+
+    def conf_ethernet(self, mapping, kconfprefix, cpuname, cpuslaves):
+        reteths = []
+        ethkconfprefix = '%sETHERNET_' % kconfprefix
+        choicestr = ''
+        macstr = ''
+        ipstr = ''
+        for m in as_list(mapping):
+            ipname = lindex(m, 0)
+            for p in self.plnxinfolist:
+                slaves = lindex(lindex(p, 1), 4)
+                lindex(lindex(lindex(p, 1), 2), 1)
+                lindex(lindex(lindex(p, 1), 1), 1)
+                ethernetinfo, ip_name, hds = first_slaves(slaves, '*gem*')
+                for hd in as_list(hds):
+                    if ip_name != '' and not tcl_equal(ipname, ip_name):
+                        continue
+                    interrupt_validation(m, 'ethernet')
+                    kname = fix_kconf_name(hd)
+                    if not KCONF_NAME.match(kname):
+                        raise SdtUnsupported('regexp on %s' % kname)
+                    if re.search('config.*%s%s_SELECT' % (ethkconfprefix, kname),
+                                 choicestr, re.S):
+                        continue
+                    prefix = '%s%s' % (ethkconfprefix, kname)
+                    choicestr = '%s%s\n\t%s\n' % (
+                        choicestr, 'config %s_SELECT' % prefix,
+                        'bool "%s"' % hd)
+                    reteths.append(hd)
+                    macstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n' % (
+                        macstr, 'config %s_MAC_AUTO' % prefix,
+                        'bool "Randomise MAC address"',
+                        'default y if SUBSYSTEM_ARCH_MICROBLAZE',
+                        'default n',
+                        'depends on %s_SELECT' % prefix,
+                        'help',
+                        '  randomise MAC address for the primary ethernet.')
+                    macstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n' % (
+                        macstr, 'config %s_MAC_PATTERN' % prefix,
+                        'string "Template for randomised MAC address"',
+                        'default "00:0a:35:00:??:??"',
+                        'depends on %s_SELECT && %s_MAC_AUTO' % (prefix, prefix),
+                        'help',
+                        '  Pattern for generating random MAC addresses - question mark',
+                        '  characters will be replaced by random hex digits')
+                    macstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n' % (
+                        macstr, 'config %s_MAC' % prefix,
+                        'string "Ethernet MAC address"',
+                        'default "ff:ff:ff:ff:ff:ff"',
+                        'depends on %s_SELECT && !%s_MAC_AUTO' % (prefix, prefix),
+                        'help',
+                        '  Default mac set to ff:ff:ff:ff:ff:ff invalid mac address to read from EEPROM',
+                        '  if you want change with desired value you can change, example: 00:0a:35:00:22:01')
+                    ipstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n' % (
+                        ipstr, 'config %s_USE_DHCP' % prefix,
+                        'bool "Obtain IP address automatically"',
+                        'default y',
+                        'depends on %s_SELECT' % prefix,
+                        'help',
+                        '  Set this option if you would like your SUBSYSTEM to use DHCP for',
+                        '  obtaining an IP address.')
+                    ipstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n' % (
+                        ipstr, 'config %s_IP_ADDRESS' % prefix,
+                        'string "Static IP address"',
+                        'default "192.168.0.10"',
+                        'depends on %s_SELECT && !%s_USE_DHCP' % (prefix, prefix),
+                        'help',
+                        '  The IP address of your main network interface when static network',
+                        '  address assignment is used.')
+                    ipstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n' % (
+                        ipstr, 'config %s_IP_NETMASK' % prefix,
+                        'string "Static IP netmask"',
+                        'default "255.255.255.0"',
+                        'depends on %s_SELECT && !%s_USE_DHCP' % (prefix, prefix),
+                        'help',
+                        '  Default netmask when static network address assignment is used.',
+                        '  In case of systemd please specify netmask value like CIDR notation Eg: 24 instead of 255.255.255.0',
+                        '  In case of sysvinit please specify netmask value like dot-decimal notation Eg: 255.255.255.0 instead of 24 ')
+                    ipstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n' % (
+                        ipstr, 'config %s_IP_GATEWAY' % prefix,
+                        'string "Static IP gateway"',
+                        'default "192.168.0.1"',
+                        'depends on %s_SELECT && !%s_USE_DHCP' % (prefix, prefix),
+                        'help',
+                        '  Default gateway when static network address assignment is used.')
+        choicestr = '%s%s\n\t%s\n' % (
+            choicestr, 'config %sMANUAL_SELECT' % ethkconfprefix,
+            'bool "manual"')
+        kconfigstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n%s\n%s\n' % (
+            'menu "Ethernet Settings"',
+            'choice',
+            'prompt "Primary Ethernet"',
+            'help',
+            '  Select a Ethernet used as primary Ethernet.',
+            '  The primary ethernet will be used for u-boot networking if u-boot is',
+            '  selected and will be used as eth0 in Linux.',
+            '  If your preferred primary ethernet is not on the list, please select',
+            '  \'manual\'.',
+            choicestr,
+            'endchoice')
+        self.output('%s\n%s\n%s\n%s\n' % (kconfigstr, macstr, ipstr, 'endmenu'))
+        return tuple(reteths)
+
+    def named_slaves(self, mapping, cpuslaves, pattern, devicetype):
+        '''ip_name of the first slave matching pattern, per mapping ip and
+        processor, for those the processor has: the sd, timer, rtc and
+        plnx_gen_conf_basic loops.'''
+        names = []
+        for m in as_list(mapping):
+            lindex(m, 0)
+            for p in self.plnxinfolist:
+                slaves = lindex(lindex(p, 1), 4)
+                info = lsearch(slaves, pattern, inline=True)
+                for hd in as_list(lindex(info, 0)):
+                    name = lindex(get_ip_property_info('ip_name', info), 0)
+                    if lsearch(cpuslaves, name) < 0:
+                        continue
+                    interrupt_validation(m, devicetype)
+                    names.append(name)
+        return names
+
+    def conf_sd(self, mapping, kconfprefix, cpuname, cpuslaves):
+        sdkconfprefix = '%sPRIMARY_SD_' % kconfprefix
+        choicestr = ''
+        names = self.named_slaves(mapping, cpuslaves, '*sd*', 'sd')
+        for name in names:
+            choicestr = '%s%s\n\t%s\n' % (
+                choicestr, 'config %s%s_SELECT' %
+                (sdkconfprefix, fix_kconf_name(name)), 'bool "%s"' % name)
+        choicestr = '%s%s\n\t%s\n' % (
+            choicestr, 'config %sMANUAL_SELECT' % sdkconfprefix,
+            'bool "manual"')
+        kconfigstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n' % (
+            'menu "SD/SDIO Settings"',
+            'choice',
+            'prompt "Primary SD/SDIO"',
+            'help',
+            '  Select a SD instanced used as primary SD/SDIO.',
+            '  It allows you to select which SD controller is in the systems primary SD card interface.',
+            choicestr,
+            'endchoice')
+        self.output('%s\n%s\n' % (kconfigstr, 'endmenu'))
+        self.conf_basic(mapping, kconfprefix, cpuname, cpuslaves, 'SD')
+        return tuple(names)
+
+    def conf_timer(self, mapping, kconfprefix, cpuname, cpuslaves):
+        timerkconfprefix = '%sTIMER_' % kconfprefix
+        choicestr = ''
+        names = self.named_slaves(mapping, cpuslaves, '*timer*', 'timer')
+        for name in names:
+            choicestr = '%s%s\n\t%s\n' % (
+                choicestr, 'config %s%s_SELECT' %
+                (timerkconfprefix, fix_kconf_name(name)), 'bool "%s"' % name)
+        choicestr = '%s%s\n\t%s\n' % (
+            choicestr, 'config %sMANUAL_SELECT' % timerkconfprefix,
+            'bool "manual"')
+        kconfigstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n%s\n%s\n' % (
+            'menu "Timer Settings"',
+            'choice',
+            'prompt "Primary timer"',
+            'help',
+            '  Select a timer instance used as primary timer for Linux kernel.',
+            '  If your preferred timer is not on the list, please select \'manual\'.',
+            '  If \'manual\' is selected, you will be responsible to enable property',
+            '  kernel driver for your timer.',
+            '  Please note that MicroBlaze system must have a timer.',
+            choicestr,
+            'endchoice')
+        self.output('%s\n%s\n' % (kconfigstr, 'endmenu'))
+        return tuple(names)
+
+    def conf_rtc(self, mapping, kconfprefix, cpuname, cpuslaves):
+        rtckconfprefix = '%sRTC_' % kconfprefix
+        choicestr = ''
+        names = self.named_slaves(mapping, cpuslaves, '*rtc*', 'rtc')
+        for name in names:
+            choicestr = '%s%s\n\t%s\n' % (
+                choicestr, 'config %s%s_SELECT' %
+                (rtckconfprefix, fix_kconf_name(name)), 'bool "%s"' % name)
+        choicestr = '%s%s\n\t%s\n' % (
+            choicestr, 'config %sMANUAL_SELECT' % rtckconfprefix,
+            'bool "manual"')
+        kconfigstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n%s\n' % (
+            'menu "RTC Settings"',
+            'choice',
+            'prompt "Primary RTC"',
+            'help',
+            '  Select a RTC instance used as primary timer for Linux kernel.',
+            '  If your preferred RTC is not on the list, please select \'manual\'.',
+            '  If \'manual\' is selected, you will be responsible to enable property',
+            '  kernel driver for your RTC.',
+            choicestr,
+            'endchoice')
+        self.output('%s\n%s\n' % (kconfigstr, 'endmenu'))
+        return tuple(names)
+
+    def conf_sata(self, mapping, kconfprefix, cpuname, cpuslaves):
+        return self.conf_basic(mapping, kconfprefix, cpuname, cpuslaves, 'SATA')
+
+    def conf_usb(self, mapping, kconfprefix, cpuname, cpuslaves):
+        return self.conf_basic(mapping, kconfprefix, cpuname, cpuslaves, 'USB')
+
+    def conf_i2c(self, mapping, kconfprefix, cpuname, cpuslaves):
+        return self.conf_basic(mapping, kconfprefix, cpuname, cpuslaves, 'I2C')
+
+    def conf_dp(self, mapping, kconfprefix, cpuname, cpuslaves):
+        return self.conf_basic(mapping, kconfprefix, cpuname, cpuslaves, 'DP')
+
+    def conf_basic(self, mapping, kconfprefix, cpuname, cpuslaves, devicetype):
+        devkconfprefix = '%s%s_' % (kconfprefix, devicetype)
+        devicetype = devicetype.lower()
+        choicestr = ''
+        # The quotes are part of the Tcl pattern
+        names = self.named_slaves(mapping, cpuslaves, '*"%s"*' % devicetype,
+                                  devicetype)
+        for name in names:
+            choicestr = '%s%s\n\t%s\n\t%s\n' % (
+                choicestr, 'config %s%s_SELECT' %
+                (devkconfprefix, fix_kconf_name(name)), 'bool', 'default y')
+        self.output('%s\n' % choicestr)
+        return tuple(names)
+
+    def conf_reset_gpio(self, mapping, kconfprefix, cpuname, cpuslaves):
+        rstgpiokconfprefix = '%sRESET_GPIO_' % kconfprefix
+        if as_list(mapping) and self.plnxinfolist:
+            # The Tcl reads an unset devinfo or name for any ip
+            raise SdtUnsupported('reset gpio')
+        choicestr = '%s%s\n\t%s\n' % (
+            '', 'config %sNONE' % rstgpiokconfprefix, 'bool "none"')
+        kconfigstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n%s\n%s\n' % (
+            'menu "Reset GPIO Settings"',
+            'choice',
+            'prompt "Reset GPIO"',
+            'help',
+            '  Select a GPIO instance used as reset GPIO.',
+            '  If you don\'t have reset GPIO in your system, please select \'none\'.',
+            choicestr,
+            'endchoice')
+        self.output('%s\n%s\n%s\n%s\n' % (kconfigstr, '', '', 'endmenu'))
+        return ()
+
+    def conf_flash_partition(self, prefix, flashname, advdepends,
+                             flash_prefix):
+        partitionstr = ''
+        flashipname = ''
+        kname = fix_kconf_name(flashname)
+        bankkconf = 'BANKLESS'
+        choicestr = '%s\n\t%s\n' % (
+            'config %s%s_%s_SELECT' % (prefix, kname, bankkconf),
+            'bool "%s"' % flashname)
+        defaultlist = []
+        if as_list(flash_prefix):
+            flash_prefix = '%s-' % flash_prefix
+        if self.current_arch == 'aarch64':
+            defaultlist = [('boot', '0x400000'), ('kernel', '0x1400000'),
+                           ('bootenv', '0x400000')]
+            if string_match('*nand*', flashname, nocase=True):
+                defaultlist += [('device-tree', '0x400000'),
+                                ('rootfs', '0x3C00000')]
+        elif self.current_arch == 'arm':
+            defaultlist = [('boot', '0x500000'), ('kernel', '0xA80000'),
+                           ('bootenv', '0x20000')]
+            if string_match('*nand*', flashname, nocase=True):
+                defaultlist += [('device-tree', '0x400000'),
+                                ('rootfs', '0x3C00000')]
+        elif self.current_arch == 'microblaze':
+            defaultlist = [('fpga', '0x400000'), ('boot', '0x40000'),
+                           ('bootenv', '0x20000'), ('kernel', '0x600000')]
+        for i in range(20):
+            if i < len(defaultlist):
+                defaultname = flash_prefix + defaultlist[i][0]
+                defaultsize = defaultlist[i][1]
+            else:
+                defaultname = ''
+                defaultsize = '0x0'
+            part = '%s%s_%s_PART%d' % (prefix, kname, bankkconf, i)
+            if i == 0:
+                namedepends = '%s%s_%s_SELECT' % (prefix, kname, bankkconf)
+            else:
+                namedepends = '%s%s_%s_PART%d_NAME != ""' % (
+                    prefix, kname, bankkconf, i - 1)
+            partitionstr = '%s\n%s\n\t%s\n' % (
+                partitionstr, 'comment "partition %d"' % i,
+                'depends on %s' % namedepends)
+            partitionstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n' % (
+                partitionstr, 'config %s_NAME' % part, 'string "name"',
+                'default "%s"' % defaultname, 'depends on %s' % namedepends)
+            partitionstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n' % (
+                partitionstr, 'config %s_SIZE' % part, 'hex "size"',
+                'default %s' % defaultsize,
+                'depends on %s_NAME != ""' % part)
+            partitionstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n' % (
+                partitionstr, 'config %s_FLAGS' % part,
+                'string "flash partition flags"',
+                'default ""',
+                'depends on %s_NAME != "" && %s' % (part, advdepends),
+                'help',
+                '  Pass the flash partition flags to DTS. Use comma separatioon for',
+                '  multiple flags, e.g. abc,def,...,xyz',
+                '  Currently, the supported string is RO ("read-only" string) flag',
+                '  which marks the partition read-only')
+            flashipname = '%s\n%s\n%s\n%s\n%s\n' % (
+                flashipname, 'config %sIP_NAME' % prefix, 'string',
+                'default %s' % flashname, 'depends on %s' % namedepends)
+        return choicestr, partitionstr, flashipname
+
+    def conf_flash(self, mapping, kconfprefix, cpuname, cpuslaves):
+        retflashs = []
+        flashkconfprefix = '%sFLASH_' % kconfprefix
+        choicestr = ''
+        partitionsstr = ''
+        flashipname = ''
+        for m in as_list(mapping):
+            ipname = lindex(m, 0)
+            devinfo = get_ip_device_info('flash', m)
+            for p in self.plnxinfolist:
+                slaves = lindex(lindex(p, 1), 4)
+                lindex(lindex(lindex(p, 1), 2), 1)
+                lindex(lindex(lindex(p, 1), 1), 1)
+                flashinfo, ip_name, hds = first_slaves(slaves, '*qspi*')
+                for hd in as_list(hds):
+                    if ip_name != '' and not tcl_equal(ipname, ip_name):
+                        continue
+                    interrupt_validation(m, 'flash')
+                    flash_type = as_string(get_ip_property_info('flash_type', m))
+                    flash_prefix = as_string(
+                        get_ip_property_info('flash_prefix', m))
+                    if ipname == 'axi_emc':
+                        raise SdtUnsupported('flash banks of %s' % hd)
+                    if flash_type == 'spi' and lindex(get_ip_property_info(
+                            'number_cs', devinfo), 0) != '':
+                        raise SdtUnsupported('chip selects of %s' % hd)
+                    strlist = self.conf_flash_partition(
+                        flashkconfprefix, hd,
+                        '%s_ADVANCED_AUTOCONFIG' % flashkconfprefix,
+                        flash_prefix)
+                    choicestr = '%s%s' % (choicestr, strlist[0])
+                    partitionsstr = '%s\n%s\n' % (partitionsstr, strlist[1])
+                    flashipname = '%s\n%s\n' % (flashipname, strlist[2])
+                    retflashs.append(hd)
+        choicestr = '%s%s\n\t%s\n' % (
+            choicestr, 'config %sMANUAL_SELECT' % flashkconfprefix,
+            'bool "manual"')
+        partitionsstr = '%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n%s\n' % (
+            'config %s_ADVANCED_AUTOCONFIG' % flashkconfprefix,
+            'bool "Advanced Flash Auto Configuration"',
+            'default n',
+            'depends on !%sMANUAL_SELECT' % flashkconfprefix,
+            'help',
+            '  Select this option to enabled ',
+            partitionsstr)
+        kconfigstr = '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n%s\n%s\n' % (
+            'menu "Flash Settings"',
+            'choice',
+            'prompt "Primary Flash"',
+            'help',
+            '  Select a Flash instance used as Primary Flash.',
+            '  PetaLinux auto config will apply the flash partition table settings',
+            '  to the primary flash.',
+            '  If you preferred flash is not on the list or you don\'t want PetaLinux',
+            '  to manage your flash partition, please select manual.',
+            choicestr,
+            'endchoice')
+        kconfigstr = '%s\n%s\n' % (kconfigstr, '')
+        self.output('%s\n%s\n%s\n%s\n' % (
+            kconfigstr, partitionsstr, flashipname, 'endmenu'))
+        return tuple(retflashs)
+
+    def conf_images_location(self, sds, flashes):
+        # Builds its menu without writing it, the one way it can fail is
+        # the boot image having no name for the arch
+        if self.current_arch not in ('microblaze', 'arm', 'aarch64'):
+            raise SdtUnsupported('no boot image for %s' % self.current_arch)
+
+
+def gen_sdt_syshw(petalinux_config, ipinfo_file):
+    '''Kconfig.syshw text sdt-description.tcl would write for
+    petalinux_config, SdtUnsupported if only it can.'''
+    return SdtSyshw(petalinux_config, ipinfo_file).generate()
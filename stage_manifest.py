@@ -0,0 +1,153 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import json
+
+import config_store
+import logger_setup
+from config_store import get_config_store, write_file_atomic
+from digest_cache import digest_cache
+
+logger, console_h = logger_setup.setup_logger()
+
+MANIFEST_FILE = '.stages.json'
+
+
+class StageManifest:
+    '''Record of every stage that ran in an output directory, kept in
+    a single JSON file next to the generated files.'''
+
+    def __init__(self, output):
+        self.manifest_file = os.path.join(output, MANIFEST_FILE)
+        try:
+            with open(self.manifest_file, 'r') as manifest_f:
+                self.stages = json.load(manifest_f).get('stages', {})
+        except (OSError, ValueError, AttributeError):
+            self.stages = {}
+
+    def get(self, name):
+        return self.stages.get(name)
+
+    def update(self, name, entry):
+        self.stages[name] = entry
+        self.save()
+
+    def remove(self, name):
+        if self.stages.pop(name, None) is not None:
+            self.save()
+
+    def save(self):
+        write_file_atomic(self.manifest_file,
+                          json.dumps({'stages': self.stages}, indent=1,
+                                     sort_keys=True))
+
+
+stage_manifests = {}
+# Name of the stage which is running, None between stages
+running_stage = None
+
+
+def get_stage_manifest(output):
+    output = os.path.abspath(output)
+    if output not in stage_manifests:
+        stage_manifests[output] = StageManifest(output)
+    return stage_manifests[output]
+
+
+def file_digest(filename):
+    '''Digest of a file, '' for a missing file and for a directory,
+    whose existence is all a stage can ask of it.'''
+    if os.path.isdir(filename):
+        return ''
+    try:
+        return digest_cache.digest(filename)
+    except OSError:
+        return ''
+
+
+class Stage:
+    '''One generation step and what it depends on.
+
+    inputs are files the stage reads as a whole (tool data, Tcl
+    scripts, templates), params are values it is run with (hw digest,
+    flow, paths given on the command line), outputs are the files it
+    generates. The symbols the stage looks up in its configs files are
+    taken from config_store.read_log, so a stage which reads a handful
+    of symbols from config is not rerun when another symbol changes.
+
+    unchanged() compares all of this with what the manifest recorded
+    when the stage last completed, done() records it. The manifest is
+    rewritten as each stage completes, so it doubles as a journal: a
+    failed or interrupted run keeps every stage it finished and the
+    next run resumes with the first one it did not.
+    '''
+
+    def __init__(self, output, name, inputs=(), params=None, outputs=(),
+                 configs=()):
+        self.manifest = get_stage_manifest(output)
+        self.name = name
+        self.inputs = [os.path.abspath(f) for f in inputs]
+        self.params = params or {}
+        self.outputs = [os.path.abspath(f) for f in outputs]
+        self.configs = [os.path.abspath(f) for f in configs]
+        self.mark = len(config_store.read_log)
+        self.reason = ''
+
+    def unchanged(self):
+        '''True if the stage can be skipped. A stage found out of date
+        is dropped from the manifest until done(), so an interrupted
+        rerun never leaves it looking complete.'''
+        global running_stage
+        if self._unchanged():
+            logger.debug('Stage %s is up to date' % self.name)
+            return True
+        running_stage = self.name
+        self.manifest.remove(self.name)
+        return False
+
+    def _unchanged(self):
+        saved = self.manifest.get(self.name)
+        if not saved:
+            self.reason = 'never run'
+            return False
+        if saved.get('params') != self.params:
+            self.reason = 'parameters changed'
+            return False
+        saved_inputs = saved.get('inputs', {})
+        if sorted(saved_inputs) != sorted(self.inputs):
+            self.reason = 'input files changed'
+            return False
+        for filename in self.inputs:
+            if file_digest(filename) != saved_inputs[filename]:
+                self.reason = '%s changed' % filename
+                return False
+        saved_outputs = saved.get('outputs', {})
+        for filename in self.outputs:
+            if not os.path.exists(filename):
+                self.reason = '%s not found' % filename
+                return False
+            if file_digest(filename) != saved_outputs.get(filename):
+                self.reason = '%s modified' % filename
+                return False
+        for filename, query, value in saved.get('reads', []):
+            if get_config_store(filename).get(*query) != value:
+                self.reason = '%s changed in %s' % (query[0], filename)
+                return False
+        return True
+
+    def done(self):
+        global running_stage
+        running_stage = None
+        reads = {}
+        for filename, query, value in config_store.read_log[self.mark:]:
+            if filename in self.configs:
+                reads.setdefault((filename, query), value)
+        self.manifest.update(self.name, {
+            'params': self.params,
+            'inputs': {f: file_digest(f) for f in self.inputs},
+            'outputs': {f: file_digest(f) for f in self.outputs},
+            'reads': [[filename, list(query), value]
+                      for (filename, query), value in reads.items()]})
+        digest_cache.flush()
@@ -0,0 +1,9 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import sys
+
+# The modules live at the top of the tree, next to gen-machineconf
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,190 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+#
+# openhw and the hsi commands the hardware scripts use, for them to run
+# under plain tclsh. The "hardware description" openhw reads is a Tcl
+# dict of cell name to a dict of its properties, IP_NAME and VLNV
+# included, the properties of the design itself under the name ".". A
+# cell's PINS property lists the {name DIRECTION TYPE} of its pins. Each
+# openhw call appends the file it opens to the file named by the
+# FAKE_HSI_LOG environment variable, if set.
+
+namespace eval fake_hsi {
+	variable designs [dict create]
+	variable current ""
+	variable count 0
+}
+
+proc fake_hsi::cells {} {
+	variable designs
+	variable current
+	if { ! [dict exists $designs $current] } {
+		error "no hw design is open"
+	}
+	return [dict get $designs $current]
+}
+
+proc fake_hsi::names {} {
+	return [lsort [lsearch -all -inline -not -exact \
+		[dict keys [fake_hsi::cells]] "."]]
+}
+
+# Whether the property of object matches each of the A==B of filter
+proc fake_hsi::matches {filter object} {
+	foreach condition [split [string map {" && " "\n"} $filter] "\n"] {
+		if { ! [regexp {^(\S+)==(.*)$} $condition -> prop value] } {
+			error "fake hsi has no filter $condition"
+		}
+		if { [hsi get_property $prop $object] ne $value } {
+			return 0
+		}
+	}
+	return 1
+}
+
+proc openhw {hdf} {
+	if { [info exists ::env(FAKE_HSI_LOG)] } {
+		set log [open $::env(FAKE_HSI_LOG) a]
+		puts $log $hdf
+		close $log
+	}
+	set hdf_f [open $hdf r]
+	set cells [read $hdf_f]
+	close $hdf_f
+	set design "design_[incr ::fake_hsi::count]"
+	dict set ::fake_hsi::designs $design $cells
+	set ::fake_hsi::current $design
+	return $design
+}
+
+proc hsi {cmd args} {
+	switch -- $cmd {
+		current_hw_design -
+		get_hw_designs {
+			if { [llength $args] > 0 } {
+				set ::fake_hsi::current [lindex $args 0]
+			}
+			return $::fake_hsi::current
+		}
+		close_hw_design {
+			dict unset ::fake_hsi::designs [lindex $args 0]
+			if { [lindex $args 0] == $::fake_hsi::current } {
+				set ::fake_hsi::current ""
+			}
+			return
+		}
+		get_cells -
+		get_cell {
+			# Cells are listed sorted by name, as hsi does
+			set names [fake_hsi::names]
+			set args [lsearch -all -inline -not -exact $args -hier]
+			switch -- [lindex $args 0] {
+				"" {
+					return $names
+				}
+				-filter {
+					set cells {}
+					foreach name $names {
+						if { [fake_hsi::matches [lindex $args 1] $name] } {
+							lappend cells $name
+						}
+					}
+					return $cells
+				}
+				-regexp {
+					return [lsearch -all -inline -regexp $names \
+						[lindex $args 1]]
+				}
+				default {
+					return [lsearch -all -inline -exact $names \
+						[lindex $args 0]]
+				}
+			}
+		}
+		get_property {
+			lassign $args prop cell
+			if { $cell == $::fake_hsi::current } {
+				set cell "."
+				if { ! [dict exists [fake_hsi::cells] $cell] } {
+					return
+				}
+			} elseif { [llength $cell] != 1 } {
+				error "no single cell to get $prop of: $cell"
+			} elseif { [string equal -nocase $prop NAME] } {
+				return $cell
+			} elseif { [string match "*/*" $cell] } {
+				# A pin, named cell/pin
+				lassign [split $cell "/"] cell pin
+				set pins [hsi get_property PINS $cell]
+				set pin [lsearch -inline -index 0 $pins $pin]
+				switch -nocase -- $prop {
+					DIRECTION { return [lindex $pin 1] }
+					TYPE { return [lindex $pin 2] }
+					default { return }
+				}
+			}
+			dict for {name value} [dict get [fake_hsi::cells] $cell] {
+				if { [string equal -nocase $name $prop] } {
+					return $value
+				}
+			}
+			return
+		}
+		list_property {
+			lassign $args cell pattern
+			return [lsearch -all -inline [lsort [dict keys \
+				[dict get [fake_hsi::cells] $cell]]] $pattern]
+		}
+		get_pins {
+			# get_pins -filter filter -of_objects cells
+			array set opts $args
+			set pins {}
+			foreach cell $opts(-of_objects) {
+				foreach pin [hsi get_property PINS $cell] {
+					set pin "${cell}/[lindex $pin 0]"
+					if { [fake_hsi::matches $opts(-filter) $pin] } {
+						lappend pins $pin
+					}
+				}
+			}
+			return $pins
+		}
+		report_property {
+			# The properties of the first object, in hsi's table
+			set args [lsearch -all -inline -not -regexp $args \
+				{^-(return_string|regexp|all)$}]
+			lassign $args cells pattern
+			set cell [lindex $cells 0]
+			if { $cell == "" } {
+				error "no object to report"
+			}
+			set report "PROPERTY TYPE READ-ONLY VALUE\n"
+			if { $cell == $::fake_hsi::current } {
+				return $report
+			}
+			set props [dict get [fake_hsi::cells] $cell]
+			foreach name [lsort [dict keys $props]] {
+				if { $pattern == "" || [regexp "^${pattern}\$" $name] } {
+					append report "$name string true [dict get $props $name]\n"
+				}
+			}
+			return $report
+		}
+		default {
+			error "fake hsi has no $cmd"
+		}
+	}
+}
+
+namespace eval ::hsi {}
+
+proc ::hsi::get_cells {args} {
+	return [hsi get_cells {*}$args]
+}
+
+namespace eval ::common {}
+
+proc ::common::get_property {prop cell} {
+	return [hsi get_property $prop $cell]
+}
@@ -0,0 +1,106 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Kconfig trees and configs laid out the way gen_config.py lays them out
+# in an output directory, for kconfig.py to be checked against conf.
+# Run as a script with conf (kconfig-frontends) on PATH to regenerate
+# data/kconfig/expected from `yes "" | KCONFIG_CONFIG=config conf Kconfig`.
+
+import os
+import sys
+import shutil
+import subprocess
+
+tests_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(tests_dir))
+
+import gen_config
+
+data_dir = os.path.join(tests_dir, 'data', 'kconfig')
+expected_dir = os.path.join(data_dir, 'expected')
+scripts_dir = gen_config.scripts_dir
+
+
+def project_tree(out_dir, soc_family):
+    '''configs/Kconfig of an SDT flow project over the sample
+    Kconfig.syshw, as get_hw_description writes it.'''
+    Kconfig_syshw = os.path.join(out_dir, 'Kconfig.syshw')
+    shutil.copyfile(os.path.join(data_dir, 'Kconfig.syshw'), Kconfig_syshw)
+    Kconfig_str = gen_config.start_menu.format(soc_family.upper(), out_dir)
+    Kconfig_str += gen_config.Kconfig_sdt
+    with open(os.path.join(scripts_dir, 'configs/Kconfig.part'), 'r',
+              encoding='utf-8') as kconfig_part_f:
+        kconfig_part_data = kconfig_part_f.read()
+    Kconfig_str += kconfig_part_data.replace(
+        'source ./Kconfig.syshw', 'source %s' % Kconfig_syshw).replace(
+        '@@multiconfigmenustr@@', '')
+    return Kconfig_str, os.path.join(scripts_dir,
+                                     'configs/config_%s' % soc_family)
+
+
+def rootfs_tree(out_dir, soc_family, arch):
+    '''rootfsconfigs/Kconfig for the default user-rootfsconfig, as
+    add_rootfs_configs writes it.'''
+    rootfs_dir = os.path.join(scripts_dir, 'rootfsconfigs')
+    subprocess.check_call([sys.executable,
+                           os.path.join(rootfs_dir, 'rootfs_config.py'),
+                           '--generate_kconfig',
+                           os.path.join(rootfs_dir, 'user-rootfsconfig'),
+                           out_dir], stdout=subprocess.DEVNULL)
+    with open(os.path.join(rootfs_dir, 'Kconfig-%s.part' % arch), 'r',
+              encoding='utf-8') as rfskconfig_part_f:
+        rfskconfig_part_data = rfskconfig_part_f.read()
+    Kconfig_str = gen_config.Kconfig_arch.format(soc_family)
+    Kconfig_str += rfskconfig_part_data.replace(
+        'source ./Kconfig.user',
+        'source %s' % os.path.join(out_dir, 'Kconfig.user'))
+    return Kconfig_str, os.path.join(rootfs_dir,
+                                     'rootfsconfig_%s' % soc_family)
+
+
+def constructs_tree(config_name):
+    with open(os.path.join(data_dir, 'constructs', 'Kconfig'), 'r',
+              encoding='utf-8') as kconfig_f:
+        return kconfig_f.read(), os.path.join(data_dir, 'constructs',
+                                              config_name)
+
+
+# case -> function returning (Kconfig contents, config to start from)
+CASES = {
+    'project-zynqmp': lambda out_dir: project_tree(out_dir, 'zynqmp'),
+    'rootfs-zynqmp': lambda out_dir: rootfs_tree(out_dir, 'zynqmp',
+                                                 'aarch64'),
+    'rootfs-microblaze': lambda out_dir: rootfs_tree(out_dir, 'microblaze',
+                                                     'microblaze'),
+    'constructs-empty': lambda out_dir: constructs_tree('config-empty'),
+    'constructs-user': lambda out_dir: constructs_tree('config-user'),
+}
+
+
+def setup_case(case, out_dir):
+    '''Write the Kconfig and config of case to out_dir, returns their
+    paths.'''
+    Kconfig_str, config = CASES[case](out_dir)
+    Kconfig = os.path.join(out_dir, 'Kconfig')
+    with open(Kconfig, 'w', encoding='utf-8') as kconfig_f:
+        kconfig_f.write(Kconfig_str)
+    cfgfile = os.path.join(out_dir, 'config')
+    shutil.copyfile(config, cfgfile)
+    return Kconfig, cfgfile
+
+
+def expected_file(case):
+    return os.path.join(expected_dir, '%s.config' % case)
+
+
+if __name__ == '__main__':
+    import tempfile
+    for case in CASES:
+        with tempfile.TemporaryDirectory() as out_dir:
+            Kconfig, cfgfile = setup_case(case, out_dir)
+            subprocess.run('yes "" | env KCONFIG_CONFIG=%s conf %s'
+                           % (cfgfile, Kconfig), shell=True, check=True,
+                           cwd=out_dir, stdout=subprocess.DEVNULL)
+            shutil.copyfile(cfgfile, expected_file(case))
+    sys.exit(0)
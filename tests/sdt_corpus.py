@@ -0,0 +1,226 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# petalinux_config.yaml (and sdt_ipinfo.yaml) inputs for sdt_syshw.py to
+# be checked against sdt-description.tcl, see test_sdt_syshw.py. Run as a
+# script with tclsh on PATH to regenerate data/sdt from random seeds,
+# keeping a mix of inputs the port handles and inputs it hands back to
+# the Tcl.
+
+import os
+import sys
+import glob
+import random
+import shutil
+import subprocess
+import tempfile
+
+tests_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(tests_dir))
+
+import sdt_syshw
+
+scripts_dir = os.path.join(os.path.dirname(tests_dir), 'gen-machine-scripts')
+corpus_dir = os.path.join(tests_dir, 'data', 'sdt')
+IPINFO = os.path.join(scripts_dir, 'data', 'sdt_ipinfo.yaml')
+IPINFO_SUFFIX = '.ipinfo.yaml'
+
+SLAVE_NAMES = ['psu_uart_0', 'psu_uart_1', 'psv_sbsauart_0', 'psv_sbsauart_1',
+               'uart2', 'psu_ethernet_0', 'gem0', 'psu_gem_1', 'gem_3',
+               'psu_qspi_0', 'qspi_1', 'psv_pmc_qspi_0', 'psu_sd_0', 'sdhci0',
+               'psu_rtc', 'rtc_0', 'psu_i2c_0', 'usb0', 'axi_timer_0',
+               'sata0', 'dp_0', 'nand_qspi', 'x', 'psu_uart_10'] * 3 + \
+    ['psu_ddr_0', 'ddr1']
+IP_NAMES = ['psu_uart', 'psv_sbsauart', 'psu_ethernet', 'psv_ethernet',
+            'psu_qspi', 'psv_pmc_qspi', 'axi_quad_spi', 'psu_sd', 'psu_rtc',
+            'psu_ddr', 'ps7_ddr', 'axi_emc', 'axi_timer', 'foo', '0x10', '16',
+            'psu_i2c', 'psu_usb', 'ps7_sram']
+ARCHES = ['aarch64', 'aarch64', 'arm', 'microblaze', '', 'riscv', 'AArch64']
+CPU_IPS = ['psu_cortexa53', 'psv_cortexa72', 'ps7_cortexa9',
+           'microblaze'] * 4 + ['foo', '']
+CPU_NAMES = ['psu_cortexa53_0', 'psv_cortexa72_0', 'ps7_cortexa9_0',
+             'microblaze_0']
+DEVTYPES = ['serial', 'ethernet', 'flash', 'sd', 'rtc', 'memory', 'sata',
+            'usb', 'i2c', 'dp', 'timer', '"sata"', '"usb"', '"sd"',
+            '"i2c"', 'reset_gpio']
+SLAVE_PROPS = [(0.9, lambda: 'device_type: %s' % random.choice(DEVTYPES)),
+               (0.9, lambda: 'ip_name: %s' % random.choice(IP_NAMES)),
+               (0.3, lambda: 'baseaddr: 0x%x' % random.randint(0, 1 << 32)),
+               (0.1, lambda: 'is_serial_property: %s' % random.choice(
+                   ['0', '1', '00', ''])),
+               (0.05, lambda: 'compatible: "xlnx,foo"'),
+               (0.05, lambda: 'label: a "b c"')]
+EXTRA_IPS = [('psu_sd', 'sd'), ('psu_rtc', 'rtc'), ('axi_timer', 'timer'),
+             ('psu_i2c', 'i2c'), ('psu_usb', 'usb'), ('psu_sata', 'sata'),
+             ('psu_dp', 'dp'), ('axi_gpio', 'reset_gpio'),
+             ('gem', 'ethernet'), ('ps7_sram', 'flash'),
+             ('foo', 'serial'), ('16', 'serial')]
+IPINFO_PROPS = ['baudrate_editable: n', 'default_baudrate: 9600',
+                'default_baudrate_value: 115200', 'baseaddr: reg',
+                'is_serial_property: y', 'flash_type: spi',
+                'flash_type: nor', 'flash_prefix: qspi',
+                'flash_prefix: a b', 'flash_prefix:', 'number_cs: cs',
+                'has_bank: y', 'has_bank: n', 'interrupt_required: n']
+
+
+def maybe(p):
+    return random.random() < p
+
+
+def gen_processor(cpu_name):
+    fields = ['        arch: %s' % random.choice(ARCHES),
+              '        ip_name: %s' % random.choice(CPU_IPS)]
+    slaves = list(dict.fromkeys(
+        random.sample(SLAVE_NAMES, random.randint(0, 10))))
+    strings = list(slaves)
+    if maybe(0.5):
+        strings += random.sample(IP_NAMES, 3)
+    if maybe(0.1):
+        strings.append('*')
+    fields.append('        slaves_strings: %s' % ' '.join(strings))
+    slave_lines = ['        slaves:']
+    for slave in slaves:
+        slave_lines.append('            %s:' % slave)
+        props = [prop() for p, prop in SLAVE_PROPS if maybe(p)]
+        if maybe(0.2):
+            random.shuffle(props)
+        slave_lines += ['                %s' % prop for prop in props]
+    fields.append('\n'.join(slave_lines))
+    if maybe(0.1):
+        random.shuffle(fields)
+    if maybe(0.05):
+        fields.pop(random.randrange(len(fields)))
+    lines = ['    %s:' % cpu_name] + fields
+    if maybe(0.05):
+        lines.append('')
+    if maybe(0.03):
+        lines.append('\t   bad indentation: here')
+    return lines
+
+
+def gen_config():
+    '''petalinux_config.yaml the way lopper writes it, give or take the
+    odd key, indentation or value sdt-description.tcl trips on.'''
+    lines = ['# comment'] if maybe(0.2) else []
+    for t in range(random.choice([1, 1, 1, 2, 3])):
+        top = 'processor' if t == 0 or maybe(0.5) else random.choice(
+            ['device_id', 'memory', 'foo'])
+        if maybe(0.1):
+            lines.append('%s: value %d' % (top, t))
+            continue
+        lines.append('%s:' % top)
+        for c in range(random.choice([1, 1, 2])):
+            cpu_name = random.choice(CPU_NAMES + ['cpu%d' % c])
+            lines += gen_processor(cpu_name)
+    if maybe(0.02):
+        lines.insert(1, '            too deep: x')
+    return '\n'.join(lines) + ('\n' if maybe(0.9) else '')
+
+
+def gen_ipinfo():
+    '''The shipped sdt_ipinfo.yaml with a few more IPs and properties.'''
+    with open(IPINFO, 'r') as ipinfo_f:
+        text = ipinfo_f.read()
+    text += '\n'
+    if maybe(0.5):
+        for ip, devtype in random.sample(EXTRA_IPS, random.randint(1, 5)):
+            text += '%s:\n    device_type: %s\n' % (ip, devtype)
+            if maybe(0.2):
+                text += '    interrupt_required: y\n'
+    lines = []
+    for line in text.split('\n'):
+        lines.append(line)
+        if line.startswith('    device_type:'):
+            lines += ['    ' + prop for prop in random.sample(
+                IPINFO_PROPS, random.randint(0, 2))]
+    return '\n'.join(lines)
+
+
+def case_files(name):
+    '''petalinux_config.yaml and sdt_ipinfo.yaml of a corpus case.'''
+    ipinfo = os.path.join(corpus_dir, name + IPINFO_SUFFIX)
+    return (os.path.join(corpus_dir, name + '.yaml'),
+            ipinfo if os.path.exists(ipinfo) else IPINFO)
+
+
+def cases():
+    return sorted(os.path.basename(f)[:-len('.yaml')]
+                  for f in glob.glob(os.path.join(corpus_dir, '*.yaml'))
+                  if not f.endswith(IPINFO_SUFFIX))
+
+
+def tcl_syshw(tclsh, petalinux_config, ipinfo, work_dir):
+    '''Kconfig.syshw from sdt-description.tcl, None if it fails.
+
+    The script reads data/sdt_ipinfo.yaml next to itself, so it runs
+    from a copy in work_dir, with the libs it sources linked in.'''
+    tcl_dir = os.path.join(work_dir, 'scripts')
+    os.makedirs(os.path.join(tcl_dir, 'data'))
+    shutil.copy(os.path.join(scripts_dir, 'sdt-description.tcl'), tcl_dir)
+    os.symlink(os.path.join(scripts_dir, 'libs'),
+               os.path.join(tcl_dir, 'libs'))
+    shutil.copy(ipinfo, os.path.join(tcl_dir, 'data', 'sdt_ipinfo.yaml'))
+    shutil.copy(petalinux_config,
+                os.path.join(work_dir, 'petalinux_config.yaml'))
+    Kconfig_syshw = os.path.join(work_dir, 'Kconfig.syshw')
+    proc = subprocess.run([tclsh, os.path.join(tcl_dir, 'sdt-description.tcl'),
+                           'plnx_gen_hwsysconf', '', Kconfig_syshw],
+                          cwd=work_dir, stdout=subprocess.DEVNULL,
+                          stderr=subprocess.DEVNULL)
+    if proc.returncode:
+        return None
+    with open(Kconfig_syshw, 'r') as kconfig_f:
+        return kconfig_f.read()
+
+
+def py_syshw(petalinux_config, ipinfo):
+    '''Kconfig.syshw from sdt_syshw.py, None if it hands back to the Tcl.'''
+    sdt_syshw.read_ipinfo.cache_clear()
+    try:
+        return sdt_syshw.gen_sdt_syshw(petalinux_config, ipinfo)
+    except sdt_syshw.SdtUnsupported:
+        return None
+
+
+def main(count):
+    tclsh = shutil.which('tclsh')
+    if not tclsh:
+        sys.exit('tclsh not found')
+    for f in glob.glob(os.path.join(corpus_dir, '*.yaml')):
+        os.remove(f)
+    # Two thirds of the cases the port generates, the rest fallbacks
+    wanted = {True: count - count // 3, False: count // 3}
+    seed = 0
+    while any(wanted.values()):
+        random.seed(seed)
+        name = 'seed-%05d' % seed
+        seed += 1
+        config = gen_config()
+        ipinfo = gen_ipinfo() if maybe(0.4) else None
+        with tempfile.TemporaryDirectory() as work_dir:
+            config_file = os.path.join(work_dir, 'config.yaml')
+            with open(config_file, 'w') as config_f:
+                config_f.write(config)
+            ipinfo_file = IPINFO
+            if ipinfo is not None:
+                ipinfo_file = os.path.join(work_dir, 'ipinfo.yaml')
+                with open(ipinfo_file, 'w') as ipinfo_f:
+                    ipinfo_f.write(ipinfo)
+            generated = py_syshw(config_file, ipinfo_file) is not None
+            if not wanted[generated]:
+                continue
+            if generated and tcl_syshw(tclsh, config_file, ipinfo_file,
+                                       work_dir) is None:
+                sys.exit('%s: sdt-description.tcl fails' % name)
+        wanted[generated] -= 1
+        with open(os.path.join(corpus_dir, name + '.yaml'), 'w') as f:
+            f.write(config)
+        if ipinfo is not None:
+            with open(os.path.join(corpus_dir, name + IPINFO_SUFFIX),
+                      'w') as f:
+                f.write(ipinfo)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
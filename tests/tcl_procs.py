@@ -0,0 +1,49 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Runs Tcl against the procs of one of the gen-machine-scripts, without
+# the script's top level code (argument handling, xsct lookups).
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+scripts_dir = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'gen-machine-scripts')
+
+LOAD_PROCS = r'''
+set procs_f [open [lindex $argv 0] r]
+set cmd ""
+foreach line [split [read $procs_f] "\n"] {
+	append cmd "${line}\n"
+	if { [info complete ${cmd}] } {
+		if { [regexp {^\s*proc\s} ${cmd}] } {
+			eval ${cmd}
+		}
+		set cmd ""
+	}
+}
+close $procs_f
+'''
+
+
+def tclsh():
+    path = shutil.which('tclsh')
+    if not path:
+        pytest.skip('tclsh not found')
+    return path
+
+
+def run_procs(script, body, cwd):
+    '''Run body after defining every proc of gen-machine-scripts/script,
+    returns its stdout.'''
+    test_tcl = os.path.join(cwd, 'test.tcl')
+    with open(test_tcl, 'w') as test_f:
+        test_f.write(LOAD_PROCS + body)
+    return subprocess.run([tclsh(), test_tcl,
+                           os.path.join(scripts_dir, script)],
+                          cwd=cwd, check=True, stdout=subprocess.PIPE,
+                          universal_newlines=True).stdout
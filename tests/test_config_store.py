@@ -0,0 +1,180 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import re
+import random
+
+import pytest
+
+import config_store
+import gen_config
+from config_store import config_batch
+
+# gen_config.py's helpers before ConfigStore, which it has to match
+
+
+def baseline_update_config_value(macro, value, filename):
+    lines = []
+    if os.path.exists(filename):
+        with open(filename, 'r') as file_data:
+            lines = file_data.readlines()
+        file_data.close()
+
+    with open(filename, 'w') as file_data:
+        for line in lines:
+            if re.search('# %s is not set' % macro, line) or re.search('%s=' % macro, line):
+                continue
+            file_data.write(line)
+        if value == 'disable':
+            file_data.write('# %s is not set\n' % macro)
+        else:
+            file_data.write('%s=%s\n' % (macro, value))
+    file_data.close()
+
+
+def baseline_get_config_value(macro, filename, Type='bool', end_macro='=y'):
+    lines = []
+    if os.path.exists(filename):
+        with open(filename, 'r') as file_data:
+            lines = file_data.readlines()
+        file_data.close()
+    value = ''
+    if Type == 'bool':
+        for line in lines:
+            line = line.strip()
+            if line.startswith(macro + '='):
+                value = line.replace(macro + '=', '').replace('"', '')
+                break
+    elif Type == 'choice':
+        for line in lines:
+            line = line.strip()
+            if line.startswith(macro) and line.endswith(end_macro):
+                value = line.replace(macro, '').replace(end_macro, '')
+                break
+    elif Type == 'choicelist':
+        for line in lines:
+            line = line.strip()
+            if line.startswith(macro) and line.endswith(end_macro):
+                value += ' ' + line.replace(macro, '').replace(end_macro, '')
+    elif Type == 'asterisk':
+        for line in lines:
+            line = line.strip()
+            if line.startswith(macro) and re.search(end_macro, line):
+                value = line.split('=')[1].replace('"', '')
+                break
+    return value
+
+
+CONFIG = '''CONFIG_SUBSYSTEM_SERIAL_PSU_UART_0_SELECT=y
+# CONFIG_SUBSYSTEM_SERIAL_PSU_UART_1_SELECT is not set
+CONFIG_SUBSYSTEM_SERIAL_PSU_UART_0_BAUDRATE_115200=y
+CONFIG_SUBSYSTEM_MEMORY_PSU_DDR_0_BANKLESS_SIZE=0x7ff00000
+CONFIG_SUBSYSTEM_MACHINE_NAME="zcu102-rev1.0"
+  CONFIG_SUBSYSTEM_INDENTED=y
+
+CONFIG_SUBSYSTEM_FLASH_PSU_QSPI_0_BANKLESS_PART0_NAME="boot"
+CONFIG_SUBSYSTEM_FLASH_PSU_QSPI_0_BANKLESS_PART1_NAME="bootenv"
+CONFIG_SUBSYSTEM_ETHERNET_PSU_ETHERNET_3_MAC="ff:ff:ff:ff:ff:ff"
+CONFIG_SUBSYSTEM_SERIAL_PSU_UART_0_SELECT=n
+'''
+MACROS = ['CONFIG_SUBSYSTEM_SERIAL_PSU_UART_0_SELECT',
+          'CONFIG_SUBSYSTEM_SERIAL_PSU_UART_1_SELECT',
+          'CONFIG_SUBSYSTEM_SERIAL_', 'CONFIG_SUBSYSTEM_SERIAL_PSU_UART_0_',
+          'CONFIG_SUBSYSTEM_MEMORY_PSU_DDR_0_BANKLESS_SIZE',
+          'CONFIG_SUBSYSTEM_MACHINE_NAME', 'CONFIG_SUBSYSTEM_INDENTED',
+          'CONFIG_SUBSYSTEM_FLASH_', 'CONFIG_SUBSYSTEM_FLASH_PSU_QSPI_0',
+          'CONFIG_SUBSYSTEM_ETHERNET_PSU_ETHERNET_3_MAC',
+          'CONFIG_SUBSYSTEM_ETHERNET_PSU_ETHERNET_3_MAC="ff',
+          'CONFIG_SUBSYSTEM_NEW', 'CONFIG_SUBSYSTEM', 'CONFIG_SUBSYSTEM_S']
+VALUES = ['y', 'n', 'disable', '"text"', '0x100', '', '"a=b"']
+QUERIES = [('bool', '=y'), ('choice', '=y'), ('choice', '_SELECT=y'),
+           ('choicelist', '=y'), ('choicelist', '_NAME="boot"'),
+           ('asterisk', 'NAME'), ('asterisk', '=y')]
+
+
+def check_queries(filename, baseline_file):
+    for macro in MACROS:
+        for Type, end_macro in QUERIES:
+            assert gen_config.get_config_value(
+                macro, filename, Type, end_macro) == \
+                baseline_get_config_value(macro, baseline_file, Type,
+                                          end_macro), (macro, Type, end_macro)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_baseline(tmp_path, seed):
+    random.seed(seed)
+    config = tmp_path / 'config'
+    baseline = tmp_path / 'baseline'
+    for path in (config, baseline):
+        path.write_text(CONFIG)
+    check_queries(str(config), str(baseline))
+    with config_batch():
+        for i in range(random.randint(1, 8)):
+            macro = random.choice(MACROS)
+            value = random.choice(VALUES)
+            gen_config.update_config_value(macro, value, str(config))
+            baseline_update_config_value(macro, value, str(baseline))
+            # Reads inside a batch see the staged writes
+            check_queries(str(config), str(baseline))
+    assert config.read_text() == baseline.read_text()
+    for i in range(random.randint(1, 4)):
+        macro = random.choice(MACROS)
+        value = random.choice(VALUES)
+        gen_config.update_config_value(macro, value, str(config))
+        baseline_update_config_value(macro, value, str(baseline))
+        assert config.read_text() == baseline.read_text()
+    check_queries(str(config), str(baseline))
+
+
+def test_missing_file(tmp_path):
+    config = tmp_path / 'config'
+    baseline = tmp_path / 'baseline'
+    check_queries(str(config), str(baseline))
+    gen_config.update_config_value('CONFIG_A', 'y', str(config))
+    baseline_update_config_value('CONFIG_A', 'y', str(baseline))
+    assert config.read_text() == baseline.read_text() == 'CONFIG_A=y\n'
+
+
+def test_batch_exception_discards(tmp_path):
+    config = tmp_path / 'config'
+    config.write_text(CONFIG)
+    with pytest.raises(RuntimeError):
+        with config_batch():
+            gen_config.update_config_value('CONFIG_A', 'y', str(config))
+            assert gen_config.get_config_value('CONFIG_A', str(config)) == 'y'
+            raise RuntimeError('generation failed')
+    assert config.read_text() == CONFIG
+    assert gen_config.get_config_value('CONFIG_A', str(config)) == ''
+
+
+def test_batch_commits_once(tmp_path, monkeypatch):
+    configs = [tmp_path / 'config', tmp_path / 'rootfs_config']
+    for config in configs:
+        config.write_text(CONFIG)
+    writes = []
+
+    def write_file_atomic(filename, data):
+        writes.append(filename)
+        real_write_file_atomic(filename, data)
+
+    real_write_file_atomic = config_store.write_file_atomic
+    monkeypatch.setattr(config_store, 'write_file_atomic', write_file_atomic)
+    inode = os.stat(configs[0]).st_ino
+    with config_batch():
+        with config_batch():
+            for config in configs:
+                gen_config.update_config_value('CONFIG_A', 'y', str(config))
+                gen_config.update_config_value('CONFIG_B', '"b"', str(config))
+        # Nothing is written before the outermost batch exits
+        assert writes == []
+        assert configs[0].read_text() == CONFIG
+    assert sorted(writes) == sorted(str(config) for config in configs)
+    for config in configs:
+        assert config.read_text() == CONFIG + 'CONFIG_A=y\nCONFIG_B="b"\n'
+    # The file was replaced, not rewritten in place, and no temp file
+    # is left next to it
+    assert os.stat(configs[0]).st_ino != inode
+    assert sorted(os.listdir(tmp_path)) == ['config', 'rootfs_config']
@@ -0,0 +1,55 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import hashlib
+
+from digest_cache import DigestCache
+
+
+def old_file(path, data):
+    '''A file older than the racy window, so its digest is cached.'''
+    path.write_bytes(data)
+    os.utime(path, (1, 1))
+    return str(path)
+
+
+def test_cache_written_on_flush_only(tmp_path):
+    cache_file = str(tmp_path / 'cache')
+    cache = DigestCache()
+    cache.set_cache_file(cache_file)
+    files = [old_file(tmp_path / ('f%d' % i), b'%d' % i) for i in range(3)]
+    for filename in files:
+        cache.digest(filename)
+    assert not os.path.exists(cache_file)
+    cache.flush()
+    mtime = os.stat(cache_file).st_mtime_ns
+    # Nothing new to save
+    cache.digest(files[0])
+    cache.flush()
+    assert os.stat(cache_file).st_mtime_ns == mtime
+
+
+def test_cache_reused_across_runs(tmp_path):
+    cache_file = str(tmp_path / 'cache')
+    filename = old_file(tmp_path / 'f', b'data')
+    cache = DigestCache()
+    cache.set_cache_file(cache_file)
+    assert cache.digest(filename) == hashlib.sha256(b'data').hexdigest()
+    cache.flush()
+
+    def fail(path):
+        raise AssertionError('%s hashed again' % path)
+    cache = DigestCache()
+    cache.set_cache_file(cache_file)
+    assert cache.digest(filename, hash_func=fail) == \
+        hashlib.sha256(b'data').hexdigest()
+
+
+def test_prefetched_digests(tmp_path):
+    files = [old_file(tmp_path / ('f%d' % i), b'%d' % i) for i in range(8)]
+    cache = DigestCache()
+    cache.prefetch(files)
+    assert [cache.digest(f) for f in files] == \
+        [hashlib.sha256(b'%d' % i).hexdigest() for i in range(8)]
@@ -0,0 +1,152 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import random
+
+import pytest
+
+from flash_parts import gen_flash_parts, FlashPartsUnsupported
+from hw_model import get_hw_model
+from tcl_procs import run_procs
+
+tests_dir = os.path.dirname(os.path.abspath(__file__))
+FAKE_HSI = os.path.join(tests_dir, 'data', 'fake-hsi.tcl')
+IPINFO = os.path.join(os.path.dirname(tests_dir), 'gen-machine-scripts',
+                      'data', 'ipinfo.yaml')
+PROCESSOR = 'psu_cortexa53_0'
+
+CELLS = {
+    'psu_qspi_0': {'IP_NAME': 'psu_qspi'},
+    'axi_quad_spi_0': {'IP_NAME': 'axi_quad_spi'},
+    'axi_emc_0': {'IP_NAME': 'axi_emc',
+                  'CONFIG.C_MEM0_WIDTH': '16',
+                  'CONFIG.C_S_AXI_MEM0_BASEADDR': '0x60000000',
+                  'CONFIG.C_S_AXI_MEM0_HIGHADDR': '0x61ffffff',
+                  'CONFIG.C_MEM1_WIDTH': '32',
+                  'CONFIG.C_S_AXI_MEM1_BASEADDR': '0x70000000',
+                  'CONFIG.C_S_AXI_MEM1_HIGHADDR': '0x70ffffff'},
+    'psu_uart_0': {'IP_NAME': 'psu_uart'},
+}
+
+
+def tcl_dict(d):
+    return ' '.join('{%s} {%s}' % (k, tcl_dict(v) if isinstance(v, dict)
+                                   else v) for k, v in d.items())
+
+
+def write_hw(tmp_path, cells):
+    '''The design as plnx_syshw_data for flash_parts.py, its values
+    strings as in the sidecar plnx_gen_hwsysconf writes, and as the fake
+    hsi's hardware description for petalinux_hsm.tcl.'''
+    syshw = tmp_path / 'plnx_syshw_data'
+    lines = ['processor:', '    %s:' % PROCESSOR, '        slaves:']
+    for cell, props in cells.items():
+        lines.append('            %s:' % cell)
+        for prop, value in props.items():
+            lines.append('                %s: "%s"' % (
+                'ip_name' if prop == 'IP_NAME' else prop, value))
+    syshw.write_text('\n'.join(lines) + '\n')
+    hdf = tmp_path / 'design.hdf'
+    hdf.write_text(tcl_dict(cells))
+    return str(syshw), str(hdf)
+
+
+def py_flash_parts(config, syshw):
+    try:
+        return gen_flash_parts(config, get_hw_model(syshw), PROCESSOR)
+    except FlashPartsUnsupported:
+        return None
+
+
+def tcl_flash_parts(tmp_path, config, hdf):
+    outputf = str(tmp_path / 'flash_parts.txt')
+    body = '''source {%s}
+if { [catch {get_flash_width_parts [list %s %s %s %s]}] } {
+	puts FAILED
+}
+''' % (FAKE_HSI, config, IPINFO, hdf, outputf)
+    if run_procs('petalinux_hsm.tcl', body, str(tmp_path)):
+        return None
+    with open(outputf, 'r') as output_f:
+        return output_f.read()
+
+
+def check(tmp_path, config_lines, cells=CELLS):
+    config = tmp_path / 'config'
+    config.write_text(''.join('%s\n' % line for line in config_lines))
+    syshw, hdf = write_hw(tmp_path, cells)
+    generated = py_flash_parts(str(config), syshw)
+    expected = tcl_flash_parts(tmp_path, str(config), hdf)
+    if expected is None:
+        assert generated is None
+    elif generated is not None:
+        assert generated == expected
+    return generated
+
+
+QSPI_PARTS = [
+    'CONFIG_SUBSYSTEM_FLASH_PSU_QSPI_0_BANKLESS_SELECT=y',
+    'CONFIG_SUBSYSTEM_FLASH_PSU_QSPI_0_BANKLESS_PART0_NAME="boot"',
+    'CONFIG_SUBSYSTEM_FLASH_PSU_QSPI_0_BANKLESS_PART0_SIZE=0x1e00000',
+    'CONFIG_SUBSYSTEM_FLASH_PSU_QSPI_0_BANKLESS_PART1_NAME="bootenv"',
+    'CONFIG_SUBSYSTEM_FLASH_PSU_QSPI_0_BANKLESS_PART1_SIZE=0x40000',
+    'CONFIG_SUBSYSTEM_FLASH_PSU_QSPI_0_BANKLESS_PART2_NAME="kernel"',
+    'CONFIG_SUBSYSTEM_FLASH_PSU_QSPI_0_BANKLESS_PART2_SIZE=0x2240000',
+]
+
+
+def test_qspi(tmp_path):
+    assert check(tmp_path, QSPI_PARTS) == \
+        'flash_type=spi\nboot=0 0x1e00000\nkernel=0x1e40000 0x2240000\n'
+
+
+def test_parallel_flash_bank(tmp_path):
+    assert check(tmp_path, [
+        'CONFIG_SUBSYSTEM_FLASH_AXI_EMC_0_BANK1_SELECT=y',
+        'CONFIG_SUBSYSTEM_FLASH_AXI_EMC_0_BANK1_PART0_NAME="boot"',
+        'CONFIG_SUBSYSTEM_FLASH_AXI_EMC_0_BANK1_PART0_SIZE=0x100000',
+    ]) == 'flash_type=parallel\nflash_width=32\nflash_size=0x1000000\n' \
+        'boot=0 0x100000\n'
+
+
+def test_no_flash(tmp_path):
+    assert check(tmp_path, ['CONFIG_SUBSYSTEM_FLASH_MANUAL_SELECT=y']) == ''
+    assert check(tmp_path, ['CONFIG_SUBSYSTEM_SERIAL_PSU_UART_0_SELECT=y']) \
+        == ''
+
+
+def test_flash_not_in_hardware(tmp_path):
+    assert check(tmp_path, ['CONFIG_SUBSYSTEM_FLASH_PS7_QSPI_0_SELECT=y']) \
+        is None
+
+
+def random_config():
+    flash = random.choice(['PSU_QSPI_0_BANKLESS', 'AXI_QUAD_SPI_0_BANK0',
+                           'AXI_EMC_0_BANK0', 'AXI_EMC_0_BANK1'] * 3 +
+                          ['AXI_EMC_0_BANK2', 'PSU_UART_0', 'MANUAL'])
+    lines = ['CONFIG_SUBSYSTEM_FLASH_%s_SELECT=y' % flash]
+    prefix = 'CONFIG_SUBSYSTEM_FLASH_%s_PART' % flash
+    names = ['boot', 'bootenv', 'kernel', 'fpga', 'dtb', 'jffs2', 'spare',
+             'myboot'] * 3 + ['a b', '']
+    sizes = [lambda: '0x%x' % random.randint(0, 1 << 28),
+             lambda: '%d' % random.randint(0, 1 << 20)] * 10 + \
+        [lambda: '0', lambda: '010', lambda: '0x', lambda: '1 2']
+    for i in range(random.randint(0, 6)):
+        if random.random() < 0.95:
+            lines.append('%s%d_NAME="%s"' % (prefix, i, random.choice(names)))
+        if random.random() < 0.98:
+            lines.append('%s%d_SIZE=%s' % (prefix, i,
+                                           random.choice(sizes)()))
+    if random.random() < 0.2:
+        lines.append('CONFIG_SUBSYSTEM_IMAGES_ADVANCED_AUTOCONFIG_%s'
+                     '_PART_NAME="%s"' % (flash, random.choice(names)))
+    random.shuffle(lines)
+    return lines
+
+
+@pytest.mark.parametrize('seed', range(60))
+def test_random_configs(tmp_path, seed):
+    random.seed(seed)
+    check(tmp_path, random_config())
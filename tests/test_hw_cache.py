@@ -0,0 +1,208 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import sys
+import time
+import socket
+import threading
+import subprocess
+import http.server
+import urllib.error
+import urllib.request
+
+import pytest
+
+import hw_cache
+from hw_cache import LocalCache, HttpCache, HwCache, CacheRequestHandler, \
+    cache_key, sha256_data
+
+OBJECT_SIZE = 1000
+
+
+def write_outputs(out_dir, name, size=OBJECT_SIZE):
+    '''An output named name, of size bytes unique to it.'''
+    out_dir.mkdir(exist_ok=True)
+    output = out_dir / name
+    output.write_bytes(name.encode().ljust(size, b'.'))
+    return [str(output)]
+
+
+def save(cache, tmp_path, name, age=0):
+    '''Save an entry with one object, both last used age seconds ago.'''
+    key = cache_key(name=name)
+    outputs = write_outputs(tmp_path / 'saved', name)
+    cache.save(key, outputs)
+    store = cache.store
+    with open(outputs[0], 'rb') as output_f:
+        digest = sha256_data(output_f.read())
+    used = time.time() - age
+    for filename in (store._file('entries', key),
+                     store._file('objects', digest)):
+        os.utime(filename, (used, used))
+    return key
+
+
+def fetch(cache, tmp_path, name):
+    return cache.fetch(cache_key(name=name),
+                       [str(tmp_path / 'fetched' / name)])
+
+
+@pytest.fixture
+def fetched(tmp_path):
+    (tmp_path / 'fetched').mkdir()
+
+
+def test_round_trip(tmp_path, fetched):
+    cache = HwCache(LocalCache(str(tmp_path / 'cache'), 1 << 20))
+    save(cache, tmp_path, 'Kconfig.syshw')
+    assert fetch(cache, tmp_path, 'Kconfig.syshw')
+    assert (tmp_path / 'fetched' / 'Kconfig.syshw').read_bytes() == \
+        (tmp_path / 'saved' / 'Kconfig.syshw').read_bytes()
+    assert not fetch(cache, tmp_path, 'plnx_syshw_data')
+
+
+def test_evicts_least_recently_used(tmp_path, fetched):
+    # An entry and its object take about 1.2 KB: four fit, the fifth
+    # crosses the size and eviction trims the cache to three
+    store = LocalCache(str(tmp_path / 'cache'), 5000)
+    cache = HwCache(store)
+    for age, name in enumerate(['a', 'b', 'c', 'd']):
+        save(cache, tmp_path, name, age=7200 - age * 100)
+    assert len(list(store._files('entries'))) == 4
+    # Using a makes b and c the least recently used
+    assert fetch(cache, tmp_path, 'a')
+    save(cache, tmp_path, 'e')
+    for name in ('b', 'c'):
+        assert not fetch(cache, tmp_path, name)
+    for name in ('a', 'd', 'e'):
+        assert fetch(cache, tmp_path, name)
+    # Their objects went with them, past their grace period
+    assert len(list(store._files('objects'))) == 3
+
+
+def test_no_eviction_below_size(tmp_path, monkeypatch):
+    store = LocalCache(str(tmp_path / 'cache'), 1 << 20)
+    cache = HwCache(store)
+    monkeypatch.setattr(store, 'evict', lambda: pytest.fail('evicted'))
+    for name in ('a', 'b', 'c'):
+        save(cache, tmp_path, name)
+
+
+def test_recent_objects_survive_eviction(tmp_path, fetched):
+    store = LocalCache(str(tmp_path / 'cache'), 2 * OBJECT_SIZE + 1000)
+    # Objects another run stored for an entry it has not written yet
+    for name in ('pending', 'expired'):
+        data = name.encode().ljust(OBJECT_SIZE, b'.')
+        store.put('objects', sha256_data(data), data)
+    expired = store._file('objects', sha256_data(
+        b'expired'.ljust(OBJECT_SIZE, b'.')))
+    os.utime(expired, (0, 0))
+    cache = HwCache(store)
+    save(cache, tmp_path, 'a', age=100)
+    save(cache, tmp_path, 'b')
+    assert not os.path.exists(expired)
+    assert sorted(f for f, _ in store._files('objects')) == sorted(
+        sha256_data(name.encode().ljust(OBJECT_SIZE, b'.'))
+        for name in ('pending', 'a', 'b'))
+
+
+def test_stored_object_restarts_grace(tmp_path):
+    store = LocalCache(str(tmp_path / 'cache'), 1 << 20)
+    data = b'object'
+    store.put('objects', sha256_data(data), data)
+    filename = store._file('objects', sha256_data(data))
+    os.utime(filename, (0, 0))
+    store.put('objects', sha256_data(data), data)
+    assert os.path.getmtime(filename) > time.time() - 60
+
+
+def test_rejects_corrupted_object(tmp_path, fetched):
+    store = LocalCache(str(tmp_path / 'cache'), 1 << 20)
+    cache = HwCache(store)
+    save(cache, tmp_path, 'a')
+    digest, filename = next(store._files('objects'))
+    with open(filename, 'ab') as object_f:
+        object_f.write(b'corrupted')
+    assert not fetch(cache, tmp_path, 'a')
+    assert not (tmp_path / 'fetched' / 'a').exists()
+    # Saving the outputs again replaces the corrupted object
+    save(cache, tmp_path, 'a')
+    assert fetch(cache, tmp_path, 'a')
+
+
+def test_rejects_entry_of_other_key(tmp_path, fetched):
+    store = LocalCache(str(tmp_path / 'cache'), 1 << 20)
+    cache = HwCache(store)
+    save(cache, tmp_path, 'a')
+    store.put('entries', cache_key(name='b'),
+              store.get('entries', cache_key(name='a')))
+    assert not cache.fetch(cache_key(name='b'),
+                           [str(tmp_path / 'fetched' / 'a')])
+
+
+@pytest.fixture
+def server(tmp_path):
+    '''URL of a CacheRequestHandler over a local cache.'''
+    handler = type('Handler', (CacheRequestHandler,), {
+        'store': LocalCache(str(tmp_path / 'served'), 1 << 20),
+        'log_message': lambda self, *args: None})
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever)
+    thread.start()
+    yield 'http://127.0.0.1:%d' % httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+    thread.join()
+
+
+def test_http_round_trip(tmp_path, fetched, server):
+    cache = HwCache(HttpCache(server))
+    save_key = cache_key(name='a')
+    cache.save(save_key, write_outputs(tmp_path / 'saved', 'a'))
+    assert fetch(cache, tmp_path, 'a')
+    assert not fetch(cache, tmp_path, 'b')
+    assert os.path.exists(LocalCache(str(tmp_path / 'served'), 0)._file(
+        'entries', save_key))
+
+
+@pytest.mark.parametrize('path', ['/objects', '/other/' + '0' * 64,
+                                  '/objects/../x', '/objects/' + 'g' * 64])
+def test_http_bad_path(server, path):
+    with pytest.raises(urllib.error.HTTPError) as e:
+        urllib.request.urlopen(server + path)
+    assert e.value.code == 404
+
+
+def test_http_rejects_object_digest_mismatch(server):
+    request = urllib.request.Request(
+        '%s/objects/%s' % (server, sha256_data(b'data')), data=b'other',
+        method='PUT')
+    with pytest.raises(urllib.error.HTTPError) as e:
+        urllib.request.urlopen(request)
+    assert e.value.code == 400
+    assert HttpCache(server).get('objects', sha256_data(b'data')) is None
+
+
+def test_serve(tmp_path, fetched):
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    proc = subprocess.Popen([sys.executable, hw_cache.__file__, 'serve',
+                             str(tmp_path / 'served'), str(port)],
+                            stderr=subprocess.DEVNULL)
+    try:
+        cache = HwCache(HttpCache('http://127.0.0.1:%d' % port))
+        for _ in range(100):
+            try:
+                socket.create_connection(('127.0.0.1', port)).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        cache.save(cache_key(name='a'), write_outputs(tmp_path / 'saved',
+                                                      'a'))
+        assert fetch(cache, tmp_path, 'a')
+    finally:
+        proc.terminate()
+        proc.wait()
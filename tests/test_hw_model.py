@@ -0,0 +1,87 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+
+import pytest
+import yaml
+
+from hw_model import load_syshw, SyshwSidecar, sidecar_file
+from tcl_procs import run_procs
+
+
+def write_syshw(cwd, datanodes):
+    '''plnx_syshw_data and its sidecar, as plnx_gen_hwsysconf writes
+    them for these plnx_output_data calls.'''
+    body = ['set plnx_json_nodes {}', 'set plnx_json_plain 1',
+            'set plnx_data [open plnx_syshw_data w]']
+    body += ['plnx_output_data {%s}' % nodes for nodes in datanodes]
+    body += ['close ${plnx_data}',
+             'plnx_output_json plnx_syshw_data.json']
+    run_procs('hw-description.tcl', '\n'.join(body) + '\n', cwd)
+    return os.path.join(cwd, 'plnx_syshw_data')
+
+
+def syshw_tree(syshw):
+    data = dict(syshw.top)
+    if syshw.processor_names():
+        data['processor'] = {name: syshw.processor(name)
+                             for name in syshw.processor_names()}
+    return data
+
+
+PLAIN = [
+    'serial_ipname psu_uart_0',
+    'memory {psu_ddr_0 {ip_name psu_ddr} {baseaddr 0x0} {size 0x7ff00000}'
+    ' {enabled true} {count 2} {ratio 1.5} {empty {}}}',
+    'processor {psu_cortexa53_0 {ip_name psu_cortexa53} {arch aarch64}'
+    ' {slaves {psu_uart_0 {ip_name psu_uart} {baud 115200}}}}'
+    ' {psu_cortexr5_0 {ip_name psu_cortexr5} {arch arm}}',
+]
+
+
+def test_plain_sidecar(tmp_path):
+    syshw_file = write_syshw(str(tmp_path), PLAIN)
+    with open(syshw_file) as syshw_f:
+        expected = yaml.safe_load(syshw_f)
+    sidecar = SyshwSidecar(syshw_file)
+    assert sidecar.resolve.__class__.__name__ == 'PlainScalars'
+    assert syshw_tree(sidecar) == expected
+    assert syshw_tree(load_syshw(syshw_file)) == expected
+
+
+@pytest.mark.parametrize('scalar', [
+    "'x'", '{"x"}', 'a #b', '{- x}', '{key: v}', '*alias', '&anchor',
+    '{[a, b]}', '{{a: b}}', '!tag', '|', 'http://host:8080/path',
+    '{a#b}', '-1', '{C:\\\\path}'])
+def test_sidecar_reads_as_yaml(scalar, tmp_path):
+    datanodes = PLAIN + ['extra {%s {value %s}}' % ('k', scalar)]
+    syshw_file = write_syshw(str(tmp_path), datanodes)
+    with open(syshw_file) as syshw_f:
+        try:
+            expected = yaml.safe_load(syshw_f)
+        except yaml.YAMLError:
+            # Nor may the sidecar hide a YAML which does not load
+            with pytest.raises(yaml.YAMLError):
+                load_syshw(syshw_file)
+            return
+    assert syshw_tree(load_syshw(syshw_file)) == expected
+    # Loaded again from the sidecar load_syshw left
+    assert syshw_tree(SyshwSidecar(syshw_file)) == expected
+
+
+def test_value_and_children(tmp_path):
+    '''The YAML of a node with a value and children does not load,
+    which the sidecar must not hide.'''
+    syshw_file = write_syshw(str(tmp_path), ['node value {child 1}'])
+    with pytest.raises(yaml.YAMLError):
+        load_syshw(syshw_file)
+
+
+def test_stale_sidecar(tmp_path):
+    syshw_file = write_syshw(str(tmp_path), PLAIN)
+    with open(syshw_file, 'a') as syshw_f:
+        syshw_f.write('serial_ipname: psu_uart_1\n')
+    os.utime(sidecar_file(syshw_file), (1, 1))
+    assert load_syshw(syshw_file).top['serial_ipname'] == 'psu_uart_1'
@@ -0,0 +1,33 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+from tcl_procs import run_procs, scripts_dir
+
+# generate_mapping_list as it was before the device type index: every
+# ip of ipinfo.yaml scanned for each device type
+MAPPING_LISTS = '''source {%s/libs/ipinfo_cache.tcl}
+set scripts_path {%s}
+set indexed [generate_mapping_list]
+set scanned {}
+foreach devtype_mapping ${indexed} {
+	set devtype [lindex ${devtype_mapping} 0]
+	set ips {devices}
+	foreach ipinfo [get_ipinfo] {
+		if {[is_ip_valid_for_device_type "${devtype}" ${ipinfo}] >= 0} {
+			lappend ips ${ipinfo}
+		}
+	}
+	lappend scanned [lreplace ${devtype_mapping} end end ${ips}]
+}
+puts ${indexed}
+puts ${scanned}
+'''
+
+
+def test_mapping_list_matches_scan(tmp_path):
+    indexed, scanned = run_procs(
+        'hw-description.tcl', MAPPING_LISTS % (scripts_dir, scripts_dir),
+        str(tmp_path)).splitlines()
+    assert indexed == scanned
+    assert 'psu_uart' in indexed
@@ -0,0 +1,94 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+
+import pytest
+
+import gen_config
+import kconfig
+from kconfig_trees import CASES, setup_case, expected_file
+
+
+def read(filename):
+    with open(filename, 'r', encoding='utf-8') as file_f:
+        return file_f.read()
+
+
+@pytest.mark.parametrize('case', sorted(CASES))
+def test_silentconfig_matches_conf(case, tmp_path):
+    Kconfig, cfgfile = setup_case(case, str(tmp_path))
+    kconfig.silentconfig(Kconfig, cfgfile)
+    assert read(cfgfile) == read(expected_file(case))
+
+
+@pytest.mark.parametrize('case', sorted(CASES))
+def test_silentconfig_is_stable(case, tmp_path):
+    '''A second run over its own output changes nothing, like conf.'''
+    Kconfig, cfgfile = setup_case(case, str(tmp_path))
+    kconfig.silentconfig(Kconfig, cfgfile)
+    assert not kconfig.silentconfig(Kconfig, cfgfile)
+
+
+def test_old_config_kept(tmp_path):
+    Kconfig, cfgfile = setup_case('constructs-user', str(tmp_path))
+    before = read(cfgfile)
+    assert kconfig.silentconfig(Kconfig, cfgfile)
+    assert read(cfgfile + '.old') == before
+
+
+def test_unchanged_config_untouched(tmp_path):
+    Kconfig, cfgfile = setup_case('constructs-user', str(tmp_path))
+    kconfig.silentconfig(Kconfig, cfgfile)
+    os.remove(cfgfile + '.old')
+    mtime = os.stat(cfgfile).st_mtime_ns
+    assert not kconfig.silentconfig(Kconfig, cfgfile)
+    assert os.stat(cfgfile).st_mtime_ns == mtime
+    assert not os.path.exists(cfgfile + '.old')
+
+
+def test_missing_config(tmp_path):
+    Kconfig, cfgfile = setup_case('constructs-empty', str(tmp_path))
+    os.remove(cfgfile)
+    assert kconfig.silentconfig(Kconfig, cfgfile)
+    assert read(cfgfile) == read(expected_file('constructs-empty'))
+    assert not os.path.exists(cfgfile + '.old')
+
+
+UNSUPPORTED = {
+    'option': 'config MODULES\n\tbool "Modules"\n\toption modules\n',
+    'macro': 'config SHELL\n\tstring "Shell"\n\tdefault $(shell,true)\n',
+    'missing-source': 'source "missing/Kconfig"\n',
+    'unterminated-menu': 'menu "Open"\nconfig A\n\tbool "A"\n',
+    'choice-nesting': 'choice\n\tprompt "Choice"\nconfig A\n\tbool "A"\n'
+                      'config B\n\tbool "B"\n\tdepends on A\nendchoice\n',
+}
+
+
+@pytest.mark.parametrize('name', sorted(UNSUPPORTED))
+def test_unsupported_raises(name, tmp_path):
+    Kconfig = str(tmp_path / 'Kconfig')
+    with open(Kconfig, 'w') as kconfig_f:
+        kconfig_f.write(UNSUPPORTED[name])
+    with pytest.raises(kconfig.KconfigError):
+        kconfig.silentconfig(Kconfig, str(tmp_path / 'config'))
+
+
+@pytest.mark.parametrize('name', sorted(UNSUPPORTED))
+def test_unsupported_falls_back_to_conf(name, tmp_path, monkeypatch):
+    Kconfig = str(tmp_path / 'Kconfig')
+    cfgfile = str(tmp_path / 'config')
+    with open(Kconfig, 'w') as kconfig_f:
+        kconfig_f.write(UNSUPPORTED[name])
+    commands = []
+
+    def getstatusoutput(cmd):
+        commands.append(cmd)
+        return 0, ''
+    monkeypatch.setattr(gen_config.subprocess, 'getstatusoutput',
+                        getstatusoutput)
+    gen_config.run_menuconfig(Kconfig, cfgfile, None, str(tmp_path), 'test')
+    assert commands == ['yes "" | env KCONFIG_CONFIG=%s conf %s'
+                        % (cfgfile, Kconfig)]
+    assert not os.path.exists(cfgfile)
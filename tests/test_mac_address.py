@@ -0,0 +1,70 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+import pytest
+
+import gen_config
+
+PATTERN = '00:0a:35:00:??:??'
+# gen_mac_address in a run of its own
+RUN_GEN_MAC = '''import sys
+import argparse
+import gen_config
+args = argparse.Namespace(hw_file=sys.argv[1], machine=sys.argv[2],
+                          deterministic=True)
+print(gen_config.gen_mac_address(args, sys.argv[3], sys.argv[4]))
+'''
+
+
+@pytest.fixture
+def hw_file(tmp_path):
+    sdt = tmp_path / 'sdt'
+    sdt.mkdir()
+    (sdt / 'system-top.dts').write_text('/dts-v1/;\n')
+    return str(sdt / 'system-top.dts')
+
+
+def mac(hw_file, machine='zcu102-rev1.0', ethdevname='PSU_ETHERNET_3',
+        deterministic=True):
+    args = argparse.Namespace(hw_file=hw_file, machine=machine,
+                              deterministic=deterministic)
+    return gen_config.gen_mac_address(args, ethdevname, PATTERN)
+
+
+def test_same_across_runs(hw_file):
+    macs = set()
+    for hash_seed in ('0', '1'):
+        # A new interpreter, its str hashes salted differently
+        env = dict(os.environ, PYTHONHASHSEED=hash_seed,
+                   PYTHONPATH=os.path.dirname(gen_config.__file__))
+        macs.add(subprocess.check_output(
+            [sys.executable, '-c', RUN_GEN_MAC, hw_file, 'zcu102-rev1.0',
+             'PSU_ETHERNET_3', PATTERN], env=env, text=True).strip())
+    assert macs == {mac(hw_file)}
+    assert re.match(r'00:0a:35:00:\d\d:\d\d\Z', mac(hw_file))
+
+
+def test_different_inputs(hw_file, tmp_path):
+    macs = {mac(hw_file), mac(hw_file, machine='zcu104-revc'),
+            mac(hw_file, ethdevname='PSU_ETHERNET_0'),
+            mac(hw_file, machine=None)}
+    assert len(macs) == 4
+    # Another design
+    with open(hw_file, 'a') as dts_f:
+        dts_f.write('/ { model = "other"; };\n')
+    assert mac(hw_file) not in macs
+
+
+def test_pattern_kept(hw_file):
+    args = argparse.Namespace(hw_file=hw_file, machine=None,
+                              deterministic=False)
+    new_mac = gen_config.gen_mac_address(args, 'PSU_ETHERNET_3',
+                                         '02:??:35:00:00:?1')
+    assert re.match(r'02:\d\d:35:00:00:\d1\Z', new_mac)
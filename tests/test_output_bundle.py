@@ -0,0 +1,92 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import json
+import argparse
+
+import pytest
+
+from output_bundle import relocate, export_bundle, import_bundle
+from stage_manifest import MANIFEST_FILE, file_digest
+
+SITE_CONF = '''SSTATE_MIRRORS:prepend = " \\
+\tfile://.* file://{build}/sstate/aarch64/PATH \\n \\
+\tfile://.* file://{output}/sstate/PATH \\n"
+SOURCE_MIRROR_URL = "file://{build}/downloads"
+'''
+PLNXTOOL_CONF = '''UNINATIVE_URL = "file://{build}/uninative/"
+TMPDIR = "{build}/tmp"
+CONFIG_DTFILE = "{output}/system.dts"
+BUILDDIR_COPY = "{exported_build}2/not-relocated"
+'''
+
+
+@pytest.mark.parametrize('text, relocated', [
+    ('UNINATIVE_URL = "file:///b/dir/x"',
+     'UNINATIVE_URL = "file://@@BUILDDIR@@/x"'),
+    ('file:/b/dir', 'file:@@BUILDDIR@@'),
+    ('"///b/dir"', '"//@@BUILDDIR@@"'),
+    ('TMPDIR = "/b/dir/tmp"', 'TMPDIR = "@@BUILDDIR@@/tmp"'),
+    ('/b/dirx /a/b/dir a/b/dir /a//b/dir',
+     '/b/dirx /a/b/dir a/b/dir /a//b/dir'),
+])
+def test_relocate(text, relocated):
+    assert relocate(text, {'@@BUILDDIR@@': '/b/dir'}) == relocated
+
+
+def host(tmp_path, name, monkeypatch):
+    '''Output, hw and BUILDDIR directories of a build host.'''
+    root = tmp_path / name
+    build = root / 'build'
+    build.mkdir(parents=True)
+    output = build / 'conf'
+    output.mkdir()
+    sdt = root / 'sdt'
+    sdt.mkdir()
+    (sdt / 'system-top.dts').write_text('/dts-v1/;\n')
+    monkeypatch.setenv('BUILDDIR', str(build))
+    return argparse.Namespace(output=str(output),
+                              hw_file=str(sdt / 'system-top.dts'),
+                              hw_description=str(sdt), soc_family='zynqmp')
+
+
+def conf_files(args, exported_build):
+    fmt = dict(build=os.environ['BUILDDIR'], output=args.output,
+               exported_build=exported_build)
+    return {'site.conf': SITE_CONF.format(**fmt),
+            'plnxtool.conf': PLNXTOOL_CONF.format(**fmt)}
+
+
+def test_round_trip(tmp_path, monkeypatch):
+    exporter = host(tmp_path, 'a', monkeypatch)
+    exported_build = os.environ['BUILDDIR']
+    outputs = {}
+    for name, text in conf_files(exporter, exported_build).items():
+        outputs[os.path.join(exporter.output, name)] = text
+        with open(os.path.join(exporter.output, name), 'w') as conf_f:
+            conf_f.write(text)
+    with open(os.path.join(exporter.output, MANIFEST_FILE), 'w') as manifest_f:
+        json.dump({'stages': {'plnxtool-conf': {
+            'inputs': {exporter.hw_file: file_digest(exporter.hw_file)},
+            'outputs': {f: file_digest(f) for f in outputs}}}}, manifest_f)
+    exporter.export_bundle = str(tmp_path / 'bundle.tar.gz')
+    export_bundle(exporter, 'sdt', 'hwhash')
+
+    importer = host(tmp_path, 'b', monkeypatch)
+    importer.import_bundle = exporter.export_bundle
+    import_bundle(importer, 'sdt', 'hwhash')
+    # Paths only starting like BUILDDIR stay as they are
+    expected = conf_files(importer, exported_build)
+    for name, text in expected.items():
+        with open(os.path.join(importer.output, name), 'r') as conf_f:
+            assert conf_f.read() == text
+    assert 'file://%s/uninative/' % os.environ['BUILDDIR'] in \
+        expected['plnxtool.conf']
+    with open(os.path.join(importer.output, MANIFEST_FILE), 'r') as manifest_f:
+        stage = json.load(manifest_f)['stages']['plnxtool-conf']
+    assert stage['outputs'] == {
+        os.path.join(importer.output, name): file_digest(
+            os.path.join(importer.output, name)) for name in expected}
+    assert list(stage['inputs']) == [importer.hw_file]
@@ -0,0 +1,86 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+
+import pytest
+
+import output_writer
+from output_writer import write_if_changed, copy_if_changed
+
+
+@pytest.fixture
+def changed_outputs(monkeypatch):
+    changed = []
+    monkeypatch.setattr(output_writer, 'changed_outputs', changed)
+    return changed
+
+
+def backdate(path):
+    '''Sets the mtime of path an hour back, a rewrite could not keep.'''
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - 3600 * 10 ** 9))
+    return os.stat(path)
+
+
+@pytest.mark.parametrize('data', ['MACHINE = "zcu102"\n',
+                                  b'\x00binary\xff'])
+def test_identical_kept(tmp_path, changed_outputs, data):
+    out = tmp_path / 'plnxtool.conf'
+    assert write_if_changed(str(out), data)
+    before = backdate(out)
+    assert not write_if_changed(str(out), data)
+    after = os.stat(out)
+    assert (after.st_ino, after.st_mtime_ns) == \
+        (before.st_ino, before.st_mtime_ns)
+    assert changed_outputs == [str(out)]
+
+
+def test_changed_replaced(tmp_path, changed_outputs):
+    out = tmp_path / 'plnxtool.conf'
+    out.write_text('MACHINE = "zcu102"\n')
+    out.chmod(0o640)
+    before = backdate(out)
+    assert write_if_changed(str(out), 'MACHINE = "zcu104"\n')
+    after = os.stat(out)
+    assert out.read_text() == 'MACHINE = "zcu104"\n'
+    # A new file renamed over the old one, with the old one's mode
+    assert after.st_ino != before.st_ino
+    assert after.st_mtime_ns != before.st_mtime_ns
+    assert after.st_mode == before.st_mode
+    assert os.listdir(tmp_path) == ['plnxtool.conf']
+    assert changed_outputs == [str(out)]
+
+
+def test_failed_write_keeps_old(tmp_path, changed_outputs, monkeypatch):
+    out = tmp_path / 'plnxtool.conf'
+    out.write_text('MACHINE = "zcu102"\n')
+
+    def replace(src, dst):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(os, 'replace', replace)
+    with pytest.raises(OSError):
+        write_if_changed(str(out), 'MACHINE = "zcu104"\n')
+    assert out.read_text() == 'MACHINE = "zcu102"\n'
+    assert os.listdir(tmp_path) == ['plnxtool.conf']
+    assert changed_outputs == []
+
+
+def test_copy_if_changed(tmp_path, changed_outputs):
+    src = tmp_path / 'system.dtb'
+    src.write_bytes(b'\xd0\x0d\xfe\xed')
+    dst_dir = tmp_path / 'out'
+    dst_dir.mkdir()
+    dst = dst_dir / 'system.dtb'
+    assert copy_if_changed(str(src), str(dst_dir))
+    before = backdate(dst)
+    assert not copy_if_changed(str(src), str(dst))
+    assert os.stat(dst).st_ino == before.st_ino
+    src.write_bytes(b'\xd0\x0d\xfe\xee')
+    assert copy_if_changed(str(src), str(dst))
+    assert dst.read_bytes() == b'\xd0\x0d\xfe\xee'
+    assert os.stat(dst).st_ino != before.st_ino
+    assert os.listdir(dst_dir) == ['system.dtb']
+    assert changed_outputs == [str(dst)]
@@ -0,0 +1,99 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import json
+import argparse
+
+import pytest
+
+import run_stamp
+
+
+@pytest.fixture
+def args(tmp_path, monkeypatch):
+    '''A recorded run of a design whose stage read input.cfg.'''
+    for name in run_stamp.ENV_NAMES:
+        if name != 'PATH':
+            monkeypatch.delenv(name, raising=False)
+    output = tmp_path / 'output'
+    output.mkdir()
+    hw_description = tmp_path / 'system.xsa'
+    hw_description.write_text('design 1')
+    stage_input = tmp_path / 'input.cfg'
+    stage_input.write_text('CONFIG_A=y\n')
+    (output / '.stages.json').write_text(json.dumps({'stages': {'stage': {
+        'inputs': [str(stage_input)], 'outputs': [], 'reads': []}}}))
+    args = argparse.Namespace(
+        soc_family='zynqmp', hw_description=str(hw_description),
+        machine=None, output=str(output), xsct_tool=None,
+        native_sysroot=None, sdt_sysroot=None, petalinux=False,
+        add_rootfsconfig=None, deterministic=False, menuconfig=None,
+        export_bundle=None, import_bundle=None, check=False)
+    monkeypatch.setattr(run_stamp, 'start_env', None)
+    run_stamp.record(args)
+    return args
+
+
+def exit_status(args, monkeypatch, check=False):
+    '''Exit status of the up to date check of a new run, None when it
+    goes on to regenerate.'''
+    monkeypatch.setattr(run_stamp, 'start_env', None)
+    args.check = check
+    try:
+        run_stamp.exit_if_uptodate(args)
+    except SystemExit as e:
+        return e.code
+    return None
+
+
+@pytest.mark.parametrize('check', [False, True])
+def test_uptodate(args, monkeypatch, check):
+    assert exit_status(args, monkeypatch, check) == 0
+
+
+def test_changed_arg(args, monkeypatch):
+    args.machine = 'zcu102-zynqmp'
+    assert exit_status(args, monkeypatch) is None
+    assert exit_status(args, monkeypatch, check=True) == 1
+
+
+@pytest.mark.parametrize('name', ['hw_description', 'stage_input'])
+def test_changed_file(args, monkeypatch, tmp_path, name):
+    changed = {'hw_description': args.hw_description,
+               'stage_input': str(tmp_path / 'input.cfg')}[name]
+    st = os.stat(changed)
+    with open(changed, 'r+') as changed_f:
+        contents = changed_f.read()
+        changed_f.seek(0)
+        # Same size and mtime: only the racy digest tells it apart
+        changed_f.write(contents.replace(contents[-2], 'x'))
+    os.utime(changed, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert exit_status(args, monkeypatch) is None
+    assert exit_status(args, monkeypatch, check=True) == 1
+
+
+@pytest.mark.parametrize('name', [n for n in run_stamp.ENV_NAMES
+                                  if n != 'PATH'])
+@pytest.mark.parametrize('value', ['', '1'])
+def test_changed_env(args, monkeypatch, name, value):
+    monkeypatch.setenv(name, value)
+    assert exit_status(args, monkeypatch, check=True) == 1
+    assert exit_status(args, monkeypatch) is None
+
+
+def test_path_extended_by_run(args, monkeypatch):
+    '''The run adds the tools to PATH after the check, what it records
+    is the environment it started with.'''
+    monkeypatch.setattr(run_stamp, 'start_env', None)
+    run_stamp.run_env()
+    monkeypatch.setenv('PATH', os.environ['PATH'] + os.pathsep + '/xsct/bin')
+    run_stamp.record(args)
+    monkeypatch.setenv('PATH', os.environ['PATH'].rsplit(os.pathsep, 1)[0])
+    assert exit_status(args, monkeypatch) == 0
+
+
+def test_failed_run(args, monkeypatch):
+    run_stamp.invalidate(args)
+    assert exit_status(args, monkeypatch, check=True) == 1
@@ -0,0 +1,68 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+
+import pytest
+
+from sdt_manifest import build_manifest, manifest_root, diff_manifests, \
+    load_manifest, save_manifest
+
+SDT = {'system-top.dts': '/dts-v1/;\n#include "pl.dtsi"\n',
+       'pl.dtsi': '/ { amba_pl: amba_pl { }; };\n',
+       'pcw.dtsi': '&uart0 { status = "okay"; };\n',
+       'include/dt-bindings/gpio.h': '#define GPIO_ACTIVE_LOW 1\n',
+       'psu_init.c': 'int psu_init(void) { return 0; }\n'}
+
+
+@pytest.fixture
+def sdt_dir(tmp_path):
+    sdt = tmp_path / 'sdt'
+    for path, text in SDT.items():
+        (sdt / path).parent.mkdir(parents=True, exist_ok=True)
+        (sdt / path).write_text(text)
+    return sdt
+
+
+def test_unchanged(sdt_dir, tmp_path):
+    manifest = build_manifest(str(sdt_dir))
+    assert sorted(manifest) == sorted(
+        p.replace('/', os.sep) for p in SDT)
+    manifest_file = str(tmp_path / 'sdt-manifest.json')
+    save_manifest(manifest_file, manifest)
+    again = build_manifest(str(sdt_dir))
+    assert again == load_manifest(manifest_file)
+    assert manifest_root(again) == manifest_root(manifest)
+    assert diff_manifests(manifest, again) == []
+
+
+@pytest.mark.parametrize('change, changes', [
+    (lambda sdt: (sdt / 'pl.dtsi').write_text('/ { };\n'),
+     [('pl.dtsi', 'modified')]),
+    (lambda sdt: (sdt / 'include/dt-bindings/gpio.h').write_text(
+        '#define GPIO_ACTIVE_LOW 0\n'),
+     [('include/dt-bindings/gpio.h', 'modified')]),
+    (lambda sdt: (sdt / 'include/dt-bindings/irq.h').write_text(''),
+     [('include/dt-bindings/irq.h', 'added')]),
+    (lambda sdt: (sdt / 'psu_init.c').unlink(),
+     [('psu_init.c', 'removed')]),
+    # Same contents under another name, or in another directory
+    (lambda sdt: (sdt / 'pcw.dtsi').rename(sdt / 'pcw2.dtsi'),
+     [('pcw.dtsi', 'removed'), ('pcw2.dtsi', 'added')]),
+    (lambda sdt: (sdt / 'include/dt-bindings/gpio.h').rename(
+        sdt / 'include/gpio.h'),
+     [('include/dt-bindings/gpio.h', 'removed'),
+      ('include/gpio.h', 'added')]),
+])
+def test_change_changes_root(sdt_dir, change, changes):
+    manifest = build_manifest(str(sdt_dir))
+    change(sdt_dir)
+    new = build_manifest(str(sdt_dir))
+    assert manifest_root(new) != manifest_root(manifest)
+    assert diff_manifests(manifest, new) == [
+        (path.replace('/', os.sep), what) for path, what in changes]
+
+
+def test_missing_manifest(tmp_path):
+    assert load_manifest(str(tmp_path / 'sdt-manifest.json')) == {}
@@ -0,0 +1,27 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import pytest
+
+from sdt_corpus import cases, case_files, tcl_syshw, py_syshw
+from tcl_procs import tclsh
+
+
+@pytest.mark.parametrize('name', cases())
+def test_matches_sdt_description(name, tmp_path):
+    petalinux_config, ipinfo = case_files(name)
+    generated = py_syshw(petalinux_config, ipinfo)
+    expected = tcl_syshw(tclsh(), petalinux_config, ipinfo, str(tmp_path))
+    if expected is None:
+        # Where the Tcl fails the port must leave it to the Tcl
+        assert generated is None
+    elif generated is not None:
+        assert generated == expected
+
+
+def test_corpus_is_generated():
+    generated = [name for name in cases()
+                 if py_syshw(*case_files(name)) is not None]
+    assert 'zynqmp' in generated
+    assert len(generated) > len(cases()) // 2
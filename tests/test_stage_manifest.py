@@ -0,0 +1,90 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import json
+
+import pytest
+
+import stage_manifest
+from config_store import get_config_store, set_config_value
+from stage_manifest import MANIFEST_FILE, Stage
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    '''An output directory with a config, an input and the output of a
+    stage reading CONFIG_A from the config, each run starting with the
+    manifest on disk.'''
+    monkeypatch.setattr(stage_manifest, 'stage_manifests', {})
+    (tmp_path / 'config').write_text('CONFIG_A=y\nCONFIG_B="b"\n')
+    (tmp_path / 'input.tcl').write_text('proc a {} {}\n')
+    return tmp_path
+
+
+def stage(project):
+    return Stage(str(project), 'gen', [str(project / 'input.tcl')],
+                 {'hw_hash': 'abc'}, [str(project / 'output')],
+                 [str(project / 'config')])
+
+
+def run(project):
+    '''Runs the stage unless it is up to date, returns whether it ran.'''
+    gen = stage(project)
+    if gen.unchanged():
+        return False
+    value = get_config_store(str(project / 'config')).get('CONFIG_A')
+    (project / 'output').write_text('A is %s\n' % value)
+    gen.done()
+    return True
+
+
+def manifest_stages(project):
+    with open(project / MANIFEST_FILE) as manifest_f:
+        return json.load(manifest_f)['stages']
+
+
+def test_unchanged_read_set_skips(project, monkeypatch):
+    assert run(project)
+    assert manifest_stages(project)['gen']['reads'] == [
+        [str(project / 'config'), ['CONFIG_A', 'bool', '=y'], 'y']]
+    monkeypatch.setattr(stage_manifest, 'stage_manifests', {})
+    assert not run(project)
+    # A symbol the stage did not read
+    set_config_value('CONFIG_B', '"c"', str(project / 'config'))
+    assert not run(project)
+
+
+@pytest.mark.parametrize('change, reason', [
+    (lambda project: set_config_value('CONFIG_A', 'disable',
+                                      str(project / 'config')),
+     'CONFIG_A changed in'),
+    (lambda project: (project / 'input.tcl').write_text('proc b {} {}\n'),
+     'input.tcl changed'),
+    (lambda project: (project / 'output').write_text('edited\n'),
+     'output modified'),
+    (lambda project: (project / 'output').unlink(), 'output not found'),
+])
+def test_change_reruns(project, change, reason):
+    assert run(project)
+    change(project)
+    gen = stage(project)
+    assert not gen.unchanged()
+    assert reason in gen.reason
+    assert run(project)
+    assert not run(project)
+
+
+def test_interrupted_stage_reruns(project, monkeypatch):
+    assert run(project)
+    (project / 'input.tcl').write_text('proc b {} {}\n')
+    # The run stops between unchanged() and done()
+    assert not stage(project).unchanged()
+    assert 'gen' not in manifest_stages(project)
+    # The next run does not take the half done stage as up to date,
+    # even once its input is back as it was
+    monkeypatch.setattr(stage_manifest, 'stage_manifests', {})
+    (project / 'input.tcl').write_text('proc a {} {}\n')
+    gen = stage(project)
+    assert not gen.unchanged()
+    assert gen.reason == 'never run'
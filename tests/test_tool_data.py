@@ -0,0 +1,116 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import shutil
+
+import pytest
+
+import tool_data
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    '''Copy of the data files, without any compiled artifact.'''
+    data_dir = str(tmp_path / 'data')
+    os.mkdir(data_dir)
+    for f in set(tool_data.SOURCES + tool_data.TCL_SOURCES):
+        shutil.copy(os.path.join(tool_data.data_dir, f), data_dir)
+    monkeypatch.setattr(tool_data, 'data_dir', data_dir)
+    monkeypatch.setattr(tool_data, 'tool_data', None)
+    return data_dir
+
+
+def test_artifact_round_trip(data_dir):
+    compiled = tool_data.compile_tool_data(data_dir)
+    digests = tool_data.source_digests(data_dir)
+    tool_data.write_tool_data(data_dir, compiled, digests)
+    loaded = tool_data.read_tool_data(data_dir, digests)
+    assert loaded.to_dict() == compiled.to_dict()
+    assert 'psu_cortexa53' in loaded.ip_device_types
+
+
+def test_outdated_artifact(data_dir):
+    digests = tool_data.source_digests(data_dir)
+    tool_data.write_tool_data(data_dir, tool_data.compile_tool_data(data_dir),
+                              digests)
+    with open(os.path.join(data_dir, 'machineconf.json'), 'w') as json_f:
+        json_f.write('{"board": {"dt-boardfile": "board.dtsi"}}')
+    assert tool_data.read_tool_data(
+        data_dir, tool_data.source_digests(data_dir)) is None
+    assert tool_data.get_tool_data().machine_boardfiles == \
+        {'board': 'board.dtsi'}
+
+
+def test_run_leaves_install_untouched(data_dir):
+    before = sorted(os.listdir(data_dir))
+    assert tool_data.get_tool_data().ipinfo
+    assert sorted(os.listdir(data_dir)) == before
+
+
+@pytest.mark.parametrize('contents', ['', 'not json', '[]',
+                                      '{"schema_version": 1}'])
+def test_unreadable_artifact(data_dir, contents):
+    with open(os.path.join(data_dir, tool_data.TOOL_DATA_FILE), 'w') as f:
+        f.write(contents)
+    assert tool_data.read_tool_data(
+        data_dir, tool_data.source_digests(data_dir)) is None
+
+
+SYSHW = '''processor:
+  microblaze_0:
+    ip_name: microblaze
+    linux_kernel_properties:
+      XILINX_MICROBLAZE0_FAMILY: kintex7 string
+      XILINX_MICROBLAZE0_USE_DIV: 1 int
+    slaves:
+      axi_uartlite_0:
+        ip_name: axi_uartlite
+      axi_ethernet_0:
+        ip_name: axi_ethernet
+      mig_7series_0:
+        ip_name: mig_7series
+'''
+
+CONFIG = '''CONFIG_SUBSYSTEM_PROCESSOR_microblaze_0_SELECT=y
+CONFIG_SUBSYSTEM_MEMORY_mig_7series_0_SELECT=y
+CONFIG_SUBSYSTEM_MEMORY_mig_7series_0_BASEADDR=0x80000000
+CONFIG_SUBSYSTEM_SERIAL_axi_uartlite_0_SELECT=y
+CONFIG_SUBSYSTEM_ETHERNET_axi_ethernet_0_SELECT=y
+# CONFIG_SUBSYSTEM_FLASH_MANUAL_SELECT is not set
+'''
+
+
+def test_compiled_kernel_cfg(data_dir, tmp_path, monkeypatch):
+    '''plnx_kernel.cfg lists options in the data files' order, with or
+    without the compiled artifact.'''
+    import argparse
+    import hw_model
+    import gen_plnx_machine
+    output = tmp_path / 'output'
+    output.mkdir()
+    (output / 'plnx_syshw_data').write_text(SYSHW)
+    (output / 'config').write_text(CONFIG)
+    monkeypatch.setattr(gen_plnx_machine, 'default_cfgfile',
+                        str(output / 'config'), raising=False)
+    args = argparse.Namespace(output=str(output), soc_family='microblaze')
+    kernel_cfg = output / 'linux-xlnx' / 'plnx_kernel.cfg'
+
+    def generate():
+        monkeypatch.setattr(hw_model, 'hw_models', {})
+        gen_plnx_machine.generate_kernel_cfg(args)
+        return kernel_cfg.read_bytes()
+
+    in_memory = generate()
+    assert in_memory.startswith(b'CONFIG_MTD=y\nCONFIG_MTD_OF_PARTS=y\n'
+                                b'CONFIG_SERIAL_OF_PLATFORM=y\nCONFIG_NET=y\n'
+                                b'CONFIG_PACKET=y\nCONFIG_UNIX=y\n'
+                                b'CONFIG_INET=y\n')
+    tool_data.write_tool_data(data_dir, tool_data.compile_tool_data(data_dir),
+                              tool_data.source_digests(data_dir))
+    monkeypatch.setattr(tool_data, 'tool_data', None)
+    kernel_cfg.unlink()
+    assert generate() == in_memory
+    assert tool_data.read_tool_data(
+        data_dir, tool_data.source_digests(data_dir)) is not None
@@ -0,0 +1,249 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import random
+import subprocess
+import zipfile
+from xml.sax.saxutils import quoteattr
+
+import pytest
+
+from uboot_bsp import gen_uboot_bsp, UbootBspUnsupported
+from tcl_procs import scripts_dir, tclsh
+
+tests_dir = os.path.dirname(os.path.abspath(__file__))
+FAKE_HSI = os.path.join(tests_dir, 'data', 'fake-hsi.tcl')
+DATA_DIR = os.path.join(scripts_dir, 'data')
+
+# petalinux_hsm_bridge.tcl as xsct runs it: tcllib's yaml is only
+# required, never used, and xsct has to be on PATH
+RUN_BRIDGE = '''source {%s}
+package provide yaml 1.0
+set argv0 {%s}
+set argv [list -c {%s} -hdf {%s} -o {%s} -data {%s} -a u-boot_bsp]
+set argc [llength $argv]
+source $argv0
+'''
+
+
+def cell(ip, vlnv=None, **parameters):
+    return dict(IP_NAME=ip, VLNV=vlnv or 'xilinx.com:ip:%s:1.0' % ip,
+                **{'CONFIG.' + k: v for k, v in parameters.items()})
+
+
+def maybe(p):
+    return random.random() < p
+
+
+def random_design():
+    cells = {'microblaze_0': cell(
+        'microblaze', 'xilinx.com:ip:microblaze:%s' % random.choice(
+            ['11.0', '10.0', '9.6']),
+        C_FSL_LINKS=random.choice(['0', '1', '2']), C_USE_BARREL='1',
+        C_USE_DIV=random.choice(['0', '1']), C_USE_PCMP_INSTR='1',
+        C_USE_HW_MUL=random.choice(['0', '1', '2']),
+        C_DCACHE_BYTE_SIZE=random.choice(['8192', '16384']),
+        C_CACHE_BYTE_SIZE='16384', C_PVR=random.choice(['0', '2']),
+        C_USE_DCACHE=random.choice(['0', '1']),
+        C_USE_ICACHE=random.choice(['0', '1'])),
+        'mig_7series_0': cell('mig_7series'),
+        'axi_uartlite_0': cell('axi_uartlite', C_BASEADDR='0x40600000')}
+    optional = [
+        ('microblaze_0_local_memory_dlmb_v10', cell('lmb_v10')),
+        ('microblaze_1', cell('microblaze', 'xilinx.com:ip:microblaze:11.0')),
+        ('ddr4_0', cell('ddr4')),
+        ('axi_uart16550_0', cell('axi_uart16550', C_BASEADDR='0x44a00000')),
+        ('mdm_1', cell('mdm', C_BASEADDR='0x41400000')),
+        ('axi_quad_spi_0', cell('axi_quad_spi', C_BASEADDR='0x44a10000')),
+        ('axi_emc_0', cell('axi_emc', C_S_AXI_MEM0_BASEADDR='0x60000000',
+                           C_S_AXI_MEM0_HIGHADDR='0x61ffffff',
+                           C_S_AXI_MEM1_BASEADDR='0x70000000')),
+        ('axi_ethernet_0', cell('axi_ethernet')),
+        ('axi_ethernetlite_0', cell('axi_ethernetlite')),
+        ('axi_gpio_0', cell('axi_gpio', C_BASEADDR=random.choice(
+            ['0x40000000', '']))),
+        ('axi_intc_0', cell('axi_intc')),
+        ('ps7_cortexa9_0', cell('ps7_cortexa9',
+                                'xilinx.com:ip:ps7_cortexa9:5.5'))]
+    for name, props in optional:
+        if maybe(0.15 if name.startswith(('microblaze_1', 'ps7')) else 0.5):
+            cells[name] = props
+    return cells
+
+
+def random_config(cells):
+    lines = []
+
+    def pick(choices):
+        present = [c for c in choices if c.split('_bank')[0] in cells or
+                   c in ('simple', 'manual')]
+        return random.choice(present if present and maybe(0.93) else choices)
+
+    def select(kind, name):
+        lines.append('CONFIG_SUBSYSTEM_%s_%s_SELECT=y' % (kind, name.upper()))
+
+    if maybe(0.95):
+        select('PROCESSOR', pick(['microblaze_0'] * 8 + [
+            'microblaze_1', 'ps7_cortexa9_0', 'microblaze']))
+    memory = pick(['mig_7series_0'] * 4 + ['ddr4_0', 'simple', 'manual'])
+    select('MEMORY', memory + (random.choice(['_BANKLESS', ''])
+                               if maybe(0.3) else ''))
+    memory = 'CONFIG_SUBSYSTEM_MEMORY_%s_' % memory.upper()
+    if maybe(0.95):
+        lines.append(memory + 'BASEADDR=0x80000000')
+    lines.append(memory + 'SIZE=0x40000000')
+    if maybe(0.95):
+        lines.append(memory + 'U__BOOT_TEXTBASE_OFFSET=%s' % random.choice(
+            ['0x80100000', '0xBFF00000', 'y', '']))
+    serial = pick(['axi_uartlite_0', 'axi_uart16550_0', 'mdm_1', 'manual'])
+    select('SERIAL', serial)
+    lines.append('CONFIG_SUBSYSTEM_SERIAL_%s_BAUDRATE_115200=y'
+                 % serial.upper())
+    if maybe(0.5):
+        select('RESET_GPIO', pick(['axi_gpio_0', 'manual']))
+    flash = pick(['axi_quad_spi_0', 'axi_emc_0_bank0', 'axi_emc_0_bankless',
+                  'manual'])
+    select('FLASH', flash)
+    if flash != 'manual':
+        part = 'CONFIG_SUBSYSTEM_FLASH_%s_PART' % flash.upper()
+        names = random.sample(['boot', 'bootenv', 'kernel', 'jffs2', 'dtb',
+                               'fpga', 'x'], random.choice([0, 1, 3, 5]))
+        for i, name in enumerate(names):
+            lines.append('%s%d_NAME="%s"' % (part, i, name))
+            if maybe(0.95):
+                lines.append('%s%d_SIZE=%s' % (part, i, random.choice(
+                    ['0x100000', '0x40000', '0x1000000'])))
+    ethernet = pick(['axi_ethernet_0', 'axi_ethernetlite_0', 'manual'])
+    select('ETHERNET', ethernet)
+    if ethernet != 'manual':
+        ethernet = 'CONFIG_SUBSYSTEM_ETHERNET_%s_' % ethernet.upper()
+        lines.append(ethernet + 'MAC="00:0a:35:00:22:01"')
+        lines.append(ethernet + 'USE_DHCP=y')
+    for p, line in [
+            (0.3, 'CONFIG_SUBSYSTEM_AUTOCONFIG_U__BOOT=y'),
+            (0.8, 'CONFIG_SUBSYSTEM_UIMAGE_NAME="image.ub"'),
+            (0.1, 'CONFIG_SUBSYSTEM_IMAGES_ADVANCED_AUTOCONFIG=y'),
+            (0.1, 'CONFIG_SUBSYSTEM_USER_CMDLINE="console=ttyUL0 x=y"'),
+            (0.1, '# CONFIG_SUBSYSTEM_FOO is not set')]:
+        if maybe(p):
+            lines.append(line)
+    lines.append('CONFIG_SUBSYSTEM_MACHINE_NAME="template"')
+    if maybe(0.2):
+        random.shuffle(lines)
+    return ''.join('%s\n' % line for line in lines)
+
+
+def write_xsa(xsa, cells):
+    '''An XSA whose hardware handoff holds cells, for uboot_bsp.py.'''
+    modules = []
+    for name, props in cells.items():
+        parameters = ''.join(
+            '<PARAMETER NAME=%s VALUE=%s/>' % (quoteattr(k[len('CONFIG.'):]),
+                                               quoteattr(v))
+            for k, v in props.items() if k.startswith('CONFIG.'))
+        modules.append('<MODULE INSTANCE=%s MODTYPE=%s VLNV=%s>'
+                       '<PARAMETERS>%s</PARAMETERS></MODULE>' % (
+                           quoteattr(name), quoteattr(props['IP_NAME']),
+                           quoteattr(props['VLNV']), parameters))
+    with zipfile.ZipFile(xsa, 'w') as xsa_zip:
+        xsa_zip.writestr('design_1.hwh', '<EDKSYSTEM><SYSTEMINFO DEVICE='
+                         '"xc7k325t" NAME="design_1"/><MODULES>%s</MODULES>'
+                         '</EDKSYSTEM>' % ''.join(modules))
+
+
+def write_hdf(hdf, cells):
+    '''The same cells as fake-hsi.tcl reads them.'''
+    with open(hdf, 'w') as hdf_f:
+        for name, props in cells.items():
+            hdf_f.write('{%s} {%s}\n' % (name, ' '.join(
+                '{%s} {%s}' % prop for prop in props.items())))
+
+
+def tcl_uboot_bsp(tmp_path, config, hdf):
+    '''config.cfg from petalinux_hsm_bridge.tcl, None if it fails.'''
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    xsct = bin_dir / 'xsct'
+    xsct.write_text('#!/bin/sh\nexit 1\n')
+    xsct.chmod(0o755)
+    out_dir = tmp_path / 'u-boot-xlnx'
+    out_dir.mkdir()
+    run_tcl = tmp_path / 'run.tcl'
+    run_tcl.write_text(RUN_BRIDGE % (
+        FAKE_HSI, os.path.join(scripts_dir, 'petalinux_hsm_bridge.tcl'),
+        config, hdf, out_dir, DATA_DIR))
+    env = dict(os.environ, PATH='%s%s%s' % (bin_dir, os.pathsep,
+                                            os.environ['PATH']))
+    proc = subprocess.run([tclsh(), str(run_tcl)], cwd=str(tmp_path),
+                          env=env, stdout=subprocess.DEVNULL,
+                          stderr=subprocess.DEVNULL)
+    if proc.returncode:
+        return None
+    return (out_dir / 'config.cfg').read_text()
+
+
+def check(tmp_path, config_text, cells):
+    config = tmp_path / 'config'
+    config.write_text(config_text)
+    xsa = str(tmp_path / 'design.xsa')
+    write_xsa(xsa, cells)
+    hdf = str(tmp_path / 'design.hdf')
+    write_hdf(hdf, cells)
+    try:
+        generated = gen_uboot_bsp(str(config), xsa, DATA_DIR)
+    except UbootBspUnsupported:
+        generated = None
+    expected = tcl_uboot_bsp(tmp_path, str(config), hdf)
+    if expected is None:
+        # Where the Tcl fails the port must leave it to the Tcl
+        assert generated is None
+    elif generated is not None:
+        assert generated == expected
+    return generated
+
+
+def test_kc705(tmp_path):
+    cells = {'microblaze_0': cell(
+        'microblaze', 'xilinx.com:ip:microblaze:11.0', C_FSL_LINKS='0',
+        C_USE_BARREL='1', C_USE_DIV='1', C_USE_PCMP_INSTR='1',
+        C_USE_HW_MUL='1', C_DCACHE_BYTE_SIZE='16384',
+        C_CACHE_BYTE_SIZE='16384', C_PVR='2', C_USE_DCACHE='1',
+        C_USE_ICACHE='1'),
+             'mig_7series_0': cell('mig_7series'),
+             'axi_uartlite_0': cell('axi_uartlite', C_BASEADDR='0x40600000'),
+             'axi_ethernet_0': cell('axi_ethernet'),
+             'axi_quad_spi_0': cell('axi_quad_spi', C_BASEADDR='0x44a10000')}
+    config = '''CONFIG_SUBSYSTEM_PROCESSOR_MICROBLAZE_0_SELECT=y
+CONFIG_SUBSYSTEM_MEMORY_MIG_7SERIES_0_SELECT=y
+CONFIG_SUBSYSTEM_MEMORY_MIG_7SERIES_0_BASEADDR=0x80000000
+CONFIG_SUBSYSTEM_MEMORY_MIG_7SERIES_0_SIZE=0x40000000
+CONFIG_SUBSYSTEM_MEMORY_MIG_7SERIES_0_U__BOOT_TEXTBASE_OFFSET=0x80100000
+CONFIG_SUBSYSTEM_SERIAL_AXI_UARTLITE_0_SELECT=y
+CONFIG_SUBSYSTEM_SERIAL_AXI_UARTLITE_0_BAUDRATE_115200=y
+CONFIG_SUBSYSTEM_FLASH_AXI_QUAD_SPI_0_SELECT=y
+CONFIG_SUBSYSTEM_FLASH_AXI_QUAD_SPI_0_PART0_NAME="boot"
+CONFIG_SUBSYSTEM_FLASH_AXI_QUAD_SPI_0_PART0_SIZE=0x100000
+CONFIG_SUBSYSTEM_ETHERNET_AXI_ETHERNET_0_SELECT=y
+CONFIG_SUBSYSTEM_ETHERNET_AXI_ETHERNET_0_MAC="00:0a:35:00:22:01"
+CONFIG_SUBSYSTEM_AUTOCONFIG_U__BOOT=y
+CONFIG_SUBSYSTEM_MACHINE_NAME="template"
+'''
+    generated = check(tmp_path, config, cells)
+    assert 'CONFIG_XILINX_MICROBLAZE0_HW_VER="11.0"' in generated
+    assert 'CONFIG_TEXT_BASE=0x80100000' in generated
+
+
+def test_not_microblaze(tmp_path):
+    cells = {'ps7_cortexa9_0': cell('ps7_cortexa9',
+                                    'xilinx.com:ip:ps7_cortexa9:5.5')}
+    assert check(tmp_path, 'CONFIG_SUBSYSTEM_PROCESSOR_PS7_CORTEXA9_0'
+                 '_SELECT=y\n', cells) is None
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_random_designs(tmp_path, seed):
+    random.seed(seed)
+    cells = random_design()
+    check(tmp_path, random_config(cells), cells)
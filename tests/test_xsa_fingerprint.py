@@ -0,0 +1,85 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import zipfile
+
+from xsa_extractor import read_xsa_design
+from xsa_fingerprint import extract_xsa_bitfiles, xsa_hw_digest, \
+    xsa_bitstream_digest
+
+
+def test_extract_xsa_bitfiles(tmp_path):
+    xsa = str(tmp_path / 'design.xsa')
+    bitstream = os.urandom(3 * 1024 * 1024 + 17)
+    with zipfile.ZipFile(xsa, 'w', zipfile.ZIP_DEFLATED) as xsa_zip:
+        xsa_zip.writestr('design.hwh', '<EDKSYSTEM/>')
+        xsa_zip.writestr('impl/design.bit', bitstream)
+    out_dir = tmp_path / 'out'
+    out_dir.mkdir()
+    bitfile = out_dir / 'design.bit'
+    bitfile.write_bytes(b'old')
+    os.chmod(bitfile, 0o640)
+    assert extract_xsa_bitfiles(xsa, str(out_dir)) == [str(bitfile)]
+    assert bitfile.read_bytes() == bitstream
+    assert os.stat(bitfile).st_mode & 0o777 == 0o640
+    assert sorted(os.listdir(out_dir)) == ['design.bit']
+
+
+HWH = '''<?xml version="1.0" encoding="UTF-8"?>
+<EDKSYSTEM TIMESTAMP="%s">
+  <SYSTEMINFO DEVICE="xczu9eg" NAME="design_1"/>
+  <MODULES>
+    <MODULE INSTANCE="psu_cortexa53_0" MODTYPE="psu_cortexa53">
+      <MEMORYMAP>
+        <MEMRANGE INSTANCE="psu_uart_0"/>
+        <MEMRANGE INSTANCE="psu_ddr_0"/>
+      </MEMORYMAP>
+    </MODULE>
+    <MODULE INSTANCE="psu_uart_0" IS_PL="FALSE" MODTYPE="psu_uart">
+      <PARAMETERS><PARAMETER NAME="C_BAUDRATE" VALUE="115200"/></PARAMETERS>
+      <PORTS>
+        <PORT DIR="O" NAME="IRQ" SIGIS="INTERRUPT"/>
+        <PORT DIR="I" NAME="CLK" SIGIS="clk"/>
+      </PORTS>
+    </MODULE>
+    <MODULE INSTANCE="psu_ddr_0" MODTYPE="psu_ddr"/>
+  </MODULES>
+</EDKSYSTEM>
+'''
+
+
+def write_xsa(xsa, timestamp='Mon Oct 16 10:00:00 2023', bitstream=b'bit'):
+    with zipfile.ZipFile(xsa, 'w') as xsa_zip:
+        xsa_zip.writestr('design_1.hwh', HWH % timestamp)
+        xsa_zip.writestr('psu_init.c', 'init')
+        xsa_zip.writestr('design_1.bit', bitstream)
+    return xsa
+
+
+def test_hw_digest_ignores_bitstream(tmp_path):
+    xsa = str(tmp_path / 'design.xsa')
+    digest = xsa_hw_digest(write_xsa(xsa))
+    assert xsa_hw_digest(write_xsa(xsa, bitstream=b'new bit')) == digest
+    assert xsa_bitstream_digest(xsa) != ''
+
+
+def test_hw_digest_covers_hwh(tmp_path):
+    xsa = str(tmp_path / 'design.xsa')
+    digest = xsa_hw_digest(write_xsa(xsa))
+    assert xsa_hw_digest(write_xsa(
+        xsa, timestamp='Tue Oct 17 10:00:00 2023')) != digest
+
+
+def test_read_xsa_design(tmp_path):
+    design = read_xsa_design(write_xsa(str(tmp_path / 'design.xsa')))
+    assert (design.device, design.name) == ('xczu9eg', 'design_1')
+    assert design.memory_maps['psu_cortexa53_0'] == ['psu_uart_0',
+                                                      'psu_ddr_0']
+    assert design.parameters['psu_uart_0'] == {'C_BAUDRATE': '115200'}
+    assert design.is_pl == {'psu_cortexa53_0': None, 'psu_uart_0': 'FALSE',
+                            'psu_ddr_0': None}
+    assert design.ports['psu_uart_0'] == [('IRQ', 'O', 'INTERRUPT'),
+                                          ('CLK', 'I', 'clk')]
+    assert design.bitfiles == ['design_1.bit']
@@ -0,0 +1,339 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import random
+import subprocess
+import types
+import zipfile
+from xml.sax.saxutils import quoteattr
+
+import pytest
+
+import gen_config
+from xsa_syshw import gen_xsa_syshw
+from xsa_extractor import XsaUnsupported
+from tcl_procs import scripts_dir, tclsh
+
+tests_dir = os.path.dirname(os.path.abspath(__file__))
+FAKE_HSI = os.path.join(tests_dir, 'data', 'fake-hsi.tcl')
+IPINFO = os.path.join(scripts_dir, 'data', 'ipinfo.yaml')
+OUTPUTS = ('Kconfig.syshw', 'plnx_syshw_data', 'plnx_syshw_data.json')
+
+# hw-description.tcl as xsct runs it, xsct being on PATH. xsct reads the
+# [7] of its "ps[7]_ddr" pattern as a command, which gives 7.
+RUN_SYSHW = '''source {%s}
+proc 7 {} {return 7}
+set argv0 {%s}
+set argv [list plnx_gen_hwsysconf {%s} {%s}]
+set argc [llength $argv]
+source $argv0
+'''
+
+
+def cell(ip, is_pl='FALSE', pins=(), slaves=None, **parameters):
+    props = dict(IP_NAME=ip, VLNV='xilinx.com:ip:%s:1.0' % ip,
+                 PINS=list(pins),
+                 **{'CONFIG.' + k: v for k, v in parameters.items()})
+    if is_pl is not None:
+        props['IS_PL'] = is_pl
+    if slaves is not None:
+        props['SLAVES'] = list(slaves)
+    return props
+
+
+IRQ = ('interrupt', 'O', 'INTERRUPT')
+
+
+def maybe(p):
+    return random.random() < p
+
+
+def rarely(usual, unusual):
+    '''usual, or now and then one of unusual, which mostly leaves the
+    design to xsct.'''
+    return random.choice(unusual) if maybe(0.1) else usual
+
+
+def random_design():
+    cpus = rarely(random.choice([
+        ['psu_cortexa53_0', 'psu_cortexa53_1'], ['ps7_cortexa9_0'],
+        ['psv_cortexa72_0'], ['psu_cortexa53_0', 'microblaze_0'],
+        ['ps7_cortexa9_0', 'ps7_cortexa9_1', 'microblaze_0']]),
+        [['microblaze_0'], []])
+    cells = {}
+    # (name, cell, how often it is in the design)
+    optional = [
+        ('psu_ddr_0', cell('psu_ddr', C_S_AXI_BASEADDR='0x00000000',
+                           C_S_AXI_HIGHADDR=random.choice(
+                               ['0x7FFFFFFF', '0x01ffffff', '0x100'])), 0.6),
+        ('psu_ddr_1', cell('psu_ddr', C_S_AXI_BASEADDR='0x800000000',
+                           C_S_AXI_HIGHADDR='0x87FFFFFFF'), 0.3),
+        ('ps7_ddr_0', cell('ps7_ddr', C_S_AXI_BASEADDR='0x00100000',
+                           C_S_AXI_HIGHADDR='0x3FFFFFFF'), 0.4),
+        ('ddr4_0', cell('ddr4', 'TRUE', **rarely(random.choice([
+            dict(C0_DDR4_MEMORY_MAP_BASEADDR='0x80000000',
+                 C0_DDR4_MEMORY_MAP_HIGHADDR='0xBFFFFFFF'),
+            dict(C_BASEADDR='0x80000000', C_HIGHADDR='0xFFFFFFFF')]),
+            [dict(C_BASEADDR='', C_HIGHADDR='')])), 0.3),
+        ('mig_7series_0', cell('mig_7series', 'TRUE', C_BASEADDR=rarely(
+            '0x80000000', ['0100', '']), C_HIGHADDR='0x9FFFFFFF'), 0.05),
+        ('axi_emc_0', cell('axi_emc', 'TRUE',
+                           C_NUM_BANKS_MEM=random.choice(['1', '2', '']),
+                           C_S_AXI_MEM0_BASEADDR='0x60000000',
+                           C_S_AXI_MEM0_HIGHADDR='0x63FFFFFF',
+                           C_S_AXI_MEM1_BASEADDR='0x70000000',
+                           C_S_AXI_MEM1_HIGHADDR='0x7FFFFFFF',
+                           EMC_BOARD_INTERFACE=random.choice(
+                               ['linear_flash', 'Custom'])), 0.3),
+        ('axi_s6_ddrx_0', cell('axi_s6_ddrx', 'TRUE', C_S0_AXI_ENABLE='1',
+                               C_S0_AXI_BASEADDR='0xA0000000',
+                               C_S0_AXI_HIGHADDR='0xA7FFFFFF',
+                               C_S1_AXI_ENABLE=random.choice(['0', '1']),
+                               C_S1_AXI_BASEADDR='0xB0000000',
+                               C_S1_AXI_HIGHADDR='0xB7FFFFFF'), 0.05),
+        ('axi_noc_0', cell('axi_noc', 'TRUE'), 0.05),
+        ('psu_uart_0', cell('psu_uart', C_S_AXI_BASEADDR='0xFF000000'), 0.5),
+        ('psu_uart_1', cell('psu_uart', C_S_AXI_BASEADDR='0xFF010000'), 0.4),
+        ('psv_sbsauart_0', cell('psv_sbsauart',
+                                C_S_AXI_BASEADDR='0xFF000000'), 0.4),
+        ('ps7_uart_1', cell('ps7_uart'), 0.4),
+        ('axi_uartlite_0', cell('axi_uartlite', rarely(random.choice(
+            ['TRUE', 'true', '1']), [None]), random.choice([[IRQ], []]),
+            C_BAUDRATE=random.choice(['115200', '9600'])), 0.4),
+        ('axi_uart16550_0', cell('axi_uart16550', 'TRUE', [IRQ]), 0.4),
+        ('mdm_1', cell('mdm', 'TRUE', [IRQ], C_USE_UART=random.choice(
+            ['0', '1', ''])), 0.4),
+        ('psu_ethernet_3', cell('psu_ethernet'), 0.4),
+        ('ps7_ethernet_0', cell('ps7_ethernet'), 0.4),
+        ('axi_ethernet_0', cell('axi_ethernet', 'TRUE', rarely(
+            random.choice([[IRQ], []]),
+            [[('mac_irq', 'O', 'interrupt')]])), 0.4),
+        ('psu_qspi_0', cell('psu_qspi'), 0.2),
+        ('ps7_qspi_0', cell('ps7_qspi'), 0.2),
+        ('psu_nand_0', cell('psu_nand'), 0.4),
+        ('axi_quad_spi_0', cell('axi_quad_spi', 'TRUE', [IRQ],
+                                C_NUM_SS_BITS='1'), 0.2),
+        ('psu_sd_0', cell('psu_sd'), 0.4),
+        ('psu_sd_1', cell('psu_sd'), 0.4),
+        ('ps7_sdio_0', cell('ps7_sdio'), 0.4),
+        ('psu_rtc', cell('psu_rtc'), 0.4),
+        ('psu_sata', cell('psu_sata'), 0.4),
+        ('psu_dp', cell('psu_dp'), 0.4),
+        ('psu_usb_0', cell('psu_usb'), 0.4),
+        ('psu_i2c_0', cell('psu_i2c'), 0.4),
+        ('ps7_i2c_0', cell('ps7_i2c'), 0.4),
+        ('axi_gpio_0', cell('axi_gpio', 'TRUE'), 0.4),
+        ('axi_timer_0', cell('axi_timer', 'TRUE', [IRQ]), 0.4)]
+    for name, props, p in optional:
+        if maybe(p):
+            cells[name] = props
+    if maybe(0.4):
+        # The NOR flash of a Zynq, its chip select in the smcc
+        cells['ps7_sram_0'] = cell('ps7_sram')
+        cells['ps7_smcc_0'] = cell('ps7_smcc', C_NOR_CHIP_SEL0=random.choice(
+            ['0', '1']))
+    slaves = list(cells)
+    for cpu in cpus:
+        cpu_slaves = [s for s in slaves if maybe(0.9)]
+        if maybe(0.2):
+            cpu_slaves.append('unknown_0')
+        if maybe(0.3):
+            random.shuffle(cpu_slaves)
+        cells[cpu] = cell(cpu.rsplit('_', 1)[0], slaves=cpu_slaves)
+    return cells
+
+
+def write_xsa(xsa, cells, bitfiles=('design_1_wrapper.bit',)):
+    '''An XSA whose hardware handoff holds cells, for xsa_syshw.py.'''
+    modules = []
+    for name, props in cells.items():
+        parameters = ''.join(
+            '<PARAMETER NAME=%s VALUE=%s/>' % (quoteattr(k[len('CONFIG.'):]),
+                                               quoteattr(v))
+            for k, v in props.items() if k.startswith('CONFIG.'))
+        ports = ''.join('<PORT DIR=%s NAME=%s SIGIS=%s/>' % (
+            quoteattr(d), quoteattr(n), quoteattr(t))
+            for n, d, t in props['PINS'])
+        memory_map = ''.join('<MEMRANGE INSTANCE=%s/>' % quoteattr(s)
+                             for s in props.get('SLAVES', ()))
+        is_pl = ' IS_PL=%s' % quoteattr(props['IS_PL']) \
+            if 'IS_PL' in props else ''
+        modules.append('<MODULE INSTANCE=%s%s MODTYPE=%s VLNV=%s>'
+                       '<PARAMETERS>%s</PARAMETERS><PORTS>%s</PORTS>'
+                       '<MEMORYMAP>%s</MEMORYMAP></MODULE>' % (
+                           quoteattr(name), is_pl, quoteattr(props['IP_NAME']),
+                           quoteattr(props['VLNV']), parameters, ports,
+                           memory_map))
+    with zipfile.ZipFile(xsa, 'w') as xsa_zip:
+        xsa_zip.writestr('design_1.hwh', '<EDKSYSTEM><SYSTEMINFO DEVICE='
+                         '"xczu9eg" NAME="design_1"/><MODULES>%s</MODULES>'
+                         '</EDKSYSTEM>' % ''.join(modules))
+        for bitfile in bitfiles:
+            xsa_zip.writestr(bitfile, 'bit')
+
+
+def write_hdf(hdf, cells, name='design_1_wrapper'):
+    '''The same cells as fake-hsi.tcl reads them.'''
+    with open(hdf, 'w') as hdf_f:
+        hdf_f.write('. {DEVICE xczu9eg NAME %s}\n' % name)
+        for cell_name, props in cells.items():
+            values = dict(props, PINS=' '.join(
+                '{%s}' % ' '.join(pin) for pin in props['PINS']))
+            if 'SLAVES' in props:
+                values['SLAVES'] = ' '.join(props['SLAVES'])
+            hdf_f.write('{%s} {%s}\n' % (cell_name, ' '.join(
+                '{%s} {%s}' % prop for prop in values.items())))
+
+
+def tcl_syshw(tmp_path, hdf):
+    '''The outputs of hw-description.tcl, None if it fails.'''
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    xsct = bin_dir / 'xsct'
+    xsct.write_text('#!/bin/sh\nexit 1\n')
+    xsct.chmod(0o755)
+    out_dir = tmp_path / 'tcl'
+    out_dir.mkdir()
+    run_tcl = tmp_path / 'run.tcl'
+    run_tcl.write_text(RUN_SYSHW % (
+        FAKE_HSI, os.path.join(scripts_dir, 'hw-description.tcl'), hdf,
+        out_dir / 'Kconfig.syshw'))
+    env = dict(os.environ, PATH='%s%s%s' % (bin_dir, os.pathsep,
+                                            os.environ['PATH']))
+    proc = subprocess.run([tclsh(), str(run_tcl)], cwd=str(out_dir),
+                          env=env, stdout=subprocess.DEVNULL,
+                          stderr=subprocess.DEVNULL)
+    if proc.returncode:
+        return None
+    return tuple((out_dir / name).read_text() for name in OUTPUTS)
+
+
+def check(tmp_path, cells, **xsa_args):
+    xsa = str(tmp_path / 'design.xsa')
+    write_xsa(xsa, cells, **xsa_args)
+    hdf = str(tmp_path / 'design.hdf')
+    write_hdf(hdf, cells)
+    try:
+        generated = gen_xsa_syshw(xsa, IPINFO)
+    except XsaUnsupported:
+        generated = None
+    expected = tcl_syshw(tmp_path, hdf)
+    if expected is None:
+        # Where the Tcl fails the port must leave it to xsct
+        assert generated is None
+    elif generated is not None:
+        assert generated == expected
+    return generated
+
+
+def zcu102():
+    return {
+        'psu_cortexa53_0': cell('psu_cortexa53', slaves=[
+            'psu_ddr_0', 'psu_uart_0', 'psu_uart_1', 'psu_ethernet_3',
+            'psu_qspi_0', 'psu_sd_1', 'psu_rtc', 'psu_i2c_0']),
+        'psu_cortexa53_1': cell('psu_cortexa53', slaves=['psu_ddr_0']),
+        'psu_ddr_0': cell('psu_ddr', C_S_AXI_BASEADDR='0x00000000',
+                          C_S_AXI_HIGHADDR='0x7FFFFFFF'),
+        'psu_uart_0': cell('psu_uart', C_S_AXI_BASEADDR='0xFF000000'),
+        'psu_uart_1': cell('psu_uart', C_S_AXI_BASEADDR='0xFF010000'),
+        'psu_ethernet_3': cell('psu_ethernet'),
+        'psu_qspi_0': cell('psu_qspi'),
+        'psu_sd_1': cell('psu_sd'),
+        'psu_rtc': cell('psu_rtc'),
+        'psu_i2c_0': cell('psu_i2c')}
+
+
+def test_zcu102(tmp_path):
+    kconfig, data, json_data = check(tmp_path, zcu102())
+    assert 'config SUBSYSTEM_MEMORY_PSU_DDR_0_BANKLESS_SELECT' in kconfig
+    assert 'default qspi-boot' not in kconfig
+    assert 'default "qspi-boot"' in kconfig
+    assert 'default cadence if SUBSYSTEM_TF-A_SERIAL_PSU_UART_0_SELECT' \
+        in kconfig
+    assert data.startswith('device_id: xczu9eg\n'
+                           'hw_design_name: design_1_wrapper\n')
+    assert json_data.startswith('{"schema_version": 3, "scalars": "plain"}')
+
+
+def test_zynq_ddr_at_zero(tmp_path):
+    cells = {'ps7_cortexa9_0': cell('ps7_cortexa9', slaves=[
+        'ps7_ddr_0', 'ps7_uart_1']),
+             'ps7_ddr_0': cell('ps7_ddr', C_S_AXI_BASEADDR='0x00100000',
+                               C_S_AXI_HIGHADDR='0x3FFFFFFF'),
+             'ps7_uart_1': cell('ps7_uart')}
+    kconfig = check(tmp_path, cells)[0]
+    assert 'config SUBSYSTEM_MEMORY_PS7_DDR_0_BANKLESS_BASEADDR\n' \
+        '\thex "System memory base address"\n\tdefault 0x0\n' in kconfig
+
+
+@pytest.mark.parametrize('cpu', ['microblaze_0', 'psv_cortexa72_0'])
+def test_left_to_xsct(tmp_path, cpu):
+    # A MicroBlaze's ADDRESS_TAG, the ranges of an axi_noc
+    cells = {cpu: cell(cpu.rsplit('_', 1)[0], slaves=['axi_noc_0']),
+             'axi_noc_0': cell('axi_noc', 'TRUE')}
+    assert check(tmp_path, cells) is None
+
+
+def test_no_bitstream(tmp_path):
+    assert check(tmp_path, zcu102(), bitfiles=()) is None
+
+
+@pytest.mark.parametrize('seed', range(60))
+def test_random_designs(tmp_path, seed):
+    random.seed(seed)
+    check(tmp_path, random_design())
+
+
+def xsa_syshw_outputs(tmp_path, monkeypatch, cells):
+    '''The outputs generate_xsa_syshw writes for an XSA of cells, and the
+    script arguments of each xsct run, xsct running hw-description.tcl
+    under the fake hsi.'''
+    out_dir = tmp_path / 'project'
+    out_dir.mkdir()
+    outputs = [str(out_dir / name) for name in OUTPUTS]
+    xsa = tmp_path / 'hw' / 'design.xsa'
+    xsa.parent.mkdir()
+    write_xsa(str(xsa), cells)
+    xsct_runs = []
+
+    def run_xsct(script, script_args, args, run_dir):
+        xsct_runs.append(script_args)
+        hdf = str(tmp_path / 'design.hdf')
+        write_hdf(hdf, cells)
+        for out_file, text in zip(outputs, tcl_syshw(tmp_path, hdf)):
+            with open(out_file, 'w') as out_f:
+                out_f.write(text)
+
+    monkeypatch.setattr(gen_config, 'run_xsct', run_xsct)
+    args = types.SimpleNamespace(hw_file=str(xsa))
+    gen_config.generate_xsa_syshw(
+        args, os.path.join(scripts_dir, 'hw-description.tcl'), IPINFO,
+        outputs, str(out_dir))
+    texts = []
+    for out_file in outputs:
+        with open(out_file) as out_f:
+            texts.append(out_f.read())
+    return tuple(texts), xsct_runs
+
+
+def test_generate_xsa_syshw(tmp_path, monkeypatch):
+    texts, xsct_runs = xsa_syshw_outputs(tmp_path, monkeypatch, zcu102())
+    assert xsct_runs == []
+    assert texts == gen_xsa_syshw(str(tmp_path / 'hw' / 'design.xsa'),
+                                  IPINFO)
+    # As xsct would have extracted it
+    assert (tmp_path / 'hw' / 'design_1_wrapper.bit').read_text() == 'bit'
+
+
+def test_generate_xsa_syshw_falls_back_to_xsct(tmp_path, monkeypatch):
+    # An octal address is left to xsct
+    cells = dict(zcu102(), psu_ddr_0=cell(
+        'psu_ddr', C_S_AXI_BASEADDR='0100', C_S_AXI_HIGHADDR='0x7FFFFFFF'))
+    texts, xsct_runs = xsa_syshw_outputs(tmp_path, monkeypatch, cells)
+    assert xsct_runs == [['plnx_gen_hwsysconf',
+                          str(tmp_path / 'hw' / 'design.xsa'),
+                          str(tmp_path / 'project' / 'Kconfig.syshw')]]
+    assert 'config SUBSYSTEM_MEMORY_PSU_DDR_0_BANKLESS_SELECT' in texts[0]
+    assert not (tmp_path / 'hw' / 'design_1_wrapper.bit').exists()
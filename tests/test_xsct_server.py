@@ -0,0 +1,175 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import sys
+import time
+
+import pytest
+
+import xsct_server
+from xsct_server import XsctServer, XsctServerError, SERVER_TCL
+from tcl_procs import tclsh
+
+FAKE_HSI = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data',
+                        'fake-hsi.tcl')
+
+# A hardware script: opens the design, reports a cell, closes the design
+# and leaves a global and a proc behind, then exits or fails on request
+SCRIPT = '''set design [openhw [lindex $argv 0]]
+puts "[hsi get_property IP_NAME [hsi get_cells -hier psu_uart_0]] $argc"
+puts stderr "warning: [lindex $argv 1]"
+if { [info exists leftover] } {
+	puts "leftover from a previous request"
+}
+set leftover 1
+proc leftover_proc {} {}
+hsi close_hw_design $design
+switch -- [lindex $argv 1] {
+	exit { exit [lindex $argv 2] }
+	error { error "script failed" }
+}
+'''
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    '''An xsct server run by tclsh over the fake hsi, and the log of the
+    designs it opened.'''
+    log = tmp_path / 'openhw.log'
+    monkeypatch.setenv('FAKE_HSI_LOG', str(log))
+    (tmp_path / 'script.tcl').write_text(SCRIPT)
+    (tmp_path / 'design.hdf').write_text('psu_uart_0 {IP_NAME psu_uart}')
+    server = XsctServer([tclsh(), SERVER_TCL, '60', FAKE_HSI])
+    yield server, log
+    server.stop()
+
+
+def run(server, tmp_path, digest, *args):
+    return server.run(str(tmp_path / 'script.tcl'),
+                      [str(tmp_path / 'design.hdf')] + list(args),
+                      str(tmp_path), digest)
+
+
+def openhw_calls(log):
+    return len(log.read_text().splitlines()) if log.exists() else 0
+
+
+def test_design_reused_per_digest(server, tmp_path):
+    server, log = server
+    assert run(server, tmp_path, 'a', 'ok') == ('psu_uart 2\n',
+                                                'warning: ok\n')
+    # The design stays open across close_hw_design and requests
+    assert run(server, tmp_path, 'a', 'ok')[0] == 'psu_uart 2\n'
+    assert openhw_calls(log) == 1
+    run(server, tmp_path, 'b', 'ok')
+    assert openhw_calls(log) == 2
+    run(server, tmp_path, 'a', 'ok')
+    assert openhw_calls(log) == 2
+
+
+def test_exit_status(server, tmp_path):
+    server, log = server
+    assert run(server, tmp_path, 'a', 'exit', '0')[0] == 'psu_uart 3\n'
+    with pytest.raises(Exception) as e:
+        run(server, tmp_path, 'a', 'exit', '3')
+    assert 'psu_uart 3' in str(e.value)
+    # exit only ends the request, not the server
+    process = server.process
+    run(server, tmp_path, 'a', 'ok')
+    assert server.process is process
+
+
+def test_exit_status_in_reply(server, tmp_path):
+    server, log = server
+    run(server, tmp_path, 'a', 'ok')
+    request = '\t'.join([str(tmp_path), 'a', str(tmp_path / 'script.tcl'),
+                         str(tmp_path / 'design.hdf'), 'exit', '7'])
+    server.process.stdin.write((request + '\n').encode())
+    server.process.stdin.flush()
+    assert server.read_reply() == (7, 'psu_uart 3\n', 'warning: exit\n')
+
+
+def test_error_traceback(server, tmp_path):
+    server, log = server
+    with pytest.raises(Exception) as e:
+        run(server, tmp_path, 'a', 'error')
+    assert 'script failed\n    while executing\n' in str(e.value)
+    assert '(file "%s"' % (tmp_path / 'script.tcl') in str(e.value)
+    assert 'warning: error' in str(e.value)
+
+
+def test_idle_timeout_restart(tmp_path, monkeypatch):
+    log = tmp_path / 'openhw.log'
+    monkeypatch.setenv('FAKE_HSI_LOG', str(log))
+    (tmp_path / 'script.tcl').write_text(SCRIPT)
+    (tmp_path / 'design.hdf').write_text('psu_uart_0 {IP_NAME psu_uart}')
+    # The server gives up after a second without a request
+    server = XsctServer([tclsh(), SERVER_TCL, '1', FAKE_HSI])
+    try:
+        run(server, tmp_path, 'a', 'ok')
+        process = server.process
+        process.wait(timeout=10)
+        assert process.returncode == 0
+        # A request after the timeout starts a new server, which opens
+        # the design again
+        assert run(server, tmp_path, 'a', 'ok')[0] == 'psu_uart 2\n'
+        assert server.process is not process
+        assert openhw_calls(log) == 2
+    finally:
+        server.stop()
+
+
+def test_restart_before_idle_timeout(tmp_path, monkeypatch):
+    monkeypatch.setattr(xsct_server, 'IDLE_MARGIN', 1)
+    (tmp_path / 'script.tcl').write_text(SCRIPT)
+    (tmp_path / 'design.hdf').write_text('psu_uart_0 {IP_NAME psu_uart}')
+    server = XsctServer([tclsh(), SERVER_TCL, '60', FAKE_HSI],
+                        idle_timeout=2)
+    try:
+        run(server, tmp_path, 'a', 'ok')
+        process = server.process
+        run(server, tmp_path, 'a', 'ok')
+        assert server.process is process
+        # Too close to the server's timeout, the client restarts it
+        # rather than race it
+        time.sleep(1.2)
+        run(server, tmp_path, 'a', 'ok')
+        assert server.process is not process
+        assert process.returncode is not None
+    finally:
+        server.stop()
+
+
+def test_disabled_after_failure(tmp_path):
+    # A server which exits before it answers, logging each start
+    starts = tmp_path / 'starts'
+    server = XsctServer(['sh', '-c', 'echo started >> %s' % starts])
+    with pytest.raises(XsctServerError) as e:
+        server.run('script.tcl', [], str(tmp_path), 'a')
+    assert 'xsct server exited' in str(e.value)
+    # Not started again for the rest of the run
+    with pytest.raises(XsctServerError) as e:
+        server.run('script.tcl', [], str(tmp_path), 'a')
+    assert 'xsct server disabled' in str(e.value)
+    assert starts.read_text() == 'started\n'
+
+
+def test_disabled_after_start_failure(tmp_path):
+    server = XsctServer([str(tmp_path / 'no-xsct')])
+    with pytest.raises(XsctServerError):
+        server.run('script.tcl', [], str(tmp_path), 'a')
+    assert server.disabled.startswith('Unable to start xsct server')
+
+
+def test_stderr_not_utf8(tmp_path):
+    # Replies to one request, stderr holding a byte utf-8 has no use for
+    reply = "import sys; sys.stdin.readline(); " \
+        "sys.stdout.buffer.write(b'@@xsct-server@@ 0 3 4\\nout\\xffrr\\n')"
+    server = XsctServer([sys.executable, '-c', reply])
+    try:
+        assert server.run('script.tcl', [], str(tmp_path), 'a') == \
+            ('out', '\ufffdrr\n')
+    finally:
+        server.stop()
@@ -0,0 +1,196 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# The static data files under gen-machine-scripts/data compiled into a
+# single JSON file with the indexes the generators look things up by,
+# and the ipinfo lists of the Tcl scripts written as a Tcl script for
+# libs/ipinfo_cache.tcl to load. Both are written by running this
+# script at install time, a run only reads them: when a data file has
+# changed since, it compiles the data in memory instead.
+
+import os
+import sys
+import json
+import string
+
+from config_store import write_file_atomic
+from digest_cache import digest_cache
+
+TOOL_DATA_SCHEMA = 2
+TOOL_DATA_FILE = '.tool-data.json'
+# sdt_ipinfo.yaml is only read by the Tcl and dt-processor.sh
+SOURCES = ('ipinfo.yaml', 'sysconf_koptions.yaml', 'machineconf.json')
+TCL_DATA_FILE = '.ipinfo.tcl'
+TCL_SOURCES = ('ipinfo.yaml', 'sdt_ipinfo.yaml')
+# Characters a Tcl word holds as they are, any other is escaped
+TCL_WORD_CHARS = set(string.ascii_letters + string.digits +
+                     '_-.,:/@%+=*?!\'#<>|~^&()')
+
+data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'gen-machine-scripts', 'data')
+
+
+class ToolData:
+    '''Contents of the data files and indexes built from them.'''
+
+    def __init__(self, ipinfo, sysconf_koptions, machineconf):
+        self.ipinfo = ipinfo
+        self.sysconf_koptions = sysconf_koptions
+        self.machineconf = machineconf
+        # ip -> its linux_kernel_properties
+        self.ip_kernel_options = {}
+        # ip -> its device types, device type -> ips
+        self.ip_device_types = {}
+        self.device_type_ips = {}
+        # Device types with linux_kernel_properties for any ip
+        self.kernel_device_types = []
+        for ip_name, ip_info in ipinfo.items():
+            ip_info = ip_info or {}
+            if 'linux_kernel_properties' in ip_info:
+                self.ip_kernel_options[ip_name] = \
+                    ip_info['linux_kernel_properties'] or {}
+            ip_types = ip_info.get('device_type')
+            if not isinstance(ip_types, dict):
+                continue
+            self.ip_device_types[ip_name] = list(ip_types)
+            for device_type, info in ip_types.items():
+                self.device_type_ips.setdefault(device_type, []).append(ip_name)
+                if info and 'linux_kernel_properties' in info and \
+                        device_type not in self.kernel_device_types:
+                    self.kernel_device_types.append(device_type)
+        # machine -> dt-boardfile
+        self.machine_boardfiles = {
+            machine: info['dt-boardfile'] for machine, info in machineconf.items()
+            if isinstance(info, dict) and 'dt-boardfile' in info}
+
+    @classmethod
+    def from_dict(cls, data):
+        '''ToolData of the plain dict to_dict() gave.'''
+        tool_data = cls.__new__(cls)
+        tool_data.__dict__.update(data)
+        return tool_data
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+def source_digests(sources_dir):
+    return {f: digest_cache.digest(os.path.join(sources_dir, f))
+            for f in SOURCES}
+
+
+def compile_tool_data(sources_dir):
+    import yaml
+    data = []
+    for f in SOURCES:
+        with open(os.path.join(sources_dir, f), 'r') as source_f:
+            if f.endswith('.json'):
+                data.append(json.load(source_f))
+            else:
+                data.append(yaml.safe_load(source_f) or {})
+    return ToolData(*data)
+
+
+def write_tool_data(sources_dir, tool_data, digests):
+    data = tool_data.to_dict()
+    if json.loads(json.dumps(data)) != data:
+        raise ValueError('tool data does not round trip through JSON')
+    # Keys not sorted, the generators emit options in the data files' order
+    write_file_atomic(os.path.join(sources_dir, TOOL_DATA_FILE),
+                      json.dumps({'schema_version': TOOL_DATA_SCHEMA,
+                                  'sources': digests,
+                                  'tool_data': data}))
+
+
+def read_tool_data(sources_dir, digests):
+    '''Compiled ToolData, None if there is none for these sources.'''
+    try:
+        with open(os.path.join(sources_dir, TOOL_DATA_FILE), 'r') as data_f:
+            saved = json.load(data_f)
+        if saved.get('schema_version') != TOOL_DATA_SCHEMA or \
+                saved.get('sources') != digests:
+            return None
+        return ToolData.from_dict(saved['tool_data'])
+    except (OSError, ValueError, AttributeError, KeyError, TypeError):
+        return None
+
+
+tool_data = None
+
+
+def get_tool_data():
+    '''ToolData for the data files as they are now, compiled in memory
+    when one of them changed since the artifact was written.'''
+    global tool_data
+    if tool_data is None:
+        digests = source_digests(data_dir)
+        tool_data = read_tool_data(data_dir, digests)
+        if tool_data is None:
+            tool_data = compile_tool_data(data_dir)
+    return tool_data
+
+
+def tcl_word(text):
+    '''text as a single Tcl word, whatever characters it holds.'''
+    if not text:
+        return '{}'
+    word = []
+    for c in text:
+        if c in TCL_WORD_CHARS:
+            word.append(c)
+        elif c == '\n':
+            word.append('\\n')
+        elif c == '\t':
+            word.append('\\t')
+        elif ' ' <= c <= '~':
+            word.append('\\' + c)
+        else:
+            word.append('\\u%04x' % ord(c))
+    return ''.join(word)
+
+
+def tcl_sources_header(sources_dir):
+    digests = {f: digest_cache.digest(os.path.join(sources_dir, f))
+               for f in TCL_SOURCES}
+    return '# sources %s\n' % json.dumps(digests, sort_keys=True)
+
+
+def compile_tcl_ipinfo(sources_dir):
+    '''A Tcl script handing ipinfo_cache the get_ipinfo list of each
+    source, with the ips of every device type in the order
+    generate_mapping_list finds them.'''
+    from sdt_syshw import read_ipinfo, split_list, lsearch, DEVICE_TYPES, \
+        SdtUnsupported
+    lines = [tcl_sources_header(sources_dir)]
+    for f in TCL_SOURCES:
+        ipinfofile = os.path.join(sources_dir, f)
+        try:
+            st = os.stat(ipinfofile)
+            ip_list = read_ipinfo(ipinfofile,
+                                  (st.st_ino, st.st_size, st.st_mtime_ns))
+            devtypes = []
+            for devtype in DEVICE_TYPES:
+                ips = []
+                for ipinfo in split_list(ip_list):
+                    e = lsearch(ipinfo, 'device_type', inline=True, index=0)
+                    if lsearch(e, devtype, index=0) >= 0:
+                        ips.append('{%s}' % ipinfo)
+                devtypes.append('%s {%s}' % (devtype, ' '.join(ips)))
+            # What read_text gets out of a binary channel
+            with open(ipinfofile, 'rb') as ipinfo_f:
+                text = ipinfo_f.read().decode('latin-1')
+        except (OSError, SdtUnsupported):
+            # get_ipinfo parses it, or fails on it, as it always did
+            continue
+        lines.append('ipinfo_cache::preparsed %s %s {%s} {%s}\n' % (
+            f, tcl_word(text), ip_list, ' '.join(devtypes)))
+    return ''.join(lines)
+
+
+if __name__ == '__main__':
+    write_tool_data(data_dir, compile_tool_data(data_dir),
+                    source_digests(data_dir))
+    write_file_atomic(os.path.join(data_dir, TCL_DATA_FILE),
+                      compile_tcl_ipinfo(data_dir))
+    sys.exit(0)
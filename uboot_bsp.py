@@ -0,0 +1,619 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# u-boot-xlnx/config.cfg of a MicroBlaze design written without xsct:
+# the u-boot_bsp function of petalinux_hsm_bridge.tcl (read_config,
+# uboot_config_gen and the simple_yaml_parser database walk they use)
+# over the config and the cells of the XSA hardware handoff. What the
+# port does not model (other processors, hsi lookups the handoff can not
+# answer, paths on which the Tcl errors out) raises UbootBspUnsupported,
+# for the caller to run xsct instead.
+
+import os
+import re
+import zipfile
+
+from xsa_extractor import read_xsa_design, XsaUnsupported
+
+LOOKUPS = ('processor', 'memory', 'serial', 'reset_gpio', 'flash', 'ethernet')
+DATABASES = ('processor', 'intc', 'memory', 'serial', 'reset_gpio', 'flash',
+             'ethernet')
+# Databases whose uboot_config options are disabled before any is set
+DISABLE_DATABASES = ('serial', 'flash', 'ethernet', 'processor')
+DATABASE_CHARS = re.compile(r'[A-Za-z0-9_.:%?<> -]*\Z')
+NAME = re.compile(r'[A-Za-z0-9_]*\Z')
+TCL_SPACE = ' \t\n\v\f\r'
+TCL_INTEGER = re.compile(r'(0[xX][0-9a-fA-F]+|0|[1-9][0-9]*)\Z')
+# db_gen_prop's switch -regexp over the config category, in order
+CATEGORIES = ('config([0-9]|)_value_plus_', 'config([0-9]|)_chk_.*_str',
+              'config([0-9]|)_chk_.*_custom_define', 'config([0-9]|)_chk_.*',
+              'custom_define([0-9]|)_chk_.*', 'custom_define([0-9]|)',
+              'undefine([0-9]|)', 'get_clk', 'define([0-9]|)_chk_not_.*',
+              'define_chk([0-9]|)_.*', 'define([0-9]|)_zero',
+              'define([0-9]|)_.*', 'define([0-9]|)')
+ARM_CPUS = ('cortexa9', 'cortexa53', 'cortexa57', 'cortexa72', 'cortexa78')
+
+
+class UbootBspUnsupported(Exception):
+    '''petalinux_hsm_bridge.tcl has to generate the u-boot config.'''
+
+
+def tcl_words(value):
+    '''Elements of a Tcl list without braces, quotes or backslashes.'''
+    if not isinstance(value, str) or set('{}"\\').intersection(value):
+        raise UbootBspUnsupported('not a plain list: %s' % value)
+    return [w for w in re.split('[%s]+' % TCL_SPACE, value) if w]
+
+
+def as_dict(node):
+    '''node as Tcl reads it as a dict, None if it is not one.'''
+    if isinstance(node, dict):
+        return node
+    words = tcl_words(node)
+    if len(words) % 2:
+        return None
+    result = {}
+    for i in range(0, len(words), 2):
+        result[words[i]] = words[i + 1]
+    return result
+
+
+def dict_exists(node, *keys):
+    for key in keys:
+        node = as_dict(node)
+        if node is None or key not in node:
+            return False
+        node = node[key]
+    return True
+
+
+def dict_get(node, *keys):
+    if not dict_exists(node, *keys):
+        raise UbootBspUnsupported('no %s' % ' '.join(keys))
+    for key in keys:
+        node = as_dict(node)[key]
+    return node
+
+
+def dict_set(node, *keys_value):
+    '''dict set over nested dicts, not through a string value.'''
+    keys, value = keys_value[:-2], keys_value[-2:]
+    for key in keys:
+        node = node.setdefault(key, {})
+        if not isinstance(node, dict):
+            raise UbootBspUnsupported('dict set through %s' % key)
+    node[value[0]] = value[1]
+
+
+def tcl_integer(value):
+    if not TCL_INTEGER.match(value):
+        raise UbootBspUnsupported('not an integer: %s' % value)
+    return int(value, 0)
+
+
+def regex_name(name):
+    if not NAME.match(name):
+        raise UbootBspUnsupported('name %s' % name)
+    return name
+
+
+def parse_database(filename):
+    '''The dict simple_yaml_parser builds from a data file.'''
+    database = {}
+    depth_keys = {}
+    with open(filename, 'r', encoding='ascii') as database_f:
+        data = database_f.read().split('\n')
+    for line in data:
+        # Its indented comment regexp is ^s+# once Tcl unescapes \s
+        if re.match('#', line) or re.match('s+#', line) or not line:
+            continue
+        if not DATABASE_CHARS.match(line):
+            raise UbootBspUnsupported('%s: %s' % (filename, line))
+        words = re.split('[@ ]', line.replace('    ', '-~#%@'))
+        depth = words.count('-~#%')
+        if words[:depth] != ['-~#%'] * depth or not words[depth]:
+            raise UbootBspUnsupported('%s: %s' % (filename, line))
+        depth_keys[depth] = words[depth]
+        if depth == 0:
+            continue
+        if any(d not in depth_keys for d in range(depth)):
+            raise UbootBspUnsupported('%s: %s' % (filename, line))
+        keys = ' '.join(depth_keys[d] for d in range(depth + 1))
+        value = ' '.join(words[depth + 1:]).strip(' ')
+        if not value:
+            continue
+        dict_set(database, *(keys.replace(':', '').split() + [value]))
+    return database
+
+
+def find_kconfig(node):
+    '''uboot_data_find_kconfig: the uboot_config options under node.'''
+    node = as_dict(node)
+    if node is None:
+        return []
+    options = []
+    for key, value in node.items():
+        if key == 'uboot_config':
+            if isinstance(value, dict):
+                raise UbootBspUnsupported('uboot_config is a dict')
+            options += [o.split('=')[0] for o in tcl_words(value)]
+        else:
+            options += find_kconfig(value)
+    return options
+
+
+class XsaCells:
+    '''The hsi cell lookups the u-boot config makes, answered from the
+    hardware handoff.'''
+
+    def __init__(self, hw_file):
+        try:
+            self.design = read_xsa_design(hw_file)
+        except (OSError, zipfile.BadZipFile, XsaUnsupported) as e:
+            raise UbootBspUnsupported('%s: %s' % (hw_file, e))
+        self.cells = sorted(self.design.modules)
+
+    def find(self, value):
+        '''The cell read_config takes for a Kconfig name: the first one
+        the name matches as a regexp. hsi lists cells sorted by name, so
+        of several matches it is the one the others all start with.'''
+        matches = [c for c in self.cells
+                   if re.search(regex_name(value), c, re.I)]
+        if not matches:
+            return value
+        first = [m for m in matches
+                 if all(o.startswith(m) for o in matches)]
+        if len(first) != 1:
+            raise UbootBspUnsupported('%s matches %s' % (value, matches))
+        return first[0]
+
+    def get_property(self, cell, prop):
+        if cell not in self.design.modules:
+            raise UbootBspUnsupported('no cell %s' % cell)
+        if prop == 'IP_NAME':
+            return self.design.modules[cell]
+        if prop == 'VLNV':
+            return self.design.vlnvs[cell]
+        parameters = self.design.parameters[cell]
+        if prop.startswith('CONFIG.'):
+            name = prop[len('CONFIG.'):]
+            if name in parameters:
+                return parameters[name]
+            for parameter, value in parameters.items():
+                if parameter.upper() == name.upper():
+                    return value
+        raise UbootBspUnsupported('no %s property for %s' % (prop, cell))
+
+    def report_properties(self, cell, pattern):
+        '''Names of the CONFIG.* properties matching pattern.'''
+        self.get_property(cell, 'IP_NAME')
+        return sorted('CONFIG.%s' % p for p in self.design.parameters[cell]
+                      if re.search(pattern, 'CONFIG.%s' % p))
+
+
+def longest_sub(prefix, alternatives, suffix, text):
+    '''regsub of prefix(a|b)suffix: Tcl takes the longest match at the
+    leftmost position.'''
+    matches = []
+    for alternative in alternatives:
+        m = re.search(re.escape(prefix + alternative + suffix), text)
+        if m:
+            matches.append((m.start(), -len(m.group()), m))
+    if not matches:
+        return text
+    m = min(matches, key=lambda x: x[:2])[2]
+    return text[:m.start()] + text[m.end():]
+
+
+class UbootBsp:
+    '''uboot_config_gen of u-boot_bsp.tcl for one config and design.'''
+
+    def __init__(self, sysconfig, hw_file, data_dir):
+        self.hw = XsaCells(hw_file)
+        self.db = {name: parse_database(os.path.join(data_dir, '%s.yaml' % name))
+                   for name in DATABASES}
+        try:
+            with open(sysconfig, 'r', encoding='ascii') as config_f:
+                self.lines = config_f.read().split('\n')
+        except UnicodeDecodeError:
+            raise UbootBspUnsupported('non ASCII config')
+        self.kconfig = {}
+        self.dict_lut = {}
+        self.def_ip_list = []
+        self.content = ''
+
+    def ip_name(self, ip):
+        if ip.lower() in ('simple', 'chip_device'):
+            return ip if ip.lower() == 'chip_device' else 'simple'
+        return self.hw.get_property(ip, 'IP_NAME')
+
+    def check_microblaze(self, cpu):
+        '''get_sw_proc_arch has to find cpu a MicroBlaze: no cortex in its
+        VLNV and microblaze in that of the first cell cpu matches.'''
+        vlnv = self.hw.get_property(cpu, 'VLNV')
+        if any(s in vlnv for s in ARM_CPUS) or 'microblaze' not in vlnv or \
+                self.hw.find(cpu) != cpu:
+            raise UbootBspUnsupported('%s is not a MicroBlaze' % cpu)
+
+    def read_config(self):
+        kconfig = self.kconfig
+        for line in self.lines:
+            if not re.search('^CONFIG_SUBSYSTEM_.*_SELECT=y', line):
+                continue
+            for lookup in LOOKUPS:
+                up = lookup.upper()
+                if not re.search('^CONFIG_SUBSYSTEM_%s.*_SELECT=y' % up, line):
+                    continue
+                if re.search('^CONFIG_SUBSYSTEM_%s.*CHANNEL[0-9]_SELECT=y' % up,
+                             line):
+                    continue
+                value = line.replace('CONFIG_SUBSYSTEM_%s_' % up, '', 1).lower()
+                value = value.replace('_select=y', '', 1)
+                if value == 'manual':
+                    continue
+                dict_set(kconfig, lookup, 'ip_str', value)
+                if re.search('^CONFIG_SUBSYSTEM_%s.*_BANK.*=' % up, line):
+                    bank_no = re.sub('.*_bank', '', value, count=1)
+                    dict_set(kconfig, lookup, 'bank',
+                             '' if 'less' in bank_no else bank_no)
+                value = value.replace('_bankless', '', 1)
+                value = re.sub('_bank[0-9]', '', value, count=1)
+                value = self.hw.find(value)
+                dict_set(kconfig, lookup, 'inst_name', value)
+                self.def_ip_list.append(value)
+                dict_set(self.dict_lut, value, 'type', lookup)
+                if value == 'simple':
+                    continue
+                if not re.search('(^hbm.*)|(.*ddr.*)', value):
+                    ip_name = self.hw.get_property(value, 'IP_NAME')
+                    if dict_exists(self.db[lookup], ip_name, 'flash_type'):
+                        dict_set(kconfig, lookup, 'flash_type',
+                                 dict_get(self.db[lookup], ip_name, 'flash_type'))
+                if lookup == 'serial':
+                    self.set_serial_dict_data(value, line)
+                break
+
+        self.target_cpu = dict_get(kconfig, 'processor', 'inst_name')
+        if self.target_cpu == '':
+            raise UbootBspUnsupported('No cpu detected.')
+        self.check_microblaze(self.target_cpu)
+        # get_current_ip_intc walks the interrupt pins, the controller it
+        # finds only matters if intc.yaml sets u-boot options
+        if find_kconfig(self.db['intc']):
+            raise UbootBspUnsupported('intc.yaml has uboot_config')
+
+        for line in self.lines:
+            if re.search('^#.*', line):
+                continue
+            for lookup in LOOKUPS:
+                if not dict_exists(kconfig, lookup, 'inst_name'):
+                    continue
+                ip_str = regex_name(dict_get(kconfig, lookup, 'ip_str'))
+                inst_name = regex_name(dict_get(kconfig, lookup, 'inst_name'))
+                if not re.search(('^CONFIG_SUBSYSTEM_%s_%s_.*=' % (
+                        lookup, inst_name)).upper(), line):
+                    continue
+                prop_data = longest_sub(
+                    ('CONFIG_SUBSYSTEM_%s_' % lookup).upper(),
+                    (ip_str.upper(), inst_name.upper()), '_', line).lower()
+                prop_data = prop_data.split('=')
+                prop_key = prop_data[0]
+                prop_value = prop_data[1] if len(prop_data) > 1 else ''
+                prop_value = prop_value.replace('"', '')
+                if re.search('part[0-1]?[0-9]_.*', prop_key):
+                    if prop_value == '':
+                        continue
+                    part_key_data = prop_key.split('_')
+                    dict_set(kconfig, lookup, part_key_data[0],
+                             part_key_data[1], prop_value)
+                else:
+                    dict_set(kconfig, lookup, prop_key, prop_value)
+            if re.search('^CONFIG_SUBSYSTEM_IMAGES_ADVANCED_AUTOCONFIG_.*', line):
+                prop_data = line.replace(
+                    'CONFIG_SUBSYSTEM_IMAGES_ADVANCED_AUTOCONFIG_', '', 1)
+                prop_data = prop_data.split('=')
+                prop_value = prop_data[1] if len(prop_data) > 1 else ''
+                prop_value = prop_value.replace('"', '')
+                prop_key = prop_data[0].lower().split('_')
+                primary_key = prop_key[0]
+                option = prop_key[1] if len(prop_key) > 1 else ''
+                if option == 'media':
+                    prop_value = prop_key[2] if len(prop_key) > 2 else ''
+                    if prop_value == 'flash':
+                        dict_set(kconfig, 'adv_partition', primary_key,
+                                 'flash_type',
+                                 dict_get(kconfig, 'flash', 'flash_type'))
+                dict_set(kconfig, 'adv_partition', primary_key, option,
+                         prop_value)
+            if re.search('^CONFIG_SUBSYSTEM_.*', line):
+                prop_data = line.replace('CONFIG_SUBSYSTEM_', '', 1).split('=')
+                prop_key = prop_data[0].lower()
+                prop_value = '='.join(prop_data[1:])
+                if re.search('^user_cmdline', prop_key):
+                    prop_value = prop_value[1:-1]
+                else:
+                    prop_value = prop_value.replace('"', '')
+                dict_set(kconfig, 'subsys_conf', prop_key, prop_value)
+
+        self.update_partitions()
+
+    def set_serial_dict_data(self, inst_name, conf_str):
+        up_p_prefix = conf_str.replace('_SELECT=y', '_BAUDRATE_', 1)
+        for line in self.lines:
+            if re.search('^%s.*=y' % regex_name(up_p_prefix), line):
+                p_val = line.replace(up_p_prefix, '', 1).replace('=y', '', 1)
+                dict_set(self.kconfig, 'serial', 'baudrate', inst_name,
+                         p_val.lower())
+                break
+
+    def get_ip_property(self, ip, bank, prop):
+        pattern = 'CONFIG.*%s_%s.*' % (regex_name(bank), prop)
+        names = self.hw.report_properties(ip, pattern)
+        if not names:
+            raise UbootBspUnsupported('unable to find the property')
+        return self.hw.get_property(ip, names[0])
+
+    def update_partitions(self):
+        '''Partition offsets and images, read_config only fails on them.'''
+        kconfig = self.kconfig
+        adv_partition_used = dict_exists(kconfig, 'subsys_conf',
+                                         'images_advanced_autoconfig')
+        offset = '0x0'
+        for part_no in range(20):
+            part = 'part%d' % part_no
+            if not dict_exists(kconfig, 'flash', part, 'size'):
+                break
+            size = dict_get(kconfig, 'flash', part, 'size')
+            flash_type = dict_get(kconfig, 'flash', 'flash_type')
+            if flash_type == 'nor':
+                flash_inst = dict_get(kconfig, 'flash', 'inst_name')
+                flash_bank = dict_get(kconfig, 'flash', 'bank')
+                cntl_base = self.get_ip_property(flash_inst, flash_bank,
+                                                 'BASEADDR')
+                p_offset = '0x%08x' % (tcl_integer(cntl_base) +
+                                       tcl_integer(offset))
+                dict_set(kconfig, 'flash', part, 'cntl_base', cntl_base)
+            else:
+                p_offset = offset
+            dict_set(kconfig, 'flash', part, 'offset', p_offset)
+            if not adv_partition_used:
+                part_name = dict_get(kconfig, 'flash', part, 'name')
+                image_file = {'boot': 'u-boot-s.bin',
+                              'jffs2': 'rootfs.jffs2', 'dtb': 'system.dtb',
+                              'fpga': 'system.bit.bin'}.get(part_name, '')
+                if part_name == 'kernel':
+                    image_file = dict_get(kconfig, 'subsys_conf', 'uimage_name')
+                if image_file != '':
+                    dict_set(kconfig, 'flash', part, 'image_file', image_file)
+                    dict_set(kconfig, 'adv_partition', part_name, 'image',
+                             image_file)
+                for key, value in (('media', 'flash'), ('part', part_name),
+                                   ('size', size), ('flash_type', flash_type)):
+                    dict_set(kconfig, 'adv_partition', part_name, key, value)
+            offset = '0x%x' % (tcl_integer(size) + tcl_integer(offset))
+        for prop in list(kconfig.get('adv_partition', {})):
+            media = dict_get(kconfig, 'adv_partition', prop, 'media')
+            if media != 'flash':
+                continue
+            dict_get(kconfig, 'adv_partition', prop, 'part')
+
+    def config_lines(self):
+        # Tcl splits an empty file into no lines at all
+        return self.content.split('\n') if self.content else []
+
+    def set_kconfig_value(self, names, vals=None, delete=False):
+        '''uboot_set_kconfig_value over lists, vals None for all y.'''
+        lines = self.config_lines()
+        if vals is None:
+            vals = ['y'] * len(names)
+        rline = None
+        for i in range(max(len(names), len(vals))):
+            n = names[i] if i < len(names) else ''
+            v = vals[i] if i < len(vals) else ''
+            n = regex_name(re.sub('^CONFIG_', '', n, count=1))
+            for idx, line in enumerate(lines):
+                if re.search('CONFIG_%s[ =]' % n, line):
+                    del lines[idx]
+                    break
+            if v == 'n':
+                rline = '# CONFIG_%s is not set' % n
+            elif not delete:
+                rline = 'CONFIG_%s=%s' % (n, v)
+            if not delete:
+                lines.append(rline)
+        self.content = '\n'.join(lines) + '\n'
+
+    def set_kconfig_string(self, names, vals='y'):
+        '''uboot_set_kconfig_value with Tcl list arguments.'''
+        self.set_kconfig_value(tcl_words(names),
+                               None if vals == 'y' else tcl_words(vals))
+
+    def kconfig_disable(self):
+        opt_list = []
+        for name in DISABLE_DATABASES:
+            opt_list += find_kconfig(self.db[name])
+        lines = self.config_lines()
+        for o in opt_list:
+            regex_name(o)
+            idx = [i for i, line in enumerate(lines) if re.search(o + '=', line)]
+            if len(idx) > 1:
+                raise UbootBspUnsupported('lreplace with %d indexes' % len(idx))
+            if idx:
+                del lines[idx[0]]
+            if any(re.search(o + ' is not', line) for line in lines):
+                continue
+            lines.append('# %s is not set' % o)
+        self.content = '\n'.join(lines) + '\n'
+
+    def db_type_list(self, db, main_key):
+        if not dict_exists(db, main_key):
+            return []
+        node = as_dict(dict_get(db, main_key))
+        if node is None:
+            raise UbootBspUnsupported('%s is not a dict' % main_key)
+        return [t for t, data in node.items() if as_dict(data) is not None]
+
+    def conf_list(self, db, ip_list):
+        conf_list = []
+        for ip_var in ip_list:
+            if not dict_exists(db, ip_var):
+                continue
+            for conf_type in self.db_type_list(db, ip_var):
+                if not dict_exists(db, ip_var, conf_type):
+                    continue
+                for conf, data in as_dict(dict_get(db, ip_var, conf_type)).items():
+                    if as_dict(data) is not None and conf not in conf_list:
+                        conf_list.append(conf)
+        return conf_list
+
+    def gen_prop(self, db, ip, main_key, db_type, config_cat):
+        if not dict_exists(db, main_key, db_type, config_cat):
+            return
+        if db_type == 'kconfig':
+            raise UbootBspUnsupported('kconfig database entries')
+        props = as_dict(dict_get(db, main_key, db_type, config_cat))
+        if props is None:
+            return
+        for prop in props:
+            real_prop = prop
+            if len(re.findall('%bn%', prop)) == 1:
+                real_prop = prop.replace('%bn%', '0')
+            if not dict_exists(db, main_key, db_type, config_cat, prop,
+                               'uboot_config'):
+                continue
+            if ip.lower() == 'chip_device':
+                raise UbootBspUnsupported('hw design properties')
+            key_value = dict_get(db, main_key, db_type, config_cat, prop,
+                                 'uboot_config')
+            if not isinstance(key_value, str):
+                raise UbootBspUnsupported('uboot_config is a dict')
+            if key_value == '':
+                continue
+            param_value = self.hw.get_property(ip, real_prop)
+            if param_value == '':
+                continue
+            striped = config_cat.replace('primary_', '')
+            category = next((c for c in CATEGORIES if re.search(c, striped)),
+                            None)
+            if category == CATEGORIES[0]:
+                inc_value = re.sub(category, '', striped)
+                param_value = '0x%08x' % (tcl_integer(param_value) +
+                                          tcl_integer(inc_value))
+            elif category == CATEGORIES[1]:
+                desired = re.sub('config([0-9]|)_chk_', '', striped)
+                desired = desired.replace('_str', '')
+                if param_value.lower() == desired.lower():
+                    self.content += key_value + '\n'
+                continue
+            elif category == CATEGORIES[2]:
+                desired = re.sub('config([0-9]|)_chk_', '', striped)
+                desired = desired.replace('_custom_define', '')
+                if key_value.lower() != desired.lower():
+                    continue
+                param_value, key_value = key_value, 'remove_me'
+            elif category == CATEGORIES[3]:
+                desired = re.sub('config([0-9]|)_chk_', '', striped)
+                if desired.lower() != param_value.lower():
+                    continue
+            elif category == CATEGORIES[4]:
+                desired = re.sub('custom_define([0-9]|)_chk_', '', striped)
+                if desired.lower() != param_value.lower():
+                    continue
+                param_value, key_value = key_value, 'remove_me'
+            elif category == CATEGORIES[5]:
+                param_value, key_value = key_value, 'remove_me'
+            elif category == CATEGORIES[6]:
+                for k in tcl_words(key_value):
+                    self.content += '#ifdef %s\n# undef %s\n#endif\n' % (k, k)
+                continue
+            elif category == CATEGORIES[7]:
+                continue
+            elif category == CATEGORIES[8]:
+                desired = re.sub('define([0-9]|)_chk_not_', '', striped)
+                if desired.lower() == param_value.lower():
+                    continue
+                param_value = ''
+            elif category == CATEGORIES[9]:
+                desired = re.sub('define_chk([0-9]|)_', '', striped)
+                if desired.lower() != param_value.lower():
+                    continue
+                param_value = ''
+            elif category == CATEGORIES[10]:
+                param_value = '0'
+            elif category == CATEGORIES[11]:
+                param_value = re.sub('define([0-9]|)_', '', striped)
+            elif category == CATEGORIES[12]:
+                param_value = ''
+            if tcl_words(param_value):
+                if key_value.lower() == 'remove_me':
+                    first_second = param_value.split('=')
+                    self.set_kconfig_string(
+                        first_second[0],
+                        first_second[1] if len(first_second) > 1 else '')
+                else:
+                    self.set_kconfig_string(key_value, param_value)
+            else:
+                self.set_kconfig_string(key_value)
+
+    def gen_prop_wrapper(self, db, ip, main_key, config_cat):
+        for db_type in self.db_type_list(db, main_key):
+            self.gen_prop(db, ip, main_key, db_type, config_cat)
+
+    def gen_config(self, ip, db):
+        '''db_gen_config of one ip for uboot_config.'''
+        ip_name = self.ip_name(ip)
+        if not dict_exists(db, ip_name):
+            return
+        ins_type = dict_get(db, ip_name, 'ip_type') \
+            if dict_exists(db, ip_name, 'ip_type') else ''
+        ip_list = tcl_words('%s %s' % (ip_name, ins_type))
+        tconf_list = self.conf_list(db, ip_list)
+        for config_cat in tconf_list:
+            self.gen_prop_wrapper(db, ip, ip_name, config_cat)
+        for db_type in self.db_type_list(db, ins_type):
+            for config_cat in tconf_list:
+                if dict_exists(db, ins_type, db_type, config_cat):
+                    self.gen_prop_wrapper(db, ip, ins_type, config_cat)
+
+    def hw_config_gen(self):
+        self.kconfig_disable()
+        db = None
+        for ip in self.def_ip_list:
+            ip_name = self.ip_name(ip)
+            db = self.db[dict_get(self.dict_lut, ip, 'type')]
+            if dict_exists(db, ip_name):
+                self.gen_config(ip, db)
+        self.gen_config('chip_device', db)
+
+    def config_gen(self):
+        self.hw_config_gen()
+        self.set_kconfig_value(['BOOTARGS'], ['n'])
+        self.set_kconfig_value(['USE_BOOTARGS'], ['n'])
+        self.set_kconfig_value(['BOOTDELAY'], ['4'])
+        dict_get(self.kconfig, 'memory', 'baseaddr')
+        uboot_textbase = dict_get(self.kconfig, 'memory',
+                                  'u__boot_textbase_offset')
+        vlnv = self.hw.get_property(self.target_cpu, 'VLNV').split(':')
+        cpu_ver = vlnv[3] if len(vlnv) > 3 else ''
+        if not re.match(r'[A-Za-z0-9_.]*\Z', cpu_ver):
+            raise UbootBspUnsupported('cpu version %s' % cpu_ver)
+        self.set_kconfig_value(['XILINX_MICROBLAZE0_HW_VER'], ['"%s"' % cpu_ver])
+        self.set_kconfig_string('TEXT_BASE', uboot_textbase)
+        self.set_kconfig_value(['SYS_PROMPT'], ['"U-Boot>"'])
+        if dict_exists(self.kconfig, 'subsys_conf', 'autoconfig_u__boot'):
+            self.set_kconfig_value(['SYS_CONFIG_NAME'], ['"platform-top"'])
+            self.set_kconfig_value(['BOOT_SCRIPT_OFFSET'], ['0x1F00000'])
+        else:
+            self.set_kconfig_value(['SYS_CONFIG_NAME'], ['0'], delete=True)
+        for config in ('SPL', 'I2C_EEPROM', 'CMD_EEPROM',
+                       'SYS_I2C_EEPROM_ADDR_OVERFLOW', 'SYS_I2C_EEPROM_ADDR'):
+            self.set_kconfig_value([config], ['n'])
+        return self.content
+
+
+def gen_uboot_bsp(sysconfig, hw_file, data_dir):
+    '''config.cfg as petalinux_hsm_bridge.tcl -a u-boot_bsp writes it.'''
+    bsp = UbootBsp(sysconfig, hw_file, data_dir)
+    bsp.read_config()
+    return bsp.config_gen()
@@ -66,9 +66,7 @@ def generate_siteconf(args, arch, xilinx_network):
                 siteconf_string += 'SOURCE_MIRROR_URL = "%s"\n' % os.environ['XILINX_INT_DOWNLOADS']
 
         if siteconf_string:
-            with open(site_conf_path, 'w') as site_conf_f:
-                site_conf_f.write(siteconf_string)
-            site_conf_f.close()
+            write_if_changed(site_conf_path, siteconf_string)
 
 
 def generate_mirrors(args, arch):
@@ -0,0 +1,124 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Hardware handoff (.hwh) of an XSA read without xsct: the file is
+# streamed out of the zip through an incremental XML parser, every
+# element being dropped as soon as it has been looked at. It gives the
+# modules, their parameters, ports and memory maps, what xsa_syshw.py
+# and uboot_bsp.py answer the hsi queries of the Tcl they port from.
+
+import os
+import zipfile
+import xml.etree.ElementTree as ElementTree
+
+BLOCK_SIZE = 1024 * 1024
+
+
+class XsaUnsupported(Exception):
+    '''The XSA holds something the extractor does not handle, xsct has
+    to read it.'''
+
+
+def iter_hwh_elements(hwh_f):
+    '''(event, element, parent) for each element of a .hwh file object,
+    event being 'start' or 'end'. An element is emptied once its end
+    event has been handled.'''
+    parser = ElementTree.XMLPullParser(events=('start', 'end'))
+    stack = []
+    try:
+        for chunk in iter(lambda: hwh_f.read(BLOCK_SIZE), b''):
+            parser.feed(chunk)
+            for event, elem in parser.read_events():
+                if event == 'start':
+                    yield event, elem, stack[-1] if stack else None
+                    stack.append(elem)
+                else:
+                    stack.pop()
+                    yield event, elem, stack[-1] if stack else None
+                    elem.clear()
+                    if stack:
+                        # Earlier siblings are gone, this is the first
+                        # child, the parser may already have added more
+                        stack[-1].remove(elem)
+        parser.close()
+    except ElementTree.ParseError as e:
+        raise XsaUnsupported('Unable to parse hardware handoff: %s' % e)
+
+
+def find_hwh(xsa_zip):
+    '''The single hardware handoff of the XSA.'''
+    hwhs = [info for info in xsa_zip.infolist()
+            if info.filename.endswith('.hwh')]
+    if len(hwhs) != 1:
+        raise XsaUnsupported('%d hardware handoff files in XSA' % len(hwhs))
+    return hwhs[0]
+
+
+class HwhDesign:
+    '''What the design in a .hwh is made of: its device and name, each
+    module's ip (MODTYPE), VLNV, IS_PL attribute (None without one) and
+    parameters (the CONFIG.* properties of its cell), the (NAME, DIR,
+    SIGIS) of its ports and the instances in its memory map, which are
+    the slaves of a processor.'''
+
+    def __init__(self, hwh_f):
+        self.device = ''
+        self.name = ''
+        self.modules = {}
+        self.vlnvs = {}
+        self.is_pl = {}
+        self.parameters = {}
+        self.ports = {}
+        self.memory_maps = {}
+        # Names of the bitstreams in the XSA, read_xsa_design sets them
+        self.bitfiles = []
+        module = None
+        module_parameters = False
+        for event, elem, parent in iter_hwh_elements(hwh_f):
+            if event != 'start':
+                if elem.tag == 'MODULE':
+                    module = None
+                elif elem.tag == 'PARAMETERS':
+                    module_parameters = False
+                continue
+            if elem.tag == 'SYSTEMINFO':
+                self.device = elem.get('DEVICE', '')
+                self.name = elem.get('NAME', '')
+            elif elem.tag == 'MODULE':
+                module = elem.get('INSTANCE')
+                if module is None:
+                    raise XsaUnsupported('MODULE without an INSTANCE')
+                self.modules[module] = elem.get('MODTYPE', '')
+                self.vlnvs[module] = elem.get('VLNV', '')
+                self.is_pl[module] = elem.get('IS_PL')
+                self.parameters[module] = {}
+                self.ports[module] = []
+                self.memory_maps[module] = []
+            elif elem.tag == 'PARAMETERS' and parent is not None and \
+                    parent.tag == 'MODULE':
+                module_parameters = module is not None
+            elif elem.tag == 'PARAMETER' and module_parameters:
+                name = elem.get('NAME')
+                if name:
+                    self.parameters[module][name] = elem.get('VALUE', '')
+            elif elem.tag == 'PORT' and module is not None and \
+                    parent is not None and parent.tag == 'PORTS':
+                self.ports[module].append((elem.get('NAME', ''),
+                                           elem.get('DIR', ''),
+                                           elem.get('SIGIS', '')))
+            elif elem.tag == 'MEMRANGE' and module is not None:
+                instance = elem.get('INSTANCE')
+                if instance and instance not in self.memory_maps[module]:
+                    self.memory_maps[module].append(instance)
+
+
+def read_xsa_design(xsa):
+    with zipfile.ZipFile(xsa) as xsa_zip:
+        with xsa_zip.open(find_hwh(xsa_zip)) as hwh_f:
+            design = HwhDesign(hwh_f)
+        design.bitfiles = [os.path.basename(info.filename)
+                           for info in xsa_zip.infolist()
+                           if not info.is_dir() and
+                           info.filename.endswith('.bit')]
+        return design
@@ -0,0 +1,76 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import zipfile
+import hashlib
+
+from config_store import write_file_atomic
+
+# Members the generated Kconfig/plnx_syshw_data are derived from
+HW_DESCRIPTION_EXTS = ('.hwh', '.xml')
+HW_DESCRIPTION_PREFIXES = ('psu_init', 'ps7_init')
+# Implementation results, these change with every bitstream rerun
+BITSTREAM_EXTS = ('.bit', '.pdi', '.mmi', '.ltx')
+BLOCK_SIZE = 1024 * 1024
+
+
+def is_hw_description(name):
+    basename = os.path.basename(name)
+    return basename.endswith(HW_DESCRIPTION_EXTS) or \
+        basename.startswith(HW_DESCRIPTION_PREFIXES)
+
+
+def is_bitstream(name):
+    return name.endswith(BITSTREAM_EXTS)
+
+
+def xsa_hw_digest(xsa):
+    '''Digest of the hardware description in an XSA, re-exporting the
+    same design with a new bitstream gives the same digest.
+
+    Description members are streamed from the zip, other non bitstream
+    members are covered by their name, size and CRC.'''
+    method = hashlib.sha256()
+    with zipfile.ZipFile(xsa) as xsa_zip:
+        for info in sorted(xsa_zip.infolist(), key=lambda i: i.filename):
+            if info.is_dir() or is_bitstream(info.filename):
+                continue
+            if is_hw_description(info.filename):
+                method.update(b'%s\0%d\0' % (info.filename.encode(),
+                                             info.file_size))
+                with xsa_zip.open(info) as member_f:
+                    for chunk in iter(lambda: member_f.read(BLOCK_SIZE), b''):
+                        method.update(chunk)
+            else:
+                method.update(b'%s\0%d\0%08x\0' % (
+                    info.filename.encode(), info.file_size, info.CRC))
+    return method.hexdigest()
+
+
+def xsa_bitstream_digest(xsa):
+    '''Digest of the bitstream members, from the zip directory alone.'''
+    method = hashlib.sha256()
+    with zipfile.ZipFile(xsa) as xsa_zip:
+        for info in sorted(xsa_zip.infolist(), key=lambda i: i.filename):
+            if is_bitstream(info.filename):
+                method.update(b'%s\0%d\0%08x\0' % (
+                    info.filename.encode(), info.file_size, info.CRC))
+    return method.hexdigest()
+
+
+def extract_xsa_bitfiles(xsa, out_dir):
+    '''Extract the .bit members next to the XSA, as xsct does when it
+    opens the design. Returns the extracted file paths.'''
+    bitfiles = []
+    with zipfile.ZipFile(xsa) as xsa_zip:
+        for info in xsa_zip.infolist():
+            if info.is_dir() or not info.filename.endswith('.bit'):
+                continue
+            bitfile = os.path.join(out_dir, os.path.basename(info.filename))
+            # Bitstreams run to hundreds of MB, stream them out
+            with xsa_zip.open(info) as member_f:
+                write_file_atomic(bitfile, member_f)
+            bitfiles.append(bitfile)
+    return bitfiles
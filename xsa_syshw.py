@@ -0,0 +1,1278 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Kconfig.syshw, plnx_syshw_data and plnx_syshw_data.json of the XSCT
+# flow written without starting xsct. This is hw-description.tcl proc
+# by proc over the same Tcl lists, the hsi queries it makes answered
+# from the XSA's hardware handoff. Whatever the handoff does not tell
+# (ADDRESS_TAG of a MicroBlaze, the memory ranges of an axi_noc, the
+# sinks of a reset GPIO, any other property) and any path on which the
+# Tcl errors out raises XsaUnsupported, for the caller to run
+# hw-description.tcl under xsct instead.
+
+import re
+import sys
+import zipfile
+
+from sdt_syshw import DEVICE_TYPES, SdtUnsupported, as_list, as_string, \
+    fix_kconf_name, get_devices_nodes, get_ip_device_info, \
+    get_ip_property_info, get_ipinfo, is_ip_valid_for_device_type, lindex, \
+    lreplace_first, lsearch, string_match, TCL_NUMBER
+from xsa_extractor import XsaUnsupported, read_xsa_design
+
+CELL_NAME = re.compile(r'[A-Za-z0-9_]+\Z')
+TCL_INT = re.compile(r'(0[xX][0-9a-fA-F]+|[1-9][0-9]*|0)\Z')
+TCL_BOOLEANS = {'true': True, 'yes': True, 'on': True,
+                'false': False, 'no': False, 'off': False}
+# Text yaml would not read back as the plain scalar it is
+YAML_NOT_PLAIN = re.compile(
+    r'^[\]\[{},#&*!|>\'"%@`]|^[-?:](\s|\Z)|:(\s|\Z)|\s#|^\s|\s\Z'
+    r'|[\x00-\x1f\x7f]')
+
+
+def tcl_int(value):
+    '''value as the integer Tcl's expr reads it, past 64 bits Tcl's
+    format would wrap it.'''
+    if not TCL_INT.match(value):
+        raise XsaUnsupported('%s as a Tcl integer' % value)
+    number = int(value, 0)
+    if number >= 1 << 64:
+        raise XsaUnsupported('%s past 64 bits' % value)
+    return number
+
+
+def tcl_count(value):
+    '''The times "for {set i 0} {$i < $value} {incr i}" loops: an empty
+    value compares as a string, below "0".'''
+    return 0 if value == '' else tcl_int(value)
+
+
+def tcl_eq(a, b):
+    '''"$a" == "$b" in a Tcl expression: integers compare by value.'''
+    if a == b:
+        return True
+    if TCL_INT.match(a) and TCL_INT.match(b):
+        return int(a, 0) == int(b, 0)
+    if a.strip() and b.strip() and TCL_NUMBER.match(a) and \
+            TCL_NUMBER.match(b):
+        raise XsaUnsupported('numeric comparison of %s and %s' % (a, b))
+    return False
+
+
+def tcl_bool(value):
+    if TCL_INT.match(value):
+        return int(value, 0) != 0
+    if value.lower() not in TCL_BOOLEANS:
+        raise XsaUnsupported('%s as a Tcl boolean' % value)
+    return TCL_BOOLEANS[value.lower()]
+
+
+def tcl_format(fmt, *args):
+    '''format fmt args..., the %s of fmt taking the first args, any
+    further args being ignored as Tcl does.'''
+    count = fmt.count('%s')
+    if len(args) < count:
+        raise XsaUnsupported('not enough arguments for format %r' % fmt)
+    return fmt % args[:count]
+
+
+def hex_str(number):
+    '''format 0x%x'''
+    return '0x%x' % (number % (1 << 64))
+
+
+def yaml_plain(text):
+    '''plnx_yaml_plain'''
+    return YAML_NOT_PLAIN.search(text) is None
+
+
+def json_string(text):
+    '''plnx_json_string'''
+    return '"%s"' % text.replace('\\', '\\\\').replace('"', '\\"') \
+        .replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
+
+
+def llength(value):
+    return len(as_list(value))
+
+
+def convert_list_to_yaml(datanode, prefix):
+    '''plnx_convert_list_to_yaml'''
+    text = '%s%s:' % (prefix, as_string(lindex(datanode, 0)))
+    for n in lreplace_first(datanode):
+        if llength(n) <= 1:
+            text = '%s %s' % (text, as_string(n))
+        else:
+            text = '%s\n%s' % (text, convert_list_to_yaml(
+                n, '%s    ' % prefix))
+    return text
+
+
+class HwhCells:
+    '''The hsi queries hw-description.tcl makes, answered from the
+    hardware handoff the way hsi answers them: cells listed sorted by
+    name, '' for a CONFIG.* property the cell does not have.'''
+
+    def __init__(self, design):
+        self.design = design
+        for name, ip_name in design.modules.items():
+            # Names and ip names go into Tcl lists and Kconfig symbols
+            if not CELL_NAME.match(name) or not CELL_NAME.match(ip_name):
+                raise XsaUnsupported('cell %s of ip %s' % (name, ip_name))
+        self.names = tuple(sorted(design.modules))
+
+    def cells_of_ip(self, ip_name):
+        '''get_cells -hier -filter IP_NAME==ip_name'''
+        cells = []
+        for name in self.names:
+            cell_ip = self.design.modules[name]
+            if cell_ip == ip_name:
+                cells.append(name)
+            elif cell_ip.lower() == ip_name.lower():
+                raise XsaUnsupported('filter on ip %s of %s' % (ip_name, name))
+        return tuple(cells)
+
+    def cell(self, name):
+        '''get_cells -hier name'''
+        return (name,) if name in self.design.modules else ()
+
+    def get_property(self, prop, cell):
+        cells = as_list(cell)
+        if len(cells) != 1 or cells[0] not in self.design.modules:
+            raise XsaUnsupported('%s of no single cell: %s' % (prop, cell))
+        cell = cells[0]
+        if prop == 'NAME':
+            value = cell
+        elif prop == 'IP_NAME':
+            value = self.design.modules[cell]
+        elif prop == 'VLNV':
+            value = self.design.vlnvs[cell]
+        elif prop == 'IS_PL':
+            value = self.design.is_pl[cell]
+            if value is None:
+                raise XsaUnsupported('no IS_PL for %s' % cell)
+        elif prop == 'SLAVES':
+            value = ' '.join(self.design.memory_maps[cell])
+        elif prop.startswith('CONFIG.'):
+            value = self.parameter(cell, prop[len('CONFIG.'):])
+        else:
+            raise XsaUnsupported('no %s property for %s' % (prop, cell))
+        # Anything else would need the Tcl's encodings and trimming
+        if not value.isascii() or not value.isprintable():
+            raise XsaUnsupported('%s of %s: %r' % (prop, cell, value))
+        return value
+
+    def parameter(self, cell, name):
+        parameters = self.design.parameters[cell]
+        if name in parameters:
+            return parameters[name]
+        values = [v for p, v in parameters.items()
+                  if p.upper() == name.upper()]
+        if len(set(values)) > 1:
+            raise XsaUnsupported('CONFIG.%s of %s in several cases'
+                                 % (name, cell))
+        return values[0] if values else ''
+
+    def list_property(self, cell, pattern):
+        '''Names of the CONFIG.* properties of cell matching pattern.'''
+        cell = self.get_property('NAME', cell)
+        return tuple(name for name in ('CONFIG.%s' % p for p in
+                                       self.design.parameters[cell])
+                     if string_match(pattern, name))
+
+    def interrupt_pins(self, cell):
+        '''get_pins -filter "DIRECTION==O && TYPE==INTERRUPT"'''
+        cell = self.get_property('NAME', cell)
+        pins = []
+        for name, direction, sigis in self.design.ports[cell]:
+            if direction == 'O' and sigis == 'INTERRUPT':
+                pins.append(name)
+            elif direction.upper() == 'O' and sigis.upper() == 'INTERRUPT':
+                raise XsaUnsupported('port %s of %s' % (name, cell))
+        return tuple(pins)
+
+
+class XsaSyshw:
+    '''plnx_gen_hwsysconf of hw-description.tcl.'''
+
+    def __init__(self, hw_file, ipinfo_file):
+        self.ipinfo_file = ipinfo_file
+        design = read_xsa_design(hw_file)
+        self.hsi = HwhCells(design)
+        # NAME of the hw design is the bitstream xsct extracts
+        if len(design.bitfiles) != 1:
+            raise XsaUnsupported('%d bitstreams in XSA' %
+                                 len(design.bitfiles))
+        self.device = design.device
+        self.design_name = design.bitfiles[0][:-len('.bit')]
+        for value in (self.device, self.design_name):
+            if not value.isascii() or not value.isprintable():
+                raise XsaUnsupported('design %r' % value)
+        self.current_arch = ''
+        self.kconfig = []
+        self.data = []
+        self.json_nodes = []
+        self.json_plain = True
+
+    def output(self, msg):
+        self.kconfig.append(msg + '\n')
+
+    def convert_list_to_json(self, datanode):
+        '''plnx_convert_list_to_json'''
+        var = as_string(lindex(datanode, 0))
+        scalar = ''
+        children = []
+        for n in lreplace_first(datanode):
+            if llength(n) <= 1:
+                scalar = '%s %s' % (scalar, as_string(n))
+            else:
+                children.append(self.convert_list_to_json(n))
+        scalar = scalar.strip(' ')
+        if not yaml_plain(var) or not yaml_plain(scalar) or \
+                (children and scalar != ''):
+            self.json_plain = False
+        if children:
+            value = '{%s}' % ', '.join(children)
+        else:
+            value = json_string(scalar)
+        return '%s: %s' % (json_string(var), value)
+
+    def output_data(self, datanodes):
+        '''plnx_output_data'''
+        self.data.append(convert_list_to_yaml(datanodes, '') + '\n')
+        if lindex(datanodes, 0) == 'processor':
+            for cpu in lreplace_first(datanodes):
+                self.json_nodes.append(
+                    self.convert_list_to_json(('processor', cpu)))
+        else:
+            self.json_nodes.append(self.convert_list_to_json(datanodes))
+
+    def json(self):
+        '''plnx_output_json'''
+        if not self.json_plain:
+            return '{"schema_version": 3, "scalars": "yaml"}\n'
+        return '{"schema_version": 3, "scalars": "plain"}\n' + \
+            ''.join('{%s}\n' % node for node in self.json_nodes)
+
+    def generate_mapping_list(self):
+        ipinfolist = as_list(get_ipinfo(self.ipinfo_file))
+        mappinglist = []
+        for devtype in DEVICE_TYPES:
+            devtype_mapping = [devtype]
+            if devtype == 'sd':
+                devtype_mapping.append('processor_ip ps7_cortexa9 '
+                                       'psu_cortexa53 psv_cortexa72 '
+                                       'psx_cortexa78')
+            elif devtype in ('timer', 'reset_gpio'):
+                devtype_mapping.append('processor_ip microblaze')
+            ips = ['devices']
+            for ipinfo in ipinfolist:
+                if is_ip_valid_for_device_type(devtype, ipinfo) >= 0:
+                    ips.append(ipinfo)
+            devtype_mapping.append(tuple(ips))
+            mappinglist.append(tuple(devtype_mapping))
+        return tuple(mappinglist)
+
+    def generate(self):
+        '''(Kconfig.syshw, plnx_syshw_data, plnx_syshw_data.json) text.'''
+        self.output_data('device_id %s' % self.device)
+        self.output_data('hw_design_name %s' % self.design_name)
+        hwmenustr = 'menuconfig SUBSYSTEM_HARDWARE_AUTO\n' \
+            '\tbool "Subsystem AUTO Hardware Settings"\n' \
+            '\tdefault y\n' \
+            '\thelp\n' \
+            '\t  This menu is to configure system hardware.\n'
+        self.output('%s\n%s\n' % (hwmenustr, 'if SUBSYSTEM_HARDWARE_AUTO'))
+        hwkconfprefix = 'SUBSYSTEM_'
+        mapping = self.generate_mapping_list()
+        cpumapping = get_devices_nodes(lindex(mapping, 0))
+        retcpus = self.conf_processor(cpumapping, hwkconfprefix)
+        cpus_nodes = ['processor']
+        for c in lreplace_first(retcpus):
+            cpuname = lindex(c, 0)
+            self.current_arch = lindex(get_ip_property_info('arch', c), 0)
+            cpuipname = lindex(get_ip_property_info('ip_name', c), 0)
+            cpuslaves = get_ip_property_info('slaves_strings', c)
+            self.output('if %sPROCESSOR_%s_SELECT' % (hwkconfprefix, cpuname))
+            rets = {'sd': (), 'flash': ()}
+            retslaves = ['slaves']
+            for m in lreplace_first(mapping):
+                devclass = lindex(m, 0)
+                classcpuipnames = get_ip_property_info('processor_ip', m)
+                if classcpuipnames and \
+                        lsearch(classcpuipnames, cpuipname) < 0:
+                    continue
+                elements = get_devices_nodes(m)
+                pproc = getattr(self, 'conf_%s' % devclass)
+                rets[devclass] = pproc(elements, hwkconfprefix, cpuname,
+                                       cpuslaves)
+                retslaves += rets[devclass]
+            self.conf_images_location(rets['sd'], rets['flash'])
+            self.output('endif')
+            for s in as_string(cpuslaves).split(' '):
+                if s and lsearch(tuple(retslaves), s, index=0) < 0:
+                    sipname = self.hsi.get_property('IP_NAME',
+                                                    self.hsi.cell(s))
+                    retslaves.append((s, ('ip_name', sipname)))
+            cpus_nodes.append(tuple(as_list(c)) + (tuple(retslaves),))
+        self.output('endif')
+        self.output_data(tuple(cpus_nodes))
+        return ''.join(self.kconfig), ''.join(self.data), self.json()
+
+    def conf_processor(self, mapping, kconfprefix):
+        retcpus = ['processor']
+        cpukconfprefix = '%sPROCESSOR_' % kconfprefix
+        cpuchoicesstr = ''
+        armknamelist = []
+        mbknamelist = []
+        aarch64namelist = []
+        armlist = []
+        mblist = []
+        aarch64list = []
+        kconfstr = ''
+        for m in as_list(mapping):
+            index = 0
+            ipname = lindex(m, 0)
+            devinfo = get_ip_device_info('processor', m)
+            archmapping = lindex(get_ip_property_info('arch', devinfo), 0)
+            hds = self.hsi.cells_of_ip(ipname)
+            valid_instance_name = lindex(hds, 0)
+            for hd in hds:
+                name = self.hsi.get_property('NAME', hd)
+                if valid_instance_name != '' and \
+                        not tcl_eq(name, valid_instance_name):
+                    continue
+                if archmapping == 'aarch64':
+                    aarch64list.append('%s:aarch64' % name)
+                elif archmapping == 'arm':
+                    armlist.append('%s:arm' % name)
+                elif archmapping == 'microblaze':
+                    mblist.append('%s:microblaze' % name)
+                kconfstr = tcl_format(
+                    '%s\n%s\n%s\n%s\n',
+                    kconfstr, 'config SUBSYSTEM_PROCESSOR%d_IP_NAME' % index,
+                    'string', 'default %s' % name)
+                if archmapping == 'microblaze' and not aarch64list and \
+                        not armlist:
+                    # Such a MicroBlaze is the system processor, its
+                    # kernel properties are read through the cell too
+                    raise XsaUnsupported('ADDRESS_TAG of %s' % name)
+                index += 1
+        if aarch64list:
+            armlist = []
+            mblist = []
+        elif armlist:
+            mblist = []
+
+        for cpu in aarch64list + armlist + mblist:
+            cpuname, archmapping = cpu.split(':')[:2]
+            hd = self.hsi.cell(cpuname)
+            ipname = self.hsi.get_property('IP_NAME', hd)
+            slaves_list = ['slaves_strings']
+            for s in self.hsi.get_property('SLAVES', hd).split(' '):
+                if self.hsi.cell(s):
+                    slaves_list.append(s)
+            kname = cpuname
+            if archmapping == 'arm':
+                armknamelist.append('%s%s_SELECT' % (cpukconfprefix, kname))
+            elif archmapping == 'microblaze':
+                mbknamelist.append('%s%s_SELECT' % (cpukconfprefix, kname))
+            elif archmapping == 'aarch64':
+                aarch64namelist.append('%s%s_SELECT' % (cpukconfprefix, kname))
+            cpuchoicesstr = tcl_format(
+                '%s%s\n\t%s\n',
+                cpuchoicesstr, 'config %s%s_SELECT' % (cpukconfprefix, kname),
+                'bool "%s"' % cpuname)
+            retcpus.append((cpuname, ('arch', archmapping),
+                            ('ip_name', ipname), tuple(slaves_list)))
+        if cpuchoicesstr == '':
+            raise XsaUnsupported('No CPU can be found in the system.')
+        kconfstr = tcl_format(
+            '%s\n%s\n\t%s\n\t%s\n\t%s\n%s\n%s\n',
+            kconfstr, 'choice', 'prompt "System Processor"', 'help',
+            ' Select a processor as the system processor', cpuchoicesstr,
+            'endchoice')
+        for namelist, arch_kconf, arch_select in (
+                (armknamelist, 'ARCHARM', 'ARCH_ARM'),
+                (mbknamelist, 'ARCHMB', 'ARCH_MICROBLAZE'),
+                (aarch64namelist, 'ARCH64', 'ARCH_AARCH64')):
+            if namelist:
+                kconfstr = tcl_format(
+                    '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s%s\n',
+                    kconfstr, 'config SUBSYSTEM_ENABLE_%s' % arch_kconf,
+                    'bool', 'default y', 'select SUBSYSTEM_%s' % arch_select,
+                    'depends on ', ' ||'.join(namelist))
+        self.output(kconfstr)
+        return tuple(retcpus)
+
+    def memory_bank_kconfig(self, bankid, bankbaseaddr, bankhighaddr,
+                            instance_name, kconfig_prefix):
+        '''plnx_gen_memory_bank_kconfig'''
+        if bankbaseaddr == '' or bankhighaddr == '':
+            raise XsaUnsupported('No memory base address and high address '
+                                 'is provided')
+        base = tcl_int(bankbaseaddr)
+        high = tcl_int(bankhighaddr)
+        # The size is compared and added as the 64 bit hex it is written as
+        size = (high - base + 1) % (1 << 64)
+        banksize = hex_str(size)
+        if size < 0x2000000:
+            return ''
+        kname = fix_kconf_name(instance_name)
+        if bankid == '':
+            bankkconf = 'BANKLESS'
+            promptname = instance_name
+        else:
+            bankkconf = 'BANK%s' % bankid
+            promptname = '%s bank%s' % (instance_name, bankid)
+        bank = '%s%s_%s' % (kconfig_prefix, kname, bankkconf)
+        choicestr = '%s\n\t%s\n' % ('config %s_SELECT' % bank,
+                                    'bool "%s"' % promptname)
+        baseaddrstr = tcl_format(
+            '%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+            'config %s_BASEADDR' % bank,
+            'hex "System memory base address"',
+            'default %s' % bankbaseaddr,
+            'range %s %s' % (bankbaseaddr, hex_str(high - 0x2000000 + 1)),
+            'depends on %s_SELECT' % bank,
+            'help',
+            '  Start address of the system memory.',
+            '  It has to be within the selected primary memory physical address range.',
+            '  Make sure the DT memory entry should start with provided address.')
+        sizestr = tcl_format(
+            '%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+            'config %s_SIZE' % bank,
+            'hex "System memory size"',
+            'default %s' % banksize,
+            'range 0x2000000 %s' % banksize,
+            'depends on %s_SELECT' % bank,
+            'help',
+            '  Size of the system memory. Minimum is 32MB, maximum is the size of',
+            '  the selected primary memory physical address range.')
+        kernelbaseaddrstr = tcl_format(
+            '%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+            'config %s_KERNEL_BASEADDR' % bank,
+            'hex "kernel base address"',
+            'default %s' % bankbaseaddr,
+            'range %s %s' % (bankbaseaddr, hex_str(base + size - 0x2000000)),
+            'depends on %s_SELECT' % bank,
+            'depends on SUBSYSTEM_ARCH_ARM || SUBSYSTEM_ARCH_AARCH64',
+            'help',
+            '  kernel base address.')
+        ubootoffsetstr = tcl_format(
+            '%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+            'config %s_U__BOOT_TEXTBASE_OFFSET' % bank,
+            'hex "u-boot text base address offset to memory base address"',
+            'default %s if SUBSYSTEM_ARCH_AARCH64' % hex_str(base + 0x8000000),
+            'default %s if SUBSYSTEM_ARCH_ARM' % hex_str(base + 0x4000000),
+            'default %s if SUBSYSTEM_ARCH_MICROBLAZE' % hex_str(base + 0x100000),
+            'range %s %s' % (hex_str(base + 0x100000),
+                             hex_str(base + size - 0x2000000 + 0x100000)),
+            'depends on %s_SELECT' % bank,
+            'depends on !SUBSYSTEM_COMPONENT_U__BOOT_NAME_NONE',
+            'help',
+            '  u-boot offset to the memory base address. Minimum suggested is 1MB.')
+        ddripname = tcl_format(
+            '%s\n\t%s\n\t%s\n\t%s\n',
+            'config %sIP_NAME' % kconfig_prefix,
+            'string',
+            'default %s' % kname,
+            'depends on %s_SELECT' % bank)
+        return (choicestr, baseaddrstr, sizestr, kernelbaseaddrstr,
+                ubootoffsetstr, ddripname)
+
+    def conf_memory(self, mapping, kconfprefix, cpuname, cpuslaves):
+        retmemories = []
+        devicetype = 'memory'
+        memorykconfprefix = '%sMEMORY_' % kconfprefix
+        strs = {'choice': '', 'baseaddr': '', 'size': '', 'kernelbaseaddr': '',
+                'ubootoffset': '', 'ddripname': ''}
+
+        def add_bank(strlist, memnode, ddripname=True):
+            if lindex(strlist, 0) == '':
+                return
+            strs['choice'] = '%s%s' % (strs['choice'], strlist[0])
+            for i, key in enumerate(('baseaddr', 'size', 'kernelbaseaddr',
+                                     'ubootoffset', 'ddripname'), 1):
+                if key != 'ddripname' or ddripname:
+                    strs[key] = '%s\n%s\n' % (strs[key], strlist[i])
+            retmemories.append(memnode)
+
+        for m in as_list(mapping):
+            ipname = lindex(m, 0)
+            devinfo = get_ip_device_info('memory', m)
+            has_bank = lindex(get_ip_property_info('has_bank', devinfo), 0)
+            if has_bank == 'y':
+                banks_property = lindex(
+                    get_ip_property_info('number_of_banks', devinfo), 0)
+                bankinfo = get_ip_property_info('bank_property', devinfo)
+                bankidreplacement = lindex(get_ip_property_info(
+                    'bankid_replacement_str', bankinfo), 0)
+                bank_enabled_property = lindex(
+                    get_ip_property_info('bank_enabled', bankinfo), 0)
+                bank_baseaddr_property = lindex(
+                    get_ip_property_info('bank_baseaddr', bankinfo), 0)
+                bank_highaddr_property = lindex(
+                    get_ip_property_info('bank_highaddr', bankinfo), 0)
+            else:
+                banks_property = ''
+                bankidreplacement = None
+                bank_baseaddr_property = lindex(
+                    get_ip_property_info('baseaddr', devinfo), 0)
+                bank_highaddr_property = lindex(
+                    get_ip_property_info('highaddr', devinfo), 0)
+                bank_enabled_property = ''
+            for hd in self.hsi.cells_of_ip(ipname):
+                if llength(bank_baseaddr_property):
+                    bankbaseaddr = self.get_property(bank_baseaddr_property,
+                                                     hd)
+                    if not llength(bankbaseaddr):
+                        bank_baseaddr_property = lindex(
+                            get_ip_property_info('baseaddr1', devinfo), 0)
+                if llength(bank_highaddr_property):
+                    bankhighaddr = self.get_property(bank_highaddr_property,
+                                                     hd)
+                    if not llength(bankhighaddr):
+                        bank_highaddr_property = lindex(
+                            get_ip_property_info('highaddr1', devinfo), 0)
+                name = self.hsi.get_property('NAME', hd)
+                if lsearch(cpuslaves, name) < 0:
+                    continue
+                if has_bank == 'n':
+                    if re.search('axi_noc', ipname):
+                        raise XsaUnsupported('memory ranges of %s' % name)
+                    bankbaseaddr = self.get_property(bank_baseaddr_property,
+                                                     hd)
+                    bankhighaddr = self.get_property(bank_highaddr_property,
+                                                     hd)
+                    # The Tcl matches "ps[7]_ddr", xsct substitutes 7 for
+                    # the [7]: the PS DDR is set to start at 0x0
+                    if re.search('ps7_ddr', ipname):
+                        bankbaseaddr = '0x0'
+                    strlist = self.memory_bank_kconfig(
+                        '', bankbaseaddr, bankhighaddr, name,
+                        memorykconfprefix)
+                    add_bank(strlist, (
+                        '%s_bankless' % name, ('device_type', devicetype),
+                        ('ip_name', ipname), ('baseaddr', bankbaseaddr),
+                        ('highaddr', bankhighaddr)))
+                elif has_bank == 'y' and banks_property != '':
+                    bankcount = self.get_property(banks_property, hd)
+                    if ipname == 'axi_emc':
+                        bankcount = str(len(self.hsi.list_property(
+                            hd, 'CONFIG.C_S_AXI_MEM*_BASEADDR')))
+                        bank_baseaddr_property = lindex(get_ip_property_info(
+                            'bank_baseaddr', bankinfo), 0)
+                        bank_highaddr_property = lindex(get_ip_property_info(
+                            'bank_highaddr', bankinfo), 0)
+                    for i in range(tcl_count(bankcount)):
+                        if ipname == 'axi_emc':
+                            isflash = self.get_property(
+                                'CONFIG.EMC_BOARD_INTERFACE', hd)
+                            if isflash == 'linear_flash':
+                                continue
+                        bankbaseaddr = self.get_property(string_map(
+                            bankidreplacement, i, bank_baseaddr_property), hd)
+                        bankhighaddr = self.get_property(string_map(
+                            bankidreplacement, i, bank_highaddr_property), hd)
+                        strlist = self.memory_bank_kconfig(
+                            str(i), bankbaseaddr, bankhighaddr, name,
+                            memorykconfprefix)
+                        add_bank(strlist, (
+                            '%s_bank%d' % (name, i),
+                            ('device_type', devicetype), ('ip_name', ipname),
+                            ('baseaddr', bankbaseaddr),
+                            ('highaddr', bankhighaddr)), ddripname=False)
+                else:
+                    for i in range(32):
+                        bankenabled = self.get_property(string_map(
+                            bankidreplacement, i, bank_enabled_property), hd)
+                        if bankenabled == '':
+                            break
+                        elif tcl_eq(bankenabled, '0'):
+                            continue
+                        bankbaseaddr = self.get_property(string_map(
+                            bankidreplacement, i, bank_baseaddr_property), hd)
+                        bankhighaddr = self.get_property(string_map(
+                            bankidreplacement, i, bank_highaddr_property), hd)
+                        strlist = self.memory_bank_kconfig(
+                            str(i), bankbaseaddr, bankhighaddr, name,
+                            memorykconfprefix)
+                        add_bank(strlist, (
+                            '%s_bank%d' % (name, i),
+                            ('device_type', devicetype), ('ip_name', ipname),
+                            ('baseaddr', bankbaseaddr),
+                            ('highaddr', bankhighaddr)), ddripname=False)
+        choicestr = tcl_format(
+            '%s\n%s\n\t%s\n',
+            strs['choice'], 'config %sMANUAL_SELECT' % memorykconfprefix,
+            'bool "manual"')
+        baseaddrstr = tcl_format(
+            '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+            strs['baseaddr'],
+            'config %sMANUAL_LOWER_BASEADDR' % memorykconfprefix,
+            'hex "Lower memory base address"',
+            'default 0x0',
+            'depends on %sMANUAL_SELECT' % memorykconfprefix,
+            'help',
+            '  base address of the lower memory',
+            '  Make sure the DT memory entry should start with provided address.')
+        sizestr = tcl_format(
+            '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+            strs['size'],
+            'config %sMANUAL_LOWER_MEMORYSIZE' % memorykconfprefix,
+            'hex "Lower memory size"',
+            'default 0x80000000',
+            'depends on %sMANUAL_SELECT' % memorykconfprefix,
+            'help',
+            '  Size of the lower memory. Minimum is 32MB, maximum is the size of',
+            '  the selected primary memory physical address range.',
+            '  If you specify 0x0 offset then it will skip generating lower memory node.')
+        baseaddrstr1 = tcl_format(
+            '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+            '', 'config %sMANUAL_UPPER_BASEADDR' % memorykconfprefix,
+            'hex "Upper memory base address"',
+            'default 0x800000000',
+            'depends on %sMANUAL_SELECT' % memorykconfprefix,
+            'depends on SUBSYSTEM_ARCH_AARCH64',
+            'help',
+            '  base address of the upper memory',
+            '  Make sure the DT memory entry should start with provided address.')
+        sizestr1 = tcl_format(
+            '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+            '', 'config %sMANUAL_UPPER_MEMORYSIZE' % memorykconfprefix,
+            'hex "Upper memory size"',
+            'default 0x80000000',
+            'depends on %sMANUAL_SELECT' % memorykconfprefix,
+            'depends on SUBSYSTEM_ARCH_AARCH64',
+            'help',
+            '  Size of the upper memory. Minimum is 32MB, maximum is the size of',
+            '  the selected primary memory physical address range.',
+            '  If you specify 0x0 offset then it will skip generating upper memory node.')
+        choicestr = tcl_format(
+            '%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+            'choice',
+            'prompt "Primary Memory"',
+            'help',
+            '  The configuration in this menu impacts the memory settings in the device tree',
+            '  autoconfig files.',
+            '  If you select \'manual\', PetaLinux will auto generate memory node based on user inputs,',
+            '  you will need to specify base address and memory size.',
+            '  To skip generating lower or upper memory node specify 0x0 offset to the memory size.',
+            choicestr,
+            'endchoice')
+        self.output(tcl_format(
+            '%s\n%s\n%s\n%s\n%s\n%s\n%s\n%s\n%s\n%s\n',
+            'menu "Memory Settings"', choicestr, baseaddrstr, sizestr,
+            baseaddrstr1, sizestr1, strs['kernelbaseaddr'],
+            strs['ubootoffset'], strs['ddripname'], 'endmenu'))
+        return tuple(retmemories)
+
+    def get_property(self, prop, hd):
+        '''hsi get_property of an ipinfo.yaml property name.'''
+        if prop == '':
+            raise XsaUnsupported('empty property name for %s' % hd)
+        return self.hsi.get_property(prop, hd)
+
+    def interrupt_validation(self, ipinfo, devtype, hd):
+        '''1 for an ip which needs no interrupt or has one, -1 else.'''
+        ipdev_info = get_ip_device_info(devtype, ipinfo)
+        if lindex(get_ip_property_info('interrupt_required', ipdev_info),
+                  0) != 'y':
+            return 1
+        srcname = self.hsi.get_property('NAME', hd)
+        return 1 if self.hsi.interrupt_pins(self.hsi.cell(srcname)) else -1
+
+    def conf_serial(self, mapping, kconfprefix, cpuname, cpuslaves):
+        retserials = []
+        devicetype = 'serial'
+        serialkconfprefix = '%sSERIAL_' % kconfprefix
+        choicestr = ''
+        baudratechoicestr = ''
+        serialipname = ''
+        baudrates = {}
+        for m in as_list(mapping):
+            ipname = lindex(m, 0)
+            devinfo = get_ip_device_info('serial', m)
+            baudrateproperty = lindex(
+                get_ip_property_info('default_baudrate', devinfo), 0)
+            hcbaudrate = lindex(
+                get_ip_property_info('default_baudrate_value', devinfo), 0)
+            is_baudrate_editable = lindex(
+                get_ip_property_info('baudrate_editable', devinfo), 0)
+            baseaddr_property = lindex(
+                get_ip_property_info('baseaddr', devinfo), 0)
+            is_config_uart_property = lindex(
+                get_ip_property_info('is_serial_property', devinfo), 0)
+            for hd in self.hsi.cells_of_ip(ipname):
+                name = self.hsi.get_property('NAME', hd)
+                if lsearch(cpuslaves, name) < 0:
+                    continue
+                if is_config_uart_property != '':
+                    is_config_uart = self.get_property(
+                        is_config_uart_property, hd)
+                    if is_config_uart == '' or tcl_eq(is_config_uart, '0'):
+                        continue
+                if baseaddr_property != '':
+                    uart_baseaddr = self.get_property(baseaddr_property, hd)
+                if self.interrupt_validation(m, devicetype, hd) < 0:
+                    continue
+                kname = fix_kconf_name(name)
+                if baudrateproperty != '' and is_baudrate_editable == 'n':
+                    baudrates[kname] = (self.get_property(baudrateproperty,
+                                                          hd),)
+                elif hcbaudrate != '':
+                    baudrates[kname] = (hcbaudrate,)
+                else:
+                    baudrates[kname] = ('600', '9600', '28800', '115200',
+                                        '230400', '460800', '921600')
+                choicestr = '%s %s' % (choicestr, name)
+                serialnode = (name, ('device_type', devicetype),
+                              ('ip_name', ipname))
+                if baseaddr_property != '':
+                    serialnode += (('baseaddr', uart_baseaddr),)
+                retserials.append(serialnode)
+        components_list = ''
+        if string_match('*aarch64*', self.current_arch, nocase=True):
+            if re.search('psv_cortexa72*', cpuname):
+                components_list = 'PLM TF-A DTG'
+            elif re.search('psx_cortexa78*', cpuname):
+                components_list = 'PLM TF-A DTG'
+            elif re.search('psu_cortexa53*', cpuname):
+                components_list = 'PMUFW FSBL TF-A DTG'
+        elif re.search('arm*', self.current_arch):
+            components_list = 'FSBL DTG'
+        elif re.search('microblaze*', self.current_arch):
+            components_list = 'FSBOOT DTG'
+        tmpstr = as_list(choicestr)
+        choicestr = ''
+        for component in as_list(components_list):
+            conf_comp = '' if component == 'DTG' else '%s_' % component
+            choicestr = tcl_format(
+                '%s\n%s\n\t%s\n',
+                choicestr, 'choice',
+                'prompt "%s Serial stdin/stdout"' % component)
+            choicestr = tcl_format(
+                '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+                choicestr, 'help',
+                '  Select a serial as the %s\'s stdin,stdout.' % component,
+                '  If you select \'manual\', you will need to add this variable ',
+                '  YAML_SERIAL_CONSOLE_STDIN:forcevariable:pn-%s = "<serial_ipname>" '
+                % component,
+                '  YAML_SERIAL_CONSOLE_STDOUT:forcevariable:pn-%s = "<serial_ipname>" '
+                % component,
+                '  in petalinuxbsp.conf file to specify the stdin/stdout.')
+            if component == 'TF-A':
+                choicestr = tcl_format(
+                    '%s\n%s\n\t%s\n\t%s\n\t%s\n',
+                    choicestr, 'help',
+                    '  Select a serial as the %s\'s stdin,stdout.' % component,
+                    '  If you select \'manual\', you will need to add this variable ',
+                    '  ATF_CONSOLE:forcevariable = "<serial_ipname>" in petalinuxbps.conf ')
+            for serial in tmpstr:
+                kstr = fix_kconf_name(serial)
+                if component not in ('DTG', 'FSBOOT'):
+                    if tcl_bool(self.hsi.get_property(
+                            'IS_PL', self.hsi.cell(serial))):
+                        continue
+                choicestr = tcl_format(
+                    '%s%s\n\t%s\n',
+                    choicestr, 'config %s%sSERIAL_%s_SELECT' %
+                    (kconfprefix, conf_comp, kstr), 'bool "%s"' % serial)
+            choicestr = tcl_format(
+                '%s%s\n%s\n\t%s\n',
+                choicestr, 'config %s%sSERIAL_MANUAL_SELECT' %
+                (kconfprefix, conf_comp), 'bool "manual"', 'endchoice')
+
+        if tmpstr:
+            baudratechoicestr = ''
+            for serial in tmpstr:
+                kstr = fix_kconf_name(serial)
+                baudratechoicestr = tcl_format(
+                    '%s%s\n\t%s\n\t%s\n',
+                    baudratechoicestr, 'choice',
+                    'prompt "System stdin/stdout baudrate for %s"' % serial,
+                    'default %s%s_BAUDRATE_115200' % (serialkconfprefix, kstr))
+                for b in baudrates[kstr]:
+                    baudratechoicestr = tcl_format(
+                        '%s%s\n\t%s\t\n',
+                        baudratechoicestr, 'config %s%s_BAUDRATE_%s' %
+                        (serialkconfprefix, kstr, b), 'bool "%s"' % b)
+                baudratechoicestr = '%s%s\n' % (baudratechoicestr, 'endchoice')
+
+        for component in as_list(components_list):
+            conf_comp = '' if component == 'DTG' else '%s_' % component
+            serialipname = tcl_format(
+                '%s\n%s\n%s\n',
+                serialipname, 'config %s%sIP_NAME' %
+                (serialkconfprefix, conf_comp), 'string')
+            for serial in tmpstr:
+                kstr = fix_kconf_name(serial)
+                if component == 'TF-A':
+                    atf_console = ''
+                    if string_match('*psu_uart_0*', serial, nocase=True):
+                        atf_console = 'cadence'
+                    elif string_match('*psu_uart_1*', serial, nocase=True):
+                        atf_console = 'cadence1'
+                    elif string_match('*psv_sbsauart_0*', serial,
+                                      nocase=True) or \
+                            string_match('*psx_sbsauart_0*', serial,
+                                         nocase=True):
+                        atf_console = 'pl011'
+                    elif string_match('*psv_sbsauart_1*', serial,
+                                      nocase=True) or \
+                            string_match('*psx_sbsauart_1*', serial,
+                                         nocase=True):
+                        atf_console = 'pl011_1'
+                    if atf_console == '':
+                        atf_console = 'dcc'
+                    serial = atf_console
+                serialipname = tcl_format(
+                    '%s%s\n',
+                    serialipname, 'default %s if %s%sSERIAL_%s_SELECT' %
+                    (serial, kconfprefix, conf_comp, kstr))
+
+        kconfigstr = '%s\n%s\n' % ('menu "Serial Settings"', choicestr)
+        self.output(tcl_format(
+            '%s\n%s\n%s\n%s\n',
+            kconfigstr, baudratechoicestr, serialipname, 'endmenu'))
+        return tuple(retserials)
+
+    def slaves_of(self, mapping, cpuslaves, devicetype):
+        '''(name, ipname) of the cells of the mapping ips which are slaves
+        of the processor and pass the interrupt validation.'''
+        slaves = []
+        for m in as_list(mapping):
+            ipname = lindex(m, 0)
+            for hd in self.hsi.cells_of_ip(ipname):
+                name = self.hsi.get_property('NAME', hd)
+                if lsearch(cpuslaves, name) < 0:
+                    continue
+                if self.interrupt_validation(m, devicetype, hd) < 0:
+                    continue
+                slaves.append((name, ipname))
+        return slaves
+
+    def conf_ethernet(self, mapping, kconfprefix, cpuname, cpuslaves):
+        reteths = []
+        devicetype = 'ethernet'
+        ethkconfprefix = '%sETHERNET_' % kconfprefix
+        choicestr = ''
+        macstr = ''
+        ipstr = ''
+        for name, ipname in self.slaves_of(mapping, cpuslaves, devicetype):
+            prefix = '%s%s' % (ethkconfprefix, fix_kconf_name(name))
+            choicestr = tcl_format(
+                '%s%s\n\t%s\n',
+                choicestr, 'config %s_SELECT' % prefix, 'bool "%s"' % name)
+            reteths.append((name, ('device_type', devicetype),
+                            ('ip_name', ipname)))
+            macstr = tcl_format(
+                '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+                macstr, 'config %s_MAC_AUTO' % prefix,
+                'bool "Randomise MAC address"',
+                'default y if SUBSYSTEM_ARCH_MICROBLAZE',
+                'default n',
+                'depends on %s_SELECT' % prefix,
+                'help',
+                '  randomise MAC address for the primary ethernet.')
+            macstr = tcl_format(
+                '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+                macstr, 'config %s_MAC_PATTERN' % prefix,
+                'string "Template for randomised MAC address"',
+                'default "00:0a:35:00:??:??"',
+                'depends on %s_SELECT && %s_MAC_AUTO' % (prefix, prefix),
+                'help',
+                '  Pattern for generating random MAC addresses - question mark',
+                '  characters will be replaced by random hex digits')
+            macstr = tcl_format(
+                '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+                macstr, 'config %s_MAC' % prefix,
+                'string "Ethernet MAC address"',
+                'default "ff:ff:ff:ff:ff:ff"',
+                'depends on %s_SELECT && !%s_MAC_AUTO' % (prefix, prefix),
+                'help',
+                '  Default mac set to ff:ff:ff:ff:ff:ff invalid mac address to read from EEPROM',
+                '  if you want change with desired value you can change, example: 00:0a:35:00:22:01')
+            ipstr = tcl_format(
+                '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+                ipstr, 'config %s_USE_DHCP' % prefix,
+                'bool "Obtain IP address automatically"',
+                'default y',
+                'depends on %s_SELECT' % prefix,
+                'help',
+                '  Set this option if you would like your SUBSYSTEM to use DHCP for',
+                '  obtaining an IP address.')
+            ipstr = tcl_format(
+                '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+                ipstr, 'config %s_IP_ADDRESS' % prefix,
+                'string "Static IP address"',
+                'default "192.168.0.10"',
+                'depends on %s_SELECT && !%s_USE_DHCP' % (prefix, prefix),
+                'help',
+                '  The IP address of your main network interface when static network',
+                '  address assignment is used.')
+            ipstr = tcl_format(
+                '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+                ipstr, 'config %s_IP_NETMASK' % prefix,
+                'string "Static IP netmask"',
+                'default "255.255.255.0"',
+                'depends on %s_SELECT && !%s_USE_DHCP' % (prefix, prefix),
+                'help',
+                '  Default netmask when static network address assignment is used.',
+                '  In case of systemd please specify netmask value like CIDR notation Eg: 24 instead of 255.255.255.0',
+                '  In case of sysvinit please specify netmask value like dot-decimal notation Eg: 255.255.255.0 instead of 24 ')
+            ipstr = tcl_format(
+                '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+                ipstr, 'config %s_IP_GATEWAY' % prefix,
+                'string "Static IP gateway"',
+                'default "192.168.0.1"',
+                'depends on %s_SELECT && !%s_USE_DHCP' % (prefix, prefix),
+                'help',
+                '  Default gateway when static network address assignment is used.')
+        choicestr = tcl_format(
+            '%s%s\n\t%s\n',
+            choicestr, 'config %sMANUAL_SELECT' % ethkconfprefix,
+            'bool "manual"')
+        kconfigstr = tcl_format(
+            '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n%s\n%s\n',
+            'menu "Ethernet Settings"',
+            'choice',
+            'prompt "Primary Ethernet"',
+            'help',
+            '  Select a Ethernet used as primary Ethernet.',
+            '  The primary ethernet will be used for u-boot networking if u-boot is',
+            '  selected and will be used as eth0 in Linux.',
+            '  If your preferred primary ethernet is not on the list, please select',
+            '  \'manual\'.',
+            choicestr,
+            'endchoice')
+        self.output('%s\n%s\n%s\n%s\n' % (kconfigstr, macstr, ipstr, 'endmenu'))
+        return tuple(reteths)
+
+    def conf_sd(self, mapping, kconfprefix, cpuname, cpuslaves):
+        retsds = []
+        sdkconfprefix = '%sPRIMARY_SD_' % kconfprefix
+        choicestr = ''
+        for name, ipname in self.slaves_of(mapping, cpuslaves, 'sd'):
+            choicestr = tcl_format(
+                '%s%s\n\t%s\n',
+                choicestr, 'config %s%s_SELECT' %
+                (sdkconfprefix, fix_kconf_name(name)), 'bool "%s"' % name)
+            retsds.append((name, ('device_type', 'sd'), ('ip_name', ipname)))
+        choicestr = tcl_format(
+            '%s%s\n\t%s\n',
+            choicestr, 'config %sMANUAL_SELECT' % sdkconfprefix,
+            'bool "manual"')
+        kconfigstr = tcl_format(
+            '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+            'menu "SD/SDIO Settings"',
+            'choice',
+            'prompt "Primary SD/SDIO"',
+            'help',
+            '  Select a SD instanced used as primary SD/SDIO.',
+            '  It allows you to select which SD controller is in the systems primary SD card interface.',
+            choicestr,
+            'endchoice')
+        self.output('%s\n%s\n' % (kconfigstr, 'endmenu'))
+        self.conf_basic(mapping, kconfprefix, cpuname, cpuslaves, 'SD')
+        return tuple(retsds)
+
+    def conf_timer(self, mapping, kconfprefix, cpuname, cpuslaves):
+        # Only run for a MicroBlaze, which conf_processor leaves to xsct
+        raise XsaUnsupported('timers of %s' % cpuname)
+
+    def conf_reset_gpio(self, mapping, kconfprefix, cpuname, cpuslaves):
+        # Only run for a MicroBlaze, the Tcl traces the GPIO's sinks too
+        raise XsaUnsupported('reset GPIOs of %s' % cpuname)
+
+    def conf_rtc(self, mapping, kconfprefix, cpuname, cpuslaves):
+        retrtcs = []
+        rtckconfprefix = '%sRTC_' % kconfprefix
+        choicestr = ''
+        for name, ipname in self.slaves_of(mapping, cpuslaves, 'rtc'):
+            choicestr = tcl_format(
+                '%s%s\n\t%s\n',
+                choicestr, 'config %s%s_SELECT' %
+                (rtckconfprefix, fix_kconf_name(name)), 'bool "%s"' % name)
+            retrtcs.append((name, ('device_type', 'rtc'), ('ip_name', ipname)))
+        choicestr = tcl_format(
+            '%s%s\n\t%s\n',
+            choicestr, 'config %sMANUAL_SELECT' % rtckconfprefix,
+            'bool "manual"')
+        kconfigstr = tcl_format(
+            '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n%s\n',
+            'menu "RTC Settings"',
+            'choice',
+            'prompt "Primary RTC"',
+            'help',
+            '  Select a RTC instance used as primary timer for Linux kernel.',
+            '  If your preferred RTC is not on the list, please select \'manual\'.',
+            '  If \'manual\' is selected, you will be responsible to enable property',
+            '  kernel driver for your RTC.',
+            choicestr,
+            'endchoice')
+        self.output('%s\n%s\n' % (kconfigstr, 'endmenu'))
+        return tuple(retrtcs)
+
+    def conf_sata(self, mapping, kconfprefix, cpuname, cpuslaves):
+        return self.conf_basic(mapping, kconfprefix, cpuname, cpuslaves, 'SATA')
+
+    def conf_usb(self, mapping, kconfprefix, cpuname, cpuslaves):
+        return self.conf_basic(mapping, kconfprefix, cpuname, cpuslaves, 'USB')
+
+    def conf_i2c(self, mapping, kconfprefix, cpuname, cpuslaves):
+        return self.conf_basic(mapping, kconfprefix, cpuname, cpuslaves, 'I2C')
+
+    def conf_dp(self, mapping, kconfprefix, cpuname, cpuslaves):
+        return self.conf_basic(mapping, kconfprefix, cpuname, cpuslaves, 'DP')
+
+    def conf_basic(self, mapping, kconfprefix, cpuname, cpuslaves, devicetype):
+        retdev = []
+        devkconfprefix = '%s%s_' % (kconfprefix, devicetype)
+        devicetype = devicetype.lower()
+        choicestr = ''
+        for name, ipname in self.slaves_of(mapping, cpuslaves, devicetype):
+            choicestr = tcl_format(
+                '%s%s\n\t%s\n\t%s\n',
+                choicestr, 'config %s%s_SELECT' %
+                (devkconfprefix, fix_kconf_name(name)), 'bool', 'default y')
+            retdev.append((name, ('device_type', devicetype),
+                           ('ip_name', ipname)))
+        self.output('%s\n' % choicestr)
+        return tuple(retdev)
+
+    def conf_flash_partition(self, prefix, flashname, bankid, advdepends,
+                             flash_prefix):
+        '''plnx_get_conf_flash_partition'''
+        partitionstr = ''
+        flashipname = ''
+        kname = fix_kconf_name(flashname)
+        if bankid == '':
+            bankprompt = ''
+            bankkconf = 'BANKLESS'
+        else:
+            bankprompt = ' bank%s' % bankid
+            bankkconf = 'BANK%s' % bankid
+        choicestr = tcl_format(
+            '%s\n\t%s\n',
+            'config %s%s_%s_SELECT' % (prefix, kname, bankkconf),
+            'bool "%s%s"' % (flashname, bankprompt))
+        defaultlist = []
+        nand = string_match('*nand*', flashname, nocase=True)
+        if self.current_arch == 'aarch64':
+            defaultlist = [('boot', '0x100000'), ('kernel', '0x1600000'),
+                           ('bootenv', '0x40000')]
+            if nand:
+                defaultlist += [('device-tree', '0x400000'),
+                                ('rootfs', '0x3C00000')]
+        elif self.current_arch == 'arm':
+            defaultlist = [('boot', '0x500000'), ('kernel', '0xA80000'),
+                           ('bootenv', '0x20000')]
+            if nand:
+                defaultlist += [('device-tree', '0x400000'),
+                                ('rootfs', '0x3C00000')]
+        elif self.current_arch == 'microblaze':
+            defaultlist = [('fpga', '0xB00000'), ('boot', '0x40000'),
+                           ('bootenv', '0x20000'), ('kernel', '0xC00000')]
+        if llength(flash_prefix):
+            defaultlist = [('%s-%s' % (flash_prefix, name), size)
+                           for name, size in defaultlist]
+        for i in range(20):
+            if i < len(defaultlist):
+                defaultname, defaultsize = defaultlist[i]
+            else:
+                defaultname = ''
+                defaultsize = '0x0'
+            part = '%s%s_%s_PART%d' % (prefix, kname, bankkconf, i)
+            if i == 0:
+                namedepends = '%s%s_%s_SELECT' % (prefix, kname, bankkconf)
+            else:
+                namedepends = '%s%s_%s_PART%d_NAME != ""' % (
+                    prefix, kname, bankkconf, i - 1)
+            partitionstr = tcl_format(
+                '%s\n%s\n\t%s\n',
+                partitionstr, 'comment "partition %d"' % i,
+                'depends on %s' % namedepends)
+            partitionstr = tcl_format(
+                '%s\n%s\n\t%s\n\t%s\n\t%s\n',
+                partitionstr, 'config %s_NAME' % part, 'string "name"',
+                'default "%s"' % defaultname, 'depends on %s' % namedepends)
+            partitionstr = tcl_format(
+                '%s\n%s\n\t%s\n\t%s\n\t%s\n',
+                partitionstr, 'config %s_SIZE' % part, 'hex "size"',
+                'default %s' % defaultsize,
+                'depends on %s_NAME != ""' % part)
+            partitionstr = tcl_format(
+                '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n',
+                partitionstr, 'config %s_FLAGS' % part,
+                'string "flash partition flags"',
+                'default ""',
+                'depends on %s_NAME != "" && %s' % (part, advdepends),
+                'help',
+                '  Pass the flash partition flags to DTS. Use comma separatioon for',
+                '  multiple flags, e.g. abc,def,...,xyz',
+                '  Currently, the supported string is RO ("read-only" string) flag',
+                '  which marks the partition read-only')
+            flashipname = tcl_format(
+                '%s\n%s\n%s\n%s\n%s\n',
+                flashipname, 'config %sIP_NAME' % prefix, 'string',
+                'default %s' % flashname, 'depends on %s' % namedepends)
+        return choicestr, partitionstr, flashipname
+
+    def conf_flash(self, mapping, kconfprefix, cpuname, cpuslaves):
+        retflashs = []
+        devicetype = 'flash'
+        flashkconfprefix = '%sFLASH_' % kconfprefix
+        advdepends = '%s_ADVANCED_AUTOCONFIG' % flashkconfprefix
+        strs = {'choice': '', 'partitions': '', 'flashipname': ''}
+        spicsstr = ''
+
+        def add_flash(strlist, flashnode):
+            strs['choice'] = '%s%s' % (strs['choice'], strlist[0])
+            strs['partitions'] = '%s\n%s\n' % (strs['partitions'], strlist[1])
+            strs['flashipname'] = '%s\n%s\n' % (strs['flashipname'],
+                                                strlist[2])
+            retflashs.append(flashnode)
+
+        for m in as_list(mapping):
+            ipname = lindex(m, 0)
+            devinfo = get_ip_device_info('flash', m)
+            for hd in self.hsi.cells_of_ip(ipname):
+                name = self.hsi.get_property('NAME', hd)
+                if lsearch(cpuslaves, name) < 0:
+                    continue
+                if self.interrupt_validation(m, devicetype, hd) < 0:
+                    continue
+                kname = fix_kconf_name(name)
+                # The whole device_type list, not the flash_type
+                flash_type = lindex(m, 1)
+                flash_type1 = lindex(flash_type, 1)
+                flash_prefix = lindex(lindex(flash_type1, lsearch(
+                    flash_type1, '*flash_prefix*')), 1)
+                bankless = ('%s_bankless' % name, ('device_type', devicetype),
+                            ('ip_name', ipname))
+                if ipname == 'axi_emc':
+                    banks_property = lindex(
+                        get_ip_property_info('number_of_banks', devinfo), 0)
+                    bankinfo = get_ip_property_info('bank_property', devinfo)
+                    bankidreplacement = lindex(get_ip_property_info(
+                        'bankid_replacement_str', bankinfo), 0)
+                    bank_baseaddr_property = lindex(
+                        get_ip_property_info('bank_baseaddr', bankinfo), 0)
+                    bank_highaddr_property = lindex(
+                        get_ip_property_info('bank_highaddr', bankinfo), 0)
+                    bankcount = self.get_property(banks_property, hd)
+                    for i in range(tcl_count(bankcount)):
+                        isflash = self.get_property(
+                            'CONFIG.EMC_BOARD_INTERFACE', hd)
+                        if isflash != 'linear_flash':
+                            continue
+                        bankbaseaddr = self.get_property(string_map(
+                            bankidreplacement, i, bank_baseaddr_property), hd)
+                        bankhighaddr = self.get_property(string_map(
+                            bankidreplacement, i, bank_highaddr_property), hd)
+                        add_flash(self.conf_flash_partition(
+                            flashkconfprefix, name, str(i), advdepends,
+                            flash_prefix), (
+                                '%s_bank%d' % (name, i),
+                                ('device_type', devicetype),
+                                ('ip_name', ipname),
+                                ('baseaddr', bankbaseaddr),
+                                ('highaddr', bankhighaddr)))
+                elif as_string(flash_type) == 'spi':
+                    raise XsaUnsupported('chip selects of %s' % name)
+                elif ipname == 'ps7_sram':
+                    smcc = self.hsi.cell('ps7_smcc_0')
+                    if name == 'ps7_sram_0':
+                        nor_cs = self.hsi.get_property(
+                            'CONFIG.C_NOR_CHIP_SEL0', smcc)
+                    else:
+                        nor_cs = self.hsi.get_property(
+                            'CONFIG.C_NOR_CHIP_SEL1', smcc)
+                    if tcl_eq(nor_cs, '0'):
+                        continue
+                    add_flash(self.conf_flash_partition(
+                        flashkconfprefix, name, '', advdepends,
+                        flash_prefix), bankless)
+                else:
+                    add_flash(self.conf_flash_partition(
+                        flashkconfprefix, name, '', advdepends,
+                        flash_prefix), bankless)
+        choicestr = tcl_format(
+            '%s%s\n\t%s\n',
+            strs['choice'], 'config %sMANUAL_SELECT' % flashkconfprefix,
+            'bool "manual"')
+        partitionsstr = tcl_format(
+            '%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n%s\n',
+            'config %s' % advdepends,
+            'bool "Advanced Flash Auto Configuration"',
+            'default n',
+            'depends on !%sMANUAL_SELECT' % flashkconfprefix,
+            'help',
+            '  Select this option to enabled ',
+            strs['partitions'])
+        kconfigstr = tcl_format(
+            '%s\n%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n\t%s\n%s\n%s\n',
+            'menu "Flash Settings"',
+            'choice',
+            'prompt "Primary Flash"',
+            'help',
+            '  Select a Flash instance used as Primary Flash.',
+            '  PetaLinux auto config will apply the flash partition table settings',
+            '  to the primary flash.',
+            '  If you preferred flash is not on the list or you don\'t want PetaLinux',
+            '  to manage your flash partition, please select manual.',
+            choicestr,
+            'endchoice')
+        kconfigstr = '%s\n%s\n' % (kconfigstr, spicsstr)
+        self.output(tcl_format(
+            '%s\n%s\n%s\n%s\n',
+            kconfigstr, partitionsstr, strs['flashipname'], 'endmenu'))
+        return tuple(retflashs)
+
+    def conf_images_location(self, sds, flashes):
+        # Builds its menu without writing it, the one way it can fail is
+        # the boot image having no name for the arch
+        if self.current_arch not in ('microblaze', 'arm', 'aarch64'):
+            raise XsaUnsupported('no boot image for %s' % self.current_arch)
+
+
+def string_map(replacement, i, value):
+    '''string map [list $replacement $i] $value'''
+    if replacement is None:
+        raise XsaUnsupported('bank of %s with no bankid replacement' % value)
+    if replacement == '':
+        return value
+    return value.replace(replacement, str(i))
+
+
+def gen_xsa_syshw(hw_file, ipinfo_file):
+    '''(Kconfig.syshw, plnx_syshw_data, plnx_syshw_data.json) text
+    hw-description.tcl would write for the XSA hw_file, XsaUnsupported
+    if only it can.'''
+    try:
+        return XsaSyshw(hw_file, ipinfo_file).generate()
+    except (SdtUnsupported, OSError, zipfile.BadZipFile) as e:
+        raise XsaUnsupported(str(e))
+
+
+if __name__ == '__main__':
+    # xsa_syshw.py <xsa> <ipinfo.yaml> [<dir>]: print what is generated,
+    # or check it against the Kconfig.syshw, plnx_syshw_data and
+    # plnx_syshw_data.json xsct wrote in dir
+    import os
+    generated = gen_xsa_syshw(sys.argv[1], sys.argv[2])
+    if len(sys.argv) < 4:
+        print(generated[0] + generated[1], end='')
+        sys.exit(0)
+    diffs = []
+    for name, text in zip(('Kconfig.syshw', 'plnx_syshw_data',
+                           'plnx_syshw_data.json'), generated):
+        with open(os.path.join(sys.argv[3], name), 'r') as xsct_f:
+            if xsct_f.read() != text:
+                diffs.append(name)
+    for name in diffs:
+        print('%s differs' % name)
+    sys.exit(1 if diffs else 0)
@@ -0,0 +1,134 @@
+# Copyright (C) 2023, Advanced Micro Devices, Inc.  All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+# Client of gen-machine-scripts/xsct-server.tcl: one xsct kept running for
+# the hardware scripts of a run instead of one xsct per script, the XSA
+# opened once per digest. The worker command can be anything speaking the
+# same protocol, tests/test_xsct_server.py runs the server under tclsh
+# with openhw and hsi defined in tests/data/fake-hsi.tcl:
+#
+#   XsctServer(['tclsh', SERVER_TCL, '60', 'tests/data/fake-hsi.tcl'])
+
+import os
+import time
+import atexit
+import subprocess
+import logger_setup
+
+SERVER_TCL = os.path.join(os.path.dirname(__file__), 'gen-machine-scripts',
+                          'xsct-server.tcl')
+MARKER = b'@@xsct-server@@ '
+# Seconds the server waits for a request before exiting
+IDLE_TIMEOUT = 300
+# Margin for a request to reach the server before its idle timeout
+IDLE_MARGIN = 10
+
+logger, console_h = logger_setup.setup_logger()
+
+
+class XsctServerError(Exception):
+    '''The xsct server could not run a request, xsct has to be run on
+    its own.'''
+
+
+class XsctServer:
+    '''An xsct running xsct-server.tcl, started on the first request and
+    again after it timed out. Once it failed to start or to answer a
+    request it is not used again for the run.'''
+
+    def __init__(self, command=None, idle_timeout=IDLE_TIMEOUT):
+        self.command = command or ['xsct', '-sdx', '-nodisp', SERVER_TCL,
+                                   str(idle_timeout)]
+        self.idle_timeout = idle_timeout
+        self.process = None
+        self.last_request = 0
+        # Why the server is no longer used, once it failed
+        self.disabled = None
+
+    def start(self, cwd):
+        logger.debug('Starting xsct server: %s' % ' '.join(self.command))
+        try:
+            self.process = subprocess.Popen(self.command, cwd=cwd,
+                                            stdin=subprocess.PIPE,
+                                            stdout=subprocess.PIPE,
+                                            stderr=subprocess.STDOUT)
+        except OSError as e:
+            raise XsctServerError('Unable to start xsct server: %s' % e)
+
+    def stop(self):
+        if not self.process:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=IDLE_MARGIN)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def alive(self):
+        # Restart rather than race the server's idle timeout
+        if time.monotonic() - self.last_request > \
+                self.idle_timeout - IDLE_MARGIN:
+            self.stop()
+        return self.process is not None and self.process.poll() is None
+
+    def run(self, script, script_args, cwd, digest):
+        '''Runs script as xsct script script_args... in cwd would, the XSA
+        opened by it being kept open for digest. Returns its stdout and
+        stderr, raises Exception when it fails like run_cmd does.'''
+        fields = [os.path.abspath(cwd), digest, script] + script_args
+        if any('\t' in f or '\n' in f for f in fields):
+            raise XsctServerError('Unable to pass %s to xsct server' % fields)
+        if self.disabled:
+            raise XsctServerError('xsct server disabled: %s' % self.disabled)
+        try:
+            if not self.alive():
+                self.start(cwd)
+            try:
+                self.process.stdin.write(('\t'.join(fields) + '\n').encode())
+                self.process.stdin.flush()
+                status, stdout, stderr = self.read_reply()
+            except OSError as e:
+                self.stop()
+                raise XsctServerError('xsct server request failed: %s' % e)
+        except XsctServerError as e:
+            # Each later request would start a server that fails the same
+            # way, xsct runs on its own for the rest of the run instead
+            self.disabled = str(e)
+            raise
+        self.last_request = time.monotonic()
+        if status != 0:
+            raise Exception('\n%s\n%s' % (stdout, stderr))
+        logger.debug(stdout)
+        return stdout, stderr
+
+    def read_reply(self):
+        chatter = []
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                self.stop()
+                raise XsctServerError('xsct server exited:\n%s' %
+                                      b''.join(chatter).decode(errors='replace'))
+            if line.startswith(MARKER):
+                break
+            chatter.append(line)
+        try:
+            status, out_len, err_len = [int(f) for f in line[len(MARKER):].split()]
+        except ValueError:
+            self.stop()
+            raise XsctServerError('Bad xsct server reply: %s' % line)
+        stdout = self.process.stdout.read(out_len)
+        stderr = self.process.stdout.read(err_len)
+        if len(stdout) != out_len or len(stderr) != err_len:
+            self.stop()
+            raise XsctServerError('xsct server reply cut short')
+        stdout = b''.join(chatter) + stdout
+        return status, stdout.decode('utf-8', errors='replace'), \
+            stderr.decode('utf-8', errors='replace')
+
+
+server = XsctServer()
+atexit.register(server.stop)